@@ -10,9 +10,11 @@ from typing import Optional
 # Third-party imports
 import numpy as np
 from PyQt6.QtCore import QPoint, QPointF, QRect, Qt, pyqtSignal
-from PyQt6.QtGui import QColor, QImage, QMouseEvent, QPainter, QPen, QWheelEvent
+from PyQt6.QtGui import QColor, QMouseEvent, QPainter, QPen, QWheelEvent
 from PyQt6.QtWidgets import QWidget
 
+from .pixel_editor_utils import create_indexed_qimage
+
 
 class PixelCanvasV3(QWidget):
     """Refactored canvas that delegates to controller"""
@@ -52,6 +54,7 @@ class PixelCanvasV3(QWidget):
         
         # Vectorized rendering optimization
         self._color_lut = None  # Lookup table for color index to RGB conversion
+        self._color_table = []  # ARGB color table for Indexed8 buffers
         self._cached_lut_version = -1
 
         # QImage-based rendering optimization
@@ -61,6 +64,10 @@ class PixelCanvasV3(QWidget):
         self._dirty_rect = QRect()  # Rectangle that needs repainting
         self._image_version = 0  # Track image data changes
         self._cached_image_version = -1
+        self._scaled_image_version = -1
+        # Palette version whose color table is applied to each buffer
+        self._buffer_table_version = -1
+        self._scaled_table_version = -1
 
         # Setup
         self.setMouseTracking(True)
@@ -159,7 +166,6 @@ class PixelCanvasV3(QWidget):
         self.greyscale_mode = greyscale
         self._palette_version += 1  # Force color cache update
         self._invalidate_color_cache()  # More efficient - only invalidate color cache
-        self._invalidate_scaled_cache()  # Also invalidate scaled cache for immediate update
         self.update()
 
     def _update_qcolor_cache(self):
@@ -196,7 +202,7 @@ class PixelCanvasV3(QWidget):
         self._cached_lut_version = -1
 
     def _update_color_lut(self):
-        """Create vectorized color lookup table for fast numpy operations"""
+        """Create vectorized color lookup table and Indexed8 color table"""
         if self._cached_lut_version == self._palette_version:
             return  # LUT is still valid
         
@@ -221,6 +227,12 @@ class PixelCanvasV3(QWidget):
         for i in range(16, 256):
             if i not in self._qcolor_cache:
                 self._color_lut[i] = magenta
+
+        # ARGB color table for the Indexed8 buffers (keeps index 0 transparent)
+        self._color_table = [invalid_color.rgba()] * 256
+        for color_index, qcolor in self._qcolor_cache.items():
+            if 0 <= color_index < 256:
+                self._color_table[color_index] = qcolor.rgba()
         
         self._cached_lut_version = self._palette_version
 
@@ -232,13 +244,13 @@ class PixelCanvasV3(QWidget):
         self._cached_image_version = -1
         
     def _invalidate_color_cache(self):
-        """Invalidate only color-related caches without affecting image data"""
+        """Invalidate only color-related caches without affecting image data
+
+        The Indexed8 buffers are kept; they pick up the new color table the
+        next time they are requested, so a palette switch costs no pixel work.
+        """
         self._cached_palette_version = -1
         self._cached_lut_version = -1
-        # Only invalidate image buffer, not scaled cache if zoom hasn't changed
-        if self._qimage_buffer is not None:
-            self._qimage_buffer = None
-            self._cached_image_version = -1
 
     def _invalidate_scaled_cache(self):
         """Invalidate only the scaled image cache"""
@@ -246,14 +258,11 @@ class PixelCanvasV3(QWidget):
         self._cached_zoom = 0
 
     def _update_qimage_buffer(self):
-        """Update QImage buffer from current image data using vectorized numpy operations"""
-        if (
-            self._qimage_buffer is not None
-            and self._cached_image_version == self._image_version
-            and self._cached_palette_version == self._palette_version
-        ):
-            return  # Cache is still valid
+        """Update the Indexed8 QImage buffer from current image data
 
+        Pixel indices are copied only when the image data changes. Palette
+        changes just swap the buffer's color table.
+        """
         if not self.controller.has_image():
             return
 
@@ -261,48 +270,27 @@ class PixelCanvasV3(QWidget):
         if image_model.data is None:
             return
 
-        height, width = image_model.data.shape
-
         # Update color lookup table if needed
         self._update_color_lut()
 
-        # Create QImage buffer with alpha support
-        self._qimage_buffer = QImage(width, height, QImage.Format.Format_ARGB32)
-
-        # Vectorized color conversion using numpy
-        # Clamp indices to valid range to prevent crashes
-        image_data = np.clip(image_model.data, 0, 255).astype(np.uint8)
-        
-        # Use vectorized lookup to convert entire image at once
-        rgb_data = self._color_lut[image_data]  # Shape: (height, width, 3)
-        
-        # Convert RGB to ARGB format for QImage (add alpha channel)
-        argb_data = np.zeros((height, width, 4), dtype=np.uint8)
-        argb_data[:, :, 0] = rgb_data[:, :, 2]  # Blue
-        argb_data[:, :, 1] = rgb_data[:, :, 1]  # Green  
-        argb_data[:, :, 2] = rgb_data[:, :, 0]  # Red
-        
-        # Handle transparency for index 0
-        mask = (image_data == 0)
-        argb_data[mask, 3] = 0  # Alpha = 0 (transparent)
-        argb_data[~mask, 3] = 255  # Alpha = 255 (opaque)
-        
-        # Copy data directly to QImage buffer for maximum speed
-        # QImage.Format_ARGB32 uses ARGB format in memory with alpha support
-        buffer_ptr = self._qimage_buffer.bits()
-        buffer_ptr.setsize(height * width * 4)  # 4 bytes per pixel
-        
-        # Convert to bytes and copy to QImage buffer
-        argb_bytes = argb_data.tobytes()
-        buffer_ptr[:len(argb_bytes)] = argb_bytes
+        if (
+            self._qimage_buffer is None
+            or self._cached_image_version != self._image_version
+        ):
+            self._qimage_buffer = create_indexed_qimage(image_model.data)
+            self._cached_image_version = self._image_version
+            self._buffer_table_version = -1
 
-        self._cached_image_version = self._image_version
+        if self._buffer_table_version != self._palette_version:
+            self._qimage_buffer.setColorTable(self._color_table)
+            self._buffer_table_version = self._palette_version
 
     def _get_scaled_qimage(self):
-        """Get scaled QImage for current zoom level using optimized numpy scaling"""
-        if self._qimage_scaled is not None and self._cached_zoom == self.zoom:
-            return self._qimage_scaled
+        """Get scaled Indexed8 QImage for current zoom level
 
+        The scaled indices are rebuilt only on zoom or image changes; palette
+        changes swap the color table of the cached image.
+        """
         if not self.controller.has_image():
             return None
 
@@ -310,41 +298,25 @@ class PixelCanvasV3(QWidget):
         if image_model.data is None:
             return None
 
-        # For better performance, scale the image data directly instead of QImage
-        height, width = image_model.data.shape
-        
         # Update color lookup table if needed
         self._update_color_lut()
 
-        # Use numpy for efficient nearest-neighbor scaling
-        scaled_data = self._scale_image_data_numpy(image_model.data, self.zoom)
-        scaled_height, scaled_width = scaled_data.shape
-
-        # Create scaled QImage directly from scaled data with alpha support
-        self._qimage_scaled = QImage(scaled_width, scaled_height, QImage.Format.Format_ARGB32)
+        if (
+            self._qimage_scaled is None
+            or self._cached_zoom != self.zoom
+            or self._scaled_image_version != self._image_version
+        ):
+            # Use numpy for efficient nearest-neighbor scaling
+            scaled_data = self._scale_image_data_numpy(image_model.data, self.zoom)
+            self._qimage_scaled = create_indexed_qimage(scaled_data)
+            self._cached_zoom = self.zoom
+            self._scaled_image_version = self._image_version
+            self._scaled_table_version = -1
 
-        # Vectorized color conversion for scaled image
-        image_data = np.clip(scaled_data, 0, 255).astype(np.uint8)
-        rgb_data = self._color_lut[image_data]
-        
-        # Convert to ARGB format
-        argb_data = np.zeros((scaled_height, scaled_width, 4), dtype=np.uint8)
-        argb_data[:, :, 0] = rgb_data[:, :, 2]  # Blue
-        argb_data[:, :, 1] = rgb_data[:, :, 1]  # Green  
-        argb_data[:, :, 2] = rgb_data[:, :, 0]  # Red
-        
-        # Handle transparency for index 0
-        mask = (image_data == 0)
-        argb_data[mask, 3] = 0  # Alpha = 0 (transparent)
-        argb_data[~mask, 3] = 255  # Alpha = 255 (opaque)
-        
-        # Copy to QImage buffer
-        buffer_ptr = self._qimage_scaled.bits()
-        buffer_ptr.setsize(scaled_height * scaled_width * 4)
-        argb_bytes = argb_data.tobytes()
-        buffer_ptr[:len(argb_bytes)] = argb_bytes
+        if self._scaled_table_version != self._palette_version:
+            self._qimage_scaled.setColorTable(self._color_table)
+            self._scaled_table_version = self._palette_version
 
-        self._cached_zoom = self.zoom
         return self._qimage_scaled
     
     def _scale_image_data_numpy(self, image_data, zoom):
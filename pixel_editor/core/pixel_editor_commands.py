@@ -8,20 +8,30 @@ long-term storage to further reduce memory usage.
 
 # Standard library imports
 import pickle
+import threading
 import zlib
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent import futures
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Any, Optional
+from typing import Any, Protocol
 
 # Third-party imports
 import numpy as np
-from typing import Protocol
+
+from .pixel_editor_constants import (
+    UNDO_COMPRESSION_AGE,
+    UNDO_MAX_COMMANDS,
+    UNDO_MEMORY_BUDGET,
+)
+
 
 # Protocol definition
 class CanvasProtocol(Protocol):
     """Protocol for objects that can be used with undo commands"""
-    image_data: Optional[np.ndarray]
+    image_data: np.ndarray | None
 
 
 class UndoCommand(ABC):
@@ -35,7 +45,7 @@ class UndoCommand(ABC):
         """Initialize command with timestamp and compression state."""
         self.timestamp: datetime = datetime.now(timezone.utc)
         self.compressed: bool = False
-        self._compressed_data: Optional[bytes] = None
+        self._compressed_data: bytes | None = None
 
     @abstractmethod
     def execute(self, canvas: "CanvasProtocol") -> None:
@@ -68,10 +78,28 @@ class UndoCommand(ABC):
         Original data is cleared after compression.
         """
         if not self.compressed:
-            data = self._get_compress_data()
-            self._compressed_data = zlib.compress(pickle.dumps(data))
-            self._clear_uncompressed_data()
-            self.compressed = True
+            self._store_compressed(self._compress_payload())
+
+    def _compress_payload(self) -> bytes:
+        """Pickle and compress the command data without modifying the command.
+
+        Command data no longer changes once the command has executed, so this
+        may run without holding the undo manager's lock.
+
+        Returns:
+            Compressed command data
+        """
+        return zlib.compress(pickle.dumps(self._get_compress_data()))
+
+    def _store_compressed(self, payload: bytes) -> None:
+        """Replace the uncompressed data with a payload from _compress_payload.
+
+        Args:
+            payload: Compressed command data
+        """
+        self._compressed_data = payload
+        self._clear_uncompressed_data()
+        self.compressed = True
 
     def decompress(self) -> None:
         """Decompress command data for execution.
@@ -293,7 +321,7 @@ class FloodFillCommand(UndoCommand):
     old_color: int = 0
     new_color: int = 0
     affected_region: tuple[int, int, int, int] = (0, 0, 0, 0)  # x, y, width, height
-    old_data: Optional[np.ndarray] = None  # Only the affected region
+    old_data: np.ndarray | None = None  # Only the affected region
     _fill_executed: bool = False
 
     def __post_init__(self) -> None:
@@ -429,7 +457,7 @@ class FloodFillCommand(UndoCommand):
 
     def _get_compress_data(
         self,
-    ) -> tuple[int, int, int, int, tuple[int, int, int, int], Optional[np.ndarray], bool]:
+    ) -> tuple[int, int, int, int, tuple[int, int, int, int], np.ndarray | None, bool]:
         """Get flood fill data for compression."""
         return (self.x, self.y, self.old_color, self.new_color, self.affected_region, self.old_data, self._fill_executed)
 
@@ -438,7 +466,7 @@ class FloodFillCommand(UndoCommand):
         self.old_data = None
 
     def _restore_from_compressed(
-        self, data: tuple[int, int, int, int, tuple[int, int, int, int], Optional[np.ndarray], bool]
+        self, data: tuple[int, int, int, int, tuple[int, int, int, int], np.ndarray | None, bool]
     ) -> None:
         """Restore flood fill data from compressed format."""
         self.x, self.y, self.old_color, self.new_color, self.affected_region, self.old_data, self._fill_executed = data
@@ -475,7 +503,7 @@ class BatchCommand(UndoCommand):
     such as continuous drawing strokes or complex multi-step operations.
     """
 
-    def __init__(self, commands: Optional[list[UndoCommand]] = None) -> None:
+    def __init__(self, commands: list[UndoCommand] | None = None) -> None:
         """Initialize with optional list of commands.
 
         Args:
@@ -508,23 +536,17 @@ class BatchCommand(UndoCommand):
 
     def get_memory_size(self) -> int:
         """Calculate total memory usage of all commands."""
+        if self.compressed and self._compressed_data:
+            return len(self._compressed_data) + 64
         return sum(cmd.get_memory_size() for cmd in self.commands) + 64
 
-    def compress(self) -> None:
-        """Compress all individual commands."""
-        # First compress individual commands
-        for cmd in self.commands:
-            if not cmd.compressed:
-                cmd.compress()
-        # Then compress the batch itself
-        super().compress()
-
     def _get_compress_data(self) -> list[UndoCommand]:
         """Get command list for compression."""
         return self.commands
 
     def _clear_uncompressed_data(self) -> None:
-        """Commands are already compressed individually."""
+        """The compressed data holds every command of the batch."""
+        self.commands = []
 
     def _restore_from_compressed(self, data: list[UndoCommand]) -> None:
         """Restore command list from compressed format."""
@@ -566,21 +588,47 @@ class BatchCommand(UndoCommand):
 class UndoManager:
     """Manages undo/redo operations with automatic compression.
 
-    Maintains a stack of commands with a current index pointer.
-    Automatically compresses older commands to reduce memory usage.
+    History is kept in a deque with a current index pointer, so dropping redo
+    entries and evicting the oldest command are O(1) per command. Retention is
+    bounded both by command count and by a byte budget derived from
+    ``get_memory_size``. Commands that age past ``compression_age`` are handed
+    to a background thread for compression one at a time, and memory totals are
+    maintained incrementally so ``get_memory_usage`` is O(1).
     """
 
-    def __init__(self, max_commands: int = 100, compression_age: int = 20) -> None:
+    def __init__(
+        self,
+        max_commands: int = UNDO_MAX_COMMANDS,
+        compression_age: int = UNDO_COMPRESSION_AGE,
+        max_bytes: int | None = UNDO_MEMORY_BUDGET,
+        background_compression: bool = True,
+    ) -> None:
         """Initialize the undo manager.
 
         Args:
             max_commands: Maximum number of commands to retain
             compression_age: Commands older than this many steps are compressed
+            max_bytes: Byte budget for the whole history (None for no budget)
+            background_compression: Compress aged commands on a worker thread
         """
-        self.command_stack: list[UndoCommand] = []
+        self.command_stack: deque[UndoCommand] = deque()
         self.current_index: int = -1
         self.max_commands: int = max_commands
         self.compression_age: int = compression_age
+        self.max_bytes: int | None = max_bytes
+        self.background_compression: bool = background_compression
+
+        # Guards command_stack and the accounting below against the compressor
+        self._lock = threading.RLock()
+        # id(command) -> (accounted bytes, accounted as compressed)
+        self._accounting: dict[int, tuple[int, bool]] = {}
+        self._total_bytes: int = 0
+        self._compressed_count: int = 0
+        # Commands before this index have already been considered for compression
+        self._compress_cursor: int = 0
+        self._pending_compressions: set[Future[None]] = set()
+        # Guards _pending_compressions, which done-callbacks modify from the worker
+        self._pending_lock = threading.Lock()
 
     def execute_command(self, command: UndoCommand, canvas: CanvasProtocol) -> None:
         """Execute a new command and add to history.
@@ -589,24 +637,22 @@ class UndoManager:
             command: Command to execute
             canvas: Canvas to apply command to
         """
-        # Remove any commands after current index (clear redo stack)
-        if self.current_index < len(self.command_stack) - 1:
-            self.command_stack = self.command_stack[: self.current_index + 1]
-
-        # Execute the command
-        command.execute(canvas)
+        with self._lock:
+            # Remove any commands after current index (clear redo stack)
+            while len(self.command_stack) > self.current_index + 1:
+                self._untrack(self.command_stack.pop())
+            self._compress_cursor = min(self._compress_cursor, len(self.command_stack))
 
-        # Add to stack
-        self.command_stack.append(command)
-        self.current_index += 1
+            # Execute the command
+            command.execute(canvas)
 
-        # Enforce maximum size
-        if len(self.command_stack) > self.max_commands:
-            self.command_stack.pop(0)
-            self.current_index -= 1
+            # Add to stack
+            self.command_stack.append(command)
+            self.current_index += 1
+            self._track(command)
 
-        # Compress old commands
-        self._compress_old_commands()
+            self._enforce_limits()
+            self._compress_old_commands()
 
     def undo(self, canvas: CanvasProtocol) -> bool:
         """Undo the last command.
@@ -617,17 +663,19 @@ class UndoManager:
         Returns:
             True if undo was successful, False if nothing to undo
         """
-        if self.current_index >= 0:
-            command = self.command_stack[self.current_index]
+        with self._lock:
+            if self.current_index >= 0:
+                command = self.command_stack[self.current_index]
 
-            # Decompress if needed
-            if command.compressed:
-                command.decompress()
+                # Decompress if needed
+                if command.compressed:
+                    command.decompress()
+                    self._refresh(command)
 
-            command.unexecute(canvas)
-            self.current_index -= 1
-            return True
-        return False
+                command.unexecute(canvas)
+                self.current_index -= 1
+                return True
+            return False
 
     def redo(self, canvas: CanvasProtocol) -> bool:
         """Redo the next command.
@@ -638,25 +686,144 @@ class UndoManager:
         Returns:
             True if redo was successful, False if nothing to redo
         """
-        if self.current_index < len(self.command_stack) - 1:
-            self.current_index += 1
-            command = self.command_stack[self.current_index]
+        with self._lock:
+            if self.current_index < len(self.command_stack) - 1:
+                self.current_index += 1
+                command = self.command_stack[self.current_index]
 
-            # Decompress if needed
-            if command.compressed:
-                command.decompress()
+                # Decompress if needed
+                if command.compressed:
+                    command.decompress()
+                    self._refresh(command)
 
-            command.execute(canvas)
-            return True
-        return False
+                command.execute(canvas)
+                return True
+            return False
+
+    def group_last_commands(self, count: int) -> BatchCommand | None:
+        """Replace the newest ``count`` commands with a single BatchCommand.
+
+        Used to turn the per-pixel commands of a drawing stroke into one undo
+        step. The commands are assumed to have been executed already.
+
+        Args:
+            count: Number of commands at the top of the history to group
+
+        Returns:
+            The new batch command, or None if there were not enough commands
+        """
+        with self._lock:
+            if count < 1 or count > self.current_index + 1:
+                return None
+
+            # Grouping only makes sense at the top of the history
+            while len(self.command_stack) > self.current_index + 1:
+                self._untrack(self.command_stack.pop())
+
+            individual_commands: list[UndoCommand] = []
+            for _ in range(count):
+                command = self.command_stack.pop()
+                self._untrack(command)
+                individual_commands.append(command)
+            individual_commands.reverse()
+
+            batch = BatchCommand(individual_commands)
+            self.command_stack.append(batch)
+            self.current_index = len(self.command_stack) - 1
+            self._compress_cursor = min(self._compress_cursor, self.current_index)
+            self._track(batch)
+            self._enforce_limits()
+            return batch
+
+    def _track(self, command: UndoCommand) -> None:
+        """Add a command's size to the running totals."""
+        size = command.get_memory_size()
+        compressed = command.compressed
+        self._accounting[id(command)] = (size, compressed)
+        self._total_bytes += size
+        if compressed:
+            self._compressed_count += 1
+
+    def _untrack(self, command: UndoCommand) -> None:
+        """Remove a command's size from the running totals."""
+        size, compressed = self._accounting.pop(id(command), (0, False))
+        self._total_bytes -= size
+        if compressed:
+            self._compressed_count -= 1
+
+    def _refresh(self, command: UndoCommand) -> None:
+        """Re-account a command after it was compressed or decompressed."""
+        if id(command) in self._accounting:
+            self._untrack(command)
+            self._track(command)
+
+    def _enforce_limits(self) -> None:
+        """Evict the oldest commands until count and byte limits are met.
+
+        The newest command is always kept, even if it alone exceeds the budget.
+        """
+        while len(self.command_stack) > 1 and (
+            len(self.command_stack) > self.max_commands
+            or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            self._untrack(self.command_stack.popleft())
+            self.current_index -= 1
+            self._compress_cursor = max(0, self._compress_cursor - 1)
 
     def _compress_old_commands(self) -> None:
-        """Compress commands older than compression_age."""
+        """Schedule compression for commands that just aged past compression_age.
+
+        Only commands between the cursor and the compression boundary are
+        visited, so each command is considered once instead of rescanning the
+        whole history on every push.
+        """
         compress_before = max(0, self.current_index - self.compression_age)
 
-        for i in range(compress_before):
-            if not self.command_stack[i].compressed:
-                self.command_stack[i].compress()
+        while self._compress_cursor < compress_before:
+            command = self.command_stack[self._compress_cursor]
+            self._compress_cursor += 1
+            if command.compressed:
+                continue
+            if self.background_compression:
+                future = _get_compression_executor().submit(
+                    self._compress_command, command
+                )
+                with self._pending_lock:
+                    self._pending_compressions.add(future)
+                future.add_done_callback(self._compression_done)
+            else:
+                self._compress_command(command)
+
+    def _compress_command(self, command: UndoCommand) -> None:
+        """Compress a single command if it is still part of the history.
+
+        The pickling and zlib work runs without the lock so undo and redo are
+        not blocked behind it; only the check and the swap are locked.
+        """
+        with self._lock:
+            if id(command) not in self._accounting or command.compressed:
+                return
+        payload = command._compress_payload()
+        with self._lock:
+            if id(command) not in self._accounting or command.compressed:
+                return
+            command._store_compressed(payload)
+            self._refresh(command)
+
+    def _compression_done(self, future: Future[None]) -> None:
+        """Forget a finished background compression."""
+        with self._pending_lock:
+            self._pending_compressions.discard(future)
+
+    def wait_for_compression(self, timeout: float | None = None) -> None:
+        """Block until all scheduled background compressions have finished.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None waits indefinitely)
+        """
+        with self._pending_lock:
+            pending = list(self._pending_compressions)
+        futures.wait(pending, timeout=timeout)
 
     def get_memory_usage(self) -> dict[str, Any]:
         """Get current memory usage statistics.
@@ -664,23 +831,28 @@ class UndoManager:
         Returns:
             Dictionary with memory usage information
         """
-        total = sum(cmd.get_memory_size() for cmd in self.command_stack)
-        compressed = sum(1 for cmd in self.command_stack if cmd.compressed)
-
-        return {
-            "total_bytes": total,
-            "total_mb": total / (1024 * 1024),
-            "command_count": len(self.command_stack),
-            "compressed_count": compressed,
-            "current_index": self.current_index,
-            "can_undo": self.current_index >= 0,
-            "can_redo": self.current_index < len(self.command_stack) - 1,
-        }
+        with self._lock:
+            total = self._total_bytes
+            return {
+                "total_bytes": total,
+                "total_mb": total / (1024 * 1024),
+                "max_bytes": self.max_bytes,
+                "command_count": len(self.command_stack),
+                "compressed_count": self._compressed_count,
+                "current_index": self.current_index,
+                "can_undo": self.current_index >= 0,
+                "can_redo": self.current_index < len(self.command_stack) - 1,
+            }
 
     def clear(self) -> None:
         """Clear all undo/redo history."""
-        self.command_stack.clear()
-        self.current_index = -1
+        with self._lock:
+            self.command_stack.clear()
+            self.current_index = -1
+            self._accounting.clear()
+            self._total_bytes = 0
+            self._compressed_count = 0
+            self._compress_cursor = 0
 
     def save_history(self) -> list[dict[str, Any]]:
         """Serialize command history for saving.
@@ -688,7 +860,8 @@ class UndoManager:
         Returns:
             List of serialized commands
         """
-        return [cmd.to_dict() for cmd in self.command_stack]
+        with self._lock:
+            return [cmd.to_dict() for cmd in self.command_stack]
 
     def load_history(
         self, history: list[dict[str, Any]], canvas: CanvasProtocol
@@ -699,23 +872,45 @@ class UndoManager:
             history: List of serialized commands
             canvas: Canvas to validate commands against
         """
-        self.clear()
-
-        for cmd_data in history:
-            cmd_type = cmd_data["type"]
-
-            if cmd_type == "DrawPixelCommand":
-                cmd = DrawPixelCommand.from_dict(cmd_data)
-            elif cmd_type == "DrawLineCommand":
-                cmd = DrawLineCommand.from_dict(cmd_data)
-            elif cmd_type == "FloodFillCommand":
-                cmd = FloodFillCommand.from_dict(cmd_data)
-            elif cmd_type == "BatchCommand":
-                cmd = BatchCommand.from_dict(cmd_data)
-            else:
-                continue  # Skip unknown command types
+        with self._lock:
+            self.clear()
+
+            for cmd_data in history:
+                cmd_type = cmd_data["type"]
+
+                if cmd_type == "DrawPixelCommand":
+                    cmd = DrawPixelCommand.from_dict(cmd_data)
+                elif cmd_type == "DrawLineCommand":
+                    cmd = DrawLineCommand.from_dict(cmd_data)
+                elif cmd_type == "FloodFillCommand":
+                    cmd = FloodFillCommand.from_dict(cmd_data)
+                elif cmd_type == "BatchCommand":
+                    cmd = BatchCommand.from_dict(cmd_data)
+                else:
+                    continue  # Skip unknown command types
+
+                self.command_stack.append(cmd)
+                self._track(cmd)
+
+            # Set current index to end of loaded history
+            self.current_index = len(self.command_stack) - 1
+            self._enforce_limits()
 
-            self.command_stack.append(cmd)
 
-        # Set current index to end of loaded history
-        self.current_index = len(self.command_stack) - 1
+_compression_executor: ThreadPoolExecutor | None = None
+_compression_executor_lock = threading.Lock()
+
+
+def _get_compression_executor() -> ThreadPoolExecutor:
+    """Get the shared single-thread executor used for command compression.
+
+    One worker is shared by all UndoManager instances so that replacing the
+    manager (new file, image load) does not leave idle threads behind.
+    """
+    global _compression_executor
+    with _compression_executor_lock:
+        if _compression_executor is None:
+            _compression_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="undo-compress"
+            )
+        return _compression_executor
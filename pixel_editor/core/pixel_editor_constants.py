@@ -107,6 +107,9 @@ MAX_RECENT_PALETTE_FILES = 10
 
 UNDO_STACK_SIZE = 50
 REDO_STACK_SIZE = 50
+UNDO_MAX_COMMANDS = 100  # Hard cap on retained history entries
+UNDO_MEMORY_BUDGET = 16 * 1024 * 1024  # Byte budget for undo history (16 MB)
+UNDO_COMPRESSION_AGE = 20  # Commands older than this many steps get compressed
 
 # ============================================================================
 # TIMING CONSTANTS
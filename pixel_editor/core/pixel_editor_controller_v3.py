@@ -14,10 +14,9 @@ from typing import List, Optional, Tuple
 import numpy as np
 from PIL import Image
 from PyQt6.QtCore import QObject, QTimer, pyqtSignal
-from PyQt6.QtGui import QColor, QImage, QPixmap
+from PyQt6.QtGui import QPixmap
 
 from .pixel_editor_commands import (
-    BatchCommand,
     DrawPixelCommand,
     FloodFillCommand,
     UndoManager,
@@ -25,7 +24,7 @@ from .pixel_editor_commands import (
 from .pixel_editor_managers import FileManager, PaletteManager, ToolManager
 from .pixel_editor_models import ImageModel, PaletteModel, ProjectModel
 from .pixel_editor_settings_adapter import PixelEditorSettingsAdapter
-from .pixel_editor_utils import debug_log
+from .pixel_editor_utils import create_color_table, create_indexed_qimage, debug_log
 
 
 class ImageModelAdapter:
@@ -525,12 +524,6 @@ class PixelEditorController(QObject):
         if self.image_model.data is None:
             return None
 
-        # Get image dimensions
-        height, width = self.image_model.data.shape
-
-        # Create QImage directly without going through PIL
-        qimage = QImage(width, height, QImage.Format.Format_RGB32)
-
         # Get colors
         if apply_palette:
             colors = self.palette_model.colors
@@ -538,16 +531,12 @@ class PixelEditorController(QObject):
             # Grayscale colors
             colors = [(i * 17, i * 17, i * 17) for i in range(16)]
 
-        # Fill the image
-        for y in range(height):
-            for x in range(width):
-                color_idx = int(self.image_model.data[y, x])
-                if 0 <= color_idx < len(colors):
-                    r, g, b = colors[color_idx]
-                    qimage.setPixel(x, y, QColor(r, g, b).rgb())
-                else:
-                    # Invalid index - use magenta
-                    qimage.setPixel(x, y, QColor(255, 0, 255).rgb())
+        # Indexed8 image: the palette is applied through the color table,
+        # invalid indices show as magenta
+        qimage = create_indexed_qimage(
+            self.image_model.data,
+            create_color_table(list(colors), transparent_index=None),
+        )
 
         return QPixmap.fromImage(qimage)
 
@@ -722,24 +711,7 @@ class PixelEditorController(QObject):
             # Commands were already executed individually during press/move
             # Now group the last N commands into a batch for better undo experience
             if len(self._drawing_pixels) > 1:
-                # Get the last N commands that were just executed
-                num_commands = len(self._drawing_pixels)
-                if len(self.undo_manager.command_stack) >= num_commands:
-                    # Remove the individual commands
-                    individual_commands = []
-                    for _ in range(num_commands):
-                        if self.undo_manager.command_stack:
-                            individual_commands.append(self.undo_manager.command_stack.pop())
-                            self.undo_manager.current_index -= 1
-                    
-                    # Create a batch command with all the individual commands
-                    batch = BatchCommand()
-                    for cmd in reversed(individual_commands):
-                        batch.add_command(cmd)
-                    
-                    # Add the batch command to the stack
-                    self.undo_manager.command_stack.append(batch)
-                    self.undo_manager.current_index += 1
+                self.undo_manager.group_last_commands(len(self._drawing_pixels))
 
         # Reset drawing state
         self._is_drawing = False
@@ -8,7 +8,11 @@ Extracted to avoid duplication between modules
 import traceback
 from datetime import datetime, timezone
 from pathlib import Path, PosixPath, WindowsPath
-from typing import Any, Optional, Union
+from typing import Any, Union
+
+# Third-party imports
+import numpy as np
+from PyQt6.QtGui import QImage
 
 # ================================================================================
 # Debug Configuration
@@ -47,7 +51,7 @@ def debug_log(category: str, message: str, level: str = "INFO") -> None:
         print(formatted_msg)  # Default
 
 
-def debug_color(color_index: int, rgb: Optional[tuple[int, int, int]] = None) -> str:
+def debug_color(color_index: int, rgb: tuple[int, int, int] | None = None) -> str:
     """Format color information for debugging
 
     Args:
@@ -212,6 +216,59 @@ def create_indexed_palette(colors: list[tuple[int, int, int]]) -> list[int]:
     return palette
 
 
+def create_color_table(
+    colors: list[tuple[int, int, int]],
+    transparent_index: int | None = 0,
+    invalid_color: tuple[int, int, int] = (255, 0, 255),
+) -> list[int]:
+    """Create a 256-entry ARGB color table for an Indexed8 QImage
+
+    Args:
+        colors: List of RGB color tuples (usually 16)
+        transparent_index: Index rendered with alpha 0, or None for fully opaque
+        invalid_color: RGB used for indices beyond the palette (magenta by default)
+
+    Returns:
+        List of 256 ARGB32 values for QImage.setColorTable()
+    """
+    r, g, b = invalid_color
+    table = [0xFF000000 | (r << 16) | (g << 8) | b] * 256
+    for i, color in enumerate(colors[:256]):
+        r, g, b = validate_rgb_color(color)
+        table[i] = 0xFF000000 | (r << 16) | (g << 8) | b
+    if transparent_index is not None and 0 <= transparent_index < 256:
+        table[transparent_index] &= 0x00FFFFFF
+    return table
+
+
+def create_indexed_qimage(
+    image_data: np.ndarray, color_table: list[int] | None = None
+) -> QImage:
+    """Create a Format_Indexed8 QImage holding a copy of the index data
+
+    Palette changes can then be applied with QImage.setColorTable() without
+    touching the pixels.
+
+    Args:
+        image_data: 2D array of color indices (height, width)
+        color_table: Optional color table from create_color_table()
+
+    Returns:
+        Indexed8 QImage that owns its pixel buffer
+    """
+    height, width = image_data.shape
+    qimage = QImage(width, height, QImage.Format.Format_Indexed8)
+    if width and height:
+        stride = qimage.bytesPerLine()
+        ptr = qimage.bits()
+        ptr.setsize(stride * height)
+        buffer = np.frombuffer(ptr, dtype=np.uint8).reshape(height, stride)
+        buffer[:, :width] = np.clip(image_data, 0, 255)
+    if color_table is not None:
+        qimage.setColorTable(color_table)
+    return qimage
+
+
 # ================================================================================
 # Palette File Validation
 # ================================================================================
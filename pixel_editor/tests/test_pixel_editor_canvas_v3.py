@@ -569,13 +569,13 @@ class TestCanvasTransparency:
         return canvas
 
     def test_qimage_format_supports_alpha(self, canvas_with_transparency):
-        """Test that QImage uses ARGB32 format which supports transparency"""
+        """Test that QImage uses an indexed format whose color table carries alpha"""
         # Force QImage buffer update
         canvas_with_transparency._update_qimage_buffer()
         
         # Check that QImage buffer exists and has correct format
         assert canvas_with_transparency._qimage_buffer is not None
-        assert canvas_with_transparency._qimage_buffer.format() == canvas_with_transparency._qimage_buffer.Format.Format_ARGB32
+        assert canvas_with_transparency._qimage_buffer.format() == canvas_with_transparency._qimage_buffer.Format.Format_Indexed8
         assert canvas_with_transparency._qimage_buffer.hasAlphaChannel()
 
     def test_transparent_pixels_have_zero_alpha(self, canvas_with_transparency):
@@ -657,7 +657,7 @@ class TestCanvasTransparency:
         
         # Check transparency in scaled image
         assert scaled_image is not None
-        assert scaled_image.format() == scaled_image.Format.Format_ARGB32
+        assert scaled_image.format() == scaled_image.Format.Format_Indexed8
         assert scaled_image.hasAlphaChannel()
         
         # Check that transparent pixels are still transparent in scaled image
@@ -665,6 +665,26 @@ class TestCanvasTransparency:
         alpha = (pixel >> 24) & 0xFF
         assert alpha == 0, f"Transparent pixel should remain transparent after zoom change"
 
+    def test_palette_change_swaps_color_table_only(self, canvas_with_transparency):
+        """Test that a palette change recolors cached images without rebuilding them"""
+        canvas = canvas_with_transparency
+        canvas._update_qimage_buffer()
+        buffer_before = canvas._qimage_buffer
+        scaled_before = canvas._get_scaled_qimage()
+        pixel_before = scaled_before.pixel(10, 0)  # Index 1
+
+        canvas.controller.palette_model.colors[1] = (255, 0, 0)
+        canvas.controller.paletteChanged.emit()
+        canvas._update_qimage_buffer()
+        scaled_after = canvas._get_scaled_qimage()
+
+        # Same image objects, new colors, transparency preserved
+        assert canvas._qimage_buffer is buffer_before
+        assert scaled_after is scaled_before
+        assert scaled_after.pixel(10, 0) != pixel_before
+        assert scaled_after.pixel(10, 0) == 0xFFFF0000
+        assert (scaled_after.pixel(0, 0) >> 24) & 0xFF == 0
+
     def test_color_cache_preserves_transparency(self, canvas_with_transparency):
         """Test that the color cache correctly stores transparency information"""
         # Update color cache
@@ -700,14 +720,15 @@ class TestCanvasTransparency:
 
     def test_transparency_regression_fix(self, canvas_with_transparency):
         """Regression test for transparency issue - ensure RGB32 format bug doesn't return"""
-        # This test ensures that the transparency fix (using ARGB32 instead of RGB32) stays fixed
+        # This test ensures that the transparency fix (alpha-capable format) stays fixed
         
         # Force QImage buffer update
         canvas_with_transparency._update_qimage_buffer()
         
-        # Verify that we're using ARGB32 format (not RGB32)
+        # Verify that we're using an alpha-capable indexed format (not RGB32)
         qimage = canvas_with_transparency._qimage_buffer
-        assert qimage.format() == qimage.Format.Format_ARGB32, "QImage should use ARGB32 format, not RGB32"
+        assert qimage.format() == qimage.Format.Format_Indexed8, "QImage should use Indexed8 format, not RGB32"
+        assert qimage.hasAlphaChannel()
         
         # Verify that transparency actually works
         pixel = qimage.pixel(0, 0)  # Should be transparent
@@ -716,4 +737,4 @@ class TestCanvasTransparency:
         
         # Also check scaled image format
         scaled_image = canvas_with_transparency._get_scaled_qimage()
-        assert scaled_image.format() == scaled_image.Format.Format_ARGB32, "Scaled QImage should use ARGB32 format"
+        assert scaled_image.format() == scaled_image.Format.Format_Indexed8, "Scaled QImage should use Indexed8 format"
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Unit tests for UndoManager history bookkeeping
+Tests byte-budgeted eviction, incremental compression and O(1) memory stats
+"""
+
+import threading
+from dataclasses import dataclass
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from pixel_editor.core.pixel_editor_commands import (
+    BatchCommand,
+    DrawPixelCommand,
+    FloodFillCommand,
+    UndoManager,
+)
+
+
+@dataclass
+class SimpleCanvas:
+    """Minimal canvas satisfying CanvasProtocol"""
+
+    image_data: np.ndarray | None = None
+
+
+@pytest.fixture
+def canvas():
+    return SimpleCanvas(image_data=np.zeros((16, 16), dtype=np.uint8))
+
+
+def draw(manager, canvas, x, y, color):
+    old = int(canvas.image_data[y, x])
+    manager.execute_command(
+        DrawPixelCommand(x=x, y=y, old_color=old, new_color=color), canvas
+    )
+
+
+def summed_size(manager):
+    return sum(cmd.get_memory_size() for cmd in manager.command_stack)
+
+
+class TestUndoManagerLimits:
+    """Test count and byte limits"""
+
+    def test_count_limit_evicts_oldest(self, canvas):
+        manager = UndoManager(max_commands=5, background_compression=False)
+        for i in range(8):
+            draw(manager, canvas, i, 0, 1)
+
+        assert len(manager.command_stack) == 5
+        assert manager.current_index == 4
+        assert manager.command_stack[0].x == 3
+
+    def test_byte_budget_evicts_oldest(self, canvas):
+        # Each uncompressed pixel command accounts for 80 bytes
+        manager = UndoManager(
+            max_commands=100, max_bytes=400, background_compression=False
+        )
+        for i in range(10):
+            draw(manager, canvas, i, 0, 1)
+
+        usage = manager.get_memory_usage()
+        assert usage["total_bytes"] <= 400
+        assert usage["command_count"] == 5
+        assert manager.command_stack[-1].x == 9
+
+    def test_oversized_command_is_kept(self, canvas):
+        manager = UndoManager(max_bytes=10, background_compression=False)
+        draw(manager, canvas, 0, 0, 1)
+
+        assert len(manager.command_stack) == 1
+        assert manager.undo(canvas)
+        assert canvas.image_data[0, 0] == 0
+
+    def test_redo_entries_dropped_on_new_command(self, canvas):
+        manager = UndoManager(background_compression=False)
+        for i in range(4):
+            draw(manager, canvas, i, 0, 1)
+        manager.undo(canvas)
+        manager.undo(canvas)
+
+        draw(manager, canvas, 5, 5, 2)
+
+        usage = manager.get_memory_usage()
+        assert usage["command_count"] == 3
+        assert not usage["can_redo"]
+        assert usage["total_bytes"] == summed_size(manager)
+
+
+class TestUndoManagerCompression:
+    """Test incremental and background compression"""
+
+    def test_synchronous_compression_of_aged_commands(self, canvas):
+        manager = UndoManager(compression_age=3, background_compression=False)
+        for i in range(10):
+            draw(manager, canvas, i, 0, 1)
+
+        # Commands with index < current_index - compression_age are compressed
+        compressed = [cmd.compressed for cmd in manager.command_stack]
+        assert compressed == [True] * 6 + [False] * 4
+        assert manager.get_memory_usage()["compressed_count"] == 6
+
+    def test_background_compression(self, canvas):
+        manager = UndoManager(compression_age=2)
+        for i in range(8):
+            draw(manager, canvas, i, 1, 3)
+        manager.wait_for_compression(timeout=5)
+
+        usage = manager.get_memory_usage()
+        assert usage["compressed_count"] == 5
+        assert usage["total_bytes"] == summed_size(manager)
+
+    def test_undo_through_compressed_commands(self, canvas):
+        manager = UndoManager(compression_age=1)
+        for i in range(6):
+            draw(manager, canvas, i, 2, i + 1)
+        manager.wait_for_compression(timeout=5)
+
+        while manager.undo(canvas):
+            pass
+
+        assert not canvas.image_data.any()
+        usage = manager.get_memory_usage()
+        assert usage["compressed_count"] == 0
+        assert usage["total_bytes"] == summed_size(manager)
+
+    def test_undo_is_not_blocked_by_background_compression(self, canvas):
+        manager = UndoManager(compression_age=1)
+        started, release = threading.Event(), threading.Event()
+        compress_payload = DrawPixelCommand._compress_payload
+
+        def slow_payload(command):
+            started.set()
+            release.wait(5)
+            return compress_payload(command)
+
+        with patch.object(DrawPixelCommand, "_compress_payload", slow_payload):
+            for i in range(3):
+                draw(manager, canvas, i, 3, 1)
+            assert started.wait(5)
+            # The compressor is mid-way through; undo must not wait for it
+            assert manager.undo(canvas)
+            release.set()
+            manager.wait_for_compression(timeout=5)
+
+        assert manager.get_memory_usage()["total_bytes"] == summed_size(manager)
+        while manager.undo(canvas):
+            pass
+        assert not canvas.image_data.any()
+
+    def test_compressed_batch_round_trip(self, canvas):
+        manager = UndoManager(compression_age=0, background_compression=False)
+        for i in range(4):
+            draw(manager, canvas, i, 4, 5)
+        batch = manager.group_last_commands(4)
+        draw(manager, canvas, 0, 5, 6)
+
+        assert batch.compressed
+        assert batch.commands == []
+        assert manager.get_memory_usage()["total_bytes"] == summed_size(manager)
+
+        manager.undo(canvas)
+        manager.undo(canvas)
+        assert not canvas.image_data.any()
+
+    def test_accounting_matches_flood_fill_size(self, canvas):
+        manager = UndoManager(background_compression=False)
+        fill = FloodFillCommand(x=0, y=0, old_color=0, new_color=4)
+        manager.execute_command(fill, canvas)
+
+        assert manager.get_memory_usage()["total_bytes"] == fill.get_memory_size()
+        assert fill.get_memory_size() > 16 * 16
+
+
+class TestUndoManagerGrouping:
+    """Test grouping of stroke commands into a batch"""
+
+    def test_group_last_commands(self, canvas):
+        manager = UndoManager(background_compression=False)
+        draw(manager, canvas, 0, 0, 1)
+        for i in range(1, 4):
+            draw(manager, canvas, i, 0, 2)
+
+        batch = manager.group_last_commands(3)
+
+        assert isinstance(batch, BatchCommand)
+        assert len(manager.command_stack) == 2
+        assert manager.current_index == 1
+        assert manager.get_memory_usage()["total_bytes"] == summed_size(manager)
+
+        manager.undo(canvas)
+        assert list(canvas.image_data[0, :4]) == [1, 0, 0, 0]
+
+    def test_group_too_many_commands(self, canvas):
+        manager = UndoManager(background_compression=False)
+        draw(manager, canvas, 0, 0, 1)
+
+        assert manager.group_last_commands(5) is None
+        assert len(manager.command_stack) == 1
+
+    def test_clear_resets_accounting(self, canvas):
+        manager = UndoManager(background_compression=False)
+        for i in range(3):
+            draw(manager, canvas, i, 0, 1)
+        manager.clear()
+
+        usage = manager.get_memory_usage()
+        assert usage["total_bytes"] == 0
+        assert usage["command_count"] == 0
+        assert usage["compressed_count"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
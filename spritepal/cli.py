@@ -0,0 +1,283 @@
+"""
+Headless command-line interface for SpritePal
+
+    python -m spritepal.cli scan ROM [ROM...] [--active ROM] [--jobs N]
+    python -m spritepal.cli extract ROM --output DIR [--offset 0x...]
+    python -m spritepal.cli inject ROM SPRITE.png --offset 0x... --output OUT.sfc
+    python -m spritepal.cli index ROM --output INDEX.pkl [--offset 0x...]
+    python -m spritepal.cli remap ROM TARGET [--offset 0x...] [--save-version NAME --game GAME]
+
+Every command writes one JSON object per line to stdout: an event per sprite
+as soon as it is ready, then a "summary" event. Logging goes to stderr.
+
+Nothing here imports Qt or the manager stack, and the core modules are only
+imported by the command that needs them, so startup stays fast. Scans of
+every ROM share one process pool; decompression runs in the HAL process pool.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO
+
+# Core modules use top-level imports (core.*, utils.*)
+sys.path.insert(0, str(Path(__file__).parent))
+
+if TYPE_CHECKING:
+    from core.batch_extraction import BatchSprite
+    from core.rom_extractor import ROMExtractor
+    from core.scan_scheduler import ScanProgress
+    from utils.rom_cache import ROMCache
+
+# Sprites hashed per similarity index batch
+INDEX_BATCH_SIZE = 64
+
+# Sprite sheet width used for similarity hashing, as in the GUI indexer
+INDEX_WIDTH_TILES = 16
+
+class JSONLinesWriter:
+    """Writes events as JSON lines, flushing each so consumers can stream them"""
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+
+    def emit(self, event: str, **fields: Any) -> None:
+        self.stream.write(json.dumps({"event": event, **fields}, default=str) + "\n")
+        self.stream.flush()
+
+def _offset(value: str) -> int:
+    """Parse a decimal or 0x-prefixed offset"""
+    try:
+        offset = int(value, 0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid offset: {value}") from None
+    if offset < 0:
+        raise argparse.ArgumentTypeError(f"offset must not be negative: {value}")
+    return offset
+
+def _open_cache(args: argparse.Namespace) -> ROMCache:
+    """ROM cache that does not load the settings manager"""
+    from utils.rom_cache import ROMCache
+    return ROMCache(cache_dir=args.cache_dir, use_settings=False)
+
+def _selected_sprites(args: argparse.Namespace, extractor: ROMExtractor) -> list[BatchSprite]:
+    """Sprites named with --offset, or the known locations plus cached scan results"""
+    from core.batch_extraction import BatchSprite, collect_sprites
+
+    if args.offset:
+        return [BatchSprite(offset) for offset in args.offset]
+    return collect_sprites(
+        extractor.get_known_sprite_locations(args.rom),
+        _open_cache(args).get_cached_scan_sprites(args.rom),
+    )
+
+def cmd_scan(args: argparse.Namespace, out: JSONLinesWriter) -> int:
+    """Scan ROMs on a shared process pool and store the results in the ROM cache"""
+    from core.scan_scheduler import ScanScheduler
+
+    start_time = time.perf_counter()
+    scheduler = ScanScheduler(jobs=args.jobs, cache=None if args.no_cache else _open_cache(args), step=args.step)
+    for rom_path in args.rom:
+        scheduler.add_rom(rom_path, start=args.start, end=args.end)
+    if args.active:
+        scheduler.set_active_rom(args.active)
+
+    def on_progress(progress: ScanProgress) -> None:
+        for sprite in progress.sprites:
+            out.emit("sprite", rom=progress.rom_paths[0], cached=progress.cached, **sprite)
+
+    scans = scheduler.run(on_progress)
+    for scan in scans:
+        out.emit("rom", roms=scan.rom_paths, fingerprint=scan.fingerprint, found=len(scan.sprites),
+                 cached=scan.cached, resumed_from=scan.resumed_from)
+
+    seconds = time.perf_counter() - start_time
+    scanned = sum(scan.end - (scan.resumed_from or scan.start) for scan in scans)
+    out.emit("summary", roms=len(args.rom), distinct=len(scans), found=sum(len(scan.sprites) for scan in scans),
+             chunk_cache_hits=scheduler.chunk_cache_hits, seconds=round(seconds, 3),
+             bytes_per_second=round(scanned / seconds) if seconds > 0 else 0)
+    return 0
+
+def cmd_extract(args: argparse.Namespace, out: JSONLinesWriter) -> int:
+    """Extract sprites to PNG with a resumable BatchExtractionJob"""
+    from core.batch_extraction import BatchExtractionJob
+    from core.rom_extractor import ROMExtractor
+
+    extractor = ROMExtractor()
+    sprites = _selected_sprites(args, extractor)
+    job = BatchExtractionJob(extractor.hal_compressor, args.rom, args.output, encode_workers=args.jobs)
+
+    summary = job.run(sprites, result_callback=lambda result: out.emit("sprite", **asdict(result)))
+    out.emit("summary", total=summary.total, extracted=summary.extracted, resumed=summary.resumed,
+             failed=summary.failed, seconds=round(summary.seconds, 3),
+             sprites_per_second=round(summary.sprites_per_second, 1))
+    return 0 if summary.failed == 0 else 1
+
+def cmd_inject(args: argparse.Namespace, out: JSONLinesWriter) -> int:
+    """Inject one sprite PNG"""
+    from core.rom_injector import ROMInjector
+
+    start_time = time.perf_counter()
+    success, message = ROMInjector().inject_sprite_to_rom(
+        args.sprite, args.rom, args.output, args.offset,
+        fast_compression=args.fast, create_backup=not args.no_backup,
+    )
+    out.emit("summary", success=success, offset=args.offset, output=args.output, message=message,
+             seconds=round(time.perf_counter() - start_time, 3))
+    return 0 if success else 1
+
+def cmd_index(args: argparse.Namespace, out: JSONLinesWriter) -> int:
+    """Hash sprites into a visual similarity index and export it"""
+    import numpy as np
+    from core.indexed_image import decode_sprite_tiles
+    from core.rom_extractor import ROMExtractor
+    from core.visual_similarity_search import VisualSimilarityEngine
+
+    start_time = time.perf_counter()
+    extractor = ROMExtractor()
+    hal_compressor = extractor.hal_compressor
+    sprites = _selected_sprites(args, extractor)
+    engine = VisualSimilarityEngine()
+    indexed = failed = 0
+
+    for index in range(0, len(sprites), INDEX_BATCH_SIZE):
+        chunk = sprites[index:index + INDEX_BATCH_SIZE]
+        decompressed = hal_compressor.decompress_batch([(args.rom, sprite.offset) for sprite in chunk])
+
+        # Sprites are hashed in batches of equal size
+        by_shape: dict[tuple[int, ...], list[tuple[int, np.ndarray]]] = {}
+        for sprite, (ok, data) in zip(chunk, decompressed, strict=True):
+            pixels = decode_sprite_tiles(data, INDEX_WIDTH_TILES) if ok and isinstance(data, bytes) else None
+            if pixels is None:
+                failed += 1
+                out.emit("sprite", offset=sprite.offset, indexed=False, error=str(data) if not ok else "No complete tiles")
+                continue
+            by_shape.setdefault(pixels.shape, []).append((sprite.offset, pixels))
+
+        for batch in by_shape.values():
+            engine.index_sprite_batch([offset for offset, _ in batch], np.stack([pixels for _, pixels in batch]))
+            for offset, pixels in batch:
+                out.emit("sprite", offset=offset, indexed=True, width=pixels.shape[1], height=pixels.shape[0])
+            indexed += len(batch)
+
+    engine.build_similarity_index()
+    engine.export_index(Path(args.output))
+    seconds = time.perf_counter() - start_time
+    out.emit("summary", indexed=indexed, failed=failed, output=args.output, seconds=round(seconds, 3),
+             sprites_per_second=round(indexed / seconds, 1) if seconds > 0 else 0.0)
+    return 0
+
+def cmd_remap(args: argparse.Namespace, out: JSONLinesWriter) -> int:
+    """Port sprite offsets of ROM to another revision by block signature"""
+    from core.offset_remapper import OffsetRemapper
+    from core.rom_extractor import ROMExtractor
+    from core.sprite_config_loader import SpriteConfigLoader
+
+    # Known sprites come from the same config the new version is saved to
+    loader = SpriteConfigLoader(args.config)
+    extractor = ROMExtractor()
+    extractor.sprite_config_loader = extractor.rom_injector.sprite_config_loader = loader
+    sprites = _selected_sprites(args, extractor)
+    summary = OffsetRemapper(extractor.hal_compressor).remap(args.rom, args.target, sprites)
+    for result in summary.results:
+        out.emit("sprite", **asdict(result))
+
+    updated = None
+    if args.save_version:
+        checksum = extractor.rom_injector.read_rom_header(args.target).checksum
+        updated = loader.add_version_offsets(args.game, args.save_version, checksum, summary.remapped())
+        if updated:
+            loader.save_config()
+        else:
+            out.emit("error", command=args.command,
+                     error=f"No sprite of {args.game} in the config matched; {args.save_version} was not saved")
+
+    out.emit("summary", total=len(summary.results), found=summary.found, moved=summary.moved,
+             missing=summary.missing, updated=updated, seconds=round(summary.seconds, 3))
+    return 0 if summary.missing == 0 and updated != 0 else 1
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="spritepal.cli", description="Headless SpritePal batch tool (JSON lines on stdout)")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="log to stderr (-vv for debug)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name: str, help_text: str, roms: str | None = None) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("rom", nargs=roms, help="ROM file")
+        command.add_argument("--cache-dir", help="ROM cache directory (default: ~/.spritepal_rom_cache)")
+        command.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes/threads")
+        return command
+
+    scan = add_command("scan", "find compressed sprites in one or more ROMs and cache the results", roms="+")
+    scan.add_argument("--active", help="ROM to scan before the others")
+    scan.add_argument("--start", type=_offset, default=0)
+    scan.add_argument("--end", type=_offset, default=None)
+    scan.add_argument("--step", type=_offset, default=0x100)
+    scan.add_argument("--no-cache", action="store_true", help="rescan and do not store the results")
+    scan.set_defaults(handler=cmd_scan)
+
+    extract = add_command("extract", "extract sprites to PNG (resumable)")
+    extract.add_argument("--output", required=True, help="output directory")
+    extract.add_argument("--offset", type=_offset, action="append",
+                         help="sprite offset, repeatable (default: known sprites and cached scan results)")
+    extract.set_defaults(handler=cmd_extract)
+
+    inject = add_command("inject", "compress a PNG into the ROM")
+    inject.add_argument("sprite", help="sprite PNG")
+    inject.add_argument("--offset", type=_offset, required=True)
+    inject.add_argument("--output", required=True, help="output ROM")
+    inject.add_argument("--fast", action="store_true", help="prefer fast compression on equal size")
+    inject.add_argument("--no-backup", action="store_true")
+    inject.set_defaults(handler=cmd_inject)
+
+    index = add_command("index", "build a visual similarity index")
+    index.add_argument("--output", required=True, help="index file to write")
+    index.add_argument("--offset", type=_offset, action="append",
+                       help="sprite offset, repeatable (default: known sprites and cached scan results)")
+    index.set_defaults(handler=cmd_index)
+
+    remap = add_command("remap", "find the sprites of ROM in another revision of the game")
+    remap.add_argument("target", help="ROM revision to find the sprites in")
+    remap.add_argument("--offset", type=_offset, action="append",
+                       help="sprite offset in ROM, repeatable (default: known sprites and cached scan results)")
+    remap.add_argument("--save-version", help="record the found offsets in the sprite config under this version")
+    remap.add_argument("--game", help="game in the sprite config (with --save-version)")
+    remap.add_argument("--config", help="sprite config file (default: config/sprite_locations.json)")
+    remap.set_defaults(handler=cmd_remap)
+    return parser
+
+def _configure_logging(level: int) -> None:
+    """Send spritepal logging to stderr at the given level"""
+    # A handler on the spritepal logger stops get_logger from adding a debug console handler
+    spritepal_logger = logging.getLogger("spritepal")
+    if not spritepal_logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(levelname)s - %(name)s - %(message)s"))
+        spritepal_logger.addHandler(handler)
+    spritepal_logger.setLevel(level)
+
+def main(argv: list[str] | None = None, stdout: TextIO | None = None) -> int:
+    """Run a command; returns the process exit code"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "save_version", None) and not args.game:
+        parser.error("--save-version requires --game")
+    args.jobs = max(args.jobs, 1)
+    _configure_logging([logging.WARNING, logging.INFO, logging.DEBUG][min(args.verbose, 2)])
+
+    out = JSONLinesWriter(stdout or sys.stdout)
+    try:
+        return args.handler(args, out)
+    except Exception as e:
+        logging.getLogger("spritepal.cli").debug("Command failed", exc_info=True)
+        out.emit("error", command=args.command, error=f"{type(e).__name__}: {e}")
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""
+Bulk sprite extraction from a ROM.
+
+A BatchExtractionJob extracts a list of sprites (known sprite locations or
+scan results) as a two-stage pipeline:
+
+    decompress a chunk of offsets (HAL process pool)
+      -> decode, apply palette, encode PNG, record metadata (thread pool)
+
+The next chunk is decompressed while the previous ones are being encoded,
+and at most max_chunks_in_flight chunks are held at once, so memory stays
+bounded however many sprites are extracted.
+
+Each finished sprite is appended to a JSON-lines ledger in the output
+directory together with its metadata and the identities of the ROM and
+palette it was written with. A rerun skips sprites the ledger records as
+written from the same ROM with the same palette, so a cancelled or
+interrupted job resumes where it stopped.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from core.indexed_image import IndexedImage
+from utils.constants import HAL_POOL_BATCH_SIZE_DEFAULT
+from utils.logging_config import get_logger
+from utils.rom_cache import get_rom_cache
+
+if TYPE_CHECKING:
+    from core.hal_compression import HALCompressor
+
+logger = get_logger(__name__)
+
+# Ledger of finished sprites, written to the output directory
+LEDGER_FILENAME = "batch_extraction.jsonl"
+
+# Decompressed chunks held at once (one decompressing, the rest encoding)
+MAX_CHUNKS_IN_FLIGHT = 2
+
+# Threads decoding and encoding sprites
+ENCODE_WORKERS = 4
+
+@dataclass(frozen=True)
+class BatchSprite:
+    """A sprite to extract"""
+
+    offset: int
+    name: str = ""
+
+    @property
+    def file_stem(self) -> str:
+        """Output file name without extension"""
+        return self.name or f"sprite_{self.offset:06X}"
+
+@dataclass
+class BatchSpriteResult:
+    """Outcome of one sprite, as recorded in the ledger"""
+
+    offset: int
+    name: str
+    png_path: str = ""
+    tile_count: int = 0
+    decompressed_size: int = 0
+    width: int = 0
+    height: int = 0
+    error: str | None = None
+    resumed: bool = False  # Written by an earlier run
+
+@dataclass
+class BatchExtractionSummary:
+    """Outcome of a batch extraction"""
+
+    total: int
+    results: list[BatchSpriteResult] = field(default_factory=list)
+    seconds: float = 0.0
+    cancelled: bool = False
+
+    @property
+    def extracted(self) -> int:
+        return sum(1 for r in self.results if r.error is None and not r.resumed)
+
+    @property
+    def resumed(self) -> int:
+        return sum(1 for r in self.results if r.resumed)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for r in self.results if r.error is not None)
+
+    @property
+    def sprites_per_second(self) -> float:
+        """Throughput of sprites extracted in this run"""
+        return self.extracted / self.seconds if self.seconds > 0 else 0.0
+
+class BatchExtractionProgress(NamedTuple):
+    """Progress of a running batch extraction"""
+
+    completed: int  # Including sprites resumed from the ledger
+    total: int
+    failed: int
+    sprites_per_second: float
+
+def collect_sprites(
+    known_locations: dict[str, Any], scan_sprites: Iterable[dict[str, Any]] = ()
+) -> list[BatchSprite]:
+    """
+    Sprites to extract from known locations and scan results.
+
+    Args:
+        known_locations: Sprite name to SpritePointer (or its cached dict form)
+        scan_sprites: Sprite dicts found by scans; offsets already known are skipped
+
+    Returns:
+        Named known sprites followed by the unnamed scan results
+    """
+    sprites = [
+        BatchSprite(pointer["offset"] if isinstance(pointer, dict) else pointer.offset, name)
+        for name, pointer in known_locations.items()
+    ]
+    known = {sprite.offset for sprite in sprites}
+    sprites.extend(
+        BatchSprite(found["offset"]) for found in scan_sprites if found["offset"] not in known
+    )
+    return sprites
+
+def palette_identity(palette: list[list[int]] | None) -> str:
+    """
+    Short identifier of the palette sprites are written with.
+
+    Args:
+        palette: RGB triplets, or None for grayscale
+
+    Returns:
+        "grayscale", or a digest of the palette's colors
+    """
+    if palette is None:
+        return "grayscale"
+    colors = bytes(value & 0xFF for color in palette for value in color)
+    return hashlib.blake2b(colors, digest_size=8).hexdigest()
+
+class BatchExtractionJob:
+    """Extracts many sprites from one ROM with a bounded, resumable pipeline"""
+
+    def __init__(
+        self,
+        hal_compressor: HALCompressor,
+        rom_path: str,
+        output_dir: str,
+        palette: list[list[int]] | None = None,
+        chunk_size: int = HAL_POOL_BATCH_SIZE_DEFAULT,
+        max_chunks_in_flight: int = MAX_CHUNKS_IN_FLIGHT,
+        encode_workers: int = ENCODE_WORKERS,
+    ) -> None:
+        """
+        Args:
+            hal_compressor: Compressor whose decompress_batch does the decompression
+            rom_path: ROM to extract from
+            output_dir: Directory for PNGs and the ledger
+            palette: RGB triplets applied to every sprite, or None for grayscale
+            chunk_size: Offsets decompressed per batch
+            max_chunks_in_flight: Decompressed chunks held at once
+            encode_workers: Threads decoding and encoding sprites
+        """
+        self.hal_compressor = hal_compressor
+        self.rom_path = rom_path
+        self.output_dir = Path(output_dir)
+        self.palette = palette
+        self.chunk_size = max(1, chunk_size)
+        self.max_chunks_in_flight = max(1, max_chunks_in_flight)
+        self.encode_workers = max(1, encode_workers)
+        self._cancel_event = threading.Event()
+
+    @property
+    def ledger_path(self) -> Path:
+        return self.output_dir / LEDGER_FILENAME
+
+    def cancel(self) -> None:
+        """Stop decompressing; chunks already decompressed are still written to the ledger"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def run(
+        self,
+        sprites: Iterable[BatchSprite],
+        progress_callback: Callable[[BatchExtractionProgress], None] | None = None,
+        result_callback: Callable[[BatchSpriteResult], None] | None = None,
+    ) -> BatchExtractionSummary:
+        """
+        Extract sprites, skipping those an earlier run already wrote.
+
+        Args:
+            sprites: Sprites to extract; repeated offsets are extracted once
+            progress_callback: Called after each chunk is written
+            result_callback: Called with each sprite's result: first those
+                resumed from the ledger, then the others as their chunks are
+                written, each group in input order
+
+        Returns:
+            Summary with one result per sprite handled
+        """
+        unique = list({sprite.offset: sprite for sprite in sprites}.values())
+        summary = BatchExtractionSummary(total=len(unique))
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        identity = self._ledger_identity()
+        finished = self._load_ledger(identity)
+        pending = []
+        for sprite in unique:
+            record = finished.get(sprite.offset)
+            if record is not None:
+                summary.results.append(BatchSpriteResult(**{**record, "resumed": True}))
+                if result_callback:
+                    result_callback(summary.results[-1])
+            else:
+                pending.append(sprite)
+        if summary.resumed:
+            logger.info(f"Resuming batch extraction: {summary.resumed} of {summary.total} sprites already written")
+
+        start_time = time.perf_counter()
+        in_flight: deque[list[Future[BatchSpriteResult]]] = deque()
+
+        def report() -> None:
+            summary.seconds = time.perf_counter() - start_time
+            if progress_callback:
+                progress_callback(BatchExtractionProgress(
+                    len(summary.results), summary.total, summary.failed, summary.sprites_per_second
+                ))
+
+        with ThreadPoolExecutor(max_workers=self.encode_workers, thread_name_prefix="batch-extract") as executor, \
+             self.ledger_path.open("a", encoding="utf-8") as ledger:
+            for index in range(0, len(pending), self.chunk_size):
+                if self.cancelled:
+                    break
+                chunk = pending[index:index + self.chunk_size]
+                decompressed = self.hal_compressor.decompress_batch(
+                    [(self.rom_path, sprite.offset) for sprite in chunk]
+                )
+                in_flight.append([
+                    executor.submit(self._finish_sprite, sprite, ok, data)
+                    for sprite, (ok, data) in zip(chunk, decompressed, strict=True)
+                ])
+                # Hold at most max_chunks_in_flight chunks of sprite data
+                while len(in_flight) >= self.max_chunks_in_flight:
+                    self._drain(in_flight.popleft(), summary, ledger, identity, result_callback)
+                    report()
+
+            while in_flight:
+                self._drain(in_flight.popleft(), summary, ledger, identity, result_callback)
+                report()
+
+        summary.seconds = time.perf_counter() - start_time
+        summary.cancelled = self.cancelled and len(summary.results) < summary.total
+        logger.info(
+            f"Batch extraction {'cancelled' if summary.cancelled else 'finished'}: "
+            f"{summary.extracted} extracted, {summary.resumed} resumed, {summary.failed} failed "
+            f"in {summary.seconds:.2f}s ({summary.sprites_per_second:.1f} sprites/sec)"
+        )
+        return summary
+
+    def _finish_sprite(self, sprite: BatchSprite, ok: bool, data: bytes | str) -> BatchSpriteResult:
+        """Decode, apply the palette and write the PNG for one decompressed sprite"""
+        result = BatchSpriteResult(sprite.offset, sprite.name)
+        if not ok or not isinstance(data, bytes):
+            result.error = f"Decompression failed: {data}"
+            return result
+
+        image = IndexedImage.from_4bpp(data, palette=self.palette)
+        result.decompressed_size = len(data)
+        result.tile_count = image.tile_count
+        if image.tile_count == 0:
+            result.error = "No complete tiles"
+            return result
+
+        try:
+            result.png_path = image.save_png(str(self.output_dir / f"{sprite.file_stem}.png"))
+        except OSError as e:
+            result.error = f"Could not write PNG: {e}"
+            return result
+        result.width, result.height = image.width, image.height
+        return result
+
+    def _drain(
+        self,
+        futures: list[Future[BatchSpriteResult]],
+        summary: BatchExtractionSummary,
+        ledger: Any,
+        identity: dict[str, str],
+        result_callback: Callable[[BatchSpriteResult], None] | None,
+    ) -> None:
+        """Wait for a chunk and append its results to the summary and ledger"""
+        for future in futures:
+            result = future.result()
+            summary.results.append(result)
+            if result_callback:
+                result_callback(result)
+            record = asdict(result)
+            del record["resumed"]
+            record.update(identity)
+            ledger.write(json.dumps(record) + "\n")
+        ledger.flush()
+
+    def _ledger_identity(self) -> dict[str, str]:
+        """ROM fingerprint and palette identity stored with each ledger record"""
+        return {
+            "rom": get_rom_cache().get_rom_fingerprint(self.rom_path),
+            "palette": palette_identity(self.palette),
+        }
+
+    def _load_ledger(self, identity: dict[str, str]) -> dict[int, dict[str, Any]]:
+        """Sprites written by earlier runs from this ROM with this palette whose PNG still exists"""
+        finished: dict[int, dict[str, Any]] = {}
+        if not self.ledger_path.exists():
+            return finished
+
+        with self.ledger_path.open(encoding="utf-8") as ledger:
+            for line in ledger:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Line cut short by an interrupted run
+                written_with = {key: record.pop(key, None) for key in identity}
+                if written_with != identity:
+                    finished.pop(record.get("offset"), None)
+                elif record.get("error") is None and Path(record.get("png_path", "")).exists():
+                    finished[record["offset"]] = record
+                else:
+                    finished.pop(record.get("offset"), None)
+        return finished
@@ -0,0 +1,294 @@
+"""
+Free space tracking for relocating ROM data that no longer fits its slot.
+
+A FreeSpaceMap is built from the padding runs EmptyRegionDetector finds,
+minus the extents of known data blocks (compressed sprites, the internal
+header and vectors). Runs are split at bank boundaries so every extent can
+be addressed from a single bank, and are indexed by size so "N contiguous
+free bytes in bank X" is a binary search.
+
+PointerTableEntry describes one entry of a game's pointer table, so data
+moved into free space can be pointed at from its new location.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from core.region_analyzer import EmptyRegionDetector
+from utils.constants import (
+    FREE_SPACE_GUARD,
+    FREE_SPACE_MIN_RUN,
+    HIROM_BANK_SIZE,
+    LOROM_BANK_SIZE,
+    ROM_HEADER_OFFSET_HIROM,
+    ROM_HEADER_OFFSET_LOROM,
+)
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Internal header plus interrupt vectors, relative to the header offset
+HEADER_RESERVED_START = -0x10
+HEADER_RESERVED_SIZE = 0x50
+
+# Address encodings supported for pointer table entries
+POINTER_MAPPINGS = ("lorom", "hirom", "linear")
+
+def _subtract_extents(
+    extents: list[tuple[int, int]], blocks: list[tuple[int, int]]
+) -> list[tuple[int, int]]:
+    """Remove sorted (start, end) blocks from sorted (start, end) extents"""
+    result = []
+    block_index = 0
+    for start, end in extents:
+        while block_index < len(blocks) and blocks[block_index][1] <= start:
+            block_index += 1
+        index = block_index
+        while start < end and index < len(blocks) and blocks[index][0] < end:
+            block_start, block_end = blocks[index]
+            if block_start > start:
+                result.append((start, block_start))
+            start = max(start, block_end)
+            index += 1
+        if start < end:
+            result.append((start, end))
+    return result
+
+class FreeSpaceMap:
+    """Unused ROM extents indexed by bank and size"""
+
+    def __init__(
+        self,
+        extents: Iterable[tuple[int, int]] = (),
+        bank_size: int = LOROM_BANK_SIZE,
+        base: int = 0,
+        min_length: int = 1,
+    ) -> None:
+        """
+        Args:
+            extents: Free (start_offset, end_offset) ranges
+            bank_size: ROM bytes per bank
+            base: File offset where the ROM starts (SMC header size, if present)
+            min_length: Shortest extent worth keeping
+        """
+        self.bank_size = bank_size
+        self.base = base
+        self.min_length = min_length
+        self._starts: list[int] = []
+        self._ends: dict[int, int] = {}
+        # (length, start) sorted for best-fit lookups; key None covers every bank
+        self._by_size: dict[int | None, list[tuple[int, int]]] = {None: []}
+        for start, end in extents:
+            self._add_split(start, end)
+
+    @classmethod
+    def from_rom(
+        cls,
+        rom_data: bytes | bytearray,
+        occupied: Iterable[tuple[int, int]] = (),
+        detector: EmptyRegionDetector | None = None,
+        bank_size: int = LOROM_BANK_SIZE,
+        base: int = 0,
+        min_length: int = FREE_SPACE_MIN_RUN,
+        guard: int = FREE_SPACE_GUARD,
+    ) -> FreeSpaceMap:
+        """
+        Build a map from the padding runs in a ROM.
+
+        Args:
+            rom_data: Complete ROM data
+            occupied: Known data blocks as (start_offset, size) pairs
+            detector: Detector used to find padding runs
+            bank_size: ROM bytes per bank
+            base: File offset where the ROM starts (SMC header size, if present)
+            min_length: Shortest free extent to keep
+            guard: Bytes skipped at the start of each run, which may end the
+                preceding data (compressed streams end with 0xFF)
+
+        Returns:
+            The free space map
+        """
+        detector = detector or EmptyRegionDetector()
+        runs = [
+            (max(start, base) + guard, end)
+            for start, end in detector.find_fill_runs(rom_data, min_length=min_length)
+            if end > base
+        ]
+        blocks = [(start, start + size) for start, size in occupied if size > 0]
+        blocks.extend(
+            (base + header + HEADER_RESERVED_START, base + header + HEADER_RESERVED_START + HEADER_RESERVED_SIZE)
+            for header in (ROM_HEADER_OFFSET_LOROM, ROM_HEADER_OFFSET_HIROM)
+        )
+        free = _subtract_extents([run for run in runs if run[0] < run[1]], sorted(blocks))
+
+        free_map = cls(free, bank_size=bank_size, base=base, min_length=min_length)
+        logger.info(
+            f"Free space map: {len(free_map)} extents, {free_map.total_free:,} bytes "
+            f"({len(blocks)} occupied blocks excluded)"
+        )
+        return free_map
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @property
+    def total_free(self) -> int:
+        """Free bytes across all extents"""
+        return sum(length for length, _start in self._by_size[None])
+
+    @property
+    def extents(self) -> list[tuple[int, int]]:
+        """Free (start_offset, end_offset) ranges in ROM order"""
+        return [(start, self._ends[start]) for start in self._starts]
+
+    def bank_of(self, offset: int) -> int:
+        """Bank containing a file offset"""
+        return (offset - self.base) // self.bank_size
+
+    def find(self, size: int, bank: int | None = None) -> int | None:
+        """
+        Find the smallest free extent that holds size bytes.
+
+        Args:
+            size: Bytes needed
+            bank: Restrict the search to this bank, or None for any bank
+
+        Returns:
+            Start offset of the extent, or None if nothing fits
+        """
+        by_size = self._by_size.get(bank, [])
+        index = bisect_left(by_size, (size, -1))
+        return by_size[index][1] if index < len(by_size) else None
+
+    def reserve(self, start: int, size: int) -> None:
+        """
+        Mark a range inside a free extent as used.
+
+        Raises:
+            ValueError: If the range is not entirely free
+        """
+        index = bisect_right(self._starts, start) - 1
+        if index < 0 or start + size > self._ends[self._starts[index]]:
+            raise ValueError(f"0x{start:X}-0x{start + size:X} is not free space")
+        extent_start = self._starts[index]
+        extent_end = self._remove(extent_start)
+        self._add(extent_start, start)
+        self._add(start + size, extent_end)
+
+    def allocate(self, size: int, bank: int | None = None) -> int | None:
+        """
+        Find and reserve size free bytes.
+
+        Returns:
+            Start offset of the reserved range, or None if nothing fits
+        """
+        start = self.find(size, bank)
+        if start is not None:
+            self.reserve(start, size)
+        return start
+
+    def release(self, start: int, size: int) -> None:
+        """
+        Return a reserved range to the free space, merging it with the
+        extents it touches.
+
+        Raises:
+            ValueError: If part of the range is already free
+        """
+        end = start + size
+        index = bisect_right(self._starts, start) - 1
+        if index >= 0 and self._ends[self._starts[index]] > start:
+            raise ValueError(f"0x{start:X}-0x{end:X} is already free space")
+        if index + 1 < len(self._starts) and self._starts[index + 1] < end:
+            raise ValueError(f"0x{start:X}-0x{end:X} is already free space")
+
+        if index >= 0 and self._ends[self._starts[index]] == start:
+            start = self._starts[index]
+            self._remove(start)
+        if end in self._ends:
+            end = self._remove(end)
+        # Re-splitting keeps merged extents inside one bank
+        self._add_split(start, end)
+
+    def _add_split(self, start: int, end: int) -> None:
+        """Add an extent, splitting it at bank boundaries"""
+        while start < end:
+            bank_end = self.base + (self.bank_of(start) + 1) * self.bank_size
+            self._add(start, min(end, bank_end))
+            start = bank_end
+
+    def _add(self, start: int, end: int) -> None:
+        if end - start < self.min_length:
+            return
+        insort(self._starts, start)
+        self._ends[start] = end
+        entry = (end - start, start)
+        insort(self._by_size[None], entry)
+        insort(self._by_size.setdefault(self.bank_of(start), []), entry)
+
+    def _remove(self, start: int) -> int:
+        end = self._ends.pop(start)
+        del self._starts[bisect_left(self._starts, start)]
+        entry = (end - start, start)
+        for key in (None, self.bank_of(start)):
+            by_size = self._by_size[key]
+            del by_size[bisect_left(by_size, entry)]
+        return end
+
+@dataclass(frozen=True)
+class PointerTableEntry:
+    """One pointer in a game's pointer table, stored little-endian"""
+
+    offset: int  # File offset of the pointer
+    width: int = 3  # 3 bytes (bank and address) or 2 (address within the target's bank)
+    mapping: str = "lorom"  # "lorom", "hirom" or "linear" (plain ROM offset)
+    bank_bits: int = 0x00  # ORed into the bank byte, e.g. 0x80 for FastROM mirrors
+
+    def __post_init__(self) -> None:
+        if self.width not in (2, 3):
+            raise ValueError(f"Pointer width must be 2 or 3 bytes, got {self.width}")
+        if self.mapping not in POINTER_MAPPINGS:
+            raise ValueError(f"Unknown pointer mapping: {self.mapping}")
+
+    @property
+    def bank_size(self) -> int:
+        """ROM bytes addressable by a 2-byte pointer into one bank"""
+        return LOROM_BANK_SIZE if self.mapping == "lorom" else HIROM_BANK_SIZE
+
+    def to_address(self, rom_offset: int) -> int:
+        """Address of a ROM offset (without SMC header) in this mapping"""
+        if self.mapping == "lorom":
+            bank, address = divmod(rom_offset, LOROM_BANK_SIZE)
+            return ((bank | self.bank_bits) << 16) | 0x8000 | address
+        if self.mapping == "hirom":
+            return (0xC00000 | rom_offset) | (self.bank_bits << 16)
+        return rom_offset
+
+    def to_offset(self, address: int) -> int | None:
+        """ROM offset (without SMC header) of an address, or None if it is not ROM"""
+        if self.mapping == "lorom":
+            if address & 0xFFFF < 0x8000:
+                return None
+            return ((address >> 16) & 0x7F) * LOROM_BANK_SIZE + (address & 0x7FFF)
+        if self.mapping == "hirom":
+            return address & 0x3FFFFF
+        return address
+
+    def encode(self, rom_offset: int) -> bytes:
+        """Pointer bytes for a ROM offset (without SMC header)"""
+        return self.to_address(rom_offset).to_bytes(3, "little")[: self.width]
+
+    def decode(self, raw: bytes | bytearray, bank: int = 0) -> int | None:
+        """
+        ROM offset (without SMC header) a stored pointer refers to.
+
+        Args:
+            raw: The pointer's bytes
+            bank: Bank of the target, needed for 2-byte pointers
+        """
+        value = int.from_bytes(raw, "little")
+        if self.width == 2:
+            value |= self.to_address(bank * self.bank_size) & 0xFF0000
+        return self.to_offset(value)
@@ -16,6 +16,7 @@ import re
 import shutil
 import signal
 import subprocess
+import sys
 import tempfile
 import threading
 import time
@@ -23,13 +24,6 @@ import weakref
 from pathlib import Path
 from typing import Any, NamedTuple
 
-try:
-    from PySide6.QtWidgets import QApplication
-    QT_AVAILABLE = True
-except ImportError:
-    QApplication = None  # type: ignore[misc]
-    QT_AVAILABLE = False
-
 from utils.constants import (
     DATA_SIZE,
     HAL_POOL_SIZE_DEFAULT,
@@ -48,6 +42,15 @@ from utils.safe_logging import (
 
 logger = get_logger(__name__)
 
+def _qt_application() -> Any:
+    """The running QApplication, or None.
+
+    Qt is looked up only if something else already imported it, so headless
+    users of the HAL tools (the CLI, CI) never pay for loading Qt.
+    """
+    qt_widgets = sys.modules.get("PySide6.QtWidgets")
+    return qt_widgets.QApplication.instance() if qt_widgets is not None else None
+
 class HALCompressionError(Exception):
     """Raised when HAL compression/decompression fails"""
 
@@ -342,14 +345,13 @@ class HALProcessPool:
 
             atexit.register(cleanup_at_exit)
 
-            # Register with Qt if available
-            if QT_AVAILABLE and QApplication is not None:
+            # Register with Qt if a Qt application is running
+            app = _qt_application()
+            if app is not None:
                 try:
-                    app = QApplication.instance()
-                    if app is not None:
-                        # Use suppressed version for Qt cleanup too
-                        app.aboutToQuit.connect(cleanup_at_exit)
-                        logger.debug("Registered HAL pool cleanup with QApplication.aboutToQuit")
+                    # Use suppressed version for Qt cleanup too
+                    app.aboutToQuit.connect(cleanup_at_exit)
+                    logger.debug("Registered HAL pool cleanup with QApplication.aboutToQuit")
                 except Exception as e:
                     logger.debug(f"Could not register Qt cleanup: {e}")
 
@@ -430,17 +432,16 @@ class HALProcessPool:
                 return False
 
     def _connect_qt_cleanup(self) -> None:
-        """Connect cleanup to QApplication.aboutToQuit signal if Qt is available."""
-        if not QT_AVAILABLE or self._qt_cleanup_connected:
+        """Connect cleanup to QApplication.aboutToQuit signal if a Qt application is running."""
+        if self._qt_cleanup_connected:
             return
 
         try:
-            if QApplication is not None:
-                app = QApplication.instance()
-                if app is not None:
-                    app.aboutToQuit.connect(self.shutdown)
-                    self._qt_cleanup_connected = True
-                    logger.debug("Connected HAL pool cleanup to QApplication.aboutToQuit signal")
+            app = _qt_application()
+            if app is not None:
+                app.aboutToQuit.connect(self.shutdown)
+                self._qt_cleanup_connected = True
+                logger.debug("Connected HAL pool cleanup to QApplication.aboutToQuit signal")
         except Exception as e:
             logger.debug(f"Could not connect to QApplication.aboutToQuit: {e}")
 
@@ -0,0 +1,548 @@
+"""
+Vectorized hex pattern search with wildcard support.
+
+Patterns such as ``"A9 ?? 8D 00 21"`` are matched by locating the longest
+literal run of the pattern (with the C regex engine for long runs, or NumPy
+comparisons over strided views for short ones) and then verifying the
+remaining literal bytes of all candidates at once with NumPy. Sets of hex
+patterns or regexes are searched in a single pass, and "all patterns within
+a window" queries are answered by merging the per-pattern hit arrays.
+"""
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+from collections.abc import Iterator
+from typing import NamedTuple
+
+import numpy as np
+
+# Bytes scanned per step of iter_matches, bounding memory and progress latency
+SEARCH_CHUNK_SIZE = 1 << 20
+# Literal runs at least this long are located with the regex engine; shorter
+# anchors match too often for per-hit match objects to be cheap
+MIN_REGEX_ANCHOR = 3
+
+class HexPattern(NamedTuple):
+    """Parsed hex pattern; mask is 0xFF for literal bytes and 0x00 for wildcards"""
+    values: bytes
+    mask: bytes
+
+    @property
+    def length(self) -> int:
+        return len(self.values)
+
+def parse_hex_pattern(pattern_str: str) -> HexPattern:
+    """
+    Parse a hex pattern string with wildcards.
+
+    Args:
+        pattern_str: Pattern like "00 01 02 ?? ?? FF"; tokens may be separated
+            by whitespace or commas, "?" and "??" are wildcards
+
+    Returns:
+        Parsed HexPattern
+
+    Raises:
+        ValueError: If a token is not a hex byte or wildcard, or the pattern is empty
+    """
+    values = bytearray()
+    mask = bytearray()
+
+    for token in re.split(r"[\s,]+", pattern_str.strip().upper()):
+        if not token:
+            continue
+        if token in {"??", "?"}:
+            values.append(0x00)
+            mask.append(0x00)
+        elif len(token) == 2 and all(c in "0123456789ABCDEF" for c in token):
+            values.append(int(token, 16))
+            mask.append(0xFF)
+        else:
+            raise ValueError(f"Invalid hex token: {token}")
+
+    if not values:
+        raise ValueError("Empty hex pattern")
+
+    return HexPattern(bytes(values), bytes(mask))
+
+def _longest_literal_run(mask: bytes) -> tuple[int, int]:
+    """(start, length) of the longest run of literal bytes in a pattern mask"""
+    best_start, best_length = 0, 0
+    run_start = None
+    for i, byte in enumerate((*mask, 0x00)):
+        if byte == 0xFF:
+            if run_start is None:
+                run_start = i
+        elif run_start is not None:
+            if i - run_start > best_length:
+                best_start, best_length = run_start, i - run_start
+            run_start = None
+    return best_start, best_length
+
+class HexPatternMatcher:
+    """
+    Finds all occurrences of a wildcard hex pattern in a buffer.
+
+    Works on anything exposing the buffer protocol (bytes, bytearray, mmap)
+    without copying it.
+    """
+
+    def __init__(self, pattern: HexPattern) -> None:
+        """
+        Prepare the anchor and verification tables for a pattern.
+
+        Args:
+            pattern: Parsed pattern to search for
+        """
+        self.pattern = pattern
+        self.length = pattern.length
+
+        self._anchor_start, anchor_length = _longest_literal_run(pattern.mask)
+        self._anchor = pattern.values[self._anchor_start:self._anchor_start + anchor_length]
+        self._anchor_regex = (
+            re.compile(b"(?=" + re.escape(self._anchor) + b")")
+            if anchor_length >= MIN_REGEX_ANCHOR
+            else None
+        )
+
+        # Literal bytes outside the anchor still need verifying per candidate
+        literal = np.flatnonzero(np.frombuffer(pattern.mask, dtype=np.uint8))
+        in_anchor = (literal >= self._anchor_start) & (literal < self._anchor_start + anchor_length)
+        self._check_positions = literal[~in_anchor]
+        self._check_values = np.frombuffer(pattern.values, dtype=np.uint8)[self._check_positions]
+
+    def find(self, data: bytes | bytearray | memoryview, start: int = 0, end: int | None = None,
+             alignment: int = 1) -> np.ndarray:
+        """
+        Find every match starting in [start, end), overlapping matches included.
+
+        Args:
+            data: Buffer to search
+            start: First candidate offset
+            end: End of the candidate range (exclusive), defaults to the buffer end
+            alignment: Only report offsets that are multiples of this value
+
+        Returns:
+            Sorted int64 array of match offsets
+        """
+        if alignment < 1:
+            raise ValueError(f"Alignment must be positive, got {alignment}")
+
+        buf = np.frombuffer(data, dtype=np.uint8)
+        last_start = len(buf) - self.length + 1
+        end = last_start if end is None else min(end, last_start)
+        start = -(-max(start, 0) // alignment) * alignment
+        if end <= start:
+            return np.empty(0, dtype=np.int64)
+
+        if not self._anchor:
+            # Pattern made only of wildcards
+            return np.arange(start, end, alignment, dtype=np.int64)
+
+        if self._anchor_regex is not None:
+            candidates = self._regex_candidates(self._anchor_regex, data, start, end, alignment)
+        else:
+            candidates = self._strided_candidates(buf, start, end, alignment)
+
+        for position, value in zip(self._check_positions, self._check_values, strict=True):
+            if not len(candidates):
+                break
+            candidates = candidates[buf[candidates + position] == value]
+
+        return candidates
+
+    def _regex_candidates(self, regex: re.Pattern[bytes], data: bytes | bytearray | memoryview,
+                          start: int, end: int, alignment: int) -> np.ndarray:
+        """Pattern starts whose anchor is found by the regex engine"""
+        anchor_pos = start + self._anchor_start
+        anchor_end = end - 1 + self._anchor_start + len(self._anchor)
+        candidates = np.fromiter(
+            (match.start() for match in regex.finditer(data, anchor_pos, anchor_end)),
+            dtype=np.int64,
+        ) - self._anchor_start
+        if alignment > 1:
+            candidates = candidates[candidates % alignment == 0]
+        return candidates
+
+    def _strided_candidates(self, buf: np.ndarray, start: int, end: int, alignment: int) -> np.ndarray:
+        """Pattern starts whose anchor bytes match, compared over aligned strided views"""
+        count = -(-(end - start) // alignment)
+        hits = np.ones(count, dtype=bool)
+        for i, value in enumerate(self._anchor):
+            first = start + self._anchor_start + i
+            hits &= buf[first:first + (count - 1) * alignment + 1:alignment] == value
+        return start + np.flatnonzero(hits).astype(np.int64) * alignment
+
+    def iter_matches(self, data: bytes | bytearray | memoryview, alignment: int = 1,
+                     overlapping: bool = False,
+                     chunk_size: int = SEARCH_CHUNK_SIZE) -> Iterator[tuple[int, np.ndarray]]:
+        """
+        Scan the whole buffer chunk by chunk.
+
+        Args:
+            data: Buffer to search
+            alignment: Only report offsets that are multiples of this value
+            overlapping: Report overlapping matches; otherwise scanning resumes
+                after the end of each match
+            chunk_size: Candidate offsets examined per step
+
+        Yields:
+            (scanned_up_to, offsets) per chunk; offsets may be empty so callers
+            can report progress and check for cancellation
+        """
+        size = len(data)
+        next_allowed = 0
+        for chunk_start in range(0, max(size, 1), chunk_size):
+            chunk_end = min(chunk_start + chunk_size, size)
+            matches = self.find(data, chunk_start, chunk_end, alignment)
+            if not overlapping and len(matches):
+                matches, next_allowed = _drop_overlaps(matches, self.length, next_allowed)
+            yield chunk_end, matches
+
+def _drop_overlaps(matches: np.ndarray, length: int, next_allowed: int) -> tuple[np.ndarray, int]:
+    """Greedy left-to-right selection of non-overlapping matches"""
+    matches = matches[matches >= next_allowed]
+    if len(matches) < 2 or np.diff(matches).min() >= length:
+        if len(matches):
+            next_allowed = int(matches[-1]) + length
+        return matches, next_allowed
+
+    kept = []
+    for offset in matches.tolist():
+        if offset >= next_allowed:
+            kept.append(offset)
+            next_allowed = offset + length
+    return np.array(kept, dtype=np.int64), next_allowed
+
+def find_hex_pattern(data: bytes | bytearray | memoryview, pattern: str | HexPattern, alignment: int = 1,
+                     overlapping: bool = False, max_results: int | None = None) -> np.ndarray:
+    """
+    Find all offsets of a wildcard hex pattern.
+
+    Args:
+        data: Buffer to search
+        pattern: Pattern string or parsed HexPattern
+        alignment: Only report offsets that are multiples of this value
+        overlapping: Report overlapping matches
+        max_results: Stop after this many matches
+
+    Returns:
+        Sorted int64 array of match offsets
+    """
+    if isinstance(pattern, str):
+        pattern = parse_hex_pattern(pattern)
+
+    found: list[np.ndarray] = []
+    total = 0
+    for _, matches in HexPatternMatcher(pattern).iter_matches(data, alignment, overlapping):
+        found.append(matches)
+        total += len(matches)
+        if max_results is not None and total >= max_results:
+            break
+
+    result = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+    return result if max_results is None else result[:max_results]
+
+class MultiPatternMatcher:
+    """
+    Finds occurrences of many wildcard hex patterns in a single pass.
+
+    Every pattern is keyed by the first two bytes of its longest literal run
+    (a one-byte anchor claims all 256 keys starting with that byte). One
+    lookup of the 16-bit key at each offset into a shared table yields the
+    candidate positions for all patterns at once; the (position, pattern)
+    pairs are then verified column by column with NumPy. Scanning cost is
+    independent of the number of patterns.
+    """
+
+    def __init__(self, patterns: list[HexPattern]) -> None:
+        """
+        Build the key table and padded verification arrays.
+
+        Args:
+            patterns: Parsed patterns to search for
+        """
+        self.patterns = list(patterns)
+        count = len(self.patterns)
+        self.lengths = np.array([p.length for p in self.patterns], dtype=np.int64)
+        width = int(self.lengths.max()) if count else 0
+
+        self._values = np.zeros((count, width), dtype=np.uint8)
+        self._literal = np.zeros((count, width), dtype=bool)
+        self._anchor_starts = np.zeros(count, dtype=np.int64)
+        self._wildcard_only: list[int] = []
+
+        pattern_keys: list[np.ndarray] = []
+        keyed_patterns: list[np.ndarray] = []
+        for index, pattern in enumerate(self.patterns):
+            self._values[index, :pattern.length] = np.frombuffer(pattern.values, dtype=np.uint8)
+            self._literal[index, :pattern.length] = np.frombuffer(pattern.mask, dtype=np.uint8) == 0xFF
+            anchor_start, anchor_length = _longest_literal_run(pattern.mask)
+            self._anchor_starts[index] = anchor_start
+            if anchor_length == 0:
+                self._wildcard_only.append(index)
+                continue
+            high = pattern.values[anchor_start] << 8
+            if anchor_length == 1:
+                keys = np.arange(high, high + 256, dtype=np.int64)
+            else:
+                keys = np.array([high | pattern.values[anchor_start + 1]], dtype=np.int64)
+            pattern_keys.append(keys)
+            keyed_patterns.append(np.full(len(keys), index, dtype=np.int64))
+
+        # CSR layout: patterns keyed by k are _key_patterns[_key_starts[k]:_key_starts[k + 1]]
+        keys = np.concatenate(pattern_keys) if pattern_keys else np.empty(0, dtype=np.int64)
+        owners = np.concatenate(keyed_patterns) if keyed_patterns else np.empty(0, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        self._key_counts = np.bincount(keys, minlength=1 << 16).astype(np.int64)
+        self._key_starts = np.concatenate(([0], np.cumsum(self._key_counts)))
+        self._key_patterns = owners[order]
+        self._key_used = self._key_counts > 0
+
+    def _find_anchored(self, buf: np.ndarray, first: int, last: int,
+                       alignment: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Matches whose anchor starts in [first, last), overlapping matches included.
+
+        Returns:
+            (offsets, pattern_indices) sorted by offset, then pattern
+        """
+        size = len(buf)
+        keys = buf[first:last].astype(np.uint16) << 8
+        following = buf[first + 1:last + 1]
+        keys[:len(following)] |= following
+        positions = first + np.flatnonzero(self._key_used[keys])
+        key_hits = keys[positions - first]
+
+        # Expand every candidate position into one (position, pattern) pair per keyed pattern
+        counts = self._key_counts[key_hits]
+        pair_positions = np.repeat(positions, counts)
+        pair_rank = np.arange(len(pair_positions)) - np.repeat(np.cumsum(counts) - counts, counts)
+        pattern_ids = self._key_patterns[np.repeat(self._key_starts[key_hits], counts) + pair_rank]
+
+        for index in self._wildcard_only:
+            wildcard_positions = np.arange(first, last, dtype=np.int64)
+            pair_positions = np.concatenate((pair_positions, wildcard_positions))
+            pattern_ids = np.concatenate((pattern_ids, np.full(len(wildcard_positions), index)))
+
+        starts = pair_positions - self._anchor_starts[pattern_ids]
+        valid = (starts >= 0) & (starts + self.lengths[pattern_ids] <= size)
+        if alignment > 1:
+            valid &= starts % alignment == 0
+        starts, pattern_ids = starts[valid], pattern_ids[valid]
+
+        for column in range(self._values.shape[1]):
+            if not len(starts):
+                break
+            literal = self._literal[pattern_ids, column]
+            index = np.minimum(starts + column, size - 1)
+            keep = ~literal | (buf[index] == self._values[pattern_ids, column])
+            starts, pattern_ids = starts[keep], pattern_ids[keep]
+
+        order = np.lexsort((pattern_ids, starts))
+        return starts[order], pattern_ids[order]
+
+    def iter_matches(self, data: bytes | bytearray | memoryview, alignment: int = 1,
+                     overlapping: bool = False,
+                     chunk_size: int = SEARCH_CHUNK_SIZE) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+        """
+        Scan the whole buffer once, chunk by chunk.
+
+        Args:
+            data: Buffer to search
+            alignment: Only report offsets that are multiples of this value
+            overlapping: Report overlapping matches of the same pattern; otherwise
+                each pattern resumes after the end of its previous match
+            chunk_size: Anchor positions examined per step
+
+        Yields:
+            (scanned_up_to, offsets, pattern_indices) per chunk
+        """
+        if alignment < 1:
+            raise ValueError(f"Alignment must be positive, got {alignment}")
+
+        size = len(data)
+        next_allowed = np.zeros(len(self.patterns), dtype=np.int64)
+        for chunk_start in range(0, max(size, 1), chunk_size):
+            chunk_end = min(chunk_start + chunk_size, size)
+            if not self.patterns or chunk_end <= chunk_start:
+                yield chunk_end, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+                continue
+
+            buf = np.frombuffer(data, dtype=np.uint8)
+            offsets, pattern_ids = self._find_anchored(buf, chunk_start, chunk_end, alignment)
+            del buf
+
+            if not overlapping and len(offsets):
+                offsets, pattern_ids = self._drop_pattern_overlaps(offsets, pattern_ids, next_allowed)
+            yield chunk_end, offsets, pattern_ids
+
+    def _drop_pattern_overlaps(self, offsets: np.ndarray, pattern_ids: np.ndarray,
+                               next_allowed: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Apply _drop_overlaps to each pattern's matches, updating next_allowed in place"""
+        kept_offsets = []
+        kept_ids = []
+        for index in np.unique(pattern_ids).tolist():
+            matches, next_allowed[index] = _drop_overlaps(
+                offsets[pattern_ids == index], int(self.lengths[index]), int(next_allowed[index])
+            )
+            kept_offsets.append(matches)
+            kept_ids.append(np.full(len(matches), index, dtype=np.int64))
+        offsets, pattern_ids = np.concatenate(kept_offsets), np.concatenate(kept_ids)
+        order = np.lexsort((pattern_ids, offsets))
+        return offsets[order], pattern_ids[order]
+
+    def find_all(self, data: bytes | bytearray | memoryview, alignment: int = 1,
+                 overlapping: bool = True) -> list[np.ndarray]:
+        """
+        Find every match of every pattern.
+
+        Args:
+            data: Buffer to search
+            alignment: Only report offsets that are multiples of this value
+            overlapping: Report overlapping matches of the same pattern
+
+        Returns:
+            Sorted offset array per pattern, in pattern order
+        """
+        found_offsets: list[np.ndarray] = []
+        found_ids: list[np.ndarray] = []
+        for _, offsets, pattern_ids in self.iter_matches(data, alignment, overlapping):
+            found_offsets.append(offsets)
+            found_ids.append(pattern_ids)
+
+        offsets = np.concatenate(found_offsets) if found_offsets else np.empty(0, dtype=np.int64)
+        pattern_ids = np.concatenate(found_ids) if found_ids else np.empty(0, dtype=np.int64)
+        return [np.sort(offsets[pattern_ids == index]) for index in range(len(self.patterns))]
+
+class RegexPatternSet:
+    """
+    Finds the matches of several bytes regexes in a single pass.
+
+    Each pattern is driven by its own re.finditer over the whole buffer and
+    the streams are merged by offset, so Python only handles actual matches,
+    never individual buffer positions. Overlapping matches come from a
+    lookahead scanner per pattern, which reports every position the pattern
+    matches at; the match object is then taken at that position.
+    """
+
+    def __init__(self, patterns: list[re.Pattern[bytes]]) -> None:
+        """
+        Args:
+            patterns: Compiled patterns, all sharing the same flags
+        """
+        self.patterns = list(patterns)
+        # Non-capturing wrapper keeps the numbering of backreferences
+        self._scanners = [re.compile(b"(?=(?:" + p.pattern + b"))", p.flags) for p in self.patterns]
+
+    def _pattern_hits(self, data: bytes | bytearray | memoryview, index: int,
+                      overlapping: bool) -> Iterator[tuple[int, int, int, re.Match[bytes]]]:
+        """(offset, pattern_index, sequence, match) for one pattern, in buffer order"""
+        pattern = self.patterns[index]
+        if overlapping:
+            candidates = (pattern.match(data, m.start()) for m in self._scanners[index].finditer(data))
+            matches = (match for match in candidates if match is not None)
+        else:
+            matches = pattern.finditer(data)
+        # The sequence number breaks ties so match objects are never compared
+        for sequence, match in enumerate(matches):
+            yield match.start(), index, sequence, match
+
+    def iter_matches(self, data: bytes | bytearray | memoryview, overlapping: bool = False,
+                     chunk_size: int = SEARCH_CHUNK_SIZE
+                     ) -> Iterator[tuple[int, list[tuple[int, int, re.Match[bytes]]]]]:
+        """
+        Scan the whole buffer, chunk by chunk.
+
+        Args:
+            data: Buffer to search
+            overlapping: Report a match at every position a pattern matches;
+                otherwise each pattern resumes after the end of its previous
+                match, like re.finditer
+            chunk_size: Positions covered per step
+
+        Yields:
+            (scanned_up_to, [(offset, pattern_index, match), ...]) per chunk
+        """
+        size = len(data)
+        merged = heapq.merge(*(self._pattern_hits(data, index, overlapping) for index in range(len(self.patterns))))
+        pending = next(merged, None)
+        for chunk_start in range(0, max(size, 1), chunk_size):
+            chunk_end = min(chunk_start + chunk_size, size)
+            hits = []
+            while pending is not None and pending[0] < chunk_end:
+                position, index, _, match = pending
+                hits.append((position, index, match))
+                pending = next(merged, None)
+            yield chunk_end, hits
+
+def match_all_within_window(hit_offsets: list[np.ndarray], hit_ends: list[np.ndarray], window_size: int,
+                            data_size: int, alignment: int = 1,
+                            max_results: int | None = None) -> list[tuple[int, list[int]]]:
+    """
+    Find windows that contain a match of every pattern.
+
+    Mirrors a sliding scan over aligned window starts ``o`` (up to
+    ``data_size - window_size``) that accepts a window when each pattern has a
+    match lying entirely inside ``[o, o + window_size)`` and then resumes half
+    a window later; a window selecting the same hits as the previous one is
+    not reported again. Instead of testing every start, the per-pattern sorted hit
+    arrays are merged leapfrog style: a failing pattern tells how far the
+    window has to move before it can be satisfied.
+
+    Args:
+        hit_offsets: Sorted match offsets per pattern
+        hit_ends: Match end offsets per pattern, parallel to hit_offsets
+        window_size: Size of the window in bytes
+        data_size: Size of the searched buffer
+        alignment: Window starts must be multiples of this value
+        max_results: Stop after this many windows
+
+    Returns:
+        List of (window_start, [index of the first fitting hit per pattern])
+    """
+    if not hit_offsets or any(len(offsets) == 0 for offsets in hit_offsets):
+        return []
+
+    offsets_list = [offsets.tolist() for offsets in hit_offsets]
+    ends_list = [ends.tolist() for ends in hit_ends]
+    # Earliest end among the hits at or after each index
+    earliest_ends = [np.minimum.accumulate(np.asarray(ends)[::-1])[::-1].tolist() for ends in hit_ends]
+
+    results: list[tuple[int, list[int]]] = []
+    last_start = data_size - window_size
+    window_start = 0
+    while True:
+        window_start = -(-window_start // alignment) * alignment
+        if window_start > last_start:
+            break
+
+        window_end = window_start + window_size
+        required_start = window_start
+        firsts = []
+        for offsets, earliest in zip(offsets_list, earliest_ends, strict=True):
+            first = bisect.bisect_left(offsets, window_start)
+            if first == len(offsets):
+                return results
+            firsts.append(first)
+            if earliest[first] > window_end:
+                required_start = max(required_start, earliest[first] - window_size)
+
+        if required_start > window_start:
+            window_start = required_start
+            continue
+
+        chosen = []
+        for first, ends in zip(firsts, ends_list, strict=True):
+            while ends[first] > window_end:
+                first += 1
+            chosen.append(first)
+        if not results or results[-1][1] != chosen:
+            results.append((window_start, chosen))
+            if max_results is not None and len(results) >= max_results:
+                break
+        window_start += max(window_size // 2, 1)
+
+    return results
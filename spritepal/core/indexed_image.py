@@ -0,0 +1,198 @@
+"""
+In-memory indexed images for the extraction pipeline.
+
+An IndexedImage is an array of color indices plus an RGB palette. Extraction
+stages hand it along directly (preview, palettes, metadata) instead of
+writing a PNG and reopening it, and the PNG is encoded once, on a background
+thread, while the remaining stages run. Large sheets take a fast encoding
+path without the optimizer.
+"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+from PIL import Image
+from utils.constants import (
+    BYTES_PER_TILE,
+    DEFAULT_TILES_PER_ROW,
+    PIXEL_SCALE_FACTOR,
+    TILE_WIDTH,
+)
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Sheets with more pixels than this are saved without the PNG optimizer
+PNG_OPTIMIZE_MAX_PIXELS = 256 * 256
+
+# zlib level for the fast path
+PNG_FAST_COMPRESS_LEVEL = 1
+
+# Background threads encoding PNGs (zlib releases the GIL)
+PNG_ENCODER_THREADS = 2
+
+# Grayscale ramp used by extracted sprite sheets: index i is gray level i
+GRAYSCALE_PALETTE = [level for i in range(256) for level in (i, i, i)]
+
+_png_executor: ThreadPoolExecutor | None = None
+_png_executor_lock = threading.Lock()
+
+def decode_4bpp_tiles(tile_data: bytes, width_tiles: int, height_tiles: int) -> np.ndarray:
+    """
+    Decode SNES 4bpp tile data into a 2D array of color indices.
+
+    SNES 4bpp format stores each 8x8 tile as 32 bytes: bitplanes 0-1
+    interleaved per row in the first 16 bytes, bitplanes 2-3 in the last 16.
+    All tiles are decoded at once with NumPy; missing data is treated as zeros.
+
+    Args:
+        tile_data: Raw 4bpp tile data (32 bytes per 8x8 tile)
+        width_tiles: Width in tiles
+        height_tiles: Height in tiles
+
+    Returns:
+        uint8 array of shape (height_tiles * 8, width_tiles * 8) with values 0-15
+    """
+    tile_count = width_tiles * height_tiles
+    expected_size = tile_count * BYTES_PER_TILE
+
+    raw = np.zeros(expected_size, dtype=np.uint8)
+    available = min(len(tile_data), expected_size)
+    raw[:available] = np.frombuffer(tile_data, dtype=np.uint8, count=available)
+
+    # (tile, plane pair, row, plane within pair)
+    planes = raw.reshape(tile_count, 2, 8, 2)
+    # Unpack every plane byte into 8 pixels, MSB first -> (tile, pair, row, plane, col)
+    bits = np.unpackbits(planes[..., np.newaxis], axis=-1)
+    indices = (
+        bits[:, 0, :, 0]
+        | (bits[:, 0, :, 1] << 1)
+        | (bits[:, 1, :, 0] << 2)
+        | (bits[:, 1, :, 1] << 3)
+    )
+
+    # (tile_y, tile_x, row, col) -> (tile_y, row, tile_x, col)
+    return (
+        indices.reshape(height_tiles, width_tiles, 8, 8)
+        .transpose(0, 2, 1, 3)
+        .reshape(height_tiles * 8, width_tiles * 8)
+    )
+
+def decode_sprite_tiles(sprite_data: bytes, max_width_tiles: int = 16) -> np.ndarray | None:
+    """
+    Decode decompressed sprite data onto a grid at most ``max_width_tiles`` wide.
+
+    Args:
+        sprite_data: Raw 4bpp tile data; a trailing partial tile is ignored
+        max_width_tiles: Maximum grid width in tiles
+
+    Returns:
+        uint8 array of color indices, or None if there is no complete tile
+    """
+    tile_count = len(sprite_data) // BYTES_PER_TILE
+    if tile_count == 0:
+        return None
+
+    width_tiles = min(max_width_tiles, tile_count)
+    height_tiles = (tile_count + width_tiles - 1) // width_tiles
+    return decode_4bpp_tiles(sprite_data, width_tiles, height_tiles)
+
+@dataclass
+class IndexedImage:
+    """Color indices plus an RGB palette, shared by the extraction stages"""
+
+    pixels: np.ndarray  # uint8 (height, width) palette indices
+    palette: list[int] = field(default_factory=lambda: list(GRAYSCALE_PALETTE))
+    tile_count: int = 0
+
+    @classmethod
+    def from_4bpp(
+        cls,
+        tile_data: bytes,
+        tiles_per_row: int = DEFAULT_TILES_PER_ROW,
+        palette: list[list[int]] | None = None,
+    ) -> IndexedImage:
+        """
+        Decode 4bpp tiles into a sprite sheet.
+
+        Without a palette, pixel values are 4-bit indices scaled to gray
+        levels (0-15 -> 0-255), the layout ROM extraction has always written.
+        With one, pixels keep their 4-bit indices and the palette is applied.
+        A trailing partial tile is ignored and unused grid cells are index 0.
+
+        Args:
+            tile_data: Raw 4bpp tile data
+            tiles_per_row: Sheet width in tiles
+            palette: RGB triplets for indices 0-15, or None for grayscale
+
+        Returns:
+            The sheet; it has no pixels if there is no complete tile
+        """
+        flat_palette = (
+            list(GRAYSCALE_PALETTE) if palette is None
+            else [int(value) for color in palette[:16] for value in color[:3]]
+        )
+        tile_count = len(tile_data) // BYTES_PER_TILE
+        if tile_count == 0:
+            return cls(np.zeros((0, tiles_per_row * TILE_WIDTH), dtype=np.uint8), flat_palette)
+
+        height_tiles = (tile_count + tiles_per_row - 1) // tiles_per_row
+        indices = decode_4bpp_tiles(tile_data[:tile_count * BYTES_PER_TILE], tiles_per_row, height_tiles)
+        if palette is None:
+            indices = indices * np.uint8(PIXEL_SCALE_FACTOR)
+        return cls(indices, flat_palette, tile_count)
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    def to_pil(self) -> Image.Image:
+        """Palette-mode PIL image sharing no memory with this image"""
+        image = Image.frombytes("P", (self.width, self.height), np.ascontiguousarray(self.pixels).tobytes())
+        image.putpalette(self.palette)
+        return image
+
+    def save_png(self, path: str, optimize: bool | None = None) -> str:
+        """
+        Encode the image as an indexed PNG.
+
+        Args:
+            path: Output path
+            optimize: Run the PNG optimizer; by default only for sheets up to
+                PNG_OPTIMIZE_MAX_PIXELS, larger ones use fast zlib settings
+
+        Returns:
+            The output path
+        """
+        if optimize is None:
+            optimize = self.pixels.size <= PNG_OPTIMIZE_MAX_PIXELS
+        if optimize:
+            self.to_pil().save(path, "PNG", optimize=True)
+        else:
+            self.to_pil().save(path, "PNG", optimize=False, compress_level=PNG_FAST_COMPRESS_LEVEL)
+        logger.debug(f"Saved PNG: {path} ({self.width}x{self.height}, optimize={optimize})")
+        return path
+
+    def save_png_async(self, path: str, optimize: bool | None = None) -> Future[str]:
+        """
+        Encode the image as a PNG on a background thread.
+
+        The pixels must not be modified until the returned future completes.
+
+        Returns:
+            Future resolving to the output path, or raising the encoding error
+        """
+        global _png_executor
+        with _png_executor_lock:
+            if _png_executor is None:
+                _png_executor = ThreadPoolExecutor(
+                    max_workers=PNG_ENCODER_THREADS, thread_name_prefix="png-encoder"
+                )
+        return _png_executor.submit(self.save_png, path, optimize)
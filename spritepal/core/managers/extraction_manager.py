@@ -15,6 +15,13 @@ if TYPE_CHECKING:
     from core.palette_manager import PaletteManager
     from core.rom_extractor import ROMExtractor
 
+from core.batch_extraction import (
+    BatchExtractionJob,
+    BatchExtractionProgress,
+    BatchExtractionSummary,
+    BatchSprite,
+    collect_sprites,
+)
 from core.extractor import SpriteExtractor
 from core.palette_manager import PaletteManager
 from core.rom_extractor import ROMExtractor
@@ -54,6 +61,7 @@ class ExtractionManager(BaseManager):
         self._sprite_extractor: SpriteExtractor | None = None
         self._rom_extractor: ROMExtractor | None = None
         self._palette_manager: PaletteManager | None = None
+        self._batch_job: BatchExtractionJob | None = None
 
         super().__init__("ExtractionManager", parent)
 
@@ -264,20 +272,16 @@ class ExtractionManager(BaseManager):
             self._update_progress(operation, 0, 100)
             self.extraction_progress.emit(f"Extracting {sprite_name} from ROM...")
 
-            output_file = f"{output_base}.png"
-            result = self._ensure_rom_extractor().extract_sprite_from_rom(
-                rom_path, offset, output_file
+            # The sprite stays in memory; its PNG is encoded in the background
+            extraction = self._ensure_rom_extractor().extract_sprite_image(
+                rom_path, offset, output_base
             )
 
-            if result:
-                # Create PIL image for preview using context manager to prevent resource leak
-                with Image.open(output_file) as img:
-                    tile_count = (img.width * img.height) // (8 * 8)
-                    # Copy image data before context exits (signal receiver needs valid data)
-                    img_copy = img.copy()
-
+            if extraction:
+                output_file = extraction.output_path
+                tile_count = extraction.image.tile_count
                 extracted_files.append(output_file)
-                self.preview_generated.emit(img_copy, tile_count)
+                self.preview_generated.emit(extraction.image.to_pil(), tile_count)
 
                 # Extract palettes if CGRAM provided
                 if cgram_path:
@@ -289,6 +293,9 @@ class ExtractionManager(BaseManager):
                             tile_count, True, True
                         )
                     )
+
+                # The PNG must be on disk before files_created is emitted
+                extraction.png_written.result()
             else:
                 self._raise_extraction_failed("Failed to extract sprite from ROM")
 
@@ -314,6 +321,102 @@ class ExtractionManager(BaseManager):
         finally:
             self._finish_operation(operation)
 
+    def extract_batch_from_rom(self, rom_path: str, output_dir: str,
+                               sprites: list[BatchSprite] | None = None,
+                               cgram_path: str | None = None,
+                               palette_index: int = SPRITE_PALETTE_START) -> BatchExtractionSummary:
+        """
+        Extract many sprites from a ROM in one pipelined, resumable job
+
+        Args:
+            rom_path: Path to ROM file
+            output_dir: Directory for the PNGs and the extraction ledger
+            sprites: Sprites to extract; defaults to the known sprite locations
+                plus every sprite found by cached scans of the ROM
+            cgram_path: CGRAM dump whose palette is applied to every sprite
+            palette_index: CGRAM palette to apply
+
+        Returns:
+            Summary of the extraction, including throughput
+
+        Raises:
+            ExtractionError: If extraction fails
+            ValidationError: If parameters are invalid
+        """
+        operation = "rom_batch_extraction"
+
+        try:
+            self._validate_required({"rom_path": rom_path, "output_dir": output_dir}, ["rom_path", "output_dir"])
+            self._validate_rom_file(rom_path)
+            if cgram_path:
+                self._validate_cgram_file(cgram_path)
+        except ValidationError as e:
+            self._handle_error(e, operation)
+            raise
+
+        if not self._start_operation(operation):
+            raise ExtractionError("Batch ROM extraction already in progress")
+
+        try:
+            if sprites is None:
+                sprites = self._find_batch_sprites(rom_path)
+
+            palette = None
+            if cgram_path:
+                palette_manager = self._ensure_palette_manager()
+                palette_manager.load_cgram(cgram_path)
+                palette = palette_manager.get_palette(palette_index)
+
+            self._batch_job = BatchExtractionJob(
+                self._ensure_rom_extractor().hal_compressor, rom_path, output_dir, palette
+            )
+
+            def on_progress(progress: BatchExtractionProgress) -> None:
+                self._update_progress(operation, progress.completed, progress.total)
+                self.extraction_progress.emit(
+                    f"Extracted {progress.completed}/{progress.total} sprites "
+                    f"({progress.sprites_per_second:.1f} sprites/sec)"
+                )
+
+            self.extraction_progress.emit(f"Extracting {len(sprites)} sprites from ROM...")
+            summary = self._batch_job.run(sprites, on_progress)
+
+            status = "cancelled" if summary.cancelled else "complete"
+            self.extraction_progress.emit(
+                f"Batch extraction {status}: {summary.extracted} extracted, "
+                f"{summary.resumed} already done, {summary.failed} failed "
+                f"({summary.sprites_per_second:.1f} sprites/sec)"
+            )
+            self.files_created.emit([r.png_path for r in summary.results if r.png_path and not r.resumed])
+
+        except (OSError, PermissionError) as e:
+            self._handle_file_io_error(e, operation, "batch ROM extraction")
+            raise
+        except Exception as e:
+            if not isinstance(e, ExtractionError):
+                self._handle_operation_error(e, operation, ExtractionError, "batch ROM extraction")
+            else:
+                self._handle_error(e, operation)
+            raise
+        else:
+            return summary
+        finally:
+            self._batch_job = None
+            self._finish_operation(operation)
+
+    def cancel_batch_extraction(self) -> None:
+        """Stop a running batch extraction; a rerun resumes where it stopped"""
+        job = self._batch_job
+        if job is not None:
+            job.cancel()
+
+    def _find_batch_sprites(self, rom_path: str) -> list[BatchSprite]:
+        """Known sprite locations followed by sprites found by cached scans"""
+        return collect_sprites(
+            self.get_known_sprite_locations(rom_path),
+            get_rom_cache().get_cached_scan_sprites(rom_path),
+        )
+
     def get_sprite_preview(self, rom_path: str, offset: int,
                           sprite_name: str | None = None) -> tuple[bytes, int, int]:
         """
@@ -18,13 +18,13 @@ from PySide6.QtCore import QObject, QThread, Signal
 
 if TYPE_CHECKING:
     from ui.workers.injection_worker import InjectionWorker
-    from ui.workers.rom_injection_worker import ROMInjectionWorker
+    from ui.workers.rom_injection_worker import ROMBatchInjectionWorker, ROMInjectionWorker
 
     from .session_manager import SessionManager
 
 from ui.common import WorkerManager
 from ui.workers.injection_worker import InjectionWorker
-from ui.workers.rom_injection_worker import ROMInjectionWorker
+from ui.workers.rom_injection_worker import ROMBatchInjectionWorker, ROMInjectionWorker
 from utils.constants import (
     SETTINGS_KEY_FAST_COMPRESSION,
     SETTINGS_KEY_LAST_CUSTOM_OFFSET,
@@ -161,6 +161,95 @@ class InjectionManager(BaseManager):
         else:
             return True
 
+    def start_batch_injection(self, params: dict[str, Any]) -> bool:
+        """
+        Start injecting several sprites into one ROM in a single transaction
+
+        The ROM is read, backed up, checksummed and written once for the whole
+        batch. Per-sprite sizes and fit are reported through compression_info
+        as {"sprites": [...]}.
+
+        Args:
+            params: Batch parameters containing:
+                - sprites: List of (sprite_path, offset) pairs
+                - input_rom, output_rom
+                - fast_compression: Use fast compression mode
+
+        Returns:
+            True if injection started successfully, False otherwise
+
+        Raises:
+            ValidationError: If parameters are invalid
+        """
+        operation = "injection"
+
+        if not self._start_operation(operation):
+            return False
+
+        try:
+            # Validate parameters
+            self.validate_batch_injection_params(params)
+
+            # Stop any existing worker
+            WorkerManager.cleanup_worker(self._current_worker, timeout=1000)
+            self._current_worker = None
+
+            worker = ROMBatchInjectionWorker(
+                [(path, offset) for path, offset in params["sprites"]],
+                params["input_rom"],
+                params["output_rom"],
+                params.get("fast_compression", False),
+            )
+
+            # Connect worker signals before starting
+            self._current_worker = worker
+            self._connect_worker_signals()
+            worker.start()
+
+            self._logger.info(f"Started batch ROM injection of {len(params['sprites'])} sprites")
+            self.injection_progress.emit(f"Starting batch injection of {len(params['sprites'])} sprites...")
+
+        except (OSError, PermissionError) as e:
+            self._handle_file_io_error(e, operation, "batch injection startup")
+        except (ValueError, TypeError) as e:
+            self._handle_data_format_error(e, operation, "batch injection startup")
+        except Exception as e:
+            self._handle_error(e, operation)
+            return False
+        else:
+            return True
+
+    def validate_batch_injection_params(self, params: dict[str, Any]) -> None:
+        """
+        Validate batch ROM injection parameters
+
+        Args:
+            params: Parameters to validate
+
+        Raises:
+            ValidationError: If parameters are invalid
+        """
+        self._validate_required(params, ["sprites", "input_rom", "output_rom"])
+        self._validate_type(params["sprites"], "sprites", list)
+
+        for entry in params["sprites"]:
+            if not isinstance(entry, (tuple, list)) or len(entry) != 2:
+                raise ValidationError(f"Invalid sprite entry (expected (sprite_path, offset)): {entry!r}")
+            sprite_path, offset = entry
+            self._validate_type(sprite_path, "sprite_path", str)
+            self._validate_type(offset, "offset", int)
+            self._validate_range(offset, "offset", min_val=0)
+            sprite_result = FileValidator.validate_image_file(sprite_path)
+            if not sprite_result.is_valid:
+                raise ValidationError(f"Sprite file validation failed: {sprite_result.error_message}")
+
+        rom_result = FileValidator.validate_rom_file(params["input_rom"])
+        if not rom_result.is_valid:
+            raise ValidationError(f"Input ROM file validation failed: {rom_result.error_message}")
+
+        if "fast_compression" in params:
+            self._validate_type(params["fast_compression"], "fast_compression", bool)
+
     def validate_injection_params(self, params: dict[str, Any]) -> None:
         """
         Validate injection parameters
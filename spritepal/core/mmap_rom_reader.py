@@ -15,6 +15,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Any, BinaryIO, Protocol
 
 from typing_extensions import override
+from utils.rom_checksum import calculate_snes_checksum
 
 if TYPE_CHECKING:
     class Decompressor(Protocol):
@@ -219,18 +220,8 @@ class MemoryMappedROMReader:
         Returns:
             16-bit checksum value
         """
-        checksum = 0
-
         with self.open_mmap() as rom_data:
-            # SNES checksum calculation
-            for i in range(0, self.file_size, 2):
-                if i + 1 < self.file_size:
-                    checksum += int.from_bytes(rom_data[i:i+2], 'little')
-                else:
-                    checksum += rom_data[i]
-                checksum &= 0xFFFF
-
-        return checksum
+            return calculate_snes_checksum(rom_data)
 
     def extract_compressed_data(self, offset: int, decompressor: Decompressor) -> bytes:
         """
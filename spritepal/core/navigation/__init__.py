@@ -264,6 +264,7 @@ from .plugins import (
     get_plugin_manager,
     shutdown_plugin_manager,
 )
+from .raw_tile_detector import RawTileConfig, RawTileDetector, RawTileRun
 from .region_map import SpriteRegionMap
 from .strategies import (
     AbstractNavigationStrategy,
@@ -272,6 +273,7 @@ from .strategies import (
     StrategyRegistry,
     get_strategy_registry,
 )
+from .tile_index import TileFlip, TileIndex, TileOccurrence
 
 
 # Navigation manager singleton holder
@@ -369,6 +371,10 @@ __all__ = [
     "PatternAnalyzer",
     "PatternBasedStrategy",
     "PluginManager",
+    # Raw graphics detection
+    "RawTileConfig",
+    "RawTileDetector",
+    "RawTileRun",
     "RegionClassifier",
     "RegionType",
     "ScoringAlgorithmPlugin",
@@ -379,6 +385,10 @@ __all__ = [
     "SpriteRegionMap",
     "StrategyPlugin",
     "StrategyRegistry",
+    # Tile deduplication
+    "TileFlip",
+    "TileIndex",
+    "TileOccurrence",
     "create_similarity_fingerprint",
     "get_navigation_cache",
     "get_navigation_manager",
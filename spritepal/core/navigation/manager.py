@@ -19,6 +19,7 @@ from typing_extensions import override
 from utils.logging_config import get_logger
 
 from .data_structures import NavigationContext, NavigationHint, SpriteLocation
+from .raw_tile_detector import RawTileDetector
 from .region_map import SpriteRegionMap
 from .strategies import get_strategy_registry
 
@@ -184,6 +185,46 @@ class NavigationManager(BaseManager):
         finally:
             self._finish_operation("add_sprite")
 
+    def detect_raw_graphics(self, rom_path: str, rom_data: bytes | None = None) -> int:
+        """
+        Scan a ROM for uncompressed 4bpp graphics and add them to its region map.
+
+        Args:
+            rom_path: Path to ROM file (must have been set with set_rom_file)
+            rom_data: ROM contents, read from rom_path if not provided
+
+        Returns:
+            Number of raw graphics runs added
+        """
+        if not self._start_operation("detect_raw_graphics"):
+            return 0
+
+        try:
+            self._validate_required({"rom_path": rom_path}, ["rom_path"])
+
+            if rom_path not in self._region_maps:
+                logger.warning(f"No region map for ROM: {rom_path}")
+                return 0
+
+            if rom_data is None:
+                rom_data = Path(rom_path).read_bytes()
+
+            region_map = self._region_maps[rom_path]
+            added = RawTileDetector().populate_region_map(region_map, rom_data)
+
+            if added:
+                logger.info(f"Added {added} raw graphics regions to region map")
+                self.region_map_updated.emit(region_map.get_region_statistics())
+                self._trigger_background_learning(rom_path)
+
+            return added
+
+        except Exception as e:
+            self._handle_error(e, "detect_raw_graphics")
+            raise
+        finally:
+            self._finish_operation("detect_raw_graphics")
+
     def get_navigation_hints(
         self,
         rom_path: str,
@@ -0,0 +1,355 @@
+"""
+Detection of uncompressed 4bpp tile graphics in ROM data.
+
+Scores a tile at every byte offset of the ROM with vectorized bitplane
+statistics and reports contiguous runs of tile-like data as sprite locations,
+so raw graphics can be navigated alongside HAL-compressed sprites.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+from core.indexed_image import decode_4bpp_tiles
+from utils.constants import BYTES_PER_TILE
+from utils.logging_config import get_logger
+
+from .data_structures import (
+    NavigationStrategy,
+    RegionType,
+    SpriteLocation,
+    create_similarity_fingerprint,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .region_map import SpriteRegionMap
+
+logger = get_logger(__name__)
+
+# Number of set bits for every byte value
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1).astype(np.uint8)
+
+# Within a tile, row r of a bitplane pair sits two bytes after row r - 1:
+# 7 row transitions x 2 planes x 2 plane pairs
+_ROW_PAIRS = 28
+# Bytes 2r and 2r + 1 hold the two planes of one row: 8 rows x 2 plane pairs
+_PLANE_PAIRS = 16
+
+# Tiles decoded per alignment when choosing the grid of a region
+PHASE_SAMPLE_TILES = 64
+
+class RawTileConfig(NamedTuple):
+    """Configuration for raw 4bpp graphics detection."""
+    min_tiles: int = 16                # Shortest run reported, in tiles
+    coherence_threshold: float = 0.72  # Random data scores ~0.5
+    max_gap_tiles: int = 2             # Incoherent tiles tolerated inside a run
+    max_entropy: float = 3.2           # Mean pixel entropy in bits (max 4)
+    max_duplicate_ratio: float = 0.5   # Share of repeated non-blank tiles
+    max_blank_ratio: float = 0.5       # Share of single-byte-value tiles
+    alignment_step: int = 1            # Byte step between tested alignments
+
+class RawTileRun(NamedTuple):
+    """A contiguous run of tile-like data on one tile grid."""
+    offset: int
+    tile_count: int
+    coherence: float
+    entropy: float
+    duplicate_ratio: float
+    blank_ratio: float
+    confidence: float
+
+def _window_sums(values: np.ndarray, span: int) -> np.ndarray:
+    """Sum every window of ``span`` consecutive values"""
+    cumulative = np.concatenate(([0], np.cumsum(values, dtype=np.int32)))
+    return cumulative[span:] - cumulative[:-span]
+
+def compute_tile_coherence(rom_data: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score a 4bpp tile starting at every byte offset of the ROM.
+
+    Coherence is the share of equal bits between vertically adjacent rows of
+    each bitplane and between paired planes of the same row. Real graphics
+    are spatially smooth and score high; compressed or random data sits
+    around 0.5. All offsets are scored at once with running sums.
+
+    Args:
+        rom_data: Raw ROM bytes
+
+    Returns:
+        Tuple of (coherence, blank) arrays indexed by tile start offset;
+        blank marks tiles made of a single repeated byte value
+    """
+    data = np.frombuffer(rom_data, dtype=np.uint8)
+    tile_starts = len(data) - BYTES_PER_TILE + 1
+    if tile_starts <= 0:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=bool)
+
+    # Row transitions: byte i vs i + 2, for k in 0..13 of each 16-byte half
+    row_bits = _window_sums(_POPCOUNT[data[:-2] ^ data[2:]], 14)
+    row_sum = row_bits[:tile_starts] + row_bits[16:16 + tile_starts]
+
+    # Plane pairs: byte i vs i + 1 at every even position within the tile
+    plane_diff = _POPCOUNT[data[:-1] ^ data[1:]]
+    plane_sum = np.empty(tile_starts, dtype=np.int32)
+    for parity in (0, 1):
+        sums = _window_sums(plane_diff[parity::2], _PLANE_PAIRS)
+        plane_sum[parity::2] = sums[: len(plane_sum[parity::2])]
+
+    differing = row_sum + plane_sum
+    coherence = 1.0 - differing.astype(np.float32) / ((_ROW_PAIRS + _PLANE_PAIRS) * 8)
+
+    changes = _window_sums(data[:-1] != data[1:], BYTES_PER_TILE - 1)
+    blank = changes[:tile_starts] == 0
+
+    return coherence, blank
+
+def tile_pixel_entropy(tiles: np.ndarray) -> np.ndarray:
+    """
+    Shannon entropy of the color indices of each tile, in bits per pixel.
+
+    Args:
+        tiles: uint8 array of shape (tile_count, 32)
+
+    Returns:
+        float64 array of shape (tile_count,) with values 0.0-4.0
+    """
+    tile_count = len(tiles)
+    if tile_count == 0:
+        return np.empty(0)
+    pixels = decode_4bpp_tiles(tiles.tobytes(), 1, tile_count).reshape(tile_count, 64)
+    keys = np.arange(tile_count)[:, np.newaxis] * 16 + pixels
+    counts = np.bincount(keys.ravel(), minlength=tile_count * 16).reshape(tile_count, 16)
+    probabilities = counts / 64.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(probabilities > 0, probabilities * np.log2(probabilities), 0.0)
+    return -terms.sum(axis=1)
+
+def _find_runs(mask: np.ndarray, min_length: int) -> list[tuple[int, int]]:
+    """Find (start, length) runs of True values at least ``min_length`` long"""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lengths = ends - starts
+    keep = lengths >= min_length
+    return list(zip(starts[keep].tolist(), lengths[keep].tolist(), strict=True))
+
+def _close_gaps(mask: np.ndarray, max_gap: int) -> np.ndarray:
+    """Fill runs of False no longer than ``max_gap`` that lie between True values"""
+    if max_gap <= 0 or not mask.any():
+        return mask
+    closed = mask.copy()
+    edges = np.diff(np.concatenate(([1], mask.view(np.int8), [1])))
+    gap_starts = np.flatnonzero(edges == -1)
+    gap_ends = np.flatnonzero(edges == 1)
+    for start, end in zip(gap_starts, gap_ends, strict=True):
+        if start > 0 and end < len(mask) and end - start <= max_gap:
+            closed[start:end] = True
+    return closed
+
+class RawTileDetector:
+    """Detects runs of uncompressed 4bpp tile graphics in ROM data."""
+
+    def __init__(self, config: RawTileConfig | None = None) -> None:
+        """Initialize detector with configuration."""
+        self.config = config or RawTileConfig()
+
+    def find_runs(
+        self,
+        rom_data: bytes,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> list[RawTileRun]:
+        """
+        Find runs of raw 4bpp graphics.
+
+        Regions where most byte offsets start a coherent tile are found first,
+        independent of alignment. Each region's tile grid is then chosen as
+        the alignment with the lowest pixel entropy, since misaligned decodes
+        mix unrelated bitplanes, and the region is split into runs on it.
+
+        Args:
+            rom_data: Raw ROM bytes
+            progress_callback: Optional callback(regions_done, regions_total)
+
+        Returns:
+            Accepted runs sorted by offset
+        """
+        config = self.config
+        coherence, blank = compute_tile_coherence(rom_data)
+        if len(coherence) < BYTES_PER_TILE:
+            return []
+
+        tile_like = (coherence >= config.coherence_threshold) | blank
+        # An offset belongs to a region when most tiles starting near it are coherent
+        mostly_coherent = _window_sums(tile_like, BYTES_PER_TILE) * 2 >= BYTES_PER_TILE
+        regions = _find_runs(
+            _close_gaps(mostly_coherent, config.max_gap_tiles * BYTES_PER_TILE),
+            config.min_tiles * BYTES_PER_TILE,
+        )
+
+        data = np.frombuffer(rom_data, dtype=np.uint8)
+        runs: list[RawTileRun] = []
+        for done, (region_start, region_length) in enumerate(regions, start=1):
+            phase = self._choose_phase(data, region_start, region_length)
+            # The majority window fades out up to a tile before the data ends
+            region_end = region_start + region_length + BYTES_PER_TILE
+            tile_offsets = np.arange(
+                region_start + phase, min(region_end, len(coherence)), BYTES_PER_TILE
+            )
+            grid_mask = _close_gaps(tile_like[tile_offsets], config.max_gap_tiles)
+            for start, length in _find_runs(grid_mask, config.min_tiles):
+                run = self._evaluate_run(
+                    data, int(tile_offsets[start]), length, coherence, blank
+                )
+                if run is not None:
+                    runs.append(run)
+            if progress_callback:
+                progress_callback(done, len(regions))
+
+        logger.info(
+            f"Raw tile scan found {len(runs)} graphics runs "
+            f"({sum(run.tile_count for run in runs)} tiles)"
+        )
+        return runs
+
+    def detect(
+        self,
+        rom_data: bytes,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> list[SpriteLocation]:
+        """
+        Detect raw 4bpp graphics runs as sprite locations.
+
+        Args:
+            rom_data: Raw ROM bytes
+            progress_callback: Optional callback(regions_done, regions_total) from find_runs
+
+        Returns:
+            Sprite locations with region type UNCOMPRESSED, sorted by offset
+        """
+        locations = []
+        for run in self.find_runs(rom_data, progress_callback):
+            size = run.tile_count * BYTES_PER_TILE
+            locations.append(
+                SpriteLocation(
+                    offset=run.offset,
+                    compressed_size=size,
+                    decompressed_size=size,
+                    confidence=run.confidence,
+                    region_type=RegionType.UNCOMPRESSED,
+                    tile_count=run.tile_count,
+                    visual_complexity=run.entropy / 4.0,
+                    similarity_fingerprint=create_similarity_fingerprint(
+                        rom_data[run.offset:run.offset + size], run.tile_count
+                    ),
+                    discovery_strategy=NavigationStrategy.LINEAR,
+                    metadata={
+                        "format": "raw_4bpp",
+                        "coherence": round(run.coherence, 3),
+                        "entropy": round(run.entropy, 3),
+                        "duplicate_ratio": round(run.duplicate_ratio, 3),
+                        "blank_ratio": round(run.blank_ratio, 3),
+                    },
+                )
+            )
+        return locations
+
+    def populate_region_map(
+        self,
+        region_map: SpriteRegionMap,
+        rom_data: bytes,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> int:
+        """
+        Add detected raw graphics runs to a region map.
+
+        Args:
+            region_map: Region map to update
+            rom_data: Raw ROM bytes
+            progress_callback: Optional callback(regions_done, regions_total) from find_runs
+
+        Returns:
+            Number of locations added
+        """
+        return region_map.add_sprites(self.detect(rom_data, progress_callback))
+
+    def _choose_phase(self, data: np.ndarray, region_start: int, region_length: int) -> int:
+        """Pick the tile grid alignment of a region with the lowest pixel entropy."""
+        sample_tiles = min(PHASE_SAMPLE_TILES, region_length // BYTES_PER_TILE - 1)
+        if sample_tiles <= 0:
+            return 0
+        # Sample from the middle of the region, away from its fuzzy edges
+        sample_start = region_start + (region_length - sample_tiles * BYTES_PER_TILE) // 2
+        sample_start -= (sample_start - region_start) % BYTES_PER_TILE
+        sample_bytes = sample_tiles * BYTES_PER_TILE
+
+        best_phase, best_entropy = 0, float("inf")
+        for phase in range(0, BYTES_PER_TILE, max(1, self.config.alignment_step)):
+            start = sample_start + phase
+            if start + sample_bytes > len(data):
+                break
+            tiles = data[start:start + sample_bytes].reshape(sample_tiles, BYTES_PER_TILE)
+            entropy = float(tile_pixel_entropy(tiles).mean())
+            if entropy < best_entropy:
+                best_phase, best_entropy = phase, entropy
+        return best_phase
+
+    def _evaluate_run(
+        self,
+        data: np.ndarray,
+        offset: int,
+        tile_count: int,
+        coherence: np.ndarray,
+        blank: np.ndarray,
+    ) -> RawTileRun | None:
+        """Trim blank edges from a candidate run and apply the acceptance rules."""
+        config = self.config
+        tile_offsets = offset + np.arange(tile_count) * BYTES_PER_TILE
+        run_blank = blank[tile_offsets]
+
+        content = np.flatnonzero(~run_blank)
+        if len(content) == 0:
+            return None
+        first, last = int(content[0]), int(content[-1])
+        tile_offsets = tile_offsets[first:last + 1]
+        run_blank = run_blank[first:last + 1]
+        tile_count = len(tile_offsets)
+        if tile_count < config.min_tiles:
+            return None
+
+        blank_ratio = float(run_blank.mean())
+        if blank_ratio > config.max_blank_ratio:
+            return None
+
+        start = int(tile_offsets[0])
+        tiles = data[start:start + tile_count * BYTES_PER_TILE].reshape(tile_count, BYTES_PER_TILE)
+        content_tiles = tiles[~run_blank]
+
+        unique_tiles = len(np.unique(content_tiles, axis=0))
+        duplicate_ratio = 1.0 - unique_tiles / len(content_tiles)
+        if duplicate_ratio > config.max_duplicate_ratio:
+            return None
+
+        entropy = float(tile_pixel_entropy(content_tiles).mean())
+        if entropy > config.max_entropy:
+            return None
+
+        mean_coherence = float(coherence[tile_offsets[~run_blank]].mean())
+        # Map coherence from the threshold..1.0 onto 0.5..1.0, then penalize
+        # noisy or repetitive content
+        span = max(1e-6, 1.0 - config.coherence_threshold)
+        confidence = 0.5 + 0.5 * min(1.0, max(0.0, mean_coherence - config.coherence_threshold) / span)
+        confidence *= 1.0 - 0.5 * duplicate_ratio
+        confidence *= 1.0 - 0.25 * entropy / 4.0
+
+        return RawTileRun(
+            offset=start,
+            tile_count=tile_count,
+            coherence=mean_coherence,
+            entropy=entropy,
+            duplicate_ratio=duplicate_ratio,
+            blank_ratio=blank_ratio,
+            confidence=max(0.0, min(1.0, confidence)),
+        )
@@ -101,6 +101,46 @@ class SpriteRegionMap:
             logger.debug(f"Added sprite at 0x{sprite.offset:06X} with confidence {sprite.confidence:.3f}")
             return True
 
+    def add_sprites(self, sprites: list[SpriteLocation]) -> int:
+        """
+        Add many sprites at once with a single re-sort and statistics update.
+
+        Follows the same rules as add_sprite: an existing sprite at the same
+        offset is only replaced by one with higher confidence.
+
+        Args:
+            sprites: Sprite locations to add
+
+        Returns:
+            Number of sprites added
+        """
+        with self._lock:
+            incoming: dict[int, SpriteLocation] = {}
+            for sprite in sprites:
+                best = incoming.get(sprite.offset) or self._offset_index.get(sprite.offset)
+                if best is not None and best.confidence >= sprite.confidence:
+                    continue
+                incoming[sprite.offset] = sprite
+
+            if not incoming:
+                return 0
+
+            replaced = [self._offset_index[offset] for offset in incoming if offset in self._offset_index]
+            for sprite in replaced:
+                self._region_buckets[sprite.region_type].remove(sprite)
+
+            self._offset_index.update(incoming)
+            self._sprites = sorted(self._offset_index.values(), key=lambda s: s.offset)
+            for sprite in incoming.values():
+                self._region_buckets[sprite.region_type].append(sprite)
+
+            self._version += 1
+            self._dirty = True
+            self._update_statistics()
+
+            logger.debug(f"Added {len(incoming)} sprites in bulk")
+            return len(incoming)
+
     def remove_sprite(self, offset: int) -> bool:
         """
         Remove a sprite by offset.
@@ -0,0 +1,462 @@
+"""
+Tile-level deduplication index for decompressed sprite data.
+
+Every 32-byte 4bpp tile of every indexed block is hashed after
+canonicalizing for horizontal and vertical flips, so a tile and its mirrored
+copies share one key. Palette-shifted copies need no special handling because
+4bpp tile data holds color indices, not colors. Keys map to a sorted posting
+table of (block, tile index, flip) entries, which answers "where else is this
+tile used" and "which blocks share at least N tiles" with binary searches and
+array operations. Blocks whose tiles are identical in the same order are
+recognized as duplicates, which lets thumbnail generation render such
+sprites once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from enum import IntFlag
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+from utils.constants import BYTES_PER_TILE
+from utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = get_logger(__name__)
+
+# Bit-reversed value of every byte, which mirrors a row of one bitplane
+_BIT_REVERSE = np.array([int(f"{i:08b}"[::-1], 2) for i in range(256)], dtype=np.uint8)
+
+# Byte order of a vertically flipped tile: rows reverse within each plane pair
+_VFLIP_ORDER = np.array([
+    base + 2 * (7 - row) + plane for base in (0, 16) for row in range(8) for plane in (0, 1)
+])
+
+# Odd multipliers mixing the four 64-bit words of a tile into one key
+_WORD_MULTIPLIERS = np.array(
+    [0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93], dtype=np.uint64
+)
+
+# Flip recorded for tiles left out of the posting table
+_SKIPPED = 0xFF
+
+# Tiles shared by more blocks than this are ignored by shared_block_pairs;
+# they are usually padding or font tiles and would make the pair count quadratic
+MAX_PAIR_POSTINGS = 64
+
+class TileFlip(IntFlag):
+    """Flip transforming a tile into another occurrence of it"""
+
+    NONE = 0
+    HORIZONTAL = 1
+    VERTICAL = 2
+    BOTH = 3
+
+class TileOccurrence(NamedTuple):
+    """One use of a tile in an indexed block"""
+
+    offset: int
+    tile_index: int
+    flip: TileFlip
+
+def split_tiles(data: bytes) -> np.ndarray:
+    """
+    View tile data as a (tile_count, 32) array; a trailing partial tile is ignored.
+
+    Args:
+        data: Raw 4bpp tile data
+
+    Returns:
+        uint8 array of shape (tile_count, 32)
+    """
+    tile_count = len(data) // BYTES_PER_TILE
+    return np.frombuffer(data, dtype=np.uint8, count=tile_count * BYTES_PER_TILE).reshape(tile_count, BYTES_PER_TILE)
+
+def hash_tiles(tiles: np.ndarray) -> np.ndarray:
+    """
+    64-bit hash of each tile's exact bytes.
+
+    Args:
+        tiles: uint8 array of shape (n, 32)
+
+    Returns:
+        uint64 array of shape (n,)
+    """
+    words = np.ascontiguousarray(tiles, dtype=np.uint8).view("<u8").astype(np.uint64)
+    mixed = np.bitwise_xor.reduce(words * _WORD_MULTIPLIERS, axis=1)
+    # splitmix64 finalizer so nearby tiles spread over the whole key space
+    mixed ^= mixed >> np.uint64(30)
+    mixed *= np.uint64(0xBF58476D1CE4E5B9)
+    mixed ^= mixed >> np.uint64(27)
+    mixed *= np.uint64(0x94D049BB133111EB)
+    mixed ^= mixed >> np.uint64(31)
+    return mixed
+
+def canonical_tile_hashes(tiles: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Flip-invariant hash of each tile.
+
+    All four flips of a tile hash alike: the key is the smallest hash of the
+    tile's flipped variants, and the flip is the one producing that variant.
+
+    Args:
+        tiles: uint8 array of shape (n, 32)
+
+    Returns:
+        (uint64 keys, uint8 flips) arrays of shape (n,)
+    """
+    hflipped = _BIT_REVERSE[tiles]
+    variants = np.stack([tiles, hflipped, tiles[:, _VFLIP_ORDER], hflipped[:, _VFLIP_ORDER]])
+    hashes = hash_tiles(variants.reshape(-1, BYTES_PER_TILE)).reshape(4, len(tiles))
+    flips = hashes.argmin(axis=0)
+    return hashes[flips, np.arange(len(tiles))], flips.astype(np.uint8)
+
+def solid_tiles(tiles: np.ndarray) -> np.ndarray:
+    """
+    Mask of tiles filled with a single color.
+
+    Args:
+        tiles: uint8 array of shape (n, 32)
+
+    Returns:
+        Boolean array of shape (n,)
+    """
+    # (tile, plane pair, row, plane): a solid tile has every plane row all 0s or all 1s
+    planes = tiles.reshape(len(tiles), 2, 8, 2)
+    uniform_rows = ((planes == 0) | (planes == 0xFF)).all(axis=(1, 2, 3))
+    same_rows = (planes == planes[:, :, :1, :]).all(axis=(1, 2, 3))
+    return uniform_rows & same_rows
+
+class TileIndex:
+    """
+    Posting table from canonical tile hashes to their uses across blocks.
+
+    Blocks are added incrementally; the sorted posting table is rebuilt
+    lazily on the next query. Keys are 64-bit hashes and collisions are not
+    verified, which is harmless at ROM scale.
+    """
+
+    def __init__(self, skip_solid: bool = True) -> None:
+        """
+        Args:
+            skip_solid: Leave single-color tiles out of the index; blank
+                padding would otherwise link almost every block
+        """
+        self.skip_solid = skip_solid
+        self._block_offsets: list[int] = []
+        self._block_ids: dict[int, int] = {}
+        # Per block: canonical key and flip of every tile; skipped tiles get flip _SKIPPED
+        self._block_keys: list[np.ndarray] = []
+        self._block_flips: list[np.ndarray] = []
+        # Digest of a block's keys and flips -> first block with that content
+        self._first_with_content: dict[bytes, int] = {}
+        self._pending: list[int] = []
+
+        # Posting table sorted by key, with CSR-style ranges per distinct key
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._starts = np.zeros(1, dtype=np.int64)
+        self._posting_blocks = np.empty(0, dtype=np.int32)
+        self._posting_tiles = np.empty(0, dtype=np.int32)
+        self._posting_flips = np.empty(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        """Number of indexed blocks"""
+        return len(self._block_offsets)
+
+    def __contains__(self, offset: int) -> bool:
+        return offset in self._block_ids
+
+    @property
+    def tile_count(self) -> int:
+        """Number of indexed tile uses"""
+        self._finalize()
+        return len(self._posting_blocks)
+
+    @property
+    def unique_tile_count(self) -> int:
+        """Number of distinct tiles, counting flips as the same tile"""
+        self._finalize()
+        return len(self._keys)
+
+    def add_block(self, offset: int, data: bytes) -> int:
+        """
+        Index the tiles of one decompressed block.
+
+        Args:
+            offset: ROM offset identifying the block
+            data: Decompressed 4bpp tile data
+
+        Returns:
+            Number of tiles indexed; 0 if the block was already indexed
+        """
+        if offset in self._block_ids:
+            return 0
+
+        tiles = split_tiles(data)
+        keys, flips = canonical_tile_hashes(tiles)
+        if self.skip_solid:
+            flips[solid_tiles(tiles)] = _SKIPPED
+
+        self._register_block(offset, keys, flips)
+        return int(np.count_nonzero(flips != _SKIPPED))
+
+    def add_blocks(self, blocks: Iterable[tuple[int, bytes]]) -> int:
+        """
+        Index several blocks.
+
+        Args:
+            blocks: (offset, decompressed data) pairs
+
+        Returns:
+            Total number of tiles indexed
+        """
+        return sum(self.add_block(offset, data) for offset, data in blocks)
+
+    def duplicate_of(self, offset: int) -> int | None:
+        """
+        Earlier indexed block with the same tiles in the same order.
+
+        Solid tiles compare by color only, since flipping cannot change them.
+
+        Args:
+            offset: Offset of an indexed block
+
+        Returns:
+            Offset of the first block indexed with identical tiles, or None
+            if the block is the first (or has no tiles)
+        """
+        block_id = self._block_ids[offset]
+        if not len(self._block_keys[block_id]):
+            return None
+        first = self._first_with_content[_content_digest(self._block_keys[block_id], self._block_flips[block_id])]
+        return None if first == block_id else self._block_offsets[first]
+
+    def find_tile(self, tile: bytes) -> list[TileOccurrence]:
+        """
+        Every indexed use of a tile, including flipped copies.
+
+        Args:
+            tile: 32 bytes of 4bpp tile data
+
+        Returns:
+            Occurrences ordered by offset and tile index; each flip is the
+            one that turns the queried tile into that occurrence
+        """
+        if len(tile) != BYTES_PER_TILE:
+            raise ValueError(f"A 4bpp tile is {BYTES_PER_TILE} bytes, got {len(tile)}")
+        keys, flips = canonical_tile_hashes(split_tiles(tile))
+        return self._occurrences(keys[0], int(flips[0]))
+
+    def where_used(self, offset: int, tile_index: int) -> list[TileOccurrence]:
+        """
+        Other uses of a tile of an indexed block.
+
+        Args:
+            offset: Offset of an indexed block
+            tile_index: Index of the tile within the block
+
+        Returns:
+            Occurrences elsewhere, with flips relative to the given tile
+        """
+        block_id = self._block_ids[offset]
+        flip = int(self._block_flips[block_id][tile_index])
+        if flip == _SKIPPED:
+            return []
+        occurrences = self._occurrences(self._block_keys[block_id][tile_index], flip)
+        return [o for o in occurrences if (o.offset, o.tile_index) != (offset, tile_index)]
+
+    def blocks_sharing(self, offset: int, min_shared: int = 1) -> list[tuple[int, int]]:
+        """
+        Blocks sharing distinct tiles with an indexed block.
+
+        Args:
+            offset: Offset of an indexed block
+            min_shared: Minimum number of shared distinct tiles
+
+        Returns:
+            (offset, shared tile count) pairs, most shared first
+        """
+        self._finalize()
+        block_id = self._block_ids[offset]
+        keys = np.unique(self._block_keys[block_id][self._block_flips[block_id] != _SKIPPED])
+        positions = np.searchsorted(self._keys, keys)
+
+        starts, ends = self._starts[positions], self._starts[positions + 1]
+        postings = _expand_ranges(starts, ends)
+        block_count = len(self._block_offsets)
+        # Count each (key, block) pair once so repeated tiles are not double counted
+        pairs = np.unique(
+            np.repeat(np.arange(len(keys)), ends - starts) * block_count + self._posting_blocks[postings]
+        )
+        shared = np.bincount(pairs % block_count, minlength=block_count)
+        shared[block_id] = 0
+
+        others = np.flatnonzero(shared >= max(min_shared, 1))
+        order = np.lexsort((others, -shared[others]))
+        return [(self._block_offsets[i], int(shared[i])) for i in others[order]]
+
+    def shared_block_pairs(
+        self, min_shared: int = 1, max_postings: int = MAX_PAIR_POSTINGS
+    ) -> list[tuple[int, int, int]]:
+        """
+        All pairs of blocks sharing at least ``min_shared`` distinct tiles.
+
+        Args:
+            min_shared: Minimum number of shared distinct tiles
+            max_postings: Tiles used by more blocks than this are ignored
+
+        Returns:
+            (offset_a, offset_b, shared tile count) with offset_a < offset_b,
+            most shared first
+        """
+        self._finalize()
+        block_count = len(self._block_offsets)
+        if block_count < 2:
+            return []
+
+        key_ids = np.repeat(np.arange(len(self._keys)), np.diff(self._starts))
+        distinct = np.unique(key_ids.astype(np.int64) * block_count + self._posting_blocks)
+        key_of, block_of = np.divmod(distinct, block_count)
+        group_starts = np.flatnonzero(np.r_[True, key_of[1:] != key_of[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(distinct)])
+
+        codes = []
+        for size in np.unique(group_sizes):
+            if size < 2 or size > max_postings:
+                continue
+            starts = group_starts[group_sizes == size]
+            blocks = block_of[starts[:, np.newaxis] + np.arange(size)]
+            first, second = np.triu_indices(size, k=1)
+            codes.append((blocks[:, first] * block_count + blocks[:, second]).ravel())
+        if not codes:
+            return []
+
+        pair_codes, counts = np.unique(np.concatenate(codes), return_counts=True)
+        keep = counts >= max(min_shared, 1)
+        pair_codes, counts = pair_codes[keep], counts[keep]
+        order = np.lexsort((pair_codes, -counts))
+
+        offsets = self._block_offsets
+        results = []
+        for code, count in zip(pair_codes[order].tolist(), counts[order].tolist(), strict=True):
+            a, b = sorted((offsets[code // block_count], offsets[code % block_count]))
+            results.append((a, b, count))
+        return results
+
+    def save(self, path: Path | str) -> None:
+        """
+        Save the index as a NumPy archive.
+
+        Args:
+            path: Destination file
+        """
+        lengths = np.array([len(keys) for keys in self._block_keys], dtype=np.int64)
+        path = Path(path)
+        temp_path = path.with_name(path.name + ".tmp")
+        with temp_path.open("wb") as f:
+            np.savez(
+                f,
+                offsets=np.array(self._block_offsets, dtype=np.int64),
+                lengths=lengths,
+                keys=np.concatenate(self._block_keys) if self._block_keys else np.empty(0, dtype=np.uint64),
+                flips=np.concatenate(self._block_flips) if self._block_flips else np.empty(0, dtype=np.uint8),
+                skip_solid=np.array(self.skip_solid),
+            )
+        temp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path | str) -> TileIndex:
+        """
+        Load an index written by save.
+
+        Args:
+            path: Archive file
+
+        Returns:
+            The loaded index
+        """
+        with np.load(path) as data:
+            index = cls(skip_solid=bool(data["skip_solid"]))
+            bounds = np.r_[0, np.cumsum(data["lengths"])]
+            keys, flips = data["keys"], data["flips"]
+            for block_id, offset in enumerate(data["offsets"].tolist()):
+                index._register_block(
+                    offset, keys[bounds[block_id]:bounds[block_id + 1]], flips[bounds[block_id]:bounds[block_id + 1]]
+                )
+        return index
+
+    def _register_block(self, offset: int, keys: np.ndarray, flips: np.ndarray) -> None:
+        """Record a block's tiles; they reach the posting table on the next query"""
+        block_id = len(self._block_offsets)
+        self._block_ids[offset] = block_id
+        self._block_offsets.append(offset)
+        self._block_keys.append(keys)
+        self._block_flips.append(flips)
+        self._first_with_content.setdefault(_content_digest(keys, flips), block_id)
+        self._pending.append(block_id)
+
+    def _occurrences(self, key: np.uint64, flip: int) -> list[TileOccurrence]:
+        """Postings of a key, with flips made relative to a tile of the given flip"""
+        self._finalize()
+        position = int(np.searchsorted(self._keys, key))
+        if position == len(self._keys) or self._keys[position] != key:
+            return []
+        postings = slice(self._starts[position], self._starts[position + 1])
+        return [
+            TileOccurrence(self._block_offsets[block], tile, TileFlip(posting_flip ^ flip))
+            for block, tile, posting_flip in zip(
+                self._posting_blocks[postings].tolist(),
+                self._posting_tiles[postings].tolist(),
+                self._posting_flips[postings].tolist(),
+                strict=True,
+            )
+        ]
+
+    def _finalize(self) -> None:
+        """Merge pending blocks into the sorted posting table"""
+        if not self._pending:
+            return
+
+        keys, blocks, tiles, flips = [], [], [], []
+        for block_id in self._pending:
+            kept = np.flatnonzero(self._block_flips[block_id] != _SKIPPED)
+            keys.append(self._block_keys[block_id][kept])
+            blocks.append(np.full(len(kept), block_id, dtype=np.int32))
+            tiles.append(kept.astype(np.int32))
+            flips.append(self._block_flips[block_id][kept])
+        self._pending = []
+
+        # Expand the existing table back to one key per posting and merge
+        all_keys = np.concatenate([np.repeat(self._keys, np.diff(self._starts)), *keys])
+        all_blocks = np.concatenate([self._posting_blocks, *blocks])
+        all_tiles = np.concatenate([self._posting_tiles, *tiles])
+        all_flips = np.concatenate([self._posting_flips, *flips])
+
+        # Sort by key, then by block and tile so postings come out in ROM order
+        block_offsets = np.array(self._block_offsets, dtype=np.int64)
+        order = np.lexsort((all_tiles, block_offsets[all_blocks], all_keys))
+        sorted_keys = all_keys[order]
+        self._posting_blocks = all_blocks[order]
+        self._posting_tiles = all_tiles[order]
+        self._posting_flips = all_flips[order]
+
+        self._keys, first = np.unique(sorted_keys, return_index=True)
+        self._starts = np.r_[first, len(sorted_keys)].astype(np.int64)
+
+def _content_digest(keys: np.ndarray, flips: np.ndarray) -> bytes:
+    """Digest of a block's tile keys and flips, in tile order"""
+    digest = hashlib.blake2b(np.ascontiguousarray(keys, dtype=np.uint64).tobytes(), digest_size=16)
+    digest.update(np.ascontiguousarray(flips, dtype=np.uint8).tobytes())
+    return digest.digest()
+
+def _expand_ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenate arange(start, end) over all ranges"""
+    lengths = ends - starts
+    if not lengths.sum():
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+    return np.arange(lengths.sum()) + offsets
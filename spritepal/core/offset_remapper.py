@@ -0,0 +1,269 @@
+"""
+Port known sprite offsets from one ROM revision to another.
+
+Sprite offsets in sprite_locations.json only hold for the revision they were
+found in; other revisions usually carry the same compressed streams, shifted
+by code and data that changed in front of them. Instead of rescanning the
+target ROM, each known sprite of the reference ROM gets a block signature:
+
+    polynomial hash of the first SIGNATURE_LENGTH compressed bytes
+    + decompressed size and digest
+
+One vectorized pass hashes every window of the target ROM. Windows whose
+hash matches a signature are checked byte for byte, the nearest few are
+decompressed, and a candidate is accepted only if its decompressed size and
+digest match the reference sprite.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from core.batch_extraction import BatchSprite
+    from core.hal_compression import HALCompressor
+
+logger = get_logger(__name__)
+
+# Compressed bytes hashed per sprite; long enough that padding rarely matches
+SIGNATURE_LENGTH = 32
+
+# Candidates per sprite decompressed to confirm a match, nearest first
+MAX_CANDIDATES = 8
+
+# Odd multiplier of the window hash; arithmetic wraps modulo 2**64
+_HASH_BASE = np.uint64(0x100000001B3)
+
+def window_hashes(data: bytes, length: int = SIGNATURE_LENGTH) -> np.ndarray:
+    """
+    Rolling polynomial hash of every window of data.
+
+    Computed as length shifted multiply-adds over the whole buffer, which gives
+    the same values as a Rabin-Karp rolling update without a Python loop per byte.
+
+    Args:
+        data: Bytes to hash
+        length: Window length
+
+    Returns:
+        uint64 array; entry i hashes data[i:i + length]
+    """
+    count = len(data) - length + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    values = np.frombuffer(data, dtype=np.uint8).astype(np.uint64)
+    hashes = np.zeros(count, dtype=np.uint64)
+    for shift in range(length):
+        hashes *= _HASH_BASE
+        hashes += values[shift:shift + count]
+    return hashes
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+@dataclass(frozen=True)
+class BlockSignature:
+    """Identifies a sprite's compressed stream independently of its offset"""
+
+    name: str
+    offset: int
+    prefix: bytes
+    prefix_hash: int
+    decompressed_size: int
+    digest: str
+
+@dataclass
+class OffsetRemap:
+    """Where a reference sprite lives in the target ROM"""
+
+    name: str
+    reference_offset: int
+    target_offset: int | None = None
+    candidates: list[int] = field(default_factory=list)  # Every verified offset
+    error: str | None = None
+
+    @property
+    def found(self) -> bool:
+        return self.target_offset is not None
+
+    @property
+    def moved(self) -> bool:
+        return self.found and self.target_offset != self.reference_offset
+
+@dataclass
+class RemapSummary:
+    """Outcome of remapping a set of sprites"""
+
+    results: list[OffsetRemap]
+    seconds: float
+
+    @property
+    def found(self) -> int:
+        return sum(1 for result in self.results if result.found)
+
+    @property
+    def moved(self) -> int:
+        return sum(1 for result in self.results if result.moved)
+
+    @property
+    def missing(self) -> int:
+        return len(self.results) - self.found
+
+    def remapped(self) -> list[tuple[str, int, int]]:
+        """(name, reference offset, target offset) of every found sprite"""
+        return [
+            (result.name, result.reference_offset, result.target_offset)
+            for result in self.results
+            if result.target_offset is not None
+        ]
+
+class OffsetRemapper:
+    """Finds a reference ROM's sprites in another revision by block signature"""
+
+    def __init__(
+        self,
+        hal_compressor: HALCompressor,
+        signature_length: int = SIGNATURE_LENGTH,
+        max_candidates: int = MAX_CANDIDATES,
+    ) -> None:
+        """
+        Args:
+            hal_compressor: Decompresses the reference sprites and the candidates
+            signature_length: Compressed bytes hashed per sprite
+            max_candidates: Candidates per sprite decompressed to confirm a match
+        """
+        self.hal_compressor = hal_compressor
+        self.signature_length = signature_length
+        self.max_candidates = max_candidates
+
+    def build_signatures(
+        self, rom_path: str, sprites: Iterable[BatchSprite]
+    ) -> tuple[list[BlockSignature], list[OffsetRemap]]:
+        """
+        Fingerprint sprites of the reference ROM.
+
+        Args:
+            rom_path: Reference ROM
+            sprites: Sprites at their reference offsets
+
+        Returns:
+            Tuple of (signatures, failures for sprites that could not be fingerprinted)
+        """
+        rom_data = Path(rom_path).read_bytes()
+        sprites = list({sprite.offset: sprite for sprite in sprites}.values())
+        decompressed = self.hal_compressor.decompress_batch([(rom_path, sprite.offset) for sprite in sprites])
+
+        signatures = []
+        failures = []
+        for sprite, (ok, data) in zip(sprites, decompressed, strict=True):
+            name = sprite.file_stem
+            prefix = rom_data[sprite.offset:sprite.offset + self.signature_length]
+            if not ok or not isinstance(data, bytes):
+                failures.append(OffsetRemap(name, sprite.offset, error=f"Reference sprite failed to decompress: {data}"))
+            elif len(prefix) < self.signature_length:
+                failures.append(OffsetRemap(name, sprite.offset, error="Reference sprite is too close to the end of the ROM"))
+            else:
+                prefix_hash = int(window_hashes(prefix, self.signature_length)[0])
+                signatures.append(BlockSignature(name, sprite.offset, prefix, prefix_hash, len(data), _digest(data)))
+        return signatures, failures
+
+    def find_signatures(self, rom_path: str, signatures: list[BlockSignature]) -> list[OffsetRemap]:
+        """
+        Locate signatures in a target ROM with one hashing pass.
+
+        Args:
+            rom_path: Target ROM
+            signatures: Signatures from build_signatures
+
+        Returns:
+            One OffsetRemap per signature, in the same order
+        """
+        rom_data = Path(rom_path).read_bytes()
+        positions = self._matching_windows(rom_data, signatures)
+
+        # Byte-compare the windows (ruling out hash collisions) and keep the nearest
+        candidates: list[list[int]] = []
+        for signature in signatures:
+            offsets = positions.get(signature.prefix_hash, np.zeros(0, dtype=np.int64))
+            nearest = offsets[np.argsort(np.abs(offsets - signature.offset), kind="stable")]
+            matching = []
+            for offset in nearest.tolist():
+                if rom_data[offset:offset + self.signature_length] == signature.prefix:
+                    matching.append(offset)
+                    if len(matching) == self.max_candidates:
+                        break
+            candidates.append(matching)
+
+        requests = [(rom_path, offset) for matching in candidates for offset in matching]
+        decompressed = iter(self.hal_compressor.decompress_batch(requests) if requests else [])
+
+        results = []
+        for signature, matching in zip(signatures, candidates, strict=True):
+            verified = []
+            for offset in matching:
+                ok, data = next(decompressed)
+                if ok and isinstance(data, bytes) and len(data) == signature.decompressed_size \
+                        and _digest(data) == signature.digest:
+                    verified.append(offset)
+
+            result = OffsetRemap(signature.name, signature.offset, candidates=verified)
+            if verified:
+                # Candidates are ordered nearest first
+                result.target_offset = verified[0]
+            elif matching:
+                result.error = "Compressed stream found but its decompressed data differs"
+            else:
+                result.error = "Compressed stream not found in target ROM"
+            results.append(result)
+        return results
+
+    def remap(self, reference_rom: str, target_rom: str, sprites: Iterable[BatchSprite]) -> RemapSummary:
+        """
+        Port sprite offsets from the reference ROM to the target ROM.
+
+        Args:
+            reference_rom: ROM the offsets are known for
+            target_rom: Other revision of the same game
+            sprites: Sprites at their reference offsets
+
+        Returns:
+            RemapSummary with one result per distinct sprite offset
+        """
+        start_time = time.perf_counter()
+        signatures, failures = self.build_signatures(reference_rom, sprites)
+        results = self.find_signatures(target_rom, signatures) + failures
+        results.sort(key=lambda result: result.reference_offset)
+
+        summary = RemapSummary(results, time.perf_counter() - start_time)
+        logger.info(
+            f"Remapped {summary.found}/{len(results)} sprites to {Path(target_rom).name} "
+            f"({summary.moved} moved) in {summary.seconds:.2f}s"
+        )
+        return summary
+
+    def _matching_windows(self, rom_data: bytes, signatures: list[BlockSignature]) -> dict[int, np.ndarray]:
+        """Offsets of every window whose hash equals a signature's, by hash"""
+        if not signatures:
+            return {}
+        hashes = window_hashes(rom_data, self.signature_length)
+        wanted = np.unique(np.array([signature.prefix_hash for signature in signatures], dtype=np.uint64))
+        offsets = np.flatnonzero(np.isin(hashes, wanted))
+        if not offsets.size:
+            return {}
+
+        # Group the hits by hash with one sort
+        hit_hashes = hashes[offsets]
+        order = np.argsort(hit_hashes, kind="stable")
+        offsets, hit_hashes = offsets[order], hit_hashes[order]
+        keys, starts = np.unique(hit_hashes, return_index=True)
+        groups = np.split(offsets.astype(np.int64), starts[1:])
+        return {int(key): group for key, group in zip(keys, groups, strict=True)}
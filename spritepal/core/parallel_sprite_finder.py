@@ -9,11 +9,11 @@ from __future__ import annotations
 import logging
 import threading
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from core.sprite_finder import SpriteFinder
 from utils.constants import (
@@ -22,6 +22,9 @@ from utils.constants import (
     MIN_SPRITE_SIZE,
 )
 
+if TYPE_CHECKING:
+    from core.hal_compression import HALCompressor
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -57,7 +60,8 @@ class ParallelSpriteFinder:
         self,
         num_workers: int = 4,
         chunk_size: int = 0x40000,  # 256KB chunks
-        step_size: int = DEFAULT_SCAN_STEP
+        step_size: int = DEFAULT_SCAN_STEP,
+        hal_compressor: HALCompressor | None = None
     ):
         """
         Initialize parallel sprite finder.
@@ -66,6 +70,8 @@ class ParallelSpriteFinder:
             num_workers: Number of parallel workers
             chunk_size: Size of each search chunk in bytes
             step_size: Step size for scanning within chunks
+            hal_compressor: Compressor shared by the workers' sprite finders,
+                or None to create one per finder
         """
         self.num_workers = num_workers
         self.chunk_size = chunk_size
@@ -73,7 +79,7 @@ class ParallelSpriteFinder:
         self.executor = ThreadPoolExecutor(max_workers=num_workers)
 
         # Create sprite finders for each worker
-        self.sprite_finders = [SpriteFinder() for _ in range(num_workers)]
+        self.sprite_finders = [SpriteFinder(hal_compressor=hal_compressor) for _ in range(num_workers)]
 
         logger.info(
             f"Initialized ParallelSpriteFinder with {num_workers} workers, "
@@ -101,6 +107,52 @@ class ParallelSpriteFinder:
         Returns:
             List of found sprites sorted by offset
         """
+        start_time = time.time()
+        all_results = []
+
+        for completed_chunks, total_chunks, results in self.iter_search(
+            rom_path, start_offset, end_offset, cancellation_token
+        ):
+            all_results.extend(results)
+
+            # Update progress
+            if progress_callback:
+                progress = int((completed_chunks / total_chunks) * 100)
+                progress_callback(progress, 100)
+
+        # Sort results by offset
+        all_results.sort(key=lambda x: x.offset)
+
+        elapsed = time.time() - start_time
+        logger.info(
+            f"Parallel search complete: found {len(all_results)} sprites "
+            f"in {elapsed:.2f}s ({len(all_results)/elapsed:.1f} sprites/sec)"
+        )
+
+        return all_results
+
+    def iter_search(
+        self,
+        rom_path: str,
+        start_offset: int = 0,
+        end_offset: int | None = None,
+        cancellation_token: threading.Event | None = None
+    ) -> Iterator[tuple[int, int, list[SearchResult]]]:
+        """
+        Search ROM regions in parallel, yielding each chunk as it completes.
+
+        Chunks finish in any order. Closing the generator early cancels the
+        chunks that have not started yet.
+
+        Args:
+            rom_path: Path to ROM file
+            start_offset: Starting offset for search
+            end_offset: Ending offset (None for entire ROM)
+            cancellation_token: Optional token to cancel search
+
+        Yields:
+            (completed_chunks, total_chunks, results) per finished chunk
+        """
         # Read ROM data
         with Path(rom_path).open("rb") as f:
             rom_data = f.read()
@@ -119,7 +171,6 @@ class ParallelSpriteFinder:
         )
 
         # Submit search tasks
-        start_time = time.time()
         futures = {}
 
         for i, chunk in enumerate(chunks):
@@ -140,41 +191,26 @@ class ParallelSpriteFinder:
             )
             futures[future] = chunk
 
-        # Collect results
-        all_results = []
         completed_chunks = 0
-
-        for future in as_completed(futures):
-            chunk = futures[future]
-
-            try:
-                results = future.result()
-                all_results.extend(results)
+        try:
+            for future in as_completed(futures):
+                chunk = futures[future]
                 completed_chunks += 1
 
-                # Update progress
-                if progress_callback:
-                    progress = int((completed_chunks / total_chunks) * 100)
-                    progress_callback(progress, 100)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.exception(f"Error searching chunk {chunk.chunk_id}: {e}")
+                    continue
 
                 logger.debug(
                     f"Chunk {chunk.chunk_id} complete: "
                     f"found {len(results)} sprites"
                 )
-
-            except Exception as e:
-                logger.exception(f"Error searching chunk {chunk.chunk_id}: {e}")
-
-        # Sort results by offset
-        all_results.sort(key=lambda x: x.offset)
-
-        elapsed = time.time() - start_time
-        logger.info(
-            f"Parallel search complete: found {len(all_results)} sprites "
-            f"in {elapsed:.2f}s ({len(all_results)/elapsed:.1f} sprites/sec)"
-        )
-
-        return all_results
+                yield completed_chunks, total_chunks, results
+        finally:
+            for future in futures:
+                future.cancel()
 
     def _create_chunks(self, start: int, end: int) -> list[SearchChunk]:
         """Divide search range into chunks."""
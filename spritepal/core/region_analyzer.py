@@ -10,12 +10,15 @@ from collections.abc import Callable
 from dataclasses import dataclass
 from typing import NamedTuple
 
+import numpy as np
 from utils.constants import (
     EMPTY_REGION_ENTROPY_THRESHOLD,
     EMPTY_REGION_MAX_UNIQUE_BYTES,
     EMPTY_REGION_PATTERN_THRESHOLD,
     EMPTY_REGION_SIZE,
     EMPTY_REGION_ZERO_THRESHOLD,
+    FREE_SPACE_FILL_BYTES,
+    FREE_SPACE_MIN_RUN,
 )
 from utils.logging_config import get_logger
 
@@ -277,6 +280,38 @@ class EmptyRegionDetector:
         logger.info(f"Optimized {len(regions)} regions into {len(merged)} scan ranges")
         return merged
 
+    def find_fill_runs(
+        self,
+        rom_data: bytes | bytearray,
+        fill_bytes: tuple[int, ...] = FREE_SPACE_FILL_BYTES,
+        min_length: int = FREE_SPACE_MIN_RUN,
+    ) -> list[tuple[int, int]]:
+        """
+        Find runs of padding bytes at byte granularity.
+
+        Args:
+            rom_data: Complete ROM data
+            fill_bytes: Byte values that count as padding
+            min_length: Shortest run to report
+
+        Returns:
+            Sorted list of (start_offset, end_offset) tuples, one per run
+        """
+        data = np.frombuffer(rom_data, dtype=np.uint8)
+        edge = np.zeros(1, dtype=np.int8)
+        runs: list[tuple[int, int]] = []
+        for fill in fill_bytes:
+            # +1 where a run starts, -1 one past where it ends
+            steps = np.diff(np.concatenate((edge, (data == fill).view(np.int8), edge)))
+            starts = np.flatnonzero(steps == 1)
+            ends = np.flatnonzero(steps == -1)
+            keep = ends - starts >= min_length
+            runs.extend(zip(starts[keep].tolist(), ends[keep].tolist(), strict=True))
+
+        runs.sort()
+        logger.debug(f"Found {len(runs)} padding runs of at least {min_length} bytes")
+        return runs
+
     def clear_cache(self):
         """Clear the analysis cache."""
         self._cache.clear()
@@ -5,8 +5,9 @@ Extracts sprites directly from ROM files using HAL decompression
 from __future__ import annotations
 
 import math
+from concurrent.futures import Future
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 if TYPE_CHECKING:
     import logging
@@ -15,10 +16,10 @@ else:
 
 from core.default_palette_loader import DefaultPaletteLoader
 from core.hal_compression import HALCompressionError, HALCompressor
+from core.indexed_image import IndexedImage
 from core.rom_injector import ROMInjector, SpritePointer
 from core.rom_palette_extractor import ROMPaletteExtractor
 from core.sprite_config_loader import SpriteConfigLoader
-from PIL import Image
 from utils.constants import (
     BUFFER_SIZE_1KB,
     BUFFER_SIZE_2KB,
@@ -35,7 +36,6 @@ from utils.constants import (
     MAX_ALIGNMENT_ERROR,
     MAX_BYTE_VALUE,
     MIN_SPRITE_TILES,
-    PIXEL_SCALE_FACTOR,
     PROGRESS_LOG_INTERVAL,
     PROGRESS_SAVE_INTERVAL,
     ROM_SCAN_STEP_DEFAULT,
@@ -44,9 +44,7 @@ from utils.constants import (
     SPRITE_QUALITY_BONUS,
     SPRITE_QUALITY_THRESHOLD,
     TILE_ANALYSIS_SAMPLE,
-    TILE_HEIGHT,
     TILE_PLANE_SIZE,
-    TILE_WIDTH,
     TYPICAL_SPRITE_MAX,
     TYPICAL_SPRITE_MIN,
 )
@@ -56,14 +54,28 @@ from utils.rom_exceptions import ROMCompressionError
 
 logger: logging.Logger = get_logger(__name__)
 
+class ROMSpriteExtraction(NamedTuple):
+    """An extracted sprite whose PNG may still be encoding"""
+
+    image: IndexedImage
+    output_path: str
+    png_written: Future[str]
+    extraction_info: dict[str, Any]
+
 class ROMExtractor:
     """Handles sprite extraction directly from ROM files"""
 
-    def __init__(self) -> None:
-        """Initialize ROM extractor with required components"""
+    def __init__(self, hal_compressor: HALCompressor | None = None) -> None:
+        """
+        Initialize ROM extractor with required components
+
+        Args:
+            hal_compressor: Compressor shared with the ROM injector, or None to
+                give each its own compressor with a process pool
+        """
         logger.debug("Initializing ROMExtractor")
-        self.hal_compressor: HALCompressor = HALCompressor()
-        self.rom_injector: ROMInjector = ROMInjector()
+        self.hal_compressor: HALCompressor = hal_compressor or HALCompressor()
+        self.rom_injector: ROMInjector = ROMInjector(hal_compressor)
         self.default_palette_loader: DefaultPaletteLoader = DefaultPaletteLoader()
         self.rom_palette_extractor: ROMPaletteExtractor = ROMPaletteExtractor()
         self.sprite_config_loader: SpriteConfigLoader = SpriteConfigLoader()
@@ -115,6 +127,29 @@ class ROMExtractor:
         Returns:
             Tuple of (output_png_path, extraction_info)
         """
+        extraction = self.extract_sprite_image(rom_path, sprite_offset, output_base, sprite_name)
+        extraction.png_written.result()
+        return extraction.output_path, extraction.extraction_info
+
+    def extract_sprite_image(
+        self, rom_path: str, sprite_offset: int, output_base: str, sprite_name: str = ""
+    ) -> ROMSpriteExtraction:
+        """
+        Extract a sprite from ROM into memory, encoding its PNG in the background.
+
+        The decoded image is returned as soon as palettes and metadata are
+        ready; the PNG is written while those stages run. Wait on
+        png_written before reading the file.
+
+        Args:
+            rom_path: Path to ROM file
+            sprite_offset: Offset in ROM where sprite data is located
+            output_base: Base name for output files (without extension)
+            sprite_name: Name of the sprite (e.g., "kirby_normal")
+
+        Returns:
+            The in-memory image, PNG path, PNG future and extraction info
+        """
         logger.info("=" * 60)
         logger.info(f"Starting ROM sprite extraction: offset=0x{sprite_offset:X}, sprite={sprite_name or 'unnamed'}")
         logger.debug(f"ROM path: {rom_path}")
@@ -132,10 +167,16 @@ class ROMExtractor:
                 rom_data, sprite_offset, expected_size
             )
 
-            # Stage 4: Convert to PNG
+            # Stage 4: Decode tiles and start encoding the PNG
             output_path = f"{output_base}.png"
             logger.info(f"Converting decompressed data to PNG: {output_path}")
-            tile_count = self._convert_4bpp_to_png(sprite_data, output_path)
+            image = self._decode_4bpp_image(sprite_data)
+            tile_count = image.tile_count
+            if tile_count:
+                png_written = image.save_png_async(output_path)
+            else:
+                png_written = Future()
+                png_written.set_result(output_path)
 
             # Stage 5: Extract palettes (ROM or default)
             palette_files, rom_palettes_used = self._extract_rom_palettes(
@@ -173,7 +214,7 @@ class ROMExtractor:
             logger.info(f"Palettes: {len(palette_files)} files")
             logger.info("=" * 60)
 
-            return output_path, extraction_info
+            return ROMSpriteExtraction(image, output_path, png_written, extraction_info)
 
     def _validate_and_read_rom(self, rom_path: str) -> tuple[Any, bytes]:
         """
@@ -397,60 +438,33 @@ class ROMExtractor:
         Returns:
             Number of tiles extracted
         """
-        # Calculate dimensions
-        num_tiles = len(tile_data) // BYTES_PER_TILE
-        tiles_per_row = DEFAULT_TILES_PER_ROW  # Standard width for sprite sheets
+        image = self._decode_4bpp_image(tile_data)
+        if image.tile_count:
+            image.save_png(output_path)
+            logger.info(f"Saved PNG: {output_path} ({image.width}x{image.height} pixels, {image.tile_count} tiles)")
+        return image.tile_count
 
-        # Handle empty data gracefully
-        if num_tiles == 0:
+    def _decode_4bpp_image(self, tile_data: bytes) -> IndexedImage:
+        """
+        Decode 4bpp tile data into a grayscale sprite sheet in memory.
+
+        Args:
+            tile_data: Raw 4bpp tile data
+
+        Returns:
+            Sheet DEFAULT_TILES_PER_ROW tiles wide; empty if there is no complete tile
+        """
+        image = IndexedImage.from_4bpp(tile_data, DEFAULT_TILES_PER_ROW)
+        if image.tile_count == 0:
             logger.info("No tile data to convert (0 bytes)")
-            return 0
+            return image
 
-        # Check if we have partial tile data
         if len(tile_data) % BYTES_PER_TILE != 0:
             logger.warning(f"Tile data not aligned: {len(tile_data)} bytes ({len(tile_data) % BYTES_PER_TILE} extra bytes)")
 
-        # Calculate image dimensions
-        img_width = tiles_per_row * TILE_WIDTH
-        img_height = ((num_tiles + tiles_per_row - 1) // tiles_per_row) * TILE_HEIGHT
-
-        logger.info(f"Converting 4bpp data: {len(tile_data)} bytes -> {num_tiles} tiles")
-        logger.debug(f"Tiles per row: {tiles_per_row}")
-        logger.debug(f"Image dimensions: {img_width}x{img_height} pixels")
-
-        # Create grayscale image
-        img = Image.new("L", (img_width, img_height), 0)
-
-        # Process each tile
-        log_interval = PROGRESS_LOG_INTERVAL  # Log progress every 100 tiles
-
-        for tile_idx in range(num_tiles):
-            # Calculate tile position
-            tile_x = (tile_idx % tiles_per_row) * TILE_WIDTH
-            tile_y = (tile_idx // tiles_per_row) * TILE_HEIGHT
-
-            if (tile_idx + 1) % log_interval == 0:
-                logger.debug(f"Processing tile {tile_idx + 1}/{num_tiles}")
-
-            # Extract tile data
-            tile_offset = tile_idx * BYTES_PER_TILE
-            tile_bytes = tile_data[tile_offset : tile_offset + BYTES_PER_TILE]
-
-            # Convert 4bpp planar to pixels
-            for y in range(TILE_HEIGHT):
-                for x in range(TILE_WIDTH):
-                    # Get pixel value from 4bpp planar format
-                    pixel = self._get_4bpp_pixel(tile_bytes, x, y)
-                    # Convert 4-bit value to 8-bit grayscale (0-15 -> 0-255)
-                    gray_value = pixel * PIXEL_SCALE_FACTOR
-                    img.putpixel((tile_x + x, tile_y + y), gray_value)
-
-        # Save as indexed PNG
-        img = img.convert("P")
-        img.save(output_path, "PNG")
-
-        logger.info(f"Saved PNG: {output_path} ({img.width}x{img.height} pixels, {num_tiles} tiles)")
-        return num_tiles
+        logger.info(f"Converting 4bpp data: {len(tile_data)} bytes -> {image.tile_count} tiles")
+        logger.debug(f"Image dimensions: {image.width}x{image.height} pixels")
+        return image
 
     def _get_4bpp_pixel(self, tile_data: bytes, x: int, y: int) -> int:
         """
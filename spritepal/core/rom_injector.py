@@ -4,13 +4,17 @@ Handles injection of edited sprites directly into ROM files.
 """
 from __future__ import annotations
 
+import itertools
 import struct
 import tempfile
 import time
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 # Only import Qt for type checking and the worker class
+from core.free_space import FreeSpaceMap, PointerTableEntry
 from core.hal_compression import HALCompressionError, HALCompressor
 from core.injector import SpriteInjector
 from core.rom_validator import ROMValidator
@@ -24,9 +28,17 @@ from utils.constants import (
 from utils.file_validator import atomic_write
 from utils.logging_config import get_logger
 from utils.rom_backup import ROMBackupManager
+from utils.rom_cache import get_rom_cache
+from utils.rom_checksum import calculate_snes_checksum, update_snes_checksum
 
 logger = get_logger(__name__)
 
+# Compression modes tried for every injection, as (name, fast)
+COMPRESSION_MODES = (("standard", False), ("fast", True))
+
+# Name of the tile data as converted from the sprite PNG
+ORIGINAL_TILE_ORDER = "original"
+
 @dataclass
 class ROMHeader:
     """SNES ROM header information"""
@@ -49,14 +61,93 @@ class SpritePointer:
     compressed_size: int | None = None
     offset_variants: list[int] | None = None
 
+@dataclass
+class CompressionTrial:
+    """One candidate encoding of a sprite: a tile ordering compressed in one mode"""
+
+    tile_order: str
+    fast: bool
+    size: int = 0
+    seconds: float = 0.0  # Wall time; the whole batch's when run through the pool
+    data: bytes = b""
+    error: str | None = None
+
+    @property
+    def mode(self) -> str:
+        """Compression mode name"""
+        return "fast" if self.fast else "standard"
+
+    @property
+    def name(self) -> str:
+        """Mode, qualified by the tile ordering when it is not the original"""
+        if self.tile_order == ORIGINAL_TILE_ORDER:
+            return self.mode
+        return f"{self.mode}, {self.tile_order} tile order"
+
+    def describe(self) -> str:
+        """One-line summary of size and time"""
+        if self.error:
+            return f"{self.name}: failed ({self.error})"
+        return f"{self.name}: {self.size} bytes in {self.seconds:.2f}s"
+
+def select_compression_trial(
+    trials: list[CompressionTrial], max_size: int, prefer_fast: bool = False
+) -> CompressionTrial | None:
+    """
+    Pick the smallest successful trial that fits in max_size bytes.
+
+    Ties go to the preferred mode, then to the original tile order.
+
+    Returns:
+        The chosen trial, or None if nothing fits
+    """
+    fitting = [t for t in trials if t.error is None and 0 < t.size <= max_size]
+    if not fitting:
+        return None
+    return min(
+        fitting,
+        key=lambda t: (t.size, t.fast != prefer_fast, t.tile_order != ORIGINAL_TILE_ORDER),
+    )
+
+@dataclass
+class SpriteInjectionResult:
+    """Outcome of one sprite in a batch injection"""
+
+    sprite_path: str
+    offset: int
+    uncompressed_size: int = 0
+    original_size: int = 0
+    compressed_size: int = 0
+    compression_mode: str = ""
+    trials: list[CompressionTrial] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def fits(self) -> bool:
+        """Whether the compressed sprite fits in the original's space"""
+        return self.error is None and 0 < self.compressed_size <= self.original_size
+
+    @property
+    def compression_ratio(self) -> float:
+        """Size reduction from compression, in percent"""
+        if not self.uncompressed_size:
+            return 0.0
+        return (self.uncompressed_size - self.compressed_size) / self.uncompressed_size * 100
+
 class ROMInjector(SpriteInjector):
     """Handles sprite injection directly into ROM files"""
 
-    def __init__(self) -> None:
+    def __init__(self, hal_compressor: HALCompressor | None = None) -> None:
+        """
+        Args:
+            hal_compressor: Compressor to use, or None to create one with a process pool
+        """
         super().__init__()
-        self.hal_compressor: HALCompressor = HALCompressor()
+        self.hal_compressor: HALCompressor = hal_compressor or HALCompressor()
         self.rom_data: bytearray | None = None
         self.header: ROMHeader | None = None
+        # Checksum of rom_data as it currently is, kept current by patch deltas
+        self._data_checksum: int | None = None
         self.sprite_config_loader: SpriteConfigLoader = SpriteConfigLoader()
         logger.debug("ROMInjector initialized with HAL compression support")
 
@@ -116,13 +207,9 @@ class ROMInjector(SpriteInjector):
         logger.debug("Calculating ROM checksum")
         # Skip SMC header if present
         offset = self.header.header_offset if self.header else 0
-        data = rom_data[offset:]
 
         # Calculate checksum
-        checksum = 0
-        for i in range(0, len(data), 2):
-            word = data[i + 1] << 8 | data[i] if i + 1 < len(data) else data[i]
-            checksum = (checksum + word) & ROM_CHECKSUM_COMPLEMENT_MASK
+        checksum = calculate_snes_checksum(rom_data, offset)
 
         # Calculate complement
         complement = checksum ^ ROM_CHECKSUM_COMPLEMENT_MASK
@@ -130,29 +217,86 @@ class ROMInjector(SpriteInjector):
         logger.debug(f"Calculated checksum: 0x{checksum:04X}, complement: 0x{complement:04X}")
         return checksum, complement
 
-    def update_rom_checksum(self, rom_data: bytearray) -> None:
-        """Update ROM checksum after modification"""
+    def update_rom_checksum(
+        self,
+        rom_data: bytearray,
+        patches: Iterable[tuple[int, bytes | bytearray, bytes | bytearray]] | None = None,
+    ) -> tuple[int, bytes, bytes]:
+        """
+        Update ROM checksum after modification.
+
+        Args:
+            rom_data: Modified ROM data
+            patches: (offset, old bytes, new bytes) for every range modified since
+                the ROM was loaded or last checksummed. When given, the checksum is
+                updated by their deltas instead of being recalculated in full.
+
+        Returns:
+            (offset, old bytes, new bytes) of the rewritten header checksum fields
+        """
         if not self.header:
             raise ValueError("ROM header not loaded")
 
         logger.info("Updating ROM checksum after modification")
-        # Calculate new checksum
-        checksum, complement = self.calculate_checksum(rom_data)
+        if patches is None or self._data_checksum is None:
+            # Calculate new checksum
+            checksum, complement = self.calculate_checksum(rom_data)
+        else:
+            checksum = self._data_checksum
+            for offset, old, new in patches:
+                checksum = update_snes_checksum(checksum, offset - self.header.header_offset, old, new)
+            complement = checksum ^ ROM_CHECKSUM_COMPLEMENT_MASK
 
         # Find header location
         header_base = self.header.header_offset + (
             ROM_HEADER_OFFSET_LOROM if len(rom_data) <= 0x8000 else ROM_HEADER_OFFSET_HIROM
         )
 
-        # Update checksum in ROM
+        # Update checksum in ROM, keeping the data checksum current for the next update
+        old_fields = bytes(rom_data[header_base + 28 : header_base + 32])
         struct.pack_into("<H", rom_data, header_base + 28, complement)
         struct.pack_into("<H", rom_data, header_base + 30, checksum)
+        new_fields = bytes(rom_data[header_base + 28 : header_base + 32])
+        self._data_checksum = update_snes_checksum(
+            checksum, header_base + 28 - self.header.header_offset, old_fields, new_fields
+        )
 
         # Update header
         old_checksum = self.header.checksum
         self.header.checksum = checksum
         self.header.checksum_complement = complement
         logger.info(f"ROM checksum updated: 0x{old_checksum:04X} -> 0x{checksum:04X}")
+        return header_base + 28, old_fields, new_fields
+
+    def _backup_rom(
+        self, rom_path: str, patches: list[tuple[int, bytes, bytes]] | None = None
+    ) -> str | None:
+        """
+        Back up a ROM before it is written.
+
+        Args:
+            rom_path: Path to the unmodified ROM
+            patches: Ranges already patched into rom_data. When given, the backup
+                is journaled as a patch (with periodic full-copy anchors);
+                otherwise the whole ROM is copied.
+
+        Returns:
+            Error message if the backup failed, None on success
+        """
+        try:
+            if patches is None:
+                backup_path = ROMBackupManager.create_backup(rom_path)
+            else:
+                backup_path = ROMBackupManager.create_journaled_backup(rom_path, self.rom_data or b"", patches)
+            logger.info(f"Created backup: {backup_path}")
+        except Exception as e:
+            logger.error(f"Backup creation failed: {e}")
+            return (
+                f"Cannot proceed: backup creation failed ({e}). "
+                "Refusing to modify ROM without a backup. "
+                "Free up disk space or fix permissions and retry."
+            )
+        return None
 
     def find_compressed_sprite(
         self, rom_data: bytes | bytearray, offset: int, expected_size: int | None = None
@@ -413,21 +557,42 @@ class ROMInjector(SpriteInjector):
         sprite_offset: int,
         fast_compression: bool = False,
         create_backup: bool = True,
+        journal_backup: bool = True,
+        tile_orders: dict[str, bytes] | None = None,
+        relocate_pointer: PointerTableEntry | None = None,
+        free_space: FreeSpaceMap | None = None,
     ) -> tuple[bool, str]:
         """
         Inject sprite directly into ROM file with validation and backup.
 
+        The sprite is compressed in every mode (and every alternative tile
+        ordering given) concurrently, and the smallest encoding that fits the
+        original sprite's space is injected. If nothing fits and a pointer
+        table entry is given, the smallest encoding is written to free space
+        instead and the pointer is updated to its new location.
+
         Args:
             sprite_path: Path to edited sprite PNG
             rom_path: Path to input ROM
             output_path: Path for output ROM
             sprite_offset: Offset in ROM where sprite data is located
-            fast_compression: Use fast compression mode
+            fast_compression: Prefer fast compression when modes tie on size
             create_backup: Create backup before modification
+            journal_backup: Back up only the overwritten ranges as a patch
+                instead of copying the whole ROM
+            tile_orders: Alternative 4bpp tile data for the same sprite that the
+                game accepts, keyed by a name for the ordering
+            relocate_pointer: Pointer to the sprite, rewritten if the sprite is
+                relocated; without it, sprites that do not fit are rejected
+            free_space: Free space to relocate into; space used is reserved in
+                it, and released again if the injection fails. Built from the
+                ROM's padding minus every known sprite when not given
 
         Returns:
             Tuple of (success, message)
         """
+        # Free space reserved for a relocated sprite until the ROM is written
+        reserved: tuple[int, int] | None = None
         try:
             start_time = time.time()
             logger.info(
@@ -435,23 +600,15 @@ class ROMInjector(SpriteInjector):
             )
 
             # Validate ROM before modification
-            _header_info, _header_offset = ROMValidator.validate_rom_for_injection(
+            _header_info, header_offset = ROMValidator.validate_rom_for_injection(
                 rom_path, sprite_offset
             )
 
-            # Create backup if requested - ABORT if backup fails
-            backup_path = None
-            if create_backup:
-                try:
-                    backup_path = ROMBackupManager.create_backup(rom_path)
-                    logger.info(f"Created backup: {backup_path}")
-                except Exception as e:
-                    logger.error(f"Backup creation failed: {e}")
-                    return False, (
-                        f"Cannot proceed: backup creation failed ({e}). "
-                        "Refusing to modify ROM without a backup. "
-                        "Free up disk space or fix permissions and retry."
-                    )
+            # Create full backup if requested - ABORT if backup fails
+            if create_backup and not journal_backup:
+                backup_error = self._backup_rom(rom_path)
+                if backup_error:
+                    return False, backup_error
 
             # Read ROM header (using improved method)
             self.header = self.read_rom_header(rom_path)
@@ -459,6 +616,7 @@ class ROMInjector(SpriteInjector):
             # Load ROM data
             with Path(rom_path).open("rb") as f:
                 self.rom_data = bytearray(f.read())
+            self._data_checksum = self.calculate_checksum(self.rom_data)[0]
 
             # Convert PNG to 4bpp
             logger.info("Converting PNG to 4bpp tile data")
@@ -472,27 +630,60 @@ class ROMInjector(SpriteInjector):
             )
             logger.debug(f"Original sprite: {original_size} bytes compressed, {len(original_data)} bytes decompressed")
 
-            # Compress new sprite data
-            compression_start = time.time()
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".bin") as tmp:
-                compressed_path = tmp.name
-
-            compressed_size = self.hal_compressor.compress_to_file(
-                tile_data, compressed_path, fast=fast_compression
-            )
-            compression_time = time.time() - compression_start
-            logger.debug(f"Compression took {compression_time:.2f} seconds")
-
-            # Calculate compression statistics
-            uncompressed_size = len(tile_data)
-            if uncompressed_size == 0:
-                Path(compressed_path).unlink(missing_ok=True)
+            # Compress new sprite data in every mode and tile order concurrently
+            if not tile_data:
                 return False, "Cannot compress empty sprite data"
+            variants = {ORIGINAL_TILE_ORDER: tile_data, **(tile_orders or {})}
+            trials = self.run_compression_trials(variants)
+            trial_report = "\n".join(f"  - {trial.describe()}" for trial in trials)
+            logger.info(f"Compression trials:\n{trial_report}")
+
+            # Choose the smallest encoding that fits, relocating if allowed
+            best = select_compression_trial(trials, original_size, prefer_fast=fast_compression)
+            target_offset = sprite_offset
+            pointer_patch = None
+            if best is None:
+                smallest = select_compression_trial(
+                    trials, len(self.rom_data), prefer_fast=fast_compression
+                )
+                if smallest is None:
+                    raise HALCompressionError(trials[0].error or "Compression failed")
+                if relocate_pointer is None:
+                    return False, (
+                        f"Compressed sprite too large: {smallest.size} bytes at best "
+                        f"(original: {original_size} bytes).\n"
+                        f"Compression trials:\n{trial_report}\n"
+                        "Try using a smaller sprite, split it into parts, "
+                        "or give its pointer table entry to relocate it."
+                    )
+                best = smallest
+                if free_space is None:
+                    free_space = FreeSpaceMap.from_rom(
+                        self.rom_data,
+                        occupied=[(sprite_offset, original_size), *self._known_sprite_extents(rom_path)],
+                        bank_size=relocate_pointer.bank_size,
+                        base=header_offset,
+                    )
+                relocation = self._relocate(
+                    relocate_pointer, free_space, sprite_offset, best.size, header_offset
+                )
+                if isinstance(relocation, str):
+                    return False, (
+                        f"Compressed sprite too large: {best.size} bytes at best "
+                        f"(original: {original_size} bytes), and it cannot be relocated: "
+                        f"{relocation}\nCompression trials:\n{trial_report}"
+                    )
+                target_offset, pointer_patch = relocation
+                reserved = (target_offset, best.size)
+
+            compressed_data = best.data
+            compressed_size = best.size
+            uncompressed_size = len(variants[best.tile_order])
             compression_ratio = (
                 (uncompressed_size - compressed_size) / uncompressed_size * 100
             )
             space_saved = original_size - compressed_size
-            compression_mode = "fast" if fast_compression else "standard"
+            compression_mode = best.name
 
             logger.info(f"Compression statistics ({compression_mode} mode):")
             logger.info(f"  - Uncompressed size: {uncompressed_size} bytes")
@@ -500,47 +691,31 @@ class ROMInjector(SpriteInjector):
             logger.info(f"  - Compression ratio: {compression_ratio:.1f}%")
             logger.info(f"  - Space saved vs original: {space_saved} bytes")
 
-            # Check if compressed data fits
-            if compressed_size > original_size:
-                Path(compressed_path).unlink(missing_ok=True)
-                suggestion = (
-                    "standard compression"
-                    if fast_compression
-                    else "a smaller sprite or split it into parts"
-                )
-                return False, (
-                    f"Compressed sprite too large: {compressed_size} bytes "
-                    f"(original: {original_size} bytes).\n"
-                    f"Compression ratio: {compression_ratio:.1f}%\n"
-                    f"Try using {suggestion}."
-                )
-
-            # Read compressed data
-            with Path(compressed_path).open("rb") as f:
-                compressed_data = f.read()
-            Path(compressed_path).unlink(missing_ok=True)
-
             # Inject compressed data into ROM
-            logger.info(f"Injecting {compressed_size} bytes of compressed data at offset 0x{sprite_offset:X}")
-            self.rom_data[sprite_offset : sprite_offset + compressed_size] = (
-                compressed_data
-            )
+            if pointer_patch is None:
+                patches = [self._apply_patch(sprite_offset, compressed_data, original_size)]
+                location = f"at 0x{sprite_offset:X}"
+            else:
+                patches = [self._apply_patch(target_offset, compressed_data, 0), pointer_patch]
+                location = (
+                    f"at 0x{target_offset:X} (relocated from 0x{sprite_offset:X}, "
+                    f"pointer at 0x{relocate_pointer.offset:X} updated)"
+                )
 
-            # Pad remaining space if needed
-            if compressed_size < original_size:
-                padding = b"\xff" * (original_size - compressed_size)
-                self.rom_data[
-                    sprite_offset + compressed_size : sprite_offset + original_size
-                ] = padding
-                logger.info(f"Padded {original_size - compressed_size} bytes with 0xFF")
+            # Update checksum from the patched ranges only
+            patches.append(self.update_rom_checksum(self.rom_data, patches))
 
-            # Update checksum
-            self.update_rom_checksum(self.rom_data)
+            # Journal the patched ranges before the ROM is written - ABORT if backup fails
+            if create_backup and journal_backup:
+                backup_error = self._backup_rom(rom_path, patches)
+                if backup_error:
+                    return False, backup_error
 
             # Write output ROM atomically (prevents corruption on crash/power loss)
             logger.info(f"Writing modified ROM to: {output_path}")
             atomic_write(output_path, bytes(self.rom_data))
             logger.debug(f"Successfully wrote {len(self.rom_data)} bytes to output ROM")
+            reserved = None
 
             total_time = time.time() - start_time
             logger.info(f"ROM injection completed in {total_time:.2f} seconds")
@@ -551,14 +726,339 @@ class ROMInjector(SpriteInjector):
             return False, f"ROM injection error: {e!s}"
         else:
             return True, (
-                f"Successfully injected sprite at 0x{sprite_offset:X}\n"
+                f"Successfully injected sprite {location}\n"
                 f"Original size: {original_size} bytes\n"
                 f"New size: {compressed_size} bytes ({compression_ratio:.1f}% compression)\n"
                 f"Space saved: {space_saved} bytes\n"
                 f"Compression mode: {compression_mode}\n"
+                f"Compression trials:\n{trial_report}\n"
                 f"Checksum updated: 0x{self.header.checksum:04X}\n"
                 f"Total time: {total_time:.2f} seconds"
             )
+        finally:
+            if reserved is not None and free_space is not None:
+                free_space.release(*reserved)
+                logger.info(f"Released 0x{reserved[0]:X} (+{reserved[1]} bytes) after the failed injection")
+
+    def _known_sprite_extents(self, rom_path: str) -> list[tuple[int, int]]:
+        """
+        (offset, size) of every sprite known to live in the loaded ROM.
+
+        Configured sprites have no recorded compressed size, so their estimated
+        size stands in for it; cached scans record the compressed size.
+
+        Args:
+            rom_path: ROM the cached scans belong to
+
+        Returns:
+            Extents of the configured and previously scanned sprites
+        """
+        extents = []
+        if self.header is not None:
+            sprites = self.sprite_config_loader.get_game_sprites(self.header.title, self.header.checksum)
+            for config in sprites.values():
+                for offset in [config.offset, *(config.offset_variants or [])]:
+                    extents.append((offset, config.estimated_size))
+
+        try:
+            for sprite in get_rom_cache().get_cached_scan_sprites(rom_path):
+                size = sprite.get("compressed_size")
+                if isinstance(size, int) and size > 0:
+                    extents.append((sprite["offset"], size))
+        except Exception as e:
+            logger.warning(f"Could not read cached scan results: {e}")
+        return extents
+
+    def _relocate(
+        self,
+        pointer: PointerTableEntry,
+        free_space: FreeSpaceMap,
+        sprite_offset: int,
+        size: int,
+        header_offset: int,
+    ) -> tuple[int, tuple[int, bytes, bytes]] | str:
+        """
+        Reserve free space for a sprite and repoint its pointer table entry.
+
+        The pointer must currently point at the sprite. A 2-byte pointer can
+        only address the sprite's own bank, so the search is limited to it.
+
+        Returns:
+            (new offset, pointer patch), or the reason relocation failed
+        """
+        if self.rom_data is None:
+            raise ValueError("ROM data not loaded")
+
+        end = pointer.offset + pointer.width
+        if pointer.offset < header_offset or end > len(self.rom_data):
+            return f"pointer offset 0x{pointer.offset:X} is outside the ROM"
+        bank = (sprite_offset - header_offset) // pointer.bank_size
+        current = pointer.decode(self.rom_data[pointer.offset:end], bank)
+        if current != sprite_offset - header_offset:
+            target = "no ROM address" if current is None else f"0x{current + header_offset:X}"
+            return f"the pointer at 0x{pointer.offset:X} points to {target}, not the sprite"
+
+        bank_filter = free_space.bank_of(sprite_offset) if pointer.width == 2 else None
+        new_offset = free_space.allocate(size, bank_filter)
+        if new_offset is None:
+            where = "" if bank_filter is None else f" in bank 0x{bank_filter:02X}"
+            return f"no free block of {size} bytes{where}"
+
+        old_pointer = bytes(self.rom_data[pointer.offset:end])
+        self.rom_data[pointer.offset:end] = pointer.encode(new_offset - header_offset)
+        logger.info(
+            f"Relocating sprite from 0x{sprite_offset:X} to 0x{new_offset:X}; "
+            f"pointer at 0x{pointer.offset:X} updated"
+        )
+        return new_offset, (pointer.offset, old_pointer, bytes(self.rom_data[pointer.offset:end]))
+
+    def run_compression_trials(self, variants: dict[str, bytes]) -> list[CompressionTrial]:
+        """
+        Compress every tile ordering in every mode concurrently.
+
+        Each trial runs its own compressor process, so the trials overlap
+        even though they are dispatched from threads.
+
+        Args:
+            variants: Tile data to compress, keyed by tile ordering name
+
+        Returns:
+            One trial per (ordering, mode), with size, time and compressed data
+        """
+        trials = [
+            CompressionTrial(tile_order, fast)
+            for tile_order in variants
+            for _mode, fast in COMPRESSION_MODES
+        ]
+
+        def run_trial(trial: CompressionTrial) -> None:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".bin") as tmp:
+                output_path = tmp.name
+            start = time.perf_counter()
+            try:
+                trial.size = self.hal_compressor.compress_to_file(
+                    variants[trial.tile_order], output_path, fast=trial.fast
+                )
+                trial.data = Path(output_path).read_bytes()
+            except Exception as e:
+                trial.error = str(e)
+            finally:
+                trial.seconds = time.perf_counter() - start
+                Path(output_path).unlink(missing_ok=True)
+
+        with ThreadPoolExecutor(max_workers=len(trials)) as executor:
+            list(executor.map(run_trial, trials))
+        return trials
+
+    def _apply_patch(
+        self, sprite_offset: int, compressed_data: bytes, original_size: int
+    ) -> tuple[int, bytes, bytes]:
+        """
+        Write compressed data over an original sprite, padding the rest with 0xFF.
+
+        Returns:
+            (offset, old bytes, new bytes) of the patched range for update_rom_checksum
+        """
+        if self.rom_data is None:
+            raise ValueError("ROM data not loaded")
+
+        compressed_size = len(compressed_data)
+        logger.info(f"Injecting {compressed_size} bytes of compressed data at offset 0x{sprite_offset:X}")
+        patch_end = sprite_offset + max(compressed_size, original_size)
+        old_bytes = bytes(self.rom_data[sprite_offset:patch_end])
+        self.rom_data[sprite_offset : sprite_offset + compressed_size] = compressed_data
+
+        # Pad remaining space if needed
+        if compressed_size < original_size:
+            padding = b"\xff" * (original_size - compressed_size)
+            self.rom_data[
+                sprite_offset + compressed_size : sprite_offset + original_size
+            ] = padding
+            logger.info(f"Padded {original_size - compressed_size} bytes with 0xFF")
+
+        return sprite_offset, old_bytes, bytes(self.rom_data[sprite_offset:patch_end])
+
+    def inject_sprites_to_rom(
+        self,
+        sprites: list[tuple[str, int]],
+        rom_path: str,
+        output_path: str,
+        fast_compression: bool = False,
+        create_backup: bool = True,
+        journal_backup: bool = True,
+        progress_callback: Callable[[int, str], None] | None = None,
+    ) -> tuple[bool, str, list[SpriteInjectionResult]]:
+        """
+        Inject several sprites into a ROM in one read/write transaction.
+
+        The ROM is validated, backed up and read once. Original sprites are
+        decompressed and new sprites compressed as batches (in parallel when
+        the HAL process pool is available). Each sprite is compressed in every
+        mode and the smallest encoding that fits is kept. All patches are applied to one
+        buffer, the checksum is updated from the patched ranges, and the ROM
+        is written atomically once. If any sprite fails or does not fit,
+        nothing is written.
+
+        Args:
+            sprites: (sprite PNG path, ROM offset) pairs; offsets include any SMC header
+            rom_path: Path to input ROM
+            output_path: Path for output ROM
+            fast_compression: Prefer fast compression when modes tie on size
+            create_backup: Create backup before modification
+            journal_backup: Back up only the overwritten ranges as a patch
+                instead of copying the whole ROM
+            progress_callback: Called with (percent, message) as the batch advances
+
+        Returns:
+            Tuple of (success, message, per-sprite results)
+        """
+        def report(percent: int, message: str) -> None:
+            logger.info(message)
+            if progress_callback:
+                progress_callback(percent, message)
+
+        results = [SpriteInjectionResult(path, offset) for path, offset in sprites]
+        if not results:
+            return False, "No sprites to inject", results
+
+        start_time = time.time()
+        temp_paths: list[str] = []
+        try:
+            # Validate ROM once for the furthest offset
+            report(5, f"Validating ROM for {len(results)} sprites")
+            ROMValidator.validate_rom_for_injection(rom_path, max(r.offset for r in results))
+
+            # Reject sprites that share an offset
+            seen_offsets: set[int] = set()
+            for result in results:
+                if result.offset in seen_offsets:
+                    result.error = f"Duplicate offset 0x{result.offset:X}"
+                seen_offsets.add(result.offset)
+
+            # Convert PNGs to 4bpp
+            report(10, "Converting sprites to 4bpp tile data")
+            tile_data: dict[int, bytes] = {}
+            for i, result in enumerate(results):
+                if result.error:
+                    continue
+                try:
+                    tile_data[i] = self.convert_png_to_4bpp(result.sprite_path)
+                except Exception as e:
+                    result.error = f"Conversion failed: {e}"
+                    continue
+                result.uncompressed_size = len(tile_data[i])
+                if not tile_data[i]:
+                    result.error = "Cannot compress empty sprite data"
+
+            # Read ROM once and decompress all originals from a single temp copy
+            self.header = self.read_rom_header(rom_path)
+            with Path(rom_path).open("rb") as f:
+                self.rom_data = bytearray(f.read())
+            self._data_checksum = self.calculate_checksum(self.rom_data)[0]
+
+            pending = [i for i, result in enumerate(results) if not result.error]
+            report(25, f"Analyzing {len(pending)} original sprites")
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".sfc") as tmp:
+                tmp.write(self.rom_data)
+                temp_paths.append(tmp.name)
+            originals = self.hal_compressor.decompress_batch(
+                [(temp_paths[0], results[i].offset) for i in pending]
+            )
+            for i, (ok, data) in zip(pending, originals, strict=True):
+                if not ok or not data:
+                    results[i].error = f"Original sprite could not be decompressed: {data or 'no data'}"
+                else:
+                    results[i].original_size = self._estimate_compressed_size(bytes(self.rom_data), results[i].offset)
+
+            # Compress all new sprites in every mode as one batch
+            pending = [i for i in pending if not results[i].error]
+            report(50, f"Compressing {len(pending)} sprites in {len(COMPRESSION_MODES)} modes")
+            requests = []
+            for i in pending:
+                for _mode, fast in COMPRESSION_MODES:
+                    with tempfile.NamedTemporaryFile(delete=False, suffix=".bin") as tmp:
+                        temp_paths.append(tmp.name)
+                    requests.append((tile_data[i], tmp.name, fast))
+                    results[i].trials.append(CompressionTrial(ORIGINAL_TILE_ORDER, fast))
+            batch_start = time.perf_counter()
+            outcomes = iter(zip(requests, self.hal_compressor.compress_batch(requests), strict=True))
+            batch_seconds = time.perf_counter() - batch_start
+            compressed: dict[int, bytes] = {}
+            for i in pending:
+                result = results[i]
+                for trial in result.trials:
+                    request, (ok, size) = next(outcomes)
+                    trial.seconds = batch_seconds
+                    if ok:
+                        trial.data = Path(request[1]).read_bytes()
+                        trial.size = len(trial.data)
+                    else:
+                        trial.error = str(size)
+                best = select_compression_trial(result.trials, result.original_size, fast_compression)
+                if best is not None:
+                    compressed[i] = best.data
+                    result.compressed_size = best.size
+                    result.compression_mode = best.name
+                elif all(trial.error for trial in result.trials):
+                    result.error = f"Compression error: {result.trials[0].error}"
+                else:
+                    result.compressed_size = min(t.size for t in result.trials if not t.error)
+                    result.error = (
+                        f"Compressed sprite too large: {result.compressed_size} bytes at best "
+                        f"(original: {result.original_size} bytes)"
+                    )
+
+            # Patched ranges must not overlap
+            fitting = sorted((r for r in results if r.fits), key=lambda r: r.offset)
+            for previous, result in itertools.pairwise(fitting):
+                if result.offset < previous.offset + previous.original_size:
+                    result.error = f"Overlaps the sprite at 0x{previous.offset:X}"
+
+            failed = [r for r in results if r.error]
+            if failed:
+                details = "\n".join(
+                    f"{Path(r.sprite_path).name} @ 0x{r.offset:X}: {r.error}" for r in failed
+                )
+                return False, f"{len(failed)} of {len(results)} sprites cannot be injected:\n{details}", results
+
+            # One backup, one buffer, one checksum update, one write
+            if create_backup and not journal_backup:
+                backup_error = self._backup_rom(rom_path)
+                if backup_error:
+                    return False, backup_error, results
+
+            report(80, f"Patching {len(results)} sprites")
+            patches = [
+                self._apply_patch(result.offset, compressed[i], result.original_size)
+                for i, result in enumerate(results)
+            ]
+            patches.append(self.update_rom_checksum(self.rom_data, patches))
+
+            if create_backup and journal_backup:
+                backup_error = self._backup_rom(rom_path, patches)
+                if backup_error:
+                    return False, backup_error, results
+
+            report(90, f"Writing modified ROM to: {output_path}")
+            atomic_write(output_path, bytes(self.rom_data))
+            total_time = time.time() - start_time
+
+        except HALCompressionError as e:
+            return False, f"Compression error: {e!s}", results
+        except Exception as e:
+            return False, f"ROM injection error: {e!s}", results
+        finally:
+            for path in temp_paths:
+                Path(path).unlink(missing_ok=True)
+
+        report(100, f"Batch injection of {len(results)} sprites completed in {total_time:.2f} seconds")
+        total_saved = sum(r.original_size - r.compressed_size for r in results)
+        return True, (
+            f"Successfully injected {len(results)} sprites\n"
+            f"Space saved: {total_saved} bytes\n"
+            f"Checksum updated: 0x{self.header.checksum:04X}\n"
+            f"Total time: {total_time:.2f} seconds"
+        ), results
 
     def find_sprite_locations(self, rom_path: str) -> dict[str, SpritePointer]:
         """
@@ -4,14 +4,117 @@ Extracts sprite palettes directly from ROM files
 """
 from __future__ import annotations
 
+import bisect
 import json
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 from utils.logging_config import get_logger
+from utils.rom_cache import get_rom_cache
 
 logger = get_logger(__name__)
 
+# Palette discovery constants
+COLORS_PER_PALETTE = 16
+PALETTE_BYTES = COLORS_PER_PALETTE * 2
+DEFAULT_MIN_PALETTE_SCORE = 0.7
+DEFAULT_MAX_PALETTE_CANDIDATES = 256
+# Windows with more repeated neighbouring colors than this are padding/tables
+MAX_REPEATED_NEIGHBOURS = 4
+# Windows surviving the prefilter are scored in chunks to bound memory
+SCORE_CHUNK_WINDOWS = 1 << 16
+# Mean luminance step (in 5-bit units) at which smoothness drops to zero
+LUMINANCE_STEP_LIMIT = 8.0
+
+def _window_counts(flags: np.ndarray, span: int) -> np.ndarray:
+    """Count set flags in every window of ``span`` consecutive elements"""
+    cumulative = np.concatenate(([0], np.cumsum(flags, dtype=np.int32)))
+    return cumulative[span:] - cumulative[:-span]
+
+def bgr555_to_rgb888(words: np.ndarray) -> np.ndarray:
+    """
+    Convert BGR555 words to RGB888 using the standard SNES scaling.
+
+    Args:
+        words: Array of BGR555 values of any shape
+
+    Returns:
+        uint8 array with a trailing RGB axis
+    """
+    words = np.asarray(words, dtype=np.uint16)
+    channels = np.stack(
+        [words & 0x1F, (words >> 5) & 0x1F, (words >> 10) & 0x1F], axis=-1
+    ).astype(np.uint8)
+    return (channels << 3) | (channels >> 2)
+
+def score_palette_windows(
+    rom_data: bytes, step: int = 2
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score every 32-byte window of ROM data as a possible BGR555 palette.
+
+    Windows are first filtered with cumulative counts (bit 15 must be clear in
+    all 16 words, and padding-like runs of repeated colors are rejected); the
+    survivors are scored on a transparent first color, distinct colors and
+    smooth luminance between neighbouring entries.
+
+    Args:
+        rom_data: Raw ROM bytes
+        step: Byte alignment of candidate windows (positive, even)
+
+    Returns:
+        Tuple of (offsets, scores) for the windows that passed the prefilter
+    """
+    if step <= 0 or step % 2:
+        raise ValueError(f"Palette scan step must be a positive even number: {step}")
+
+    usable = len(rom_data) & ~1
+    if usable < PALETTE_BYTES:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    words = np.frombuffer(rom_data, dtype="<u2", count=usable // 2)
+    window_count = len(words) - COLORS_PER_PALETTE + 1
+
+    # Cheap prefilter over all windows using running counts
+    high_bits = _window_counts(words >= 0x8000, COLORS_PER_PALETTE)
+    repeats = _window_counts(words[1:] == words[:-1], COLORS_PER_PALETTE - 1)
+    valid = (high_bits == 0) & (repeats <= MAX_REPEATED_NEIGHBOURS)
+
+    word_step = step // 2
+    if word_step > 1:
+        aligned = np.zeros(window_count, dtype=bool)
+        aligned[::word_step] = True
+        valid &= aligned
+
+    starts = np.flatnonzero(valid)
+    scores = np.empty(len(starts), dtype=np.float32)
+    lanes = np.arange(COLORS_PER_PALETTE)
+
+    for chunk_start in range(0, len(starts), SCORE_CHUNK_WINDOWS):
+        chunk = starts[chunk_start:chunk_start + SCORE_CHUNK_WINDOWS]
+        windows = words[chunk[:, None] + lanes]
+
+        transparent = windows[:, 0] == 0
+
+        ordered = np.sort(windows, axis=1)
+        distinct = 1 + np.count_nonzero(ordered[:, 1:] != ordered[:, :-1], axis=1)
+        uniqueness = distinct / COLORS_PER_PALETTE
+
+        r = (windows & 0x1F).astype(np.float32)
+        g = ((windows >> 5) & 0x1F).astype(np.float32)
+        b = ((windows >> 10) & 0x1F).astype(np.float32)
+        luminance = 0.299 * r + 0.587 * g + 0.114 * b
+        # Color 0 is usually transparent, so smoothness ignores it
+        steps = np.abs(np.diff(luminance[:, 1:], axis=1)).mean(axis=1)
+        smoothness = np.clip(1.0 - steps / LUMINANCE_STEP_LIMIT, 0.0, 1.0)
+
+        scores[chunk_start:chunk_start + len(chunk)] = (
+            0.2 * transparent + 0.4 * uniqueness + 0.4 * smoothness
+        )
+
+    return starts * 2, scores
+
 class ROMPaletteExtractor:
     """Extracts palettes directly from ROM files"""
 
@@ -190,3 +293,116 @@ class ROMPaletteExtractor:
             logger.exception("Failed to extract palette range")
 
         return palettes
+
+    def find_palette_candidates(
+        self,
+        rom_data: bytes,
+        step: int = 2,
+        min_score: float = DEFAULT_MIN_PALETTE_SCORE,
+        max_results: int = DEFAULT_MAX_PALETTE_CANDIDATES,
+    ) -> list[dict[str, Any]]:
+        """
+        Find ranked palette candidates in raw ROM data.
+
+        Overlapping windows of the same palette block all score similarly, so
+        only the best-scoring window of each overlapping group is kept.
+
+        Args:
+            rom_data: Raw ROM bytes
+            step: Byte alignment of candidate windows (positive, even)
+            min_score: Minimum score (0.0-1.0) for a window to be reported
+            max_results: Maximum number of candidates to return
+
+        Returns:
+            Candidates sorted by descending score, each with "offset",
+            "score" and "colors" (16 RGB lists)
+        """
+        offsets, scores = score_palette_windows(rom_data, step)
+        keep = scores >= min_score
+        offsets, scores = offsets[keep], scores[keep]
+
+        # Best score first; ties resolved towards lower offsets
+        order = np.lexsort((offsets, -scores))
+        taken: list[int] = []
+        ranked: list[tuple[int, float]] = []
+        for idx in order:
+            if len(ranked) >= max_results:
+                break
+            offset = int(offsets[idx])
+            pos = bisect.bisect_left(taken, offset)
+            if pos > 0 and offset - taken[pos - 1] < PALETTE_BYTES:
+                continue
+            if pos < len(taken) and taken[pos] - offset < PALETTE_BYTES:
+                continue
+            taken.insert(pos, offset)
+            ranked.append((offset, float(scores[idx])))
+
+        if not ranked:
+            return []
+
+        words = np.array(
+            [
+                np.frombuffer(rom_data, dtype="<u2", count=COLORS_PER_PALETTE, offset=offset)
+                for offset, _ in ranked
+            ]
+        )
+        colors = bgr555_to_rgb888(words).tolist()
+
+        return [
+            {"offset": offset, "score": round(score, 4), "colors": palette_colors}
+            for (offset, score), palette_colors in zip(ranked, colors, strict=True)
+        ]
+
+    def scan_rom_for_palettes(
+        self,
+        rom_path: str,
+        step: int = 2,
+        min_score: float = DEFAULT_MIN_PALETTE_SCORE,
+        max_results: int = DEFAULT_MAX_PALETTE_CANDIDATES,
+        use_cache: bool = True,
+    ) -> list[dict[str, Any]]:
+        """
+        Discover likely palettes anywhere in a ROM file.
+
+        Results are cached through ROMCache, keyed by ROM hash and scan
+        parameters.
+
+        Args:
+            rom_path: Path to ROM file
+            step: Byte alignment of candidate windows (positive, even)
+            min_score: Minimum score (0.0-1.0) for a window to be reported
+            max_results: Maximum number of candidates to return
+            use_cache: Whether to read and write the ROM cache
+
+        Returns:
+            Ranked palette candidates (see find_palette_candidates); offsets
+            are file offsets usable with extract_palettes_from_rom
+        """
+        scan_params = {
+            "step": step,
+            "min_score": min_score,
+            "max_results": max_results,
+        }
+        rom_cache = get_rom_cache() if use_cache else None
+
+        if rom_cache is not None:
+            cached = rom_cache.get_palette_candidates(rom_path, scan_params)
+            if cached is not None:
+                logger.debug(f"Using {len(cached)} cached palette candidates")
+                return cached
+
+        try:
+            rom_data = Path(rom_path).read_bytes()
+        except OSError:
+            logger.exception("Failed to read ROM for palette scan")
+            return []
+
+        candidates = self.find_palette_candidates(rom_data, step, min_score, max_results)
+        logger.info(
+            f"Palette scan found {len(candidates)} candidates in {Path(rom_path).name}"
+        )
+
+        if rom_cache is not None:
+            rom_cache.save_palette_candidates(rom_path, scan_params, candidates)
+
+        return candidates
@@ -24,6 +24,7 @@ from utils.constants import (
     ROM_SIZE_512KB,
 )
 from utils.logging_config import get_logger
+from utils.rom_checksum import calculate_snes_checksum
 from utils.rom_exceptions import (
     InvalidROMError,
     ROMChecksumError,
@@ -165,13 +166,7 @@ class ROMValidator:
             rom_data = f.read()
 
         # Calculate actual checksum
-        checksum = 0
-        for i in range(0, len(rom_data), 2):
-            if i + 1 < len(rom_data):
-                word = (rom_data[i + 1] << 8) | rom_data[i]
-            else:
-                word = rom_data[i]
-            checksum = (checksum + word) & ROM_CHECKSUM_COMPLEMENT_MASK
+        checksum = calculate_snes_checksum(rom_data)
 
         # Compare with header checksum
         if checksum != header_info["checksum"]:
@@ -0,0 +1,375 @@
+"""
+Scan scheduling across many ROMs.
+
+ScanScheduler scans a library of ROMs (regional variants, revisions) with
+one shared worker pool:
+
+- ROMs are identified by content fingerprint, so copies of the same ROM are
+  scanned once and reported under every path.
+- Work is split into chunks queued by priority. Raising a ROM's priority
+  (e.g. the ROM open in the editor) moves its remaining chunks ahead of
+  everyone else's; only a few chunks per worker are submitted at a time, so
+  the change takes effect immediately.
+- Chunk results are cached by the content they were computed from. Banks
+  shared by several variants are therefore only decompressed and validated
+  once, wherever they sit in each ROM.
+- Per-ROM results go through ROMCache as partial scan results, so an
+  interrupted run resumes from the last contiguous completed offset and a
+  finished ROM is not scanned again.
+"""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from utils.constants import DEFAULT_SCAN_STEP, MAX_SPRITE_SIZE
+from utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from core.parallel_sprite_finder import ParallelSpriteFinder
+    from utils.rom_cache import ROMCache
+
+logger = get_logger(__name__)
+
+# ROM bytes scanned by one worker task
+SCAN_CHUNK_SIZE = 0x40000
+
+# Bytes past a chunk that a sprite starting inside it may be compressed into
+SCAN_CHUNK_OVERRUN = MAX_SPRITE_SIZE
+
+# Chunks submitted per worker, keeping priority changes responsive
+CHUNKS_PER_WORKER = 2
+
+# Per-process sprite finder used by scan workers
+_worker_finder: ParallelSpriteFinder | None = None
+
+def _init_scan_worker(step: int) -> None:
+    """Create the sprite finder of a scan worker"""
+    global _worker_finder
+    from core.hal_compression import HALCompressor
+    from core.parallel_sprite_finder import ParallelSpriteFinder
+
+    # Each worker is already one of the scheduler's processes, so it runs
+    # exhal directly instead of starting a HAL process pool of its own
+    _worker_finder = ParallelSpriteFinder(
+        num_workers=1,
+        chunk_size=SCAN_CHUNK_SIZE,
+        step_size=step,
+        hal_compressor=HALCompressor(use_pool=False),
+    )
+
+def _scan_chunk(rom_path: str, start: int, end: int) -> list[dict[str, Any]]:
+    """Scan one ROM range in a worker, returning plain sprite dicts"""
+    if _worker_finder is None:
+        raise RuntimeError("Scan worker not initialized")
+    return [
+        {
+            "offset": result.offset,
+            "size": result.size,
+            "tile_count": result.tile_count,
+            "compressed_size": result.compressed_size,
+            "confidence": result.confidence,
+        }
+        for result in _worker_finder.search_parallel(rom_path, start, end)
+    ]
+
+@dataclass
+class ROMScan:
+    """Scan state of one distinct ROM"""
+
+    fingerprint: str
+    rom_paths: list[str]
+    start: int
+    end: int
+    step: int
+    priority: int
+    order: int  # Tie-break between ROMs of equal priority, in the order added
+    chunks: list[tuple[int, int]] = field(default_factory=list)  # Not yet submitted
+    results: dict[int, list[dict[str, Any]]] = field(default_factory=dict)  # Chunk start -> sprites
+    total_chunks: int = 0
+    resumed_from: int | None = None  # Offset a cached partial scan had reached
+    cached: bool = False  # Completed scan loaded from the ROM cache
+
+    @property
+    def scan_params(self) -> dict[str, int]:
+        return {"start_offset": self.start, "end_offset": self.end, "step": self.step}
+
+    @property
+    def done(self) -> bool:
+        return len(self.results) == self.total_chunks
+
+    @property
+    def sprites(self) -> list[dict[str, Any]]:
+        """Sprites found so far, sorted by offset"""
+        return sorted(itertools.chain.from_iterable(self.results.values()), key=lambda sprite: sprite["offset"])
+
+    def contiguous_end(self) -> int:
+        """End of the completed chunks that follow the start without gaps"""
+        position = self.start
+        while position < self.end and position in self.results:
+            position = min(position + SCAN_CHUNK_SIZE, self.end)
+        return position
+
+class ScanProgress(NamedTuple):
+    """Progress of one ROM, reported after each of its chunks"""
+
+    fingerprint: str
+    rom_paths: list[str]
+    completed_chunks: int
+    total_chunks: int
+    sprites: list[dict[str, Any]]  # Found in the chunk just finished
+    cached: bool = False  # Sprites loaded from the ROM cache instead
+
+class ScanScheduler:
+    """Scans many ROMs with one shared worker pool"""
+
+    def __init__(
+        self,
+        jobs: int | None = None,
+        cache: ROMCache | None = None,
+        step: int = DEFAULT_SCAN_STEP,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        Args:
+            jobs: Worker processes (default: one per CPU); 1 scans on a thread
+            cache: ROM cache for fingerprints and per-ROM results, or None to
+                always rescan and keep nothing
+            step: Scan step within chunks
+            executor: Pool to run chunks on instead of a process pool; it must
+                run _init_scan_worker in each worker
+        """
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.cache = cache
+        self.step = step
+        self._executor = executor
+        self._scans: dict[str, ROMScan] = {}
+        self._chunk_results: dict[bytes, list[dict[str, Any]]] = {}
+        self._queue: list[tuple[int, int, int, str]] = []
+        self._queue_dirty = False
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self.chunk_cache_hits = 0
+
+    @property
+    def scans(self) -> list[ROMScan]:
+        return list(self._scans.values())
+
+    def add_rom(self, rom_path: str, priority: int = 0, start: int = 0, end: int | None = None) -> ROMScan:
+        """
+        Queue a ROM; a copy of an already queued ROM joins its scan.
+
+        Args:
+            rom_path: ROM to scan
+            priority: Higher scans first
+            start: First offset to scan
+            end: End offset (None for the whole ROM)
+
+        Returns:
+            The scan the ROM belongs to
+        """
+        fingerprint = self._fingerprint(rom_path)
+        with self._lock:
+            scan = self._scans.get(fingerprint)
+            if scan is not None:
+                scan.rom_paths.append(rom_path)
+                logger.info(f"{rom_path} is identical to {scan.rom_paths[0]}, scanning once")
+                if priority > scan.priority:
+                    scan.priority = priority
+                    self._queue_dirty = True
+                return scan
+
+            rom_size = Path(rom_path).stat().st_size
+            end = rom_size if end is None else min(end, rom_size)
+            scan = ROMScan(fingerprint, [rom_path], start, end, self.step, priority, order=len(self._scans))
+            self._scans[fingerprint] = scan
+            self._plan(scan)
+            self._queue_dirty = True
+            return scan
+
+    def set_priority(self, rom_path: str, priority: int) -> None:
+        """Change the priority of a queued ROM's remaining chunks"""
+        with self._lock:
+            for scan in self._scans.values():
+                if rom_path in scan.rom_paths:
+                    scan.priority = priority
+                    self._queue_dirty = True
+                    return
+        raise KeyError(f"ROM not queued: {rom_path}")
+
+    def set_active_rom(self, rom_path: str) -> None:
+        """Scan the ROM the user is looking at before all others"""
+        with self._lock:
+            top = max((scan.priority for scan in self._scans.values()), default=0)
+        self.set_priority(rom_path, top + 1)
+
+    def cancel(self) -> None:
+        """Stop submitting chunks; finished chunks are kept in the ROM cache"""
+        self._cancel_event.set()
+
+    def run(self, progress_callback: Callable[[ScanProgress], None] | None = None) -> list[ROMScan]:
+        """
+        Scan every queued ROM.
+
+        Args:
+            progress_callback: Called after each chunk with the sprites it found
+
+        Returns:
+            Every scan, in the order the ROMs were added
+        """
+        start_time = time.perf_counter()
+        owns_executor = self._executor is None
+        # A single worker runs on a thread, skipping process startup
+        pool_class = ThreadPoolExecutor if self.jobs == 1 else ProcessPoolExecutor
+        executor = self._executor or pool_class(
+            max_workers=self.jobs, initializer=_init_scan_worker, initargs=(self.step,)
+        )
+        in_flight: dict[Future[list[dict[str, Any]]], tuple[ROMScan, int, int, bytes]] = {}
+
+        # Report what the ROM cache already had
+        for scan in self.scans:
+            if scan.resumed_from is not None and progress_callback:
+                progress_callback(ScanProgress(
+                    scan.fingerprint, list(scan.rom_paths), len(scan.results), scan.total_chunks, scan.sprites,
+                    cached=True,
+                ))
+
+        try:
+            while True:
+                self._submit(executor, in_flight, progress_callback)
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    scan, chunk_start, chunk_end, key = in_flight.pop(future)
+                    sprites = future.result()
+                    self._chunk_results[key] = [
+                        {**sprite, "offset": sprite["offset"] - chunk_start} for sprite in sprites
+                    ]
+                    self._finish_chunk(scan, chunk_start, sprites, progress_callback)
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if owns_executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        logger.info(
+            f"Scanned {len(self._scans)} ROMs in {time.perf_counter() - start_time:.1f}s "
+            f"({self.chunk_cache_hits} chunks reused from identical content)"
+        )
+        return self.scans
+
+    def _fingerprint(self, rom_path: str) -> str:
+        if self.cache is not None:
+            return self.cache.get_rom_fingerprint(rom_path)
+        digest = hashlib.sha256()
+        with Path(rom_path).open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _plan(self, scan: ROMScan) -> None:
+        """Split a scan into chunks, resuming from the ROM cache"""
+        starts = range(scan.start, scan.end, SCAN_CHUNK_SIZE)
+        scan.total_chunks = len(starts)
+        resume_from = scan.start
+
+        cached = self.cache.get_partial_scan_results(scan.rom_paths[0], scan.scan_params) if self.cache else None
+        if cached:
+            resume_from = scan.end if cached.get("completed") else cached.get("current_offset", scan.start)
+            scan.cached = bool(cached.get("completed"))
+            scan.resumed_from = resume_from
+            # Chunks before the resume point count as done; their sprites are filed under the first one
+            for chunk_start in starts:
+                if chunk_start + SCAN_CHUNK_SIZE <= resume_from or resume_from >= scan.end:
+                    scan.results[chunk_start] = []
+            if scan.results:
+                scan.results[scan.start] = [
+                    sprite for sprite in cached.get("found_sprites", []) if sprite["offset"] < resume_from
+                ]
+
+        scan.chunks = [
+            (chunk_start, min(chunk_start + SCAN_CHUNK_SIZE, scan.end))
+            for chunk_start in starts if chunk_start not in scan.results
+        ]
+
+    def _rebuild_queue(self) -> None:
+        """Order every unsubmitted chunk by its ROM's current priority"""
+        self._queue = [
+            (-scan.priority, scan.order, chunk_start, scan.fingerprint)
+            for scan in self._scans.values()
+            for chunk_start, _chunk_end in scan.chunks
+        ]
+        heapq.heapify(self._queue)
+        self._queue_dirty = False
+
+    def _submit(
+        self,
+        executor: Executor,
+        in_flight: dict[Future[list[dict[str, Any]]], tuple[ROMScan, int, int, bytes]],
+        progress_callback: Callable[[ScanProgress], None] | None,
+    ) -> None:
+        """Keep the pool busy with the highest priority chunks"""
+        while len(in_flight) < self.jobs * CHUNKS_PER_WORKER and not self._cancel_event.is_set():
+            with self._lock:
+                if self._queue_dirty:
+                    self._rebuild_queue()
+                if not self._queue:
+                    return
+                _priority, _order, chunk_start, fingerprint = heapq.heappop(self._queue)
+                scan = self._scans[fingerprint]
+                chunk_end = next(end for start, end in scan.chunks if start == chunk_start)
+                scan.chunks.remove((chunk_start, chunk_end))
+
+            key = self._chunk_key(scan.rom_paths[0], chunk_start, chunk_end)
+            cached = self._chunk_results.get(key)
+            if cached is not None:
+                self.chunk_cache_hits += 1
+                sprites = [{**sprite, "offset": sprite["offset"] + chunk_start} for sprite in cached]
+                self._finish_chunk(scan, chunk_start, sprites, progress_callback)
+                continue
+
+            future = executor.submit(_scan_chunk, scan.rom_paths[0], chunk_start, chunk_end)
+            in_flight[future] = (scan, chunk_start, chunk_end, key)
+
+    def _chunk_key(self, rom_path: str, start: int, end: int) -> bytes:
+        """Identify a chunk by the bytes its scan can read"""
+        with Path(rom_path).open("rb") as f:
+            f.seek(start)
+            data = f.read(end - start + SCAN_CHUNK_OVERRUN)
+        digest = hashlib.blake2b(data, digest_size=20)
+        digest.update(f"{end - start}:{self.step}".encode())
+        return digest.digest()
+
+    def _finish_chunk(
+        self,
+        scan: ROMScan,
+        chunk_start: int,
+        sprites: list[dict[str, Any]],
+        progress_callback: Callable[[ScanProgress], None] | None,
+    ) -> None:
+        """Record a chunk and persist the scan's contiguous progress"""
+        previous_end = scan.contiguous_end()
+        scan.results[chunk_start] = sprites
+
+        current_end = scan.contiguous_end()
+        if self.cache is not None and current_end > previous_end:
+            found = [sprite for sprite in scan.sprites if sprite["offset"] < current_end]
+            self.cache.save_partial_scan_results(
+                scan.rom_paths[0], scan.scan_params, found, current_offset=current_end,
+                completed=current_end >= scan.end,
+            )
+
+        if progress_callback:
+            progress_callback(ScanProgress(
+                scan.fingerprint, list(scan.rom_paths), len(scan.results), scan.total_chunks, sprites
+            ))
@@ -7,10 +7,13 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from utils.logging_config import get_logger
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
 logger = get_logger(__name__)
 
 @dataclass
@@ -158,6 +161,9 @@ class SpriteConfigLoader:
                 continue
 
             offset_str = sprite_data.get("offset", "0x0")
+            # Offsets remapped for this version take precedence
+            if selected_version and selected_version in sprite_data.get("offsets", {}):
+                offset_str = sprite_data["offsets"][selected_version]
             offset = (
                 int(offset_str, 16)
                 if offset_str.startswith("0x")
@@ -304,6 +310,74 @@ class SpriteConfigLoader:
 
         logger.info(f"Added custom sprite: {game_name} - {sprite_name} at 0x{offset:X}")
 
+    def add_version_offsets(
+        self,
+        game_name: str,
+        version: str,
+        checksum: int,
+        remapped: Iterable[tuple[str, int, int]],
+    ) -> int:
+        """
+        Register a ROM version and its sprite offsets; save_config writes them out.
+
+        The checksum identifies the version in get_game_sprites, which then
+        uses these offsets instead of the sprites' default ones. Sprites are
+        matched by name, and unnamed ones by their offset in the reference
+        ROM, which may be the default offset or one recorded for another
+        version.
+
+        Args:
+            game_name: Name of the game
+            version: Version name, e.g. "Europe_Rev1"
+            checksum: ROM header checksum of the version
+            remapped: (sprite name, offset in the reference ROM, offset in this
+                version) per found sprite, e.g. from OffsetRemapper
+
+        Returns:
+            Number of sprites updated; the version is only registered if
+            this is not 0
+
+        Raises:
+            KeyError: If the game is not in the configuration
+        """
+        game_data = self.config_data.get("games", {}).get(game_name)
+        if game_data is None:
+            raise KeyError(f"Unknown game: {game_name}")
+
+        sprites = {
+            name: data for name, data in game_data.get("sprites", {}).items()
+            # Skip metadata entries like "_note"
+            if not name.startswith("_")
+        }
+        by_offset: dict[int, str] = {}
+        for sprite_name, sprite_data in sprites.items():
+            for offset_str in [sprite_data.get("offset", "0x0"), *sprite_data.get("offsets", {}).values()]:
+                by_offset.setdefault(self._parse_offset(offset_str), sprite_name)
+
+        new_offsets: dict[str, int] = {}
+        for name, reference_offset, offset in remapped:
+            sprite_name = name if name in sprites else by_offset.get(reference_offset)
+            if sprite_name is not None:
+                new_offsets[sprite_name] = offset
+
+        # Without offsets the version would silently get the default ones
+        if not new_offsets:
+            logger.warning(f"No sprites of {game_name} matched; version {version} not added")
+            return 0
+
+        game_data.setdefault("checksums", {})[version] = f"0x{checksum:04X}"
+        for sprite_name, offset in new_offsets.items():
+            sprites[sprite_name].setdefault("offsets", {})[version] = f"0x{offset:X}"
+
+        logger.info(
+            f"Added {len(new_offsets)} sprite offsets for {game_name} ({version}, checksum 0x{checksum:04X})"
+        )
+        return len(new_offsets)
+
+    @staticmethod
+    def _parse_offset(offset_str: str) -> int:
+        return int(offset_str, 16) if offset_str.startswith("0x") else int(offset_str)
+
     def save_config(self, output_path: str | None = None) -> None:
         """
         Save current configuration to file.
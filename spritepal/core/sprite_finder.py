@@ -8,7 +8,7 @@ import os
 import tempfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from core.region_analyzer import EmptyRegionConfig, EmptyRegionDetector
 from core.rom_extractor import ROMExtractor
@@ -31,6 +31,9 @@ from utils.constants import (
 )
 from utils.logging_config import get_logger
 
+if TYPE_CHECKING:
+    from core.hal_compression import HALCompressor
+
 logger = get_logger(__name__)
 
 @dataclass
@@ -59,8 +62,13 @@ class SpriteCandidate:
 class SpriteFinder:
     """Finds actual character sprites in ROM files"""
 
-    def __init__(self, output_dir: str = "sprite_candidates", region_config: EmptyRegionConfig | None = None) -> None:
-        self.extractor = ROMExtractor()
+    def __init__(
+        self,
+        output_dir: str = "sprite_candidates",
+        region_config: EmptyRegionConfig | None = None,
+        hal_compressor: HALCompressor | None = None,
+    ) -> None:
+        self.extractor = ROMExtractor(hal_compressor)
         self.validator = SpriteVisualValidator()
         self.output_dir = output_dir
         self.region_detector = EmptyRegionDetector(region_config)
@@ -0,0 +1,183 @@
+"""
+Streaming query-by-image search over a ROM.
+
+Candidates are hashed in batches in the order they become available, cheapest
+first: sprites already in the similarity index, then offsets supplied by the
+caller (cached scan results, live scanner output). Each batch is scored
+against the reference as soon as it is hashed and merged into a bounded top-k,
+so the first matches arrive long before the whole ROM has been indexed.
+Newly hashed sprites are saved to the index as a side effect, making the next
+search cheaper.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from core.indexed_image import decode_sprite_tiles
+from core.visual_similarity_search import (
+    SimilarityMatch,
+    SimilarityTopK,
+    SpriteHash,
+    VisualSimilarityEngine,
+)
+from utils.constants import SPRITE_WIDTH_TILES
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Candidates decompressed and hashed together
+SEARCH_BATCH_SIZE = 32
+
+# Newly hashed sprites between index saves
+INDEX_SAVE_INTERVAL = 512
+
+class VisualSearchUpdate(NamedTuple):
+    """Progress of a streaming visual search"""
+
+    matches: list[SimilarityMatch]
+    hashed: int
+    changed: bool
+
+class StreamingVisualSearch:
+    """
+    Incremental top-k similarity search that indexes candidates as it goes.
+
+    Decompression is supplied by the caller so that the search can use the
+    HAL process pool in the application and plain callables in tests.
+    """
+
+    def __init__(
+        self,
+        engine: VisualSimilarityEngine,
+        decompress: Callable[[list[int]], list[bytes | None]],
+        max_results: int = 50,
+        similarity_threshold: float = 0.8,
+        index_path: Path | None = None,
+        batch_size: int = SEARCH_BATCH_SIZE,
+        save_interval: int = INDEX_SAVE_INTERVAL,
+    ) -> None:
+        """
+        Args:
+            engine: Engine whose database receives newly hashed sprites
+            decompress: Returns decompressed data (or None) for each offset
+            max_results: Number of matches to keep
+            similarity_threshold: Minimum similarity score (0.0-1.0)
+            index_path: Where to save the index, or None to skip saving
+            batch_size: Candidates decompressed and hashed together
+            save_interval: Newly hashed sprites between index saves
+        """
+        self.engine = engine
+        self.decompress = decompress
+        self.max_results = max_results
+        self.similarity_threshold = similarity_threshold
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self.save_interval = save_interval
+        self._unsaved = 0
+
+    def reference_from_offset(self, offset: int) -> SpriteHash | None:
+        """
+        Hash of the sprite at ``offset``, decoding and indexing it if needed.
+
+        Args:
+            offset: ROM offset of the reference sprite
+
+        Returns:
+            The sprite's hash, or None if it could not be decoded
+        """
+        if offset in self.engine.sprite_database:
+            return self.engine.sprite_database[offset]
+        hashes = self._hash_offsets([offset])
+        return hashes[0] if hashes else None
+
+    def run(
+        self,
+        target_hash: SpriteHash,
+        candidates: Iterable[int],
+        is_cancelled: Callable[[], bool] | None = None,
+    ) -> Iterator[VisualSearchUpdate]:
+        """
+        Search indexed sprites, then stream the candidates through hashing.
+
+        The first update covers the existing index and is always yielded;
+        later updates follow every hashed batch. Candidates already in the
+        index are skipped.
+
+        Args:
+            target_hash: Hash of the reference image
+            candidates: Offsets to consider, in priority order; may be lazy
+            is_cancelled: Polled between candidates to stop early
+
+        Yields:
+            VisualSearchUpdate with the best matches so far
+        """
+        top = SimilarityTopK(self.max_results)
+        if self.engine.sprite_database:
+            top.add(self.engine.find_similar(target_hash, self.max_results, self.similarity_threshold))
+        yield VisualSearchUpdate(top.results(), 0, True)
+
+        seen = set(self.engine.sprite_database)
+        seen.add(target_hash.offset)
+        hashed = 0
+        pending: list[int] = []
+        try:
+            for offset in candidates:
+                if is_cancelled and is_cancelled():
+                    return
+                if offset in seen:
+                    continue
+                seen.add(offset)
+                pending.append(offset)
+                if len(pending) < self.batch_size:
+                    continue
+
+                hashed, changed = self._score_batch(target_hash, pending, top, hashed)
+                pending = []
+                yield VisualSearchUpdate(top.results(), hashed, changed)
+
+            if pending and not (is_cancelled and is_cancelled()):
+                hashed, changed = self._score_batch(target_hash, pending, top, hashed)
+                yield VisualSearchUpdate(top.results(), hashed, changed)
+        finally:
+            self.save_index()
+
+    def save_index(self) -> None:
+        """Save the index if sprites were hashed since the last save"""
+        if not self.index_path or not self._unsaved:
+            return
+        try:
+            self.engine.export_index(self.index_path)
+            self._unsaved = 0
+        except OSError as e:
+            logger.warning(f"Failed to save similarity index: {e}")
+
+    def _score_batch(
+        self, target_hash: SpriteHash, offsets: list[int], top: SimilarityTopK, hashed: int
+    ) -> tuple[int, bool]:
+        """Hash a batch of candidates and merge their scores into the top-k"""
+        hashes = self._hash_offsets(offsets)
+        matches = self.engine.search_hashes(target_hash, hashes, self.max_results, self.similarity_threshold)
+        return hashed + len(hashes), top.add(matches)
+
+    def _hash_offsets(self, offsets: list[int]) -> list[SpriteHash]:
+        """Decompress, decode and index sprites, batching by decoded shape"""
+        by_shape: dict[tuple[int, int], tuple[list[int], list[np.ndarray]]] = {}
+        for offset, sprite_data in zip(offsets, self.decompress(offsets), strict=True):
+            pixels = decode_sprite_tiles(sprite_data, SPRITE_WIDTH_TILES) if sprite_data else None
+            if pixels is None:
+                continue
+            group = by_shape.setdefault(pixels.shape, ([], []))
+            group[0].append(offset)
+            group[1].append(pixels)
+
+        hashes: list[SpriteHash] = []
+        for group_offsets, group_pixels in by_shape.values():
+            hashes.extend(self.engine.index_sprite_batch(group_offsets, np.stack(group_pixels)))
+
+        self._unsaved += len(hashes)
+        if self._unsaved >= self.save_interval:
+            self.save_index()
+        return hashes
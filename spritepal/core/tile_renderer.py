@@ -3,11 +3,18 @@ Tile renderer for converting 4bpp SNES tile data to images.
 """
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import numpy as np
 from core.default_palette_loader import DefaultPaletteLoader
+from core.indexed_image import decode_4bpp_tiles
 from PIL import Image
+from utils.constants import BYTES_PER_TILE
 from utils.logging_config import get_logger
 
+if TYPE_CHECKING:
+    from PySide6.QtGui import QImage
+
 logger = get_logger(__name__)
 
 class TileRenderer:
@@ -25,6 +32,28 @@ class TileRenderer:
             self.default_palettes = {
                 8: [[i * 16, i * 16, i * 16] for i in range(16)]
             }
+        # Indexed8 color tables per palette index, built on first use
+        self._color_tables: dict[int | None, list[int]] = {}
+
+    def get_palette(self, palette_index: int | None) -> list[list[int]]:
+        """
+        Get the RGB colors for a palette index.
+
+        Args:
+            palette_index: Palette index (0-15) or None for grayscale
+
+        Returns:
+            List of 16 RGB triplets (grayscale if the palette is unknown)
+        """
+        if palette_index is None:
+            # Use grayscale palette when None is specified
+            logger.debug("Using grayscale palette (palette_index=None)")
+            return [[i * 17, i * 17, i * 17] for i in range(16)]  # 0-255 range
+        if palette_index not in self.default_palettes:
+            logger.debug(f"Palette index {palette_index} not found, using grayscale")
+            return [[i * 17, i * 17, i * 17] for i in range(16)]  # Grayscale fallback
+        logger.debug(f"Using palette index {palette_index}")
+        return self.default_palettes[palette_index]
 
     def render_tiles(
         self,
@@ -47,80 +76,86 @@ class TileRenderer:
         """
         logger.debug(f"render_tiles called: data_len={len(tile_data)}, dims={width_tiles}x{height_tiles}, palette={palette_index}")
         try:
-            # Validate input
-            bytes_per_tile = 32
-            expected_size = width_tiles * height_tiles * bytes_per_tile
-
-            if len(tile_data) < expected_size:
-                # Pad with zeros if needed
-                tile_data = tile_data + b'\x00' * (expected_size - len(tile_data))
-                logger.debug(f"Padded tile data from {len(tile_data) - (expected_size - len(tile_data))} to {expected_size} bytes")
-
-            # Get palette
-            if palette_index is None:
-                # Use grayscale palette when None is specified
-                palette = [[i * 17, i * 17, i * 17] for i in range(16)]  # 0-255 range
-                logger.debug("Using grayscale palette (palette_index=None)")
-            elif palette_index not in self.default_palettes:
-                logger.debug(f"Palette index {palette_index} not found, using grayscale")
-                palette = [[i * 17, i * 17, i * 17] for i in range(16)]  # Grayscale fallback
-            else:
-                # Get the specified palette
-                palette = self.default_palettes[palette_index]
-                logger.debug(f"Using palette index {palette_index}")
-
+            indices = decode_4bpp_tiles(tile_data, width_tiles, height_tiles)
+            palette = self.get_palette(palette_index)
             logger.debug(f"Using palette {palette_index} with {len(palette)} colors")
 
-            # Create output image
-            width_pixels = width_tiles * 8
-            height_pixels = height_tiles * 8
-            image = Image.new('RGBA', (width_pixels, height_pixels), (0, 0, 0, 0))
-            pixels = image.load()
-
-            # Check if pixels is None (can happen if image.load() fails)
-            if pixels is None:
-                raise ValueError("Failed to load image pixels")
-
-            # Process each tile
-            for tile_y in range(height_tiles):
-                for tile_x in range(width_tiles):
-                    tile_index = tile_y * width_tiles + tile_x
-                    tile_offset = tile_index * bytes_per_tile
-
-                    if tile_offset >= len(tile_data):
-                        continue
-
-                    # Decode the tile
-                    tile_pixels = self._decode_4bpp_tile(
-                        tile_data[tile_offset:tile_offset + bytes_per_tile]
-                    )
-
-                    # Apply palette and draw to image
-                    for y in range(8):
-                        for x in range(8):
-                            color_index = tile_pixels[y][x]
-
-                            # Color 0 is usually transparent
-                            if color_index == 0:
-                                color = (0, 0, 0, 0)
-                            else:
-                                rgb = palette[color_index]
-                                color = (rgb[0], rgb[1], rgb[2], 255)
-
-                            # Calculate pixel position
-                            px = tile_x * 8 + x
-                            py = tile_y * 8 + y
-
-                            if px < width_pixels and py < height_pixels:
-                                pixels[px, py] = color
-
-            logger.debug(f"Successfully rendered image: {width_pixels}x{height_pixels} pixels")
+            # Color 0 is transparent; apply the palette as a single table lookup
+            rgba_lut = np.zeros((256, 4), dtype=np.uint8)
+            rgba_lut[:len(palette), :3] = np.asarray(palette, dtype=np.uint8)[:, :3]
+            rgba_lut[1:, 3] = 255
+            rgba_lut[0] = (0, 0, 0, 0)
+
+            image = Image.fromarray(rgba_lut[indices], "RGBA")
+            logger.debug(f"Successfully rendered image: {image.width}x{image.height} pixels")
             return image
 
         except Exception as e:
             logger.error(f"Failed to render tiles: {e}", exc_info=True)
             return None
 
+    def render_tiles_indexed(
+        self,
+        tile_data: bytes,
+        width_tiles: int,
+        height_tiles: int,
+        palette_index: int | None = None
+    ) -> QImage | None:
+        """
+        Render 4bpp tile data to an Indexed8 QImage.
+
+        The returned image keeps the raw color indices, so switching palettes
+        later only needs set_palette() instead of a full re-render.
+
+        Args:
+            tile_data: Raw 4bpp tile data (32 bytes per 8x8 tile)
+            width_tiles: Width in tiles
+            height_tiles: Height in tiles
+            palette_index: Palette index to use (0-15) or None for grayscale
+
+        Returns:
+            Indexed8 QImage or None if rendering fails
+        """
+        # Qt is imported on demand so headless rendering never loads it
+        from utils.image_utils import create_indexed_qimage
+
+        try:
+            indices = decode_4bpp_tiles(tile_data, width_tiles, height_tiles)
+            return create_indexed_qimage(indices, self.get_color_table(palette_index))
+        except Exception as e:
+            logger.error(f"Failed to render indexed tiles: {e}", exc_info=True)
+            return None
+
+    def get_color_table(self, palette_index: int | None) -> list[int]:
+        """
+        Get the Indexed8 color table for a palette, cached per palette index.
+
+        Args:
+            palette_index: Palette index (0-15) or None for grayscale
+
+        Returns:
+            256-entry ARGB color table with index 0 transparent
+        """
+        table = self._color_tables.get(palette_index)
+        if table is None:
+            from utils.image_utils import build_color_table
+
+            table = build_color_table(self.get_palette(palette_index))
+            self._color_tables[palette_index] = table
+        return table
+
+    def set_palette(self, image: QImage, palette_index: int | None) -> None:
+        """
+        Switch the palette of an image from render_tiles_indexed().
+
+        Only the color table is replaced; no pixel data is touched.
+
+        Args:
+            image: Indexed8 QImage to recolor in place
+            palette_index: Palette index (0-15) or None for grayscale
+        """
+        image.setColorTable(self.get_color_table(palette_index))
+
     def _decode_4bpp_tile(self, tile_bytes: bytes) -> list[list[int]]:
         """
         Decode a single 4bpp SNES tile.
@@ -131,53 +166,7 @@ class TileRenderer:
         Returns:
             8x8 array of color indices (0-15)
         """
-        if len(tile_bytes) < 32:
-            # Pad if needed
-            tile_bytes = tile_bytes + b'\x00' * (32 - len(tile_bytes))
-
-        # Initialize 8x8 pixel array
-        pixels = [[0 for _ in range(8)] for _ in range(8)]
-
-        # SNES 4bpp format:
-        # 2 bytes for plane 0-1 of row 0
-        # 2 bytes for plane 0-1 of row 1
-        # ... (8 rows)
-        # 2 bytes for plane 2-3 of row 0
-        # 2 bytes for plane 2-3 of row 1
-        # ... (8 rows)
-
-        for row in range(8):
-            # Get the 4 plane bytes for this row
-            plane_01_offset = row * 2
-            plane_23_offset = 16 + row * 2
-
-            if plane_01_offset + 1 < len(tile_bytes):
-                plane0 = tile_bytes[plane_01_offset]
-                plane1 = tile_bytes[plane_01_offset + 1]
-            else:
-                plane0 = plane1 = 0
-
-            if plane_23_offset + 1 < len(tile_bytes):
-                plane2 = tile_bytes[plane_23_offset]
-                plane3 = tile_bytes[plane_23_offset + 1]
-            else:
-                plane2 = plane3 = 0
-
-            # Decode each pixel in the row
-            for col in range(8):
-                bit_mask = 1 << (7 - col)
-
-                # Extract bit from each plane
-                bit0 = 1 if (plane0 & bit_mask) else 0
-                bit1 = 2 if (plane1 & bit_mask) else 0
-                bit2 = 4 if (plane2 & bit_mask) else 0
-                bit3 = 8 if (plane3 & bit_mask) else 0
-
-                # Combine to get color index (0-15)
-                color_index = bit0 | bit1 | bit2 | bit3
-                pixels[row][col] = color_index
-
-        return pixels
+        return decode_4bpp_tiles(tile_bytes, 1, 1).tolist()
 
     def render_sprite_preview(
         self,
@@ -202,7 +191,7 @@ class TileRenderer:
             return None
 
         # Calculate tile count
-        tile_count = len(sprite_data) // 32
+        tile_count = len(sprite_data) // BYTES_PER_TILE
         if tile_count == 0:
             return None
 
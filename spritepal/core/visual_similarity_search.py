@@ -6,8 +6,12 @@ useful for finding variations, palette swaps, or related graphics.
 """
 from __future__ import annotations
 
+import heapq
+import itertools
 import logging
+import math
 import pickle
+from collections.abc import Iterator, MutableMapping
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -34,6 +38,363 @@ class SimilarityMatch:
     hash_distance: int
     metadata: dict[str, Any]
 
+# Score weights of the individual similarity metrics
+PHASH_WEIGHT = 0.4
+DHASH_WEIGHT = 0.3
+HISTOGRAM_WEIGHT = 0.3
+
+# Width of the multi-index hashing substrings
+MIH_CHUNK_BITS = 16
+# Rows a full scan verifies in roughly the time of one substring probe or
+# one gathered candidate
+MIH_PROBE_COST = 2
+# Unmerged additions tolerated before the index is rebuilt
+MIN_PENDING_REBUILD = 256
+# Sprite pairs compared per block of the all-pairs similarity matrix
+PAIR_BLOCK_SIZE = 1 << 20
+
+# Bins per RGB channel of the color histogram
+HISTOGRAM_BINS = 16
+# Colors in a 4bpp sprite palette
+PALETTE_COLORS = 16
+# Fraction bits of PIL's fixed-point resampling coefficients for 8-bit images
+RESAMPLE_PRECISION_BITS = 22
+# Grayscale ramp used when a batch is hashed without palettes
+GRAYSCALE_PALETTE = np.repeat(np.arange(PALETTE_COLORS, dtype=np.uint8)[:, np.newaxis] * 17, 3, axis=1)
+
+def pack_hash_bits(bits: np.ndarray) -> np.ndarray:
+    """
+    Pack hash bit vectors into uint64 words.
+
+    Args:
+        bits: Array of shape (n, bit_count) or (bit_count,) with 0/1 values
+
+    Returns:
+        uint64 array of shape (n, ceil(bit_count / 64)); padding bits are zero
+    """
+    bits = np.atleast_2d(np.asarray(bits, dtype=np.uint8))
+    packed = np.packbits(bits, axis=1)
+    pad = (-packed.shape[1]) % 8
+    if pad:
+        packed = np.pad(packed, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        """Set bits of packed uint64 words, summed over the last axis"""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int32)
+else:  # NumPy < 2.0
+    _BYTE_POPCOUNT = np.array([i.bit_count() for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        """Set bits of packed uint64 words, summed over the last axis"""
+        return _BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)].sum(axis=-1, dtype=np.int32)
+
+def hamming_distances(words: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Hamming distance between every row of packed ``words`` and ``query``"""
+    return _popcount(words ^ query)
+
+def _neighbour_masks(bits: int, radius: int) -> np.ndarray:
+    """All XOR masks of ``bits`` width with at most ``radius`` bits set"""
+    masks = [0]
+    for count in range(1, radius + 1):
+        for positions in itertools.combinations(range(bits), count):
+            masks.append(sum(1 << p for p in positions))
+    return np.array(masks, dtype=np.int64)
+
+_MASK_CACHE: dict[int, np.ndarray] = {}
+
+def _neighbour_mask_cache(radius: int) -> np.ndarray:
+    """Cached substring neighbour masks for ``radius``"""
+    if radius not in _MASK_CACHE:
+        _MASK_CACHE[radius] = _neighbour_masks(MIH_CHUNK_BITS, radius)
+    return _MASK_CACHE[radius]
+
+def _neighbour_count(radius: int) -> int:
+    """Number of substring neighbours within ``radius``, without enumerating them"""
+    return sum(math.comb(MIH_CHUNK_BITS, count) for count in range(radius + 1))
+
+def _chunk_radii(bit_weights: np.ndarray, max_loss: float) -> list[int]:
+    """
+    Per-substring search radii covering every key within ``max_loss``.
+
+    A key that differs from the query in more than r_j bits of every substring
+    j loses at least sum(w_j * (r_j + 1)) of score, where w_j is the score a
+    bit of that substring is worth, so any radii for which that sum exceeds
+    ``max_loss`` find every match. Radii are raised greedily, always where the
+    most score is covered per extra neighbour probed; -1 means the substring
+    is not probed at all.
+
+    Args:
+        bit_weights: Score lost per differing bit, one per substring
+        max_loss: Largest hash score loss a match may have
+
+    Returns:
+        One radius per substring
+    """
+    weights = bit_weights.tolist()
+    radii = [-1] * len(weights)
+    covered = 0.0
+    while covered <= max_loss + 1e-9:
+        chunk = max(
+            (chunk for chunk in range(len(weights)) if radii[chunk] < MIH_CHUNK_BITS),
+            key=lambda chunk: weights[chunk] / math.comb(MIH_CHUNK_BITS, radii[chunk] + 1),
+            default=None,
+        )
+        if chunk is None:
+            break
+        radii[chunk] += 1
+        covered += weights[chunk]
+    return radii
+
+def _expand_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenate the ranges [start, start + length) in one vectorized step"""
+    total = int(lengths.sum())
+    ends = np.cumsum(lengths)
+    return np.repeat(starts - ends + lengths, lengths) + np.arange(total)
+
+def _resample_weights(source: int, target: int) -> np.ndarray | None:
+    """
+    Fixed-point Lanczos weights that resample ``source`` samples into ``target``.
+
+    Mirrors the coefficients of PIL's LANCZOS resize for 8-bit images: the
+    kernel is stretched by the downscale factor, each row is normalized and
+    scaled to RESAMPLE_PRECISION_BITS. Row i holds the weights of output
+    sample i, so ``pixels @ weights.T`` resamples along that axis.
+
+    Returns:
+        int64 array of shape (target, source), or None when the size is
+        unchanged and PIL skips the pass
+    """
+    if source == target:
+        return None
+    scale = source / target
+    filter_scale = max(scale, 1.0)
+    support = 3.0 * filter_scale
+    centers = (np.arange(target) + 0.5) * scale
+    first = np.maximum((centers - support + 0.5).astype(np.int64), 0)
+    last = np.minimum((centers + support + 0.5).astype(np.int64), source)
+
+    samples = np.arange(source)
+    x = (samples - centers[:, np.newaxis] + 0.5) * (1.0 / filter_scale)
+    inside = (samples >= first[:, np.newaxis]) & (samples < last[:, np.newaxis]) & (x >= -3.0) & (x < 3.0)
+    weights = np.where(inside, np.sinc(x) * np.sinc(x / 3), 0.0)
+    # Accumulate left to right like PIL, so the normalized weights round alike
+    totals = np.cumsum(weights, axis=1)[:, -1:]
+    weights = np.divide(weights, totals, out=weights, where=totals != 0)
+    scaled = weights * (1 << RESAMPLE_PRECISION_BITS)
+    return np.where(scaled < 0, scaled - 0.5, scaled + 0.5).astype(np.int64)
+
+def _resample(gray: np.ndarray, height: int, width: int) -> np.ndarray:
+    """
+    Resize a (n, h, w) batch of 8-bit grayscale images like PIL's LANCZOS.
+
+    Horizontal pass first, each pass rounded and clipped to 8 bits.
+    """
+    for axis, size in ((2, width), (1, height)):
+        weights = _resample_weights(gray.shape[axis], size)
+        if weights is None:
+            continue
+        # Integer sums stay far below 2**53, so float64 products are exact
+        moved = np.moveaxis(gray, axis, -1).astype(np.float64)
+        total = moved @ weights.T.astype(np.float64) + (1 << (RESAMPLE_PRECISION_BITS - 1))
+        rounded = np.floor(total / (1 << RESAMPLE_PRECISION_BITS))
+        gray = np.moveaxis(np.clip(rounded, 0, 255).astype(np.uint8), -1, axis)
+    return gray
+
+def _luma(rgb: np.ndarray) -> np.ndarray:
+    """8-bit grayscale of RGB values, rounded like PIL's "L" conversion"""
+    rgb = rgb.astype(np.int64)
+    return ((rgb[..., 0] * 19595 + rgb[..., 1] * 38470 + rgb[..., 2] * 7471 + 0x8000) >> 16).astype(np.uint8)
+
+def _flatten_alpha(image: Image.Image) -> np.ndarray:
+    """RGB pixels of an image with transparent pixels black, like color 0 of a sprite"""
+    rgba = np.asarray(image.convert("RGBA"))
+    return np.where(rgba[..., 3:] > 0, rgba[..., :3], 0).astype(np.uint8)
+
+def _batch_palettes(palettes: np.ndarray | None, count: int) -> np.ndarray:
+    """Broadcast palettes to (count, 16, 3) RGB with color 0 forced to black"""
+    if palettes is None:
+        palettes = GRAYSCALE_PALETTE
+    palettes = np.asarray(palettes, dtype=np.uint8)
+    if palettes.ndim not in (2, 3) or palettes.shape[-2] != PALETTE_COLORS or palettes.shape[-1] < 3:
+        raise ValueError(f"Palettes must have shape (16, 3) or (n, 16, 3), got {palettes.shape}")
+    rgb = np.array(np.broadcast_to(palettes[..., :3], (count, PALETTE_COLORS, 3)))
+    # Color 0 is transparent and hashes like the black of a flattened RGBA image
+    rgb[:, 0] = 0
+    return rgb
+
+class _SpriteDatabase(MutableMapping):
+    """
+    Offset -> SpriteHash mapping that records changes for the search index.
+
+    Pure additions can be merged into the index incrementally; replacing or
+    removing entries forces a rebuild.
+    """
+
+    def __init__(self, data: dict[int, SpriteHash] | None = None) -> None:
+        self._data: dict[int, SpriteHash] = dict(data or {})
+        self.added: list[int] = []
+        self.structural_change = False
+
+    def __getitem__(self, key: int) -> SpriteHash:
+        return self._data[key]
+
+    def __setitem__(self, key: int, value: SpriteHash) -> None:
+        if key in self._data:
+            self.structural_change = True
+        else:
+            self.added.append(key)
+        self._data[key] = value
+
+    def __delitem__(self, key: int) -> None:
+        del self._data[key]
+        self.structural_change = True
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.structural_change = True
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Persist as a plain dict so exported indexes stay format-compatible
+        return (dict, (dict(self._data),))
+
+class _HashIndex:
+    """
+    Packed hash matrices with a multi-index hashing (MIH) candidate lookup.
+
+    The phash and dhash bits of every sprite are packed into one key of
+    16-bit substrings. A sprite can only reach the score threshold if the
+    score its hash bits lose stays within 1 - threshold, so by the pigeonhole
+    principle it lies within a small radius of the query on at least one
+    substring (see _chunk_radii). Candidates are gathered from per-substring
+    sorted tables and then verified exactly. When enumerating substring
+    neighbours would cost more than a scan, all rows are verified with a
+    vectorized popcount instead.
+    """
+
+    def __init__(self, hashes: list[SpriteHash]) -> None:
+        self.offsets = np.array([h.offset for h in hashes], dtype=np.int64)
+        self.phash_words = pack_hash_bits(np.stack([h.phash for h in hashes]))
+        self.dhash_words = pack_hash_bits(np.stack([h.dhash for h in hashes]))
+        self.histograms = np.stack([h.histogram for h in hashes]).astype(np.float32)
+
+        self.phash_bits = len(hashes[0].phash)
+        self.dhash_bits = len(hashes[0].dhash)
+
+        # Score lost per differing bit of each substring
+        chunks_per_word = 64 // MIH_CHUNK_BITS
+        self.bit_weights = np.array(
+            [PHASH_WEIGHT / self.phash_bits] * (self.phash_words.shape[1] * chunks_per_word) +
+            [DHASH_WEIGHT / self.dhash_bits] * (self.dhash_words.shape[1] * chunks_per_word)
+        )
+        # Substring bucket tables are built on the first lookup that uses them
+        self._chunks: np.ndarray | None = None
+        self._bucket_rows: np.ndarray | None = None
+        self._bucket_starts: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def probe_count(self, max_loss: float) -> tuple[list[int], int]:
+        """Substring radii for ``max_loss`` and the neighbours a query probes with them"""
+        radii = _chunk_radii(self.bit_weights, max_loss)
+        return radii, sum(_neighbour_count(radius) for radius in radii if radius >= 0)
+
+    def candidates(self, query_phash: np.ndarray, query_dhash: np.ndarray, max_loss: float) -> np.ndarray | None:
+        """
+        Row indices whose hashes may lose at most ``max_loss`` of score.
+
+        Returns None when every row has to be verified and a full scan is cheaper.
+        """
+        radii, probe_count = self.probe_count(max_loss)
+        if probe_count * MIH_PROBE_COST >= len(self):
+            return None
+
+        self._build_buckets()
+        query_chunks = np.ascontiguousarray(np.concatenate([query_phash, query_dhash])).view(np.uint16)
+        keys = np.concatenate([
+            (chunk << MIH_CHUNK_BITS) + (int(query_chunks[chunk]) ^ _neighbour_mask_cache(radius))
+            for chunk, radius in enumerate(radii) if radius >= 0
+        ])
+        starts = self._bucket_starts[keys]
+        lengths = self._bucket_starts[keys + 1] - starts
+        if (probe_count + int(lengths.sum())) * MIH_PROBE_COST >= len(self):
+            return None
+        # Rows found on several substrings are reported once, in row order
+        found = np.zeros(len(self), dtype=bool)
+        found[self._bucket_rows[_expand_ranges(starts, lengths)]] = True
+        return np.flatnonzero(found)
+
+    def candidate_pairs(self, max_loss: float) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Row pairs (first < second) whose hashes may lose at most ``max_loss``.
+
+        Every row probes the buckets of its substring neighbours, so a pair
+        may be yielded once per substring it matches on.
+
+        Yields:
+            Blocks of (first_rows, second_rows) with at most about
+            PAIR_BLOCK_SIZE pairs each
+        """
+        radii, _ = self.probe_count(max_loss)
+        self._build_buckets()
+        row_count = len(self)
+        for chunk, radius in enumerate(radii):
+            if radius < 0:
+                continue
+            masks = _neighbour_mask_cache(radius)
+            values = self._chunks[:, chunk]
+            block_rows = max(1, PAIR_BLOCK_SIZE // len(masks))
+            for row_start in range(0, row_count, block_rows):
+                rows = np.arange(row_start, min(row_count, row_start + block_rows))
+                keys = ((chunk << MIH_CHUNK_BITS) + (values[rows, np.newaxis] ^ masks)).ravel()
+                starts = self._bucket_starts[keys]
+                lengths = self._bucket_starts[keys + 1] - starts
+                # Most probed buckets are empty
+                probed = np.flatnonzero(lengths)
+                if not len(probed):
+                    continue
+                owners = rows[probed // len(masks)]
+                starts, lengths = starts[probed], lengths[probed]
+
+                # Split the buckets so that each block expands to a bounded number of pairs
+                ends = np.cumsum(lengths)
+                cuts = np.searchsorted(ends, np.arange(PAIR_BLOCK_SIZE, int(ends[-1]), PAIR_BLOCK_SIZE))
+                for lo, hi in itertools.pairwise([0, *np.unique(cuts).tolist(), len(probed)]):
+                    if hi <= lo:
+                        continue
+                    first = np.repeat(owners[lo:hi], lengths[lo:hi])
+                    second = self._bucket_rows[_expand_ranges(starts[lo:hi], lengths[lo:hi])]
+                    keep = first < second
+                    yield first[keep], second[keep]
+
+    def _build_buckets(self) -> None:
+        """Group rows by substring value, one bucket table per substring"""
+        if self._bucket_rows is not None:
+            return
+        self._chunks = np.ascontiguousarray(
+            np.hstack([self.phash_words, self.dhash_words])
+        ).view(np.uint16).astype(np.int64)
+        chunk_count = self._chunks.shape[1]
+        # Key chunk << 16 | value; flattened chunk-major, so row = position % rows
+        keys = (self._chunks + (np.arange(chunk_count) << MIH_CHUNK_BITS)).T.ravel()
+        self._bucket_rows = np.argsort(keys, kind="stable") % len(self)
+        self._bucket_starts = np.zeros((chunk_count << MIH_CHUNK_BITS) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=chunk_count << MIH_CHUNK_BITS), out=self._bucket_starts[1:])
+
 class VisualSimilarityEngine:
     """
     Engine for finding visually similar sprites using multiple techniques.
@@ -53,8 +414,24 @@ class VisualSimilarityEngine:
         self.sprite_database = {}  # offset -> SpriteHash
         self.index_built = False
 
+        # Search index over sprite_database; additions since the last rebuild
+        # are kept in a small secondary index until they are merged
+        self._index: _HashIndex | None = None
+        self._pending_offsets: list[int] = []
+        self._pending_index: _HashIndex | None = None
+
         logger.info(f"Initialized VisualSimilarityEngine with hash_size={hash_size}")
 
+    @property
+    def sprite_database(self) -> MutableMapping[int, SpriteHash]:
+        """Indexed sprites by ROM offset."""
+        return self._sprite_database
+
+    @sprite_database.setter
+    def sprite_database(self, database: dict[int, SpriteHash]) -> None:
+        self._sprite_database = _SpriteDatabase(database)
+        self._sprite_database.structural_change = True
+
     def index_sprite(self, offset: int, image: Image.Image, metadata: dict[str, Any] | None = None) -> SpriteHash:
         """
         Index a sprite for similarity search.
@@ -68,8 +445,7 @@ class VisualSimilarityEngine:
             SpriteHash object
         """
         # Generate multiple hashes for robust matching
-        phash = self._calculate_phash(image)
-        dhash = self._calculate_dhash(image)
+        phash, dhash = self._image_hashes(image)
         histogram = self._calculate_color_histogram(image)
 
         sprite_hash = SpriteHash(
@@ -85,9 +461,149 @@ class VisualSimilarityEngine:
 
         return sprite_hash
 
+    def compute_batch_hashes(
+        self, pixels: np.ndarray, palettes: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate average hashes, difference hashes and histograms for a batch.
+
+        Works directly on decoded 4bpp color indices, so sprites never have to
+        be rendered to PIL images. Downsampling is a Lanczos filter applied as
+        two matrix products over the whole batch, exactly as for single images;
+        the histogram is derived from per-sprite color counts instead of
+        per-pixel RGB values.
+
+        Args:
+            pixels: uint8 array of shape (n, height, width) with values 0-15
+            palettes: RGB palette of shape (16, 3) shared by the batch, one per
+                sprite of shape (n, 16, 3), or None for a grayscale ramp
+
+        Returns:
+            Tuple of (phash, dhash, histogram) arrays of shape (n, 64),
+            (n, 64) and (n, 48) for the default hash size
+        """
+        pixels = np.asarray(pixels, dtype=np.uint8)
+        if pixels.ndim != 3:
+            raise ValueError(f"Pixels must have shape (n, height, width), got {pixels.shape}")
+        count, height, width = pixels.shape
+        flat = pixels.reshape(count, -1) & (PALETTE_COLORS - 1)
+        rgb = _batch_palettes(palettes, count)
+
+        # Grayscale through a per-sprite luminance lookup table
+        luma = _luma(rgb)
+        gray = np.take_along_axis(luma, flat.astype(np.intp), axis=1).reshape(count, height, width)
+
+        phash, dhash = self._gray_hashes(gray)
+
+        # Color counts per sprite, spread over the histogram bin of every channel
+        counts = np.bincount(
+            (flat + np.arange(count)[:, np.newaxis] * PALETTE_COLORS).ravel(),
+            minlength=count * PALETTE_COLORS,
+        ).reshape(count, PALETTE_COLORS).astype(np.float32)
+        bins = rgb // (256 // HISTOGRAM_BINS)
+        one_hot = bins[..., np.newaxis] == np.arange(HISTOGRAM_BINS)
+        histogram = np.einsum("nc,ncbk->nbk", counts, one_hot.astype(np.float32)).reshape(count, -1)
+        histogram /= histogram.sum(axis=1, keepdims=True) + 1e-6
+
+        return phash, dhash, histogram
+
+    def _gray_hashes(self, gray: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Average and difference hashes of a (n, height, width) 8-bit grayscale batch"""
+        count = len(gray)
+        small = _resample(gray, self.hash_size, self.hash_size).astype(np.float32)
+        phash = small > small.mean(axis=(1, 2), keepdims=True)
+
+        wide = _resample(gray, self.hash_size, self.hash_size + 1)
+        dhash = wide[:, :, 1:] > wide[:, :, :-1]
+
+        return phash.reshape(count, -1).astype(np.uint8), dhash.reshape(count, -1).astype(np.uint8)
+
+    def hash_image(self, image: Image.Image, offset: int = -1, metadata: dict[str, Any] | None = None) -> SpriteHash:
+        """
+        Hash an arbitrary image compatibly with compute_batch_hashes.
+
+        Transparent pixels count as black, like the color 0 of rendered
+        sprites, so a PNG exported from a sprite hashes like its tile data.
+        The result is not added to the database.
+
+        Args:
+            image: Reference image in any PIL mode
+            offset: Offset recorded in the returned hash
+            metadata: Optional metadata for the returned hash
+
+        Returns:
+            SpriteHash of the image
+        """
+        phash, dhash = self._image_hashes(image)
+
+        rgb = _flatten_alpha(image)
+        bins = rgb.reshape(-1, 3) // (256 // HISTOGRAM_BINS)
+        histogram = np.concatenate([
+            np.bincount(bins[:, channel], minlength=HISTOGRAM_BINS) for channel in range(3)
+        ]).astype(np.float32)
+        histogram /= histogram.sum() + 1e-6
+
+        return SpriteHash(
+            offset=offset,
+            phash=phash,
+            dhash=dhash,
+            histogram=histogram,
+            metadata=metadata or {}
+        )
+
+    def _image_hashes(self, image: Image.Image) -> tuple[np.ndarray, np.ndarray]:
+        """Average and difference hash of an image, downscaled like compute_batch_hashes"""
+        gray = _luma(_flatten_alpha(image))
+        phash, dhash = self._gray_hashes(gray[np.newaxis])
+        return phash[0], dhash[0]
+
+    def index_sprite_batch(
+        self,
+        offsets: list[int] | np.ndarray,
+        pixels: np.ndarray,
+        palettes: np.ndarray | None = None,
+        metadata: list[dict[str, Any]] | None = None,
+    ) -> list[SpriteHash]:
+        """
+        Index a batch of equally sized sprites from decoded tile data.
+
+        Args:
+            offsets: ROM offsets of the sprites
+            pixels: uint8 array of shape (n, height, width) with values 0-15
+            palettes: Palettes as accepted by compute_batch_hashes
+            metadata: Optional metadata per sprite
+
+        Returns:
+            List of SpriteHash objects in batch order
+        """
+        offsets = [int(offset) for offset in offsets]
+        if len(offsets) != len(pixels):
+            raise ValueError(f"Got {len(offsets)} offsets for {len(pixels)} sprites")
+        if metadata is not None and len(metadata) != len(offsets):
+            raise ValueError(f"Got {len(metadata)} metadata entries for {len(offsets)} sprites")
+        if not offsets:
+            return []
+
+        phashes, dhashes, histograms = self.compute_batch_hashes(pixels, palettes)
+        sprite_hashes = [
+            SpriteHash(
+                offset=offset,
+                phash=phashes[i],
+                dhash=dhashes[i],
+                histogram=histograms[i],
+                metadata=metadata[i] if metadata is not None else {},
+            )
+            for i, offset in enumerate(offsets)
+        ]
+
+        self.sprite_database.update(zip(offsets, sprite_hashes, strict=True))
+        logger.debug(f"Indexed batch of {len(sprite_hashes)} sprites")
+
+        return sprite_hashes
+
     def find_similar(
         self,
-        target: Image.Image | int,
+        target: Image.Image | int | SpriteHash,
         max_results: int = 10,
         similarity_threshold: float = 0.8
     ) -> list[SimilarityMatch]:
@@ -95,7 +611,7 @@ class VisualSimilarityEngine:
         Find sprites similar to target.
 
         Args:
-            target: Either a PIL Image or offset of indexed sprite
+            target: A PIL Image, offset of indexed sprite, or precomputed hash
             max_results: Maximum number of results to return
             similarity_threshold: Minimum similarity score (0.0-1.0)
 
@@ -108,64 +624,174 @@ class VisualSimilarityEngine:
             if target not in self.sprite_database:
                 raise ValueError(f"Sprite at offset 0x{target:X} not indexed")
             target_hash = self.sprite_database[target]
+        elif isinstance(target, SpriteHash):
+            target_hash = target
         else:
             # Calculate hashes for new image
+            phash, dhash = self._image_hashes(target)
             target_hash = SpriteHash(
                 offset=-1,
-                phash=self._calculate_phash(target),
-                dhash=self._calculate_dhash(target),
+                phash=phash,
+                dhash=dhash,
                 histogram=self._calculate_color_histogram(target),
                 metadata={}
             )
 
-        # Search database
-        matches = []
+        return self._search(target_hash, max_results, similarity_threshold)
 
-        for offset, sprite_hash in self.sprite_database.items():
-            # Skip self-comparison
-            if offset == target_hash.offset:
-                continue
+    def search_hashes(
+        self,
+        target_hash: SpriteHash,
+        hashes: list[SpriteHash],
+        max_results: int = 10,
+        similarity_threshold: float = 0.8
+    ) -> list[SimilarityMatch]:
+        """
+        Score a batch of sprite hashes that need not be in the database.
 
-            # Calculate similarity
-            similarity = self._calculate_similarity(target_hash, sprite_hash)
-
-            if similarity >= similarity_threshold:
-                match = SimilarityMatch(
-                    offset=offset,
-                    similarity_score=similarity,
-                    hash_distance=self._hamming_distance(
-                        target_hash.phash,
-                        sprite_hash.phash
-                    ),
-                    metadata=sprite_hash.metadata
-                )
-                matches.append(match)
+        Args:
+            target_hash: Hash to compare against
+            hashes: Candidate hashes
+            max_results: Maximum number of results to return
+            similarity_threshold: Minimum similarity score (0.0-1.0)
 
-        # Sort by similarity and limit results
-        matches.sort(key=lambda x: x.similarity_score, reverse=True)
-        return matches[:max_results]
+        Returns:
+            List of similar sprites sorted by similarity
+        """
+        if not hashes:
+            return []
+        lookup = {sprite_hash.offset: sprite_hash for sprite_hash in hashes}
+        return self._search_indexes([_HashIndex(hashes)], lookup, target_hash, max_results, similarity_threshold)
+
+    def _search(
+        self,
+        target_hash: SpriteHash,
+        max_results: int,
+        similarity_threshold: float
+    ) -> list[SimilarityMatch]:
+        """Search the database for sprites scoring at least the threshold."""
+        indexes = [index for index in self._get_indexes() if index is not None]
+        return self._search_indexes(indexes, self._sprite_database, target_hash, max_results, similarity_threshold)
+
+    def _search_indexes(
+        self,
+        indexes: list[_HashIndex],
+        lookup: dict[int, SpriteHash],
+        target_hash: SpriteHash,
+        max_results: int,
+        similarity_threshold: float
+    ) -> list[SimilarityMatch]:
+        """
+        Search hash indexes for sprites scoring at least the threshold.
+
+        The score can only reach the threshold if the combined phash and dhash
+        distance is small enough, so that bound drives the index lookup; the
+        surviving candidates are scored together as matrix operations.
+        """
+        if not indexes:
+            return []
+
+        phash_bits = len(target_hash.phash)
+        dhash_bits = len(target_hash.dhash)
+        query_phash = pack_hash_bits(target_hash.phash)[0]
+        query_dhash = pack_hash_bits(target_hash.dhash)[0]
+        query_histogram = target_hash.histogram.astype(np.float32)
+
+        # score <= 1 - PHASH_WEIGHT * dp / phash_bits - DHASH_WEIGHT * dd / dhash_bits
+        max_loss = PHASH_WEIGHT + DHASH_WEIGHT + HISTOGRAM_WEIGHT - similarity_threshold
+
+        offsets, scores, distances, ranks = [], [], [], []
+        rank_base = 0
+        for index in indexes:
+            rows = index.candidates(query_phash, query_dhash, max_loss)
+            if rows is None:
+                phash_distance = hamming_distances(index.phash_words, query_phash)
+                dhash_distance = hamming_distances(index.dhash_words, query_dhash)
+            else:
+                phash_distance = hamming_distances(index.phash_words[rows], query_phash)
+                dhash_distance = hamming_distances(index.dhash_words[rows], query_dhash)
+
+            hash_similarity = (
+                (1.0 - phash_distance / phash_bits) * PHASH_WEIGHT +
+                (1.0 - dhash_distance / dhash_bits) * DHASH_WEIGHT
+            )
+            # Only rows that could still reach the threshold need histograms
+            reachable = np.flatnonzero(hash_similarity + HISTOGRAM_WEIGHT >= similarity_threshold)
+            if rows is not None:
+                rows = rows[reachable]
+            else:
+                rows = reachable
+            if len(rows):
+                histogram_similarity = np.minimum(
+                    index.histograms[rows], query_histogram
+                ).sum(axis=1)
+                similarity = (
+                    hash_similarity[reachable] +
+                    histogram_similarity.astype(np.float64) * HISTOGRAM_WEIGHT
+                )
+                keep = (similarity >= similarity_threshold) & (
+                    index.offsets[rows] != target_hash.offset
+                )
+                offsets.append(index.offsets[rows][keep])
+                scores.append(similarity[keep])
+                distances.append(phash_distance[reachable][keep])
+                ranks.append(rows[keep] + rank_base)
+            rank_base += len(index)
+
+        offsets = np.concatenate(offsets) if offsets else np.empty(0, dtype=np.int64)
+        if len(offsets) == 0:
+            return []
+        scores = np.concatenate(scores)
+        distances = np.concatenate(distances)
+        # Best score first; ties keep database order
+        order = np.lexsort((np.concatenate(ranks), -scores))[:max_results]
+
+        return [
+            SimilarityMatch(
+                offset=int(offsets[i]),
+                similarity_score=float(scores[i]),
+                hash_distance=int(distances[i]),
+                metadata=lookup[int(offsets[i])].metadata
+            )
+            for i in order
+        ]
+
+    def _get_indexes(self) -> tuple[_HashIndex | None, _HashIndex | None]:
+        """Bring the search index up to date with sprite_database."""
+        database = self._sprite_database
+        if database.structural_change or (self._index is None and database):
+            self._rebuild_index()
+        elif database.added:
+            self._pending_offsets.extend(database.added)
+            database.added = []
+            limit = max(MIN_PENDING_REBUILD, len(self._index) // 8 if self._index else 0)
+            if len(self._pending_offsets) > limit:
+                self._rebuild_index()
+            else:
+                self._pending_index = _HashIndex(
+                    [database[offset] for offset in self._pending_offsets]
+                )
+        return self._index, self._pending_index
+
+    def _rebuild_index(self) -> None:
+        """Rebuild the search index from the whole database."""
+        database = self._sprite_database
+        hashes = list(database.values())
+        self._index = _HashIndex(hashes) if hashes else None
+        self._pending_offsets = []
+        self._pending_index = None
+        database.added = []
+        database.structural_change = False
 
     def _calculate_phash(self, image: Image.Image) -> np.ndarray:
         """
         Calculate perceptual hash using a simplified approach.
 
         Resistant to scaling and minor changes.
-        Uses average hash instead of DCT for simplicity.
+        Uses average hash instead of DCT for simplicity, with the same Lanczos
+        filter downscale as compute_batch_hashes.
         """
-        # Convert to grayscale and resize
-        img = image.convert("L").resize(
-            (self.hash_size, self.hash_size),
-            Image.Resampling.LANCZOS
-        )
-
-        # Convert to numpy array
-        pixels = np.array(img, dtype=np.float32)
-
-        # Calculate average
-        avg = np.mean(pixels)
-
-        # Generate hash based on average
-        return (pixels > avg).flatten().astype(np.uint8)
+        return self._image_hashes(image)[0]
 
     def _calculate_dhash(self, image: Image.Image) -> np.ndarray:
         """
@@ -173,18 +799,7 @@ class VisualSimilarityEngine:
 
         Good for detecting similar structures.
         """
-        # Resize to hash_size + 1 width
-        img = image.convert("L").resize(
-            (self.hash_size + 1, self.hash_size),
-            Image.Resampling.LANCZOS
-        )
-
-        pixels = np.array(img, dtype=np.float32)
-
-        # Calculate horizontal differences
-        diff = pixels[:, 1:] > pixels[:, :-1]
-
-        return diff.flatten().astype(np.uint8)
+        return self._image_hashes(image)[1]
 
     def _calculate_color_histogram(self, image: Image.Image) -> np.ndarray:
         """
@@ -197,9 +812,10 @@ class VisualSimilarityEngine:
             image = image.convert("RGB")
 
         # Calculate histogram for each channel
-        hist_r = np.histogram(np.array(image)[:, :, 0], bins=16, range=(0, 256))[0]
-        hist_g = np.histogram(np.array(image)[:, :, 1], bins=16, range=(0, 256))[0]
-        hist_b = np.histogram(np.array(image)[:, :, 2], bins=16, range=(0, 256))[0]
+        pixels = np.asarray(image)
+        hist_r = np.histogram(pixels[:, :, 0], bins=HISTOGRAM_BINS, range=(0, 256))[0]
+        hist_g = np.histogram(pixels[:, :, 1], bins=HISTOGRAM_BINS, range=(0, 256))[0]
+        hist_b = np.histogram(pixels[:, :, 2], bins=HISTOGRAM_BINS, range=(0, 256))[0]
 
         # Concatenate and normalize
         histogram = np.concatenate([hist_r, hist_g, hist_b])
@@ -231,9 +847,9 @@ class VisualSimilarityEngine:
 
         # Weighted combination
         return (
-            phash_similarity * 0.4 +
-            dhash_similarity * 0.3 +
-            hist_similarity * 0.3
+            phash_similarity * PHASH_WEIGHT +
+            dhash_similarity * DHASH_WEIGHT +
+            hist_similarity * HISTOGRAM_WEIGHT
         )
 
     def _hamming_distance(self, hash1: np.ndarray, hash2: np.ndarray) -> int:
@@ -249,18 +865,153 @@ class VisualSimilarityEngine:
         intersection = np.minimum(hist1, hist2).sum()
         return float(intersection)
 
+    def similarity_pairs(
+        self,
+        similarity_threshold: float,
+        max_offset_distance: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find all pairs of indexed sprites scoring at least the threshold.
+
+        Candidate pairs come from whichever is cheaper: the multi-index
+        hashing lookup, where every sprite probes the substring neighbours
+        its score could still tolerate, or comparing sprites sorted by offset
+        block by block, where hash distances for a block of rows come from one
+        XOR + popcount over the packed words. With ``max_offset_distance`` only
+        the band of pairs that close together in the ROM is compared. Either
+        way histogram intersections are only evaluated for pairs whose hash
+        score can still reach the threshold.
+
+        Args:
+            similarity_threshold: Minimum similarity score (0.0-1.0)
+            max_offset_distance: Optional maximum offset difference of a pair
+
+        Returns:
+            Tuple of (first_offsets, second_offsets, scores) with
+            first_offsets < second_offsets, sorted by offset
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+        index, pending = self._get_indexes()
+        if pending is not None:
+            # Pairs are searched within one index, so merge the additions first
+            self._rebuild_index()
+            index = self._index
+        if index is None:
+            return empty
+
+        # Positions in offset order; pairs are reported as (lower, higher) position
+        order = np.argsort(index.offsets, kind="stable")
+        offsets = index.offsets[order]
+        count = len(offsets)
+        if max_offset_distance is None:
+            band_end = np.full(count, count)
+        else:
+            band_end = np.searchsorted(offsets, offsets + max_offset_distance, side="right")
+
+        max_loss = PHASH_WEIGHT + DHASH_WEIGHT + HISTOGRAM_WEIGHT - similarity_threshold
+        _, probe_count = index.probe_count(max_loss)
+        scanned_pairs = int((band_end - np.arange(1, count + 1)).sum())
+        if count * probe_count * MIH_PROBE_COST < scanned_pairs:
+            blocks = self._indexed_pairs(index, order, band_end, max_loss)
+        else:
+            blocks = self._scanned_pairs(index, order, band_end, similarity_threshold)
+
+        firsts, seconds, scores = [], [], []
+        for first, second, hash_similarity in blocks:
+            # Histogram intersection only for pairs that can still qualify
+            reachable = hash_similarity + HISTOGRAM_WEIGHT >= similarity_threshold
+            first, second = first[reachable], second[reachable]
+            if not len(first):
+                continue
+            histogram_similarity = np.minimum(
+                index.histograms[order[first]], index.histograms[order[second]]
+            ).sum(axis=1)
+            similarity = (
+                hash_similarity[reachable] +
+                histogram_similarity.astype(np.float64) * HISTOGRAM_WEIGHT
+            )
+            keep = similarity >= similarity_threshold
+            firsts.append(first[keep])
+            seconds.append(second[keep])
+            scores.append(similarity[keep])
+
+        if not firsts:
+            return empty
+        # Index lookups can find a pair on several substrings; report it once
+        pair_keys, unique = np.unique(
+            np.concatenate(firsts) * count + np.concatenate(seconds), return_index=True
+        )
+        return offsets[pair_keys // count], offsets[pair_keys % count], np.concatenate(scores)[unique]
+
+    def _indexed_pairs(
+        self, index: _HashIndex, order: np.ndarray, band_end: np.ndarray, max_loss: float
+    ) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Candidate pairs from the index, as (first, second, hash_similarity) blocks"""
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order))
+
+        for rows_a, rows_b in index.candidate_pairs(max_loss):
+            first = np.minimum(position[rows_a], position[rows_b])
+            second = np.maximum(position[rows_a], position[rows_b])
+            in_band = second < band_end[first]
+            rows_a, rows_b = rows_a[in_band], rows_b[in_band]
+            phash_distance = _popcount(index.phash_words[rows_a] ^ index.phash_words[rows_b])
+            dhash_distance = _popcount(index.dhash_words[rows_a] ^ index.dhash_words[rows_b])
+            hash_similarity = (
+                (1.0 - phash_distance / index.phash_bits) * PHASH_WEIGHT +
+                (1.0 - dhash_distance / index.dhash_bits) * DHASH_WEIGHT
+            )
+            yield first[in_band], second[in_band], hash_similarity
+
+    def _scanned_pairs(
+        self, index: _HashIndex, order: np.ndarray, band_end: np.ndarray, similarity_threshold: float
+    ) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Pairs within the band that may reach the threshold, as (first, second, hash_similarity) blocks"""
+        phash_words = index.phash_words[order]
+        dhash_words = index.dhash_words[order]
+
+        count = len(order)
+        row_start = 0
+        while row_start < count - 1:
+            # A block of b rows spans about b + width columns; keep b * (b + width) bounded
+            width = max(1, int(band_end[row_start]) - row_start - 1)
+            block_rows = int((math.sqrt(width * width + 4 * PAIR_BLOCK_SIZE) - width) / 2)
+            row_end = min(count - 1, row_start + max(1, block_rows))
+            col_start, col_end = row_start + 1, int(band_end[row_end - 1])
+            if col_end <= col_start:
+                row_start = row_end
+                continue
+
+            rows = np.arange(row_start, row_end)
+            cols = np.arange(col_start, col_end)
+            in_band = (cols[np.newaxis, :] > rows[:, np.newaxis]) & (
+                cols[np.newaxis, :] < band_end[rows, np.newaxis]
+            )
+
+            phash_distance = _popcount(phash_words[rows, np.newaxis, :] ^ phash_words[np.newaxis, cols, :])
+            dhash_distance = _popcount(dhash_words[rows, np.newaxis, :] ^ dhash_words[np.newaxis, cols, :])
+            hash_similarity = (
+                (1.0 - phash_distance / index.phash_bits) * PHASH_WEIGHT +
+                (1.0 - dhash_distance / index.dhash_bits) * DHASH_WEIGHT
+            )
+            pair_rows, pair_cols = np.nonzero(
+                in_band & (hash_similarity + HISTOGRAM_WEIGHT >= similarity_threshold)
+            )
+            yield rows[pair_rows], cols[pair_cols], hash_similarity[pair_rows, pair_cols]
+            row_start = row_end
+
     def build_similarity_index(self):
         """
         Build optimized index for fast similarity search.
 
-        Uses LSH (Locality Sensitive Hashing) for approximate nearest neighbor.
+        Packs all hashes for multi-index hashing lookups. Searches keep the
+        index current automatically; calling this merges pending additions.
         """
         if not self.sprite_database:
             logger.warning("No sprites indexed, cannot build similarity index")
             return
 
-        # TODO: Implement LSH index for very large databases
-        # For now, brute force search is sufficient for typical ROM sizes
+        self._rebuild_index()
 
         self.index_built = True
         logger.info(f"Built similarity index for {len(self.sprite_database)} sprites")
@@ -274,8 +1025,12 @@ class VisualSimilarityEngine:
             "index_built": self.index_built
         }
 
-        with Path(path).open("wb") as f:
+        # Write to a temporary file first so readers never see a partial index
+        path = Path(path)
+        temp_path = path.with_name(path.name + ".tmp")
+        with temp_path.open("wb") as f:
             pickle.dump(export_data, f)
+        temp_path.replace(path)
 
         logger.info(f"Exported similarity index to {path}")
 
@@ -291,11 +1046,102 @@ class VisualSimilarityEngine:
 
         logger.info(f"Imported similarity index with {len(self.sprite_database)} sprites")
 
+class SimilarityTopK:
+    """
+    Bounded min-heap keeping the best matches seen across streamed batches.
+
+    Ties are broken in favour of the match seen first, so the final ranking
+    does not depend on batch boundaries.
+    """
+
+    def __init__(self, max_results: int) -> None:
+        """
+        Args:
+            max_results: Number of matches to keep
+        """
+        self.max_results = max_results
+        self._heap: list[tuple[float, int, SimilarityMatch]] = []
+        self._offsets: set[int] = set()
+        self._sequence = 0
+
+    def add(self, matches: list[SimilarityMatch]) -> bool:
+        """
+        Offer matches to the heap.
+
+        Args:
+            matches: Candidate matches; offsets already kept are ignored
+
+        Returns:
+            True if the kept matches changed
+        """
+        changed = False
+        for match in matches:
+            if match.offset in self._offsets or self.max_results <= 0:
+                continue
+            entry = (match.similarity_score, -self._sequence, match)
+            self._sequence += 1
+            if len(self._heap) < self.max_results:
+                heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]:
+                self._offsets.discard(heapq.heapreplace(self._heap, entry)[2].offset)
+            else:
+                continue
+            self._offsets.add(match.offset)
+            changed = True
+        return changed
+
+    @property
+    def threshold(self) -> float | None:
+        """Score a new match must beat once the heap is full, else None"""
+        if len(self._heap) < self.max_results:
+            return None
+        return self._heap[0][0]
+
+    def results(self) -> list[SimilarityMatch]:
+        """Kept matches, best first"""
+        return [match for _, _, match in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+def _connected_components(
+    offsets: list[int], firsts: np.ndarray, seconds: np.ndarray
+) -> list[list[int]]:
+    """
+    Union-find over similarity edges.
+
+    Returns:
+        Components with at least two members, each sorted by offset
+    """
+    position = {offset: i for i, offset in enumerate(offsets)}
+    parent = list(range(len(offsets)))
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]  # Path halving
+            node = parent[node]
+        return node
+
+    for first, second in zip(firsts.tolist(), seconds.tolist(), strict=True):
+        root_a, root_b = find(position[first]), find(position[second])
+        if root_a != root_b:
+            # Keep the lowest offset as root so components stay offset-ordered
+            if root_a < root_b:
+                parent[root_b] = root_a
+            else:
+                parent[root_a] = root_b
+
+    members: dict[int, list[int]] = {}
+    for i, offset in enumerate(offsets):
+        members.setdefault(find(i), []).append(offset)
+    return [group for group in members.values() if len(group) >= 2]
+
 class SpriteGroupFinder:
     """
     Find groups of related sprites (animations, variations).
 
-    Uses similarity search to identify sprite families.
+    Builds a similarity graph from the engine's batched pair search and
+    clusters it with union-find.
     """
 
     def __init__(self, similarity_engine: VisualSimilarityEngine):
@@ -310,30 +1156,22 @@ class SpriteGroupFinder:
         """
         Find groups of similar sprites.
 
+        Sprites are grouped transitively: two sprites share a group when a
+        chain of pairwise matches at the threshold connects them.
+
         Returns:
             List of groups, each group is a list of sprite offsets
         """
-        processed = set()
-        groups = []
-
-        for offset in self.engine.sprite_database:
-            if offset in processed:
-                continue
-
-            # Find all sprites similar to this one
-            similar = self.engine.find_similar(
-                offset,
-                max_results=50,
-                similarity_threshold=similarity_threshold
-            )
-
-            if len(similar) >= min_group_size - 1:
-                group = [offset] + [match.offset for match in similar]
-                groups.append(group)
-                processed.update(group)
+        firsts, seconds, _ = self.engine.similarity_pairs(similarity_threshold)
+        offsets = sorted(self.engine.sprite_database)
+        groups = [
+            group for group in _connected_components(offsets, firsts, seconds)
+            if len(group) >= min_group_size
+        ]
 
         # Sort groups by size
         groups.sort(key=len, reverse=True)
+        self.groups = groups
 
         logger.info(f"Found {len(groups)} sprite groups")
         return groups
@@ -346,6 +1184,9 @@ class SpriteGroupFinder:
         """
         Find animation sequences based on proximity and similarity.
 
+        Only sprite pairs within the proximity are compared, so consecutive
+        frames of every returned sequence are at most that far apart.
+
         Args:
             offset_proximity: Maximum distance between animation frames
             similarity_threshold: Minimum similarity for animation frames
@@ -353,41 +1194,12 @@ class SpriteGroupFinder:
         Returns:
             List of animation sequences
         """
-        animations = []
-        processed = set()
-
-        # Sort sprites by offset
-        sorted_offsets = sorted(self.engine.sprite_database.keys())
-
-        for i, offset in enumerate(sorted_offsets):
-            if offset in processed:
-                continue
-
-            animation = [offset]
-            current_offset = offset
-
-            # Look for subsequent similar sprites
-            for j in range(i + 1, len(sorted_offsets)):
-                next_offset = sorted_offsets[j]
-
-                # Check proximity
-                if next_offset - current_offset > offset_proximity:
-                    break
-
-                # Check similarity
-                similar = self.engine.find_similar(
-                    current_offset,
-                    max_results=10,
-                    similarity_threshold=similarity_threshold
-                )
-
-                if any(match.offset == next_offset for match in similar):
-                    animation.append(next_offset)
-                    current_offset = next_offset
-                    processed.add(next_offset)
-
-            if len(animation) >= 2:
-                animations.append(animation)
+        firsts, seconds, _ = self.engine.similarity_pairs(
+            similarity_threshold, max_offset_distance=offset_proximity
+        )
+        offsets = sorted(self.engine.sprite_database)
+        animations = _connected_components(offsets, firsts, seconds)
+        animations.sort(key=lambda animation: animation[0])
 
         logger.info(f"Found {len(animations)} animation sequences")
         return animations
@@ -23,6 +23,7 @@ from tests.infrastructure.qt_real_testing import (
     QtTestCase,
 )
 from tests.infrastructure.thread_safe_test_image import ThreadSafeTestImage
+from ui.common.thumbnail_scheduler import MAX_WINDOW_ITEMS
 
 
 @pytest.fixture
@@ -209,7 +210,8 @@ class TestCompleteUIWorkflowsIntegration(QtTestCase):
         # Step 6: Verify thumbnail generation was triggered automatically
         # Verify worker was created and thumbnails were queued
         mock_thumbnail_worker_class.assert_called_once()  # Worker was created
-        assert mock_thumbnail_worker.queue_thumbnail.call_count == len(realistic_sprite_data)
+        scheduled = mock_thumbnail_worker.replace_queue.call_args[0][0]
+        assert {request.offset for request in scheduled} == {s['offset'] for s in realistic_sprite_data}
 
         # Step 7: Simulate thumbnail completion
         for sprite in realistic_sprite_data:
@@ -468,8 +470,10 @@ class TestCompleteUIWorkflowsIntegration(QtTestCase):
         assert load_time < 3.0, f"Sprite loading took {load_time:.2f}s, too slow"
         assert thumbnail_setup_time < 1.0, f"Thumbnail setup took {thumbnail_setup_time:.2f}s, too slow"
 
-        # Verify thumbnail queuing
-        assert mock_thumbnail_worker.queue_thumbnail.call_count == 1000
+        # Verify thumbnail queuing is bounded by the viewport window
+        scheduled = mock_thumbnail_worker.replace_queue.call_args[0][0]
+        assert 0 < len(scheduled) <= MAX_WINDOW_ITEMS
+        assert scheduled[0].offset == 0x10000
 
     @patch('ui.windows.detached_gallery_window.get_extraction_manager')
     def test_concurrent_operations_workflow(
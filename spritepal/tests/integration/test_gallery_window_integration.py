@@ -232,10 +232,10 @@ class TestDetachedGalleryWindowIntegration(QtTestCase):
         self.window._set_rom_file(test_rom_file)
 
         # Set some sprite data
-        self.window.sprites_data = [
+        self.window.set_sprites([
             {'offset': 0x10000, 'name': 'Sprite1'},
             {'offset': 0x20000, 'name': 'Sprite2'},
-        ]
+        ])
 
         # Generate thumbnails
         self.window._generate_thumbnails()
@@ -249,8 +249,8 @@ class TestDetachedGalleryWindowIntegration(QtTestCase):
             real_extraction_manager.get_rom_extractor()
         )
 
-        # Verify queue_thumbnail was called for each sprite
-        assert mock_controller.queue_thumbnail.call_count == 2
+        # Verify the viewport schedule covers each sprite
+        mock_controller.schedule_thumbnails.assert_called_with([(0x10000, False), (0x20000, False)], 256)
 
         # Verify controller is stored on the window
         assert self.window.thumbnail_controller is not None
@@ -0,0 +1,158 @@
+"""Tests for pipelined, resumable batch extraction"""
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+from core.batch_extraction import LEDGER_FILENAME, BatchExtractionJob, BatchSprite
+from PIL import Image
+from tests.infrastructure.mock_hal import MockHALCompressor
+from utils.constants import BYTES_PER_TILE
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.file_io,
+    pytest.mark.no_qt,
+    pytest.mark.ci_safe,
+]
+
+def solid_tile(index: int) -> bytes:
+    """4bpp tile with every pixel set to one color index"""
+    planes = [0xFF if index & (1 << bit) else 0x00 for bit in range(4)]
+    return bytes([planes[0], planes[1]] * 8 + [planes[2], planes[3]] * 8)
+
+class TileHAL:
+    """Decompresses offset N to N % 16 solid tiles; offsets listed in bad fail"""
+
+    def __init__(self, bad: tuple[int, ...] = ()) -> None:
+        self.bad = bad
+        self.batches: list[list[int]] = []
+        self.on_batch = None
+
+    def decompress_batch(self, requests):
+        self.batches.append([offset for _rom, offset in requests])
+        if self.on_batch:
+            self.on_batch(len(self.batches))
+        return [
+            (False, "bad header") if offset in self.bad else (True, solid_tile(offset % 16) * (offset % 16 + 1))
+            for _rom, offset in requests
+        ]
+
+def run(tmp_path, hal, offsets, rom="game.sfc", **kwargs):
+    job = BatchExtractionJob(hal, rom, str(tmp_path / "out"), **kwargs)
+    return job, job.run([BatchSprite(offset) for offset in offsets])
+
+class TestBatchExtraction:
+    """Test the decompress -> decode -> encode pipeline"""
+
+    def test_extracts_every_sprite_once(self, tmp_path):
+        hal = TileHAL(bad=(0x105,))
+        progress = []
+        job = BatchExtractionJob(hal, "game.sfc", str(tmp_path / "out"), chunk_size=3)
+
+        sprites = [BatchSprite(offset) for offset in (0x101, 0x102, 0x103, 0x102, 0x104, 0x105)]
+        summary = job.run([*sprites, BatchSprite(0x106, "boss")], progress.append)
+
+        assert hal.batches == [[0x101, 0x102, 0x103], [0x104, 0x105, 0x106]]
+        assert (summary.total, summary.extracted, summary.failed) == (6, 5, 1)
+        assert summary.sprites_per_second > 0
+        assert progress[-1].completed == 6
+        assert (tmp_path / "out" / "boss.png").exists()
+        with Image.open(tmp_path / "out" / "sprite_000103.png") as image:
+            assert image.size == (128, 8)
+            assert np.all(np.asarray(image)[:, :32] == 3 * 17)
+
+        records = [json.loads(line) for line in (tmp_path / "out" / LEDGER_FILENAME).read_text().splitlines()]
+        assert len(records) == 6
+        assert records[0]["tile_count"] == 2
+        assert records[0]["decompressed_size"] == 2 * BYTES_PER_TILE
+        assert "bad header" in records[4]["error"]
+
+    def test_palette_is_applied(self, tmp_path):
+        palette = [[i * 10, 0, 255 - i * 10] for i in range(16)]
+        _job, summary = run(tmp_path, TileHAL(), [0x102], palette=palette)
+
+        with Image.open(summary.results[0].png_path) as image:
+            assert np.all(np.asarray(image)[:, :24] == 2)
+            assert image.getpalette()[6:9] == [20, 0, 235]
+
+    def test_rerun_resumes_and_retries_failures(self, tmp_path):
+        run(tmp_path, TileHAL(bad=(0x102,)), [0x101, 0x102, 0x103])
+        (tmp_path / "out" / "sprite_000103.png").unlink()
+
+        hal = TileHAL()
+        _job, summary = run(tmp_path, hal, [0x101, 0x102, 0x103])
+
+        assert hal.batches == [[0x102, 0x103]]
+        assert (summary.resumed, summary.extracted, summary.failed) == (1, 2, 0)
+
+    def test_palette_change_is_not_resumed(self, tmp_path):
+        palette = [[i * 10, 0, 255 - i * 10] for i in range(16)]
+        run(tmp_path, TileHAL(), [0x101, 0x102], palette=palette)
+
+        hal = TileHAL()
+        _job, summary = run(tmp_path, hal, [0x101, 0x102])
+        assert hal.batches == [[0x101, 0x102]]
+        assert summary.resumed == 0
+        with Image.open(summary.results[0].png_path) as image:
+            assert np.all(np.asarray(image)[:, :8] == 1 * 17)
+
+        hal = TileHAL()
+        _job, summary = run(tmp_path, hal, [0x101, 0x102])
+        assert hal.batches == []
+        assert summary.resumed == 2
+
+    def test_rom_change_is_not_resumed(self, tmp_path):
+        first_rom = tmp_path / "first.sfc"
+        second_rom = tmp_path / "second.sfc"
+        first_rom.write_bytes(b"\x01" * 0x8000)
+        second_rom.write_bytes(b"\x02" * 0x8000)
+        run(tmp_path, TileHAL(), [0x101, 0x102], rom=str(first_rom))
+
+        hal = TileHAL()
+        _job, summary = run(tmp_path, hal, [0x101, 0x102], rom=str(second_rom))
+        assert hal.batches == [[0x101, 0x102]]
+        assert summary.resumed == 0
+
+        hal = TileHAL()
+        _job, summary = run(tmp_path, hal, [0x101, 0x102], rom=str(second_rom))
+        assert hal.batches == []
+        assert summary.resumed == 2
+
+    def test_cancel_stops_between_chunks(self, tmp_path):
+        hal = TileHAL()
+        job = BatchExtractionJob(hal, "game.sfc", str(tmp_path / "out"), chunk_size=2)
+        hal.on_batch = lambda count: count == 2 and job.cancel()
+
+        summary = job.run([BatchSprite(offset) for offset in range(0x101, 0x109)])
+
+        assert len(hal.batches) == 2
+        assert summary.cancelled
+        assert len(summary.results) == 4
+
+        hal = TileHAL()
+        _job, summary = run(tmp_path, hal, range(0x101, 0x109))
+        assert not summary.cancelled
+        assert (summary.resumed, summary.extracted) == (4, 4)
+        assert hal.batches == [list(range(0x105, 0x109))]
+
+    def test_chunks_in_flight_are_bounded(self, tmp_path):
+        hal = TileHAL()
+        drained = []
+        held = []
+        # Chunks still held (decompressed, not yet written) when the next one is decompressed
+        hal.on_batch = lambda count: held.append(count - 1 - len(drained))
+        job = BatchExtractionJob(hal, "game.sfc", str(tmp_path / "out"), chunk_size=1, max_chunks_in_flight=2)
+
+        summary = job.run([BatchSprite(offset) for offset in range(0x101, 0x107)], drained.append)
+
+        assert summary.extracted == 6
+        assert held == [0, 1, 1, 1, 1, 1]
+
+    def test_with_mock_hal(self, tmp_path):
+        _job, summary = run(tmp_path, MockHALCompressor(use_pool=False), [0x8000, 0x9000])
+
+        assert summary.extracted == 2
+        assert summary.results[0].tile_count == 0x8000 // BYTES_PER_TILE
@@ -0,0 +1,190 @@
+"""Tests for the headless command-line interface"""
+from __future__ import annotations
+
+import io
+import json
+import logging
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import cli
+import pytest
+from tests.infrastructure.mock_hal import MockHALCompressor
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.file_io,
+    pytest.mark.no_qt,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+SPRITEPAL_DIR = Path(__file__).parent.parent
+
+def run_cli(*argv: str) -> tuple[int, list[dict]]:
+    stdout = io.StringIO()
+    code = cli.main(list(argv), stdout=stdout)
+    return code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+class FakeSpriteFinder:
+    """Reports a sprite wherever the ROM holds the byte 0x5A"""
+
+    def __init__(self, hal_compressor=None):
+        self.hal_compressor = hal_compressor
+
+    def find_sprite_at_offset(self, rom_data, offset):
+        if rom_data[offset] != 0x5A:
+            return None
+        return {"decompressed_size": 0x800, "compressed_size": 0x100, "tile_count": 64}
+
+@pytest.fixture(autouse=True)
+def restore_log_level():
+    """main() sets the spritepal log level for the command line"""
+    logger = logging.getLogger("spritepal")
+    level = logger.level
+    yield
+    logger.setLevel(level)
+
+@pytest.fixture
+def rom(tmp_path):
+    data = bytearray(range(256)) * (0x80000 // 256)
+    for offset in (0x1000, 0x48000):
+        data[offset] = 0x5A
+    path = tmp_path / "game.sfc"
+    path.write_bytes(data)
+    return path
+
+@pytest.fixture
+def fake_finder():
+    """Scan workers find sprites with FakeSpriteFinder"""
+    with patch("core.parallel_sprite_finder.SpriteFinder", FakeSpriteFinder), \
+         patch("core.hal_compression.HALCompressor", MockHALCompressor):
+        yield
+
+@pytest.fixture
+def mock_hal():
+    with patch("core.rom_extractor.HALCompressor", lambda: MockHALCompressor(use_pool=False)), \
+         patch("core.rom_injector.HALCompressor", lambda: MockHALCompressor(use_pool=False)):
+        yield
+
+def test_startup_does_not_load_qt():
+    code = (
+        "import sys, cli, "
+        "core.rom_extractor, core.batch_extraction, core.parallel_sprite_finder, "
+        "core.visual_similarity_search, utils.rom_cache; "
+        "print(any(name.startswith('PySide6') for name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=SPRITEPAL_DIR, capture_output=True, text=True, timeout=60, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+def test_scan_streams_and_caches_results(rom, tmp_path, fake_finder):
+    cache_dir = str(tmp_path / "cache")
+    code, events = run_cli("scan", str(rom), "--jobs", "1", "--step", "0x100", "--cache-dir", cache_dir)
+
+    assert code == 0
+    sprites = [event for event in events if event["event"] == "sprite"]
+    assert sorted(sprite["offset"] for sprite in sprites) == [0x1000, 0x48000]
+    assert not any(sprite["cached"] for sprite in sprites)
+    assert events[-1]["event"] == "summary"
+    assert events[-1]["found"] == 2
+
+    code, events = run_cli("scan", str(rom), "--jobs", "1", "--step", "0x100", "--cache-dir", cache_dir)
+    assert [event["offset"] for event in events if event["event"] == "sprite" and event["cached"]] == [0x1000, 0x48000]
+    assert events[-2]["cached"]
+    assert events[0]["tile_count"] == 64
+
+def test_extract_defaults_to_cached_scan_results(rom, tmp_path, fake_finder, mock_hal):
+    cache_dir = str(tmp_path / "cache")
+    run_cli("scan", str(rom), "--jobs", "1", "--cache-dir", cache_dir)
+
+    code, events = run_cli("extract", str(rom), "--output", str(tmp_path / "out"), "--cache-dir", cache_dir)
+
+    assert code == 0
+    assert [event["offset"] for event in events if event["event"] == "sprite"] == [0x1000, 0x48000]
+    assert events[-1]["extracted"] == 2
+    assert (tmp_path / "out" / "sprite_001000.png").exists()
+
+def test_index_writes_similarity_index(rom, tmp_path, mock_hal):
+    from core.visual_similarity_search import VisualSimilarityEngine
+
+    index_path = tmp_path / "index.pkl"
+    code, events = run_cli("index", str(rom), "--output", str(index_path), "--offset", "0x1000", "--offset", "0x2000")
+
+    assert code == 0
+    assert events[-1]["indexed"] == 2
+    engine = VisualSimilarityEngine()
+    engine.import_index(index_path)
+    assert sorted(engine.sprite_database) == [0x1000, 0x2000]
+
+def test_errors_are_reported_as_json(tmp_path):
+    code, events = run_cli("scan", str(tmp_path / "missing.sfc"), "--cache-dir", str(tmp_path))
+
+    assert code == 2
+    assert events == [{"event": "error", "command": "scan", "error": events[0]["error"]}]
+    assert "FileNotFoundError" in events[0]["error"]
+
+class LengthPrefixedHAL:
+    """Decompresses a stream stored as a 2-byte length followed by the data"""
+
+    def decompress_batch(self, requests):
+        results = []
+        for rom_path, offset in requests:
+            data = Path(rom_path).read_bytes()
+            size = int.from_bytes(data[offset:offset + 2], "little")
+            results.append((True, data[offset + 2:offset + 2 + size]) if size else (False, "Invalid stream"))
+        return results
+
+def test_remap_saves_offsets_for_the_new_version(tmp_path):
+    sprite = (0x200).to_bytes(2, "little") + bytes(range(256)) * 2
+    reference = tmp_path / "us.sfc"
+    reference.write_bytes(b"\x00" * 0x1000 + sprite + b"\x00" * (0x10000 - 0x1000 - len(sprite)))
+    target = bytearray(b"\x00" * 0x10000)
+    target[0x1400:0x1400 + len(sprite)] = sprite
+    target[0x7FC0:0x7FC4] = b"GAME"
+    target[0x7FDC:0x7FE0] = (0xBEEF ^ 0xFFFF).to_bytes(2, "little") + (0xBEEF).to_bytes(2, "little")
+    (tmp_path / "eu.sfc").write_bytes(target)
+    config_path = tmp_path / "sprites.json"
+    config_path.write_text(json.dumps({"games": {"GAME": {"sprites": {"Hero": {"offset": "0x1000"}}}}}))
+
+    with patch("core.rom_extractor.HALCompressor", LengthPrefixedHAL), \
+         patch("core.rom_injector.HALCompressor", LengthPrefixedHAL):
+        code, events = run_cli(
+            "remap", str(reference), str(tmp_path / "eu.sfc"), "--offset", "0x1000",
+            "--save-version", "Europe", "--game", "GAME", "--config", str(config_path),
+        )
+
+    assert code == 0
+    assert events[0]["target_offset"] == 0x1400
+    assert events[-1]["moved"] == 1
+    game = json.loads(config_path.read_text())["games"]["GAME"]
+    assert game["checksums"]["Europe"] == "0xBEEF"
+    assert game["sprites"]["Hero"]["offsets"]["Europe"] == "0x1400"
+
+def test_remap_fails_when_no_config_sprite_matches(tmp_path):
+    sprite = (0x200).to_bytes(2, "little") + bytes(range(256)) * 2
+    data = bytearray(b"\x00" * 0x10000)
+    data[0x1000:0x1000 + len(sprite)] = sprite
+    data[0x7FC0:0x7FC4] = b"GAME"
+    data[0x7FDC:0x7FE0] = (0xBEEF ^ 0xFFFF).to_bytes(2, "little") + (0xBEEF).to_bytes(2, "little")
+    reference = tmp_path / "us.sfc"
+    reference.write_bytes(data)
+    config_path = tmp_path / "sprites.json"
+    config = json.dumps({"games": {"GAME": {"sprites": {"Hero": {"offset": "0x3000"}}}}})
+    config_path.write_text(config)
+
+    with patch("core.rom_extractor.HALCompressor", LengthPrefixedHAL), \
+         patch("core.rom_injector.HALCompressor", LengthPrefixedHAL):
+        code, events = run_cli(
+            "remap", str(reference), str(reference), "--offset", "0x1000",
+            "--save-version", "Europe", "--game", "GAME", "--config", str(config_path),
+        )
+
+    assert code == 1
+    assert events[-2]["event"] == "error"
+    assert events[-1]["updated"] == 0
+    assert config_path.read_text() == config
@@ -0,0 +1,214 @@
+"""Tests for the free space map, pointer table entries and sprite relocation"""
+from __future__ import annotations
+
+import struct
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from core.free_space import FreeSpaceMap, PointerTableEntry
+from core.region_analyzer import EmptyRegionDetector
+from core.rom_injector import ROMInjector
+from core.sprite_config_loader import SpriteConfig
+from PIL import Image
+from tests.infrastructure.mock_hal import MockHALCompressor
+from utils.rom_checksum import calculate_snes_checksum
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+ROM_SIZE = 0x80000
+HEADER_BASE = 0xFFC0
+SPRITE_OFFSET = 0x20000
+SPRITE_SLOT = 32  # Too small for the 51 bytes the mock compresses a 16x16 sprite to
+POINTER_OFFSET = 0x10000
+FREE_START, FREE_END = 0x40000, 0x41000
+
+def make_rom(path) -> bytes:
+    """512KB ROM with one small sprite slot, a pointer to it and a block of 0xFF padding"""
+    rom = bytearray(b"\x55" * ROM_SIZE)
+    rom[SPRITE_OFFSET:SPRITE_OFFSET + SPRITE_SLOT] = b"\x11" * SPRITE_SLOT
+    rom[SPRITE_OFFSET + SPRITE_SLOT:SPRITE_OFFSET + SPRITE_SLOT + 16] = b"\xff" * 16
+    rom[FREE_START:FREE_END] = b"\xff" * (FREE_END - FREE_START)
+    rom[POINTER_OFFSET:POINTER_OFFSET + 3] = PointerTableEntry(POINTER_OFFSET).encode(SPRITE_OFFSET)
+    rom[HEADER_BASE:HEADER_BASE + 21] = b"RELOCATE TEST".ljust(21)
+    struct.pack_into("<HH", rom, HEADER_BASE + 28, 0xFFFF, 0x0000)
+    checksum = calculate_snes_checksum(rom)
+    struct.pack_into("<HH", rom, HEADER_BASE + 28, checksum ^ 0xFFFF, checksum)
+    path.write_bytes(rom)
+    return bytes(rom)
+
+def make_sprite(path) -> str:
+    pixels = np.random.default_rng(0).integers(0, 16, (16, 16), dtype=np.uint8)
+    image = Image.fromarray(pixels, mode="P")
+    image.putpalette([value for i in range(16) for value in (i * 16, i * 16, i * 16)])
+    image.save(path)
+    return str(path)
+
+class TestFreeSpaceMap:
+    """Test building and querying the free space index"""
+
+    def test_fill_runs(self):
+        data = bytearray(b"\x12" * 1000)
+        data[100:200] = b"\xff" * 100
+        data[300:330] = b"\x00" * 30
+        data[900:] = b"\x00" * 100
+
+        runs = EmptyRegionDetector().find_fill_runs(data, min_length=64)
+
+        assert runs == [(100, 200), (900, 1000)]
+
+    def test_from_rom_excludes_blocks_guard_and_header(self):
+        rom = bytearray(b"\x55" * 0x20000)
+        rom[0x1000:0x3000] = b"\xff" * 0x2000
+        rom[0x7F00:0x8100] = b"\x00" * 0x200  # Spans a bank boundary and the LoROM header
+
+        free = FreeSpaceMap.from_rom(rom, occupied=[(0x1800, 0x100)], guard=16)
+
+        assert free.extents == [(0x1010, 0x1800), (0x1900, 0x3000), (0x7F10, 0x7FB0), (0x8000, 0x8100)]
+        assert free.total_free == 0x7F0 + 0x1700 + 0xA0 + 0x100
+
+    def test_best_fit_lookup_and_allocation(self):
+        free = FreeSpaceMap([(0x100, 0x200), (0x8100, 0x8140), (0x9000, 0xB000)])
+
+        assert free.find(0x40) == 0x8100
+        assert free.find(0x41) == 0x100
+        assert free.find(0x40, bank=0) == 0x100
+        assert free.find(0x200, bank=0) is None
+        assert free.find(0x10000) is None
+
+        assert free.allocate(0x30, bank=1) == 0x8100
+        assert free.extents == [(0x100, 0x200), (0x8130, 0x8140), (0x9000, 0xB000)]
+        free.reserve(0x9800, 0x100)
+        assert free.extents == [(0x100, 0x200), (0x8130, 0x8140), (0x9000, 0x9800), (0x9900, 0xB000)]
+        with pytest.raises(ValueError, match="not free space"):
+            free.reserve(0x97F0, 0x20)
+
+    def test_release_merges_within_bank(self):
+        free = FreeSpaceMap([(0x7000, 0x9000)])
+        assert free.extents == [(0x7000, 0x8000), (0x8000, 0x9000)]
+
+        free.reserve(0x7F00, 0x100)
+        free.reserve(0x8000, 0x80)
+        free.release(0x7F00, 0x100)
+        free.release(0x8000, 0x80)
+
+        assert free.extents == [(0x7000, 0x8000), (0x8000, 0x9000)]
+        assert free.find(0x1000, bank=0) == 0x7000
+        with pytest.raises(ValueError, match="already free"):
+            free.release(0x6F80, 0x100)
+
+class TestPointerTableEntry:
+    """Test pointer encoding"""
+
+    @pytest.mark.parametrize(("pointer", "offset", "raw"), [
+        (PointerTableEntry(0), 0x20000, b"\x00\x80\x04"),
+        (PointerTableEntry(0, bank_bits=0x80), 0x2ABCD, b"\xcd\xab\x85"),
+        (PointerTableEntry(0, mapping="hirom"), 0x123456, b"\x56\x34\xd2"),
+        (PointerTableEntry(0, mapping="linear"), 0x123456, b"\x56\x34\x12"),
+    ])
+    def test_round_trip(self, pointer, offset, raw):
+        assert pointer.encode(offset) == raw
+        assert pointer.decode(raw) == offset
+
+    def test_two_byte_pointer_uses_target_bank(self):
+        pointer = PointerTableEntry(0, width=2)
+        assert pointer.encode(0x2ABCD) == b"\xcd\xab"
+        assert pointer.decode(b"\xcd\xab", bank=5) == 0x2ABCD
+        with pytest.raises(ValueError, match="width"):
+            PointerTableEntry(0, width=4)
+
+class TestRelocation:
+    """Test injecting a sprite that outgrew its slot"""
+
+    @pytest.fixture
+    def injector(self):
+        with patch("core.rom_injector.HALCompressor", lambda: MockHALCompressor(use_pool=False)):
+            return ROMInjector()
+
+    def test_relocates_and_repoints(self, injector, tmp_path):
+        rom_path = tmp_path / "game.sfc"
+        original = make_rom(rom_path)
+        output = tmp_path / "out.sfc"
+        pointer = PointerTableEntry(POINTER_OFFSET)
+
+        success, message = injector.inject_sprite_to_rom(
+            make_sprite(tmp_path / "s.png"), str(rom_path), str(output), SPRITE_OFFSET,
+            create_backup=False, relocate_pointer=pointer,
+        )
+
+        assert success, message
+        data = output.read_bytes()
+        new_offset = pointer.decode(data[POINTER_OFFSET:POINTER_OFFSET + 3])
+        assert FREE_START < new_offset < FREE_END
+        assert f"relocated from 0x{SPRITE_OFFSET:X}" in message
+        assert data[new_offset:new_offset + 10] == b"MOCK_COMP_"
+        assert data[SPRITE_OFFSET:SPRITE_OFFSET + SPRITE_SLOT] == original[SPRITE_OFFSET:SPRITE_OFFSET + SPRITE_SLOT]
+        assert struct.unpack_from("<H", data, HEADER_BASE + 30)[0] == calculate_snes_checksum(data)
+
+    def test_without_pointer_or_space_fails(self, injector, tmp_path):
+        rom_path = tmp_path / "game.sfc"
+        make_rom(rom_path)
+        sprite = make_sprite(tmp_path / "s.png")
+
+        success, message = injector.inject_sprite_to_rom(
+            sprite, str(rom_path), str(tmp_path / "a.sfc"), SPRITE_OFFSET, create_backup=False
+        )
+        assert not success
+        assert "too large" in message
+
+        success, message = injector.inject_sprite_to_rom(
+            sprite, str(rom_path), str(tmp_path / "b.sfc"), SPRITE_OFFSET, create_backup=False,
+            relocate_pointer=PointerTableEntry(POINTER_OFFSET + 1),
+        )
+        assert not success
+        assert "not the sprite" in message
+
+        success, message = injector.inject_sprite_to_rom(
+            sprite, str(rom_path), str(tmp_path / "c.sfc"), SPRITE_OFFSET, create_backup=False,
+            relocate_pointer=PointerTableEntry(POINTER_OFFSET, width=2),
+        )
+        assert not success
+        assert "no free block of 51 bytes in bank 0x04" in message
+        assert not (tmp_path / "c.sfc").exists()
+
+    def test_known_sprites_are_not_overwritten(self, injector, tmp_path):
+        rom_path = tmp_path / "game.sfc"
+        make_rom(rom_path)
+        output = tmp_path / "out.sfc"
+        pointer = PointerTableEntry(POINTER_OFFSET)
+        # A configured sprite and a scanned one cover the padding except its tail
+        configured = SpriteConfig("Known", FREE_START, "", True, 0x800)
+        scanned = [{"offset": FREE_START + 0x800, "compressed_size": 0x700}]
+
+        with patch.object(injector.sprite_config_loader, "get_game_sprites", return_value={"Known": configured}), \
+                patch("core.rom_injector.get_rom_cache", return_value=Mock(get_cached_scan_sprites=Mock(return_value=scanned))):
+            success, message = injector.inject_sprite_to_rom(
+                make_sprite(tmp_path / "s.png"), str(rom_path), str(output), SPRITE_OFFSET,
+                create_backup=False, relocate_pointer=pointer,
+            )
+
+        assert success, message
+        new_offset = pointer.decode(output.read_bytes()[POINTER_OFFSET:POINTER_OFFSET + 3])
+        assert FREE_START + 0xF00 <= new_offset < FREE_END
+
+    def test_failed_injection_releases_reserved_space(self, injector, tmp_path):
+        rom_path = tmp_path / "game.sfc"
+        original = make_rom(rom_path)
+        free = FreeSpaceMap.from_rom(original)
+        extents = free.extents
+
+        with patch("core.rom_injector.ROMBackupManager.create_journaled_backup", side_effect=OSError("disk full")):
+            success, message = injector.inject_sprite_to_rom(
+                make_sprite(tmp_path / "s.png"), str(rom_path), str(tmp_path / "out.sfc"), SPRITE_OFFSET,
+                relocate_pointer=PointerTableEntry(POINTER_OFFSET), free_space=free,
+            )
+
+        assert not success
+        assert "backup creation failed" in message
+        assert free.extents == extents
+        assert not (tmp_path / "out.sfc").exists()
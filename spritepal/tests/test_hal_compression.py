@@ -522,12 +522,8 @@ class TestHALProcessPoolIntegration:
 
     def test_qt_cleanup_integration(self):
         """Test Qt cleanup integration when QApplication is available"""
-        with patch('core.hal_compression.QT_AVAILABLE', True), \
-             patch('core.hal_compression.QApplication') as mock_qapp:
-
-            mock_app = Mock()
-            mock_qapp.instance.return_value = mock_app
-
+        mock_app = Mock()
+        with patch('core.hal_compression._qt_application', return_value=mock_app):
             pool = HALProcessPool()
             pool._connect_qt_cleanup()
 
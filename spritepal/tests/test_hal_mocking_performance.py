@@ -61,7 +61,7 @@ class TestHALMockingPerformance:
         assert not result.success
         assert result.error_message == "Simulated error for testing"
 
-    def test_mock_statistics_tracking(self, hal_pool):
+    def test_mock_statistics_tracking(self, hal_pool, tmp_path):
         """Test that mock tracks usage statistics."""
         # Perform various operations
         decompress_req = HALRequest(
@@ -76,7 +76,7 @@ class TestHALMockingPerformance:
             rom_path="",
             offset=0,
             data=b"test data",
-            output_path="test.compressed",
+            output_path=str(tmp_path / "test.compressed"),
             request_id="stats_2"
         )
 
@@ -0,0 +1,237 @@
+"""Tests for the vectorized wildcard hex pattern search"""
+from __future__ import annotations
+
+import mmap
+import re
+
+import numpy as np
+import pytest
+from core.hex_pattern_search import (
+    HexPattern,
+    HexPatternMatcher,
+    MultiPatternMatcher,
+    RegexPatternSet,
+    find_hex_pattern,
+    match_all_within_window,
+    parse_hex_pattern,
+)
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+def brute_force_matches(data: bytes, pattern: HexPattern, alignment: int, overlapping: bool) -> list[int]:
+    """Reference byte-by-byte matcher"""
+    matches = []
+    next_allowed = 0
+    for offset in range(len(data) - pattern.length + 1):
+        if offset % alignment or offset < next_allowed:
+            continue
+        if all(m == 0 or data[offset + i] == v for i, (v, m) in enumerate(zip(pattern.values, pattern.mask, strict=True))):
+            matches.append(offset)
+            if not overlapping:
+                next_allowed = offset + pattern.length
+    return matches
+
+def brute_force_windows(hits, ends, window_size, data_size, alignment):
+    """Reference sliding-window scan for AND queries"""
+    results = []
+    start = 0
+    while start <= data_size - window_size:
+        if start % alignment:
+            start += 1
+            continue
+        chosen = []
+        for offsets, hit_ends in zip(hits, ends, strict=True):
+            fitting = [i for i, (o, e) in enumerate(zip(offsets, hit_ends, strict=True))
+                       if o >= start and e <= start + window_size]
+            if not fitting:
+                break
+            chosen.append(fitting[0])
+        if len(chosen) == len(hits):
+            if not results or results[-1][1] != chosen:
+                results.append((start, chosen))
+            start += max(window_size // 2, 1)
+        else:
+            start += 1
+    return results
+
+def random_patterns(rng, count):
+    return [
+        parse_hex_pattern(" ".join(
+            "??" if rng.random() < 0.3 else f"{rng.integers(0, 4):02X}" for _ in range(rng.integers(1, 6))
+        ))
+        for _ in range(count)
+    ]
+
+class TestParseHexPattern:
+    """Test pattern parsing"""
+
+    def test_wildcards_and_separators(self):
+        pattern = parse_hex_pattern(" a9, ?? 8d ? 21 ")
+        assert pattern.values == bytes([0xA9, 0x00, 0x8D, 0x00, 0x21])
+        assert pattern.mask == bytes([0xFF, 0x00, 0xFF, 0x00, 0xFF])
+        assert pattern.length == 5
+
+    @pytest.mark.parametrize("pattern_str", ["", "   ", "GG", "123", "0x12"])
+    def test_invalid_patterns(self, pattern_str):
+        with pytest.raises(ValueError):
+            parse_hex_pattern(pattern_str)
+
+class TestHexPatternMatcher:
+    """Test matching against a brute-force reference"""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_reference(self, seed):
+        rng = np.random.default_rng(seed)
+        for _ in range(60):
+            data = rng.integers(0, 4, int(rng.integers(0, 400)), dtype=np.uint8).tobytes()
+            tokens = ["??" if rng.random() < 0.3 else f"{rng.integers(0, 4):02X}" for _ in range(rng.integers(1, 7))]
+            pattern = parse_hex_pattern(" ".join(tokens))
+            alignment = int(rng.choice([1, 2, 3, 4]))
+            overlapping = bool(rng.random() < 0.5)
+
+            found = []
+            for _, offsets in HexPatternMatcher(pattern).iter_matches(
+                data, alignment, overlapping, chunk_size=int(rng.integers(1, 64))
+            ):
+                found.extend(offsets.tolist())
+
+            assert found == brute_force_matches(data, pattern, alignment, overlapping), tokens
+
+    def test_long_anchor_with_wildcards(self):
+        data = bytearray(0x10000)
+        for offset in (0x100, 0x2001, 0x8000):
+            data[offset:offset + 6] = bytes([0xA9, offset & 0xFF, 0x8D, 0x00, 0x21, 0x60])
+        data[0x9000:0x9005] = bytes([0xA9, 0x12, 0x8D, 0x00, 0x22])
+
+        assert find_hex_pattern(bytes(data), "A9 ?? 8D 00 21").tolist() == [0x100, 0x2001, 0x8000]
+        assert find_hex_pattern(bytes(data), "A9 ?? 8D 00 21", alignment=0x100).tolist() == [0x100, 0x8000]
+
+    def test_non_overlapping_across_chunks(self):
+        data = bytes(10)
+        matcher = HexPatternMatcher(parse_hex_pattern("00 00 00"))
+        found = [o for _, offsets in matcher.iter_matches(data, chunk_size=4) for o in offsets.tolist()]
+        assert found == [0, 3, 6]
+
+    def test_max_results(self):
+        assert find_hex_pattern(bytes(100), "00", max_results=7).tolist() == list(range(7))
+
+    def test_wildcard_only_pattern(self):
+        assert find_hex_pattern(bytes(10), "?? ??", alignment=4).tolist() == [0, 4, 8]
+
+    def test_searches_mmap_without_copy(self, tmp_path):
+        rom_path = tmp_path / "rom.bin"
+        data = bytearray(0x4000)
+        data[0x1230:0x1234] = b"\x12\x34\x56\x78"
+        rom_path.write_bytes(data)
+
+        with rom_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as rom_data:
+            assert find_hex_pattern(rom_data, "12 ?? 56 78").tolist() == [0x1230]
+
+class TestMultiPatternMatcher:
+    """Test single-pass matching of pattern sets"""
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_matches_reference_per_pattern(self, seed):
+        rng = np.random.default_rng(seed)
+        for _ in range(60):
+            data = rng.integers(0, 4, int(rng.integers(0, 300)), dtype=np.uint8).tobytes()
+            patterns = random_patterns(rng, int(rng.integers(1, 5)))
+            alignment = int(rng.choice([1, 2, 3]))
+            overlapping = bool(rng.random() < 0.5)
+
+            found = {i: [] for i in range(len(patterns))}
+            for _, offsets, pattern_ids in MultiPatternMatcher(patterns).iter_matches(
+                data, alignment, overlapping, chunk_size=int(rng.integers(1, 50))
+            ):
+                for offset, pattern_id in zip(offsets.tolist(), pattern_ids.tolist(), strict=True):
+                    found[pattern_id].append(offset)
+
+            for i, pattern in enumerate(patterns):
+                assert found[i] == brute_force_matches(data, pattern, alignment, overlapping)
+
+    def test_find_all_splits_by_pattern(self):
+        data = bytearray(0x1000)
+        data[0x10:0x13] = b"\x01\x02\x03"
+        data[0x20:0x22] = b"\xAA\xBB"
+        data[0x800:0x803] = b"\x01\x7F\x03"
+        matcher = MultiPatternMatcher([parse_hex_pattern("01 ?? 03"), parse_hex_pattern("AA BB")])
+
+        first, second = matcher.find_all(bytes(data))
+
+        assert first.tolist() == [0x10, 0x800]
+        assert second.tolist() == [0x20]
+
+class TestRegexPatternSet:
+    """Test single-pass matching of regex sets"""
+
+    @pytest.mark.parametrize("with_groups", [False, True])
+    def test_matches_finditer(self, with_groups):
+        rng = np.random.default_rng(7)
+        sources = [b"ab", b"a+b", b"c.a", b"bb?c"] + ([b"(a)b\\1"] if with_groups else [])
+        patterns = [re.compile(source) for source in sources]
+        for _ in range(40):
+            data = rng.integers(97, 100, int(rng.integers(0, 200)), dtype=np.uint8).tobytes()
+            found = {i: [] for i in range(len(patterns))}
+            for _, hits in RegexPatternSet(patterns).iter_matches(data, chunk_size=int(rng.integers(1, 50))):
+                for offset, pattern_id, match in hits:
+                    found[pattern_id].append((offset, match.end()))
+
+            for i, pattern in enumerate(patterns):
+                assert found[i] == [(m.start(), m.end()) for m in pattern.finditer(data)]
+
+    def test_overlapping_matches_every_position(self):
+        rng = np.random.default_rng(9)
+        patterns = [re.compile(source) for source in (b"ab", b"a+b", b"(a)a?\\1", b"c?")]
+        for _ in range(40):
+            data = rng.integers(97, 100, int(rng.integers(0, 200)), dtype=np.uint8).tobytes()
+            found = []
+            for _, hits in RegexPatternSet(patterns).iter_matches(data, overlapping=True, chunk_size=int(rng.integers(1, 50))):
+                found.extend((offset, pattern_id, match.end()) for offset, pattern_id, match in hits)
+
+            expected = []
+            for position in range(len(data)):
+                for i, pattern in enumerate(patterns):
+                    match = pattern.match(data, position)
+                    if match is not None:
+                        expected.append((position, i, match.end()))
+            assert found == expected
+
+    def test_broad_pattern_over_large_buffer(self):
+        data = np.random.default_rng(3).integers(0, 256, 1 << 20, dtype=np.uint8).tobytes()
+        patterns = [re.compile(rb"[\x00-\xff]{3}"), re.compile(rb"\x00")]
+        chunks = list(RegexPatternSet(patterns).iter_matches(data, chunk_size=1 << 18))
+
+        assert [scanned for scanned, _ in chunks] == [1 << 18, 2 << 18, 3 << 18, 4 << 18]
+        offsets = [offset for _, hits in chunks for offset, pattern_id, _ in hits if pattern_id == 0]
+        assert offsets == list(range(0, len(data) - 2, 3))
+        assert sum(len(hits) for _, hits in chunks) == len(offsets) + data.count(0)
+
+class TestWindowMerge:
+    """Test AND-within-window evaluation"""
+
+    def test_matches_sliding_scan(self):
+        rng = np.random.default_rng(11)
+        for _ in range(300):
+            data_size = int(rng.integers(0, 400))
+            window_size = int(rng.integers(1, 60))
+            alignment = int(rng.choice([1, 2, 4]))
+            hits, ends = [], []
+            for _ in range(rng.integers(1, 4)):
+                offsets = np.sort(rng.choice(max(data_size, 1), rng.integers(0, 20)))
+                hits.append(offsets)
+                ends.append(offsets + rng.integers(1, 8, len(offsets)))
+
+            assert match_all_within_window(hits, ends, window_size, data_size, alignment) == brute_force_windows(
+                [h.tolist() for h in hits], [e.tolist() for e in ends], window_size, data_size, alignment
+            )
+
+    def test_max_results_and_missing_pattern(self):
+        hits = [np.arange(0, 1000, 10), np.arange(5, 1000, 10)]
+        ends = [h + 2 for h in hits]
+        assert len(match_all_within_window(hits, ends, 16, 1000, max_results=3)) == 3
+        assert match_all_within_window([hits[0], np.empty(0, dtype=np.int64)], ends, 16, 1000) == []
@@ -4,9 +4,17 @@ from __future__ import annotations
 import logging
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 from PIL import Image
-from utils.image_utils import create_checkerboard_pattern, pil_to_qpixmap
+from utils.image_utils import (
+    build_color_table,
+    create_checkerboard_pattern,
+    create_indexed_qimage,
+    create_scaled_indexed_qimage,
+    fit_size,
+    pil_to_qpixmap,
+)
 
 # Check if Qt is available without initializing
 try:
@@ -302,3 +310,42 @@ class TestCreateCheckerboardPattern:
         assert img.getpixel((0, 0)) == (200, 200, 200)
         assert img.getpixel((50, 0)) == (255, 255, 255)
         assert img.getpixel((100, 0)) == (200, 200, 200)
+
+class TestScaledIndexedImage:
+    """Test nearest-neighbor scaling into Indexed8 images"""
+
+    @staticmethod
+    def pixels(image) -> np.ndarray:
+        stride = image.bytesPerLine()
+        data = np.frombuffer(image.constBits(), dtype=np.uint8, count=stride * image.height())
+        return data.reshape(image.height(), stride)[:, :image.width()]
+
+    @pytest.mark.parametrize("shape", [(8, 128), (64, 128), (128, 40), (24, 24), (1, 3)])
+    @pytest.mark.parametrize("size", [32, 128, 256])
+    def test_size_matches_qt_keep_aspect_ratio(self, shape, size):
+        from PySide6.QtCore import Qt
+
+        image = create_indexed_qimage(np.zeros(shape, dtype=np.uint8))
+        scaled = image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio)
+        assert fit_size(shape[1], shape[0], size) == (scaled.width(), scaled.height())
+
+    def test_integer_upscale_repeats_pixels(self):
+        from PySide6.QtGui import QImage
+
+        indices = np.random.default_rng(0).integers(0, 16, (16, 32), dtype=np.uint8)
+        table = build_color_table([[i * 17] * 3 for i in range(16)])
+
+        image = create_scaled_indexed_qimage(indices, 64, table)
+
+        assert image.format() == QImage.Format.Format_Indexed8
+        assert (image.width(), image.height()) == (64, 32)
+        np.testing.assert_array_equal(self.pixels(image), np.kron(indices, np.ones((2, 2), dtype=np.uint8)))
+        assert image.colorTable() == table
+
+    def test_downscale_samples_source_pixels(self):
+        indices = np.arange(30 * 30, dtype=np.int64).reshape(30, 30) % 256
+
+        image = create_scaled_indexed_qimage(indices, 10)
+
+        np.testing.assert_array_equal(self.pixels(image), indices[::3, ::3])
+        assert create_scaled_indexed_qimage(np.zeros((0, 8), dtype=np.uint8), 10).isNull()
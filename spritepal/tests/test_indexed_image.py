@@ -0,0 +1,96 @@
+"""Tests for in-memory indexed images and the extraction pipeline built on them"""
+from __future__ import annotations
+
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from core.indexed_image import PNG_FAST_COMPRESS_LEVEL, IndexedImage
+from PIL import Image
+from tests.infrastructure.mock_hal import MockHALCompressor
+from utils.constants import BYTES_PER_TILE
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.file_io,
+    pytest.mark.no_qt,
+    pytest.mark.ci_safe,
+]
+
+def solid_tile(index: int) -> bytes:
+    """4bpp tile with every pixel set to one color index"""
+    planes = [0xFF if index & (1 << bit) else 0x00 for bit in range(4)]
+    return bytes([planes[0], planes[1]] * 8 + [planes[2], planes[3]] * 8)
+
+class TestIndexedImage:
+    """Test decoding and PNG encoding"""
+
+    def test_from_4bpp_grayscale_sheet(self):
+        image = IndexedImage.from_4bpp(solid_tile(15) + solid_tile(1) * 16 + b"\x00" * 5)
+
+        assert image.tile_count == 17
+        assert (image.width, image.height) == (128, 16)
+        assert image.pixels[0, 0] == 255
+        assert image.pixels[0, 8] == 17
+        assert image.pixels[8, 8] == 0  # Unused cell on the last row
+
+        pil = image.to_pil()
+        assert pil.mode == "P"
+        assert pil.getpixel((0, 0)) == 255
+        assert pil.getpalette()[17 * 3:18 * 3] == [17, 17, 17]
+
+    def test_empty_data(self):
+        image = IndexedImage.from_4bpp(b"\x00" * (BYTES_PER_TILE - 1))
+        assert image.tile_count == 0
+        assert image.height == 0
+
+    def test_large_sheets_skip_optimizer(self, tmp_path):
+        small = IndexedImage(np.zeros((8, 8), dtype=np.uint8))
+        large = IndexedImage(np.zeros((512, 256), dtype=np.uint8))
+
+        with patch.object(Image.Image, "save") as save:
+            small.save_png(str(tmp_path / "small.png"))
+            large.save_png(str(tmp_path / "large.png"))
+
+        assert save.call_args_list[0].kwargs == {"optimize": True}
+        assert save.call_args_list[1].kwargs == {"optimize": False, "compress_level": PNG_FAST_COMPRESS_LEVEL}
+
+    def test_async_save_round_trips(self, tmp_path):
+        image = IndexedImage.from_4bpp(solid_tile(3) * 20)
+        path = str(tmp_path / "sheet.png")
+
+        assert image.save_png_async(path).result(timeout=10) == path
+        with Image.open(path) as saved:
+            assert saved.mode == "P"
+            assert np.array_equal(np.asarray(saved), image.pixels)
+
+class TestInMemoryExtraction:
+    """Test ROMExtractor.extract_sprite_image"""
+
+    @pytest.fixture
+    def extractor(self):
+        with patch("core.rom_extractor.HALCompressor", MockHALCompressor), \
+             patch("core.rom_injector.HALCompressor", MockHALCompressor):
+            from core.rom_extractor import ROMExtractor
+            extractor = ROMExtractor()
+        extractor.rom_injector = Mock()
+        extractor.rom_injector.read_rom_header.return_value = Mock(title="TEST ROM", checksum=0x1234)
+        extractor.sprite_config_loader = Mock(config_data={"games": {}})
+        extractor.sprite_config_loader.get_game_sprites.return_value = {}
+        return extractor
+
+    def test_image_is_returned_without_reading_the_png(self, extractor, tmp_path):
+        rom_path = tmp_path / "test.sfc"
+        rom_path.write_bytes(b"\x00" * 0x10000)
+        sprite_data = solid_tile(7) * 4
+        extractor.rom_injector.find_compressed_sprite.return_value = (100, sprite_data)
+
+        with patch("PIL.Image.open", side_effect=AssertionError("PNG reopened")):
+            extraction = extractor.extract_sprite_image(str(rom_path), 0x8000, str(tmp_path / "sprite"))
+            assert extraction.png_written.result(timeout=10) == str(tmp_path / "sprite.png")
+
+        assert extraction.image.tile_count == 4
+        assert extraction.image.pixels[0, 0] == 7 * 17
+        assert extraction.extraction_info["tile_count"] == 4
+        assert (tmp_path / "sprite.png").exists()
@@ -0,0 +1,144 @@
+"""Tests for porting sprite offsets between ROM revisions"""
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+from core.batch_extraction import BatchSprite
+from core.offset_remapper import OffsetRemapper, window_hashes
+from core.sprite_config_loader import SpriteConfigLoader
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.file_io,
+    pytest.mark.no_qt,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+class FakeHAL:
+    """Decompresses a stream stored as a 2-byte length followed by the data"""
+
+    def __init__(self) -> None:
+        self.requests: list[tuple[str, int]] = []
+
+    def decompress_batch(self, requests):
+        self.requests.extend(requests)
+        results = []
+        for rom_path, offset in requests:
+            data = Path(rom_path).read_bytes()
+            size = int.from_bytes(data[offset:offset + 2], "little")
+            if size == 0 or offset + 2 + size > len(data):
+                results.append((False, "Invalid stream"))
+            else:
+                results.append((True, data[offset + 2:offset + 2 + size]))
+        return results
+
+def stream(seed: int, size: int = 256) -> bytes:
+    return size.to_bytes(2, "little") + random.Random(seed).randbytes(size)
+
+def make_rom(path: Path, parts: list[bytes], size: int = 0x10000) -> str:
+    data = b"".join(parts)
+    path.write_bytes(data + b"\xff" * (size - len(data)))
+    return str(path)
+
+def test_window_hashes_match_naive_rolling_hash():
+    data = random.Random(1).randbytes(100)
+    base, mask = 0x100000001B3, (1 << 64) - 1
+
+    expected = []
+    for start in range(len(data) - 8 + 1):
+        value = 0
+        for byte in data[start:start + 8]:
+            value = (value * base + byte) & mask
+        expected.append(value)
+
+    assert window_hashes(data, 8).tolist() == expected
+    assert window_hashes(data[:4], 8).size == 0
+
+def test_moved_sprites_are_found(tmp_path):
+    sprites = [stream(seed) for seed in range(3)]
+    reference = make_rom(tmp_path / "us.sfc", [b"\x00" * 0x100, sprites[0], sprites[1], b"\x00" * 0x40, sprites[2]])
+    # The revision inserts code in front of the second sprite
+    target = make_rom(tmp_path / "eu.sfc", [b"\x00" * 0x100, sprites[0], b"\xea" * 0x333, sprites[1], b"\x00" * 0x40, sprites[2]])
+    offsets = [0x100, 0x100 + len(sprites[0]), 0x100 + len(sprites[0]) * 2 + 0x40]
+
+    hal = FakeHAL()
+    summary = OffsetRemapper(hal).remap(reference, target, [BatchSprite(offset) for offset in offsets])
+
+    assert [result.target_offset for result in summary.results] == [offsets[0], offsets[1] + 0x333, offsets[2] + 0x333]
+    assert (summary.found, summary.moved, summary.missing) == (3, 2, 0)
+    # Only the reference sprites and the verified candidates are decompressed
+    assert len(hal.requests) == 6
+
+def test_changed_and_missing_sprites_are_reported(tmp_path):
+    original = stream(1)
+    # Same compressed prefix, different data further in
+    changed = original[:64] + bytes(b ^ 0xFF for b in original[64:])
+    reference = make_rom(tmp_path / "us.sfc", [original, stream(2)])
+    target = make_rom(tmp_path / "eu.sfc", [b"\x00" * 0x10, changed])
+
+    summary = OffsetRemapper(FakeHAL()).remap(
+        reference, target, [BatchSprite(0, "changed"), BatchSprite(len(original), "gone"), BatchSprite(0xFFF0, "bad")]
+    )
+
+    errors = {result.name: result.error for result in summary.results}
+    assert "differs" in errors["changed"]
+    assert "not found" in errors["gone"]
+    assert "failed to decompress" in errors["bad"]
+    assert summary.missing == 3
+
+def test_nearest_copy_wins(tmp_path):
+    sprite = stream(7)
+    reference = make_rom(tmp_path / "us.sfc", [b"\x00" * 0x2000, sprite])
+    target = make_rom(tmp_path / "eu.sfc", [sprite, b"\x00" * 0x2100, sprite])
+
+    result = OffsetRemapper(FakeHAL()).remap(reference, target, [BatchSprite(0x2000)]).results[0]
+
+    assert result.target_offset == len(sprite) + 0x2100
+    assert result.candidates == [len(sprite) + 0x2100, 0]
+
+def test_remapped_offsets_apply_to_the_new_version(tmp_path):
+    config_path = tmp_path / "sprites.json"
+    config_path.write_text(json.dumps({"games": {"GAME": {
+        "checksums": {"USA": "0x1234"},
+        "sprites": {"Hero": {"offset": "0x1000"}, "Enemy": {"offset": "0x2000"}},
+    }}}))
+
+    loader = SpriteConfigLoader(str(config_path))
+    remapped = [("sprite_001000", 0x1000, 0x1333), ("sprite_005000", 0x5000, 0x10)]
+    assert loader.add_version_offsets("GAME", "Europe", 0xBEEF, remapped) == 1
+    loader.save_config()
+
+    sprites = SpriteConfigLoader(str(config_path)).get_game_sprites("GAME", 0xBEEF)
+    assert (sprites["Hero"].offset, sprites["Enemy"].offset) == (0x1333, 0x2000)
+    assert SpriteConfigLoader(str(config_path)).get_game_sprites("GAME", 0x1234)["Hero"].offset == 0x1000
+
+def test_remapping_from_a_remapped_version(tmp_path):
+    config_path = tmp_path / "sprites.json"
+    config_path.write_text(json.dumps({"games": {"GAME": {
+        "checksums": {"USA": "0x1234", "Europe": "0xBEEF"},
+        "sprites": {
+            "Hero": {"offset": "0x1000", "offsets": {"Europe": "0x1333"}},
+            "Enemy": {"offset": "0x2000", "offsets": {"Europe": "0x2333"}},
+        },
+    }}}))
+
+    # Named by the config, or only known by their offset in the Europe ROM
+    loader = SpriteConfigLoader(str(config_path))
+    remapped = [("Hero", 0x1333, 0x1444), ("sprite_002333", 0x2333, 0x2444)]
+    assert loader.add_version_offsets("GAME", "Europe_Rev1", 0xCAFE, remapped) == 2
+
+    sprites = loader.get_game_sprites("GAME", 0xCAFE)
+    assert (sprites["Hero"].offset, sprites["Enemy"].offset) == (0x1444, 0x2444)
+
+def test_unmatched_version_is_not_added(tmp_path):
+    config_path = tmp_path / "sprites.json"
+    config_path.write_text(json.dumps({"games": {"GAME": {"sprites": {"Hero": {"offset": "0x1000"}}}}}))
+
+    loader = SpriteConfigLoader(str(config_path))
+    assert loader.add_version_offsets("GAME", "Europe", 0xBEEF, [("sprite_005000", 0x5000, 0x10)]) == 0
+    assert "checksums" not in loader.config_data["games"]["GAME"]
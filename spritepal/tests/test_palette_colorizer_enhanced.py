@@ -675,3 +675,59 @@ class TestPaletteColorizerEnhanced:
         # Cache should be faster
         assert second_call_time < first_call_time
         assert result1 is result2
+
+    def test_get_display_qimage_swaps_color_table(self):
+        """Test that palette switches reuse the same Indexed8 QImage"""
+        from PySide6.QtGui import QImage
+
+        colorizer = PaletteColorizer()
+        test_image = Image.new("L", (4, 4))
+        test_image.putpixel((1, 0), 16)  # Index 1
+
+        colorizer.set_palettes({
+            8: [(0, 0, 0), (255, 0, 0)],
+            9: [(0, 0, 0), (0, 255, 0)],
+        })
+
+        # Palette mode off: nothing to show
+        assert colorizer.get_display_qimage(0, test_image) is None
+
+        colorizer.toggle_palette_mode()
+        colorizer.set_selected_palette(8)
+        qimage = colorizer.get_display_qimage(0, test_image)
+        assert qimage.format() == QImage.Format.Format_Indexed8
+        assert qimage.pixel(1, 0) == 0xFFFF0000
+        assert (qimage.pixel(0, 0) >> 24) & 0xFF == 0  # Index 0 transparent
+
+        colorizer.set_selected_palette(9)
+        recolored = colorizer.get_display_qimage(0, test_image)
+        assert recolored is qimage
+        assert recolored.pixel(1, 0) == 0xFF00FF00
+
+    def test_get_display_qimage_tracks_row_image(self):
+        """Test that a new image for the same row rebuilds the index data"""
+        colorizer = PaletteColorizer()
+        colorizer.set_palettes({8: [(0, 0, 0), (255, 0, 0), (0, 0, 255)]})
+        colorizer.toggle_palette_mode()
+
+        first = Image.new("L", (2, 2), 16)
+        second = Image.new("L", (2, 2), 32)
+
+        assert colorizer.get_display_qimage(0, first).pixel(0, 0) == 0xFFFF0000
+        assert colorizer.get_display_qimage(0, second).pixel(0, 0) == 0xFF0000FF
+
+    def test_row_preview_widget_draws_indexed_qimage(self, qapp):
+        """Test that row previews paint the colorizer's Indexed8 QImage"""
+        from ui.widgets.row_widgets import RowPreviewWidget
+
+        colorizer = PaletteColorizer()
+        colorizer.set_palettes({8: [(0, 0, 0), (255, 0, 0)]})
+        colorizer.toggle_palette_mode()
+        qimage = colorizer.get_display_qimage(0, Image.new("L", (8, 8), 16))
+
+        widget = RowPreviewWidget(0, qimage, 1)
+        widget.resize(350, 85)
+        grabbed = widget.grab().toImage()
+
+        # The 8x8 row is scaled into the image well at (7, 7)
+        assert grabbed.pixel(10, 10) == 0xFFFF0000
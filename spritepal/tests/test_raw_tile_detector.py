@@ -0,0 +1,169 @@
+"""Tests for raw 4bpp graphics detection and bulk region map updates"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from core.navigation.data_structures import NavigationStrategy, RegionType, SpriteLocation
+from core.navigation.raw_tile_detector import (
+    RawTileConfig,
+    RawTileDetector,
+    compute_tile_coherence,
+    tile_pixel_entropy,
+)
+from core.navigation.region_map import SpriteRegionMap
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+def encode_4bpp_tiles(pixels: np.ndarray) -> bytes:
+    """Encode (n, 8, 8) color indices as SNES 4bpp tiles"""
+    tiles = np.zeros((len(pixels), 32), dtype=np.uint8)
+    for plane in range(4):
+        bits = ((pixels >> plane) & 1).astype(np.uint8)
+        packed = np.packbits(bits, axis=2)[:, :, 0]
+        base = 0 if plane < 2 else 16
+        tiles[:, base + (plane & 1):base + 16:2] = packed
+    return tiles.tobytes()
+
+def make_graphics(tile_count: int, seed: int = 1) -> bytes:
+    """Smooth blob-shaped tiles resembling real sprite graphics"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[:8, :8]
+    pixels = np.zeros((tile_count, 8, 8), dtype=np.uint8)
+    for tile in pixels:
+        cy, cx = rng.integers(0, 8, 2)
+        radius = rng.integers(2, 6)
+        distance = np.hypot(yy - cy, xx - cx)
+        tile[distance < radius] = rng.integers(1, 16)
+        tile[distance < radius / 2] = rng.integers(1, 16)
+    return encode_4bpp_tiles(pixels)
+
+def make_rom(size: int = 0x40000, seed: int = 0) -> bytearray:
+    """Random (compressed-looking) ROM data"""
+    rng = np.random.default_rng(seed)
+    return bytearray(rng.integers(0, 256, size, dtype=np.uint8).tobytes())
+
+def make_location(offset: int, confidence: float = 0.5) -> SpriteLocation:
+    return SpriteLocation(
+        offset=offset,
+        compressed_size=64,
+        decompressed_size=64,
+        confidence=confidence,
+        region_type=RegionType.UNCOMPRESSED,
+        tile_count=2,
+        visual_complexity=0.5,
+        similarity_fingerprint=b"",
+        discovery_strategy=NavigationStrategy.LINEAR,
+    )
+
+class TestTileStatistics:
+    """Test the vectorized per-offset statistics"""
+
+    def test_coherence_separates_graphics_from_noise(self):
+        rom_data = make_rom(0x2000)
+        graphics = make_graphics(32)
+        rom_data[0x800:0x800 + len(graphics)] = graphics
+
+        coherence, blank = compute_tile_coherence(bytes(rom_data))
+
+        assert len(coherence) == len(rom_data) - 31
+        assert coherence[0x800:0x800 + len(graphics) - 32:32].mean() > 0.8
+        assert abs(coherence[:0x400].mean() - 0.5) < 0.02
+        assert not blank[:0x400].any()
+
+    def test_blank_tiles_flagged(self):
+        rom_data = bytes(64) + b"\x12" * 32 + bytes(range(32))
+        _, blank = compute_tile_coherence(rom_data)
+        assert blank[0] and blank[32] and blank[64]
+        assert not blank[96]
+
+    def test_pixel_entropy_bounds(self):
+        solid = np.frombuffer(encode_4bpp_tiles(np.full((1, 8, 8), 5, dtype=np.uint8)), dtype=np.uint8)
+        spread = np.arange(64, dtype=np.uint8).reshape(1, 8, 8) % 16
+        entropy = tile_pixel_entropy(
+            np.vstack([solid, np.frombuffer(encode_4bpp_tiles(spread), dtype=np.uint8)]).reshape(2, 32)
+        )
+        assert entropy[0] == 0.0
+        assert entropy[1] == pytest.approx(4.0)
+
+class TestRawTileDetector:
+    """Test run detection and region map population"""
+
+    @pytest.mark.parametrize("offset", [0x10000, 0x10013, 0x10020])
+    def test_detects_run_on_correct_grid(self, offset):
+        rom_data = make_rom()
+        graphics = make_graphics(120)
+        rom_data[offset:offset + len(graphics)] = graphics
+
+        runs = RawTileDetector().find_runs(bytes(rom_data))
+
+        assert len(runs) == 1
+        assert runs[0].offset == offset
+        assert runs[0].tile_count == 120
+
+    def test_random_and_padding_rejected(self):
+        rom_data = make_rom()
+        rom_data[0x8000:0x10000] = bytes(0x8000)
+        assert RawTileDetector().find_runs(bytes(rom_data)) == []
+
+    def test_repeated_tiles_rejected(self):
+        rom_data = make_rom()
+        pattern = make_graphics(2) * 40
+        rom_data[0x10000:0x10000 + len(pattern)] = pattern
+        assert RawTileDetector().find_runs(bytes(rom_data)) == []
+
+    def test_short_runs_ignored(self):
+        rom_data = make_rom()
+        graphics = make_graphics(8)
+        rom_data[0x10000:0x10000 + len(graphics)] = graphics
+        assert RawTileDetector(RawTileConfig(min_tiles=16)).find_runs(bytes(rom_data)) == []
+
+    def test_populate_region_map(self):
+        rom_data = make_rom()
+        for offset, seed in ((0x4000, 1), (0x20000, 2)):
+            graphics = make_graphics(64, seed)
+            rom_data[offset:offset + len(graphics)] = graphics
+        region_map = SpriteRegionMap(rom_size=len(rom_data))
+        progress = []
+
+        added = RawTileDetector().populate_region_map(
+            region_map, bytes(rom_data), lambda done, total: progress.append((done, total))
+        )
+
+        assert added == 2
+        sprites = region_map.get_sprites_by_region(RegionType.UNCOMPRESSED)
+        assert [s.offset for s in sprites] == [0x4000, 0x20000]
+        assert sprites[0].compressed_size == 64 * 32
+        assert sprites[0].metadata["format"] == "raw_4bpp"
+        assert progress[-1][0] == progress[-1][1]
+
+class TestRegionMapBulkAdd:
+    """Test SpriteRegionMap.add_sprites"""
+
+    def test_bulk_add_keeps_order_and_statistics(self):
+        region_map = SpriteRegionMap(rom_size=0x10000)
+        region_map.add_sprite(make_location(0x400))
+
+        added = region_map.add_sprites([make_location(0x800), make_location(0x100)])
+
+        assert added == 2
+        assert [s.offset for s in region_map] == [0x100, 0x400, 0x800]
+        assert region_map.get_region_statistics()["total_sprites"] == 3
+
+    def test_bulk_add_respects_confidence(self):
+        region_map = SpriteRegionMap(rom_size=0x10000)
+        region_map.add_sprite(make_location(0x400, confidence=0.8))
+
+        added = region_map.add_sprites(
+            [make_location(0x400, confidence=0.5), make_location(0x600, confidence=0.3),
+             make_location(0x600, confidence=0.9)]
+        )
+
+        assert added == 1
+        assert region_map.get_sprite(0x400).confidence == 0.8
+        assert region_map.get_sprite(0x600).confidence == 0.9
+        assert len(region_map.get_sprites_by_region(RegionType.UNCOMPRESSED)) == 2
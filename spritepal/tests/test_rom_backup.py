@@ -0,0 +1,104 @@
+"""Tests for full-copy and journaled patch ROM backups"""
+from __future__ import annotations
+
+import itertools
+from pathlib import Path
+
+import pytest
+from utils.rom_backup import ROMBackupManager
+from utils.rom_exceptions import ROMBackupError
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.file_io,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+def patch_rom(rom_path: Path, offset: int, new: bytes) -> tuple[bytearray, list[tuple[int, bytes, bytes]]]:
+    """Apply one patch in memory, as an injection does before writing"""
+    data = bytearray(rom_path.read_bytes())
+    patches = [(offset, bytes(data[offset:offset + len(new)]), new)]
+    data[offset:offset + len(new)] = new
+    return data, patches
+
+def journaled_edit(rom_path: Path, offset: int, new: bytes) -> str:
+    data, patches = patch_rom(rom_path, offset, new)
+    backup = ROMBackupManager.create_journaled_backup(str(rom_path), data, patches)
+    rom_path.write_bytes(data)
+    return backup
+
+@pytest.fixture
+def rom(tmp_path):
+    path = tmp_path / "game.sfc"
+    path.write_bytes(bytes(range(256)) * 256)
+    return path
+
+class TestJournaledBackups:
+    """Test patch journaling, anchors and restore"""
+
+    def test_first_backup_adds_full_anchor(self, rom):
+        original = rom.read_bytes()
+        first = journaled_edit(rom, 0x100, b"\xaa" * 16)
+        second = journaled_edit(rom, 0x2001, b"\xbb" * 5)
+
+        assert first.endswith(".sppatch")
+        assert second.endswith(".sppatch")
+        assert Path(second).stat().st_size < 1024
+
+        backups = ROMBackupManager.list_backups(str(rom))
+        assert [b["kind"] for b in backups] == ["patch", "patch", "full"]
+        assert backups[0]["ranges"] == [(0x2001, 5)]
+        assert Path(backups[2]["path"]).read_bytes() == original
+
+    def test_restore_replays_chain_in_reverse(self, rom):
+        anchor = journaled_edit(rom, 0x10, b"\x01" * 4)
+        states = [rom.read_bytes()]
+        patches = []
+        for i, offset in enumerate([0x100, 0x104, 0x100, 0x3000]):
+            patches.append(journaled_edit(rom, offset, bytes([0x40 + i]) * 8))
+            states.append(rom.read_bytes())
+
+        chain = [b for b in ROMBackupManager.list_backups(str(rom)) if b["kind"] == "patch"]
+        assert [b["path"] for b in chain] == [*patches[::-1], anchor]
+        for newer, older in itertools.pairwise(chain):
+            assert newer["base_sha256"] == older["result_sha256"]
+
+        ROMBackupManager.restore_backup(patches[2], str(rom))
+        assert rom.read_bytes() == states[2]
+        ROMBackupManager.restore_backup(patches[0], str(rom))
+        assert rom.read_bytes() == states[0]
+
+    def test_restore_fails_without_chain(self, rom):
+        journaled_edit(rom, 0x10, b"\x01" * 4)
+        patch_path = journaled_edit(rom, 0x20, b"\x02" * 4)
+        rom.write_bytes(b"\x00" * rom.stat().st_size)
+
+        with pytest.raises(ROMBackupError, match="No patch chain"):
+            ROMBackupManager.restore_backup(patch_path, str(rom))
+
+    def test_anchor_interval(self, rom, monkeypatch):
+        monkeypatch.setattr(ROMBackupManager, "ANCHOR_INTERVAL", 2)
+        monkeypatch.setattr(ROMBackupManager, "MAX_BACKUPS_PER_ROM", 100)
+        for i in range(6):
+            assert journaled_edit(rom, 0x100 + i * 2, bytes([i])).endswith(".sppatch")
+
+        kinds = [b["kind"] for b in ROMBackupManager.list_backups(str(rom))][::-1]
+        assert kinds == ["full", "patch", "patch", "full", "patch", "patch", "full", "patch", "patch"]
+
+    def test_restore_across_anchors(self, rom):
+        states, patches = [], []
+        for i in range(2 * ROMBackupManager.ANCHOR_INTERVAL + 3):
+            states.append(rom.read_bytes())
+            patches.append(journaled_edit(rom, 0x40 * i, bytes([i + 1]) * 8))
+        assert sum(b["kind"] == "full" for b in ROMBackupManager.list_backups(str(rom))) == 3
+
+        # Taken before the last two anchors
+        ROMBackupManager.restore_backup(patches[2], str(rom))
+        assert rom.read_bytes() == states[2]
+
+        # An anchoring patch restores from its full copy
+        rom.write_bytes(b"\x00" * rom.stat().st_size)
+        ROMBackupManager.restore_backup(patches[ROMBackupManager.ANCHOR_INTERVAL], str(rom))
+        assert rom.read_bytes() == states[ROMBackupManager.ANCHOR_INTERVAL]
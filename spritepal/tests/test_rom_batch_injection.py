@@ -0,0 +1,223 @@
+"""Tests for multi-sprite ROM injection in a single transaction"""
+from __future__ import annotations
+
+import struct
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from core.rom_injector import CompressionTrial, ROMInjector, select_compression_trial
+from PIL import Image
+from tests.infrastructure.mock_hal import MockHALCompressor
+from ui.workers.rom_injection_worker import ROMBatchInjectionWorker
+from utils.file_validator import atomic_write
+from utils.rom_checksum import calculate_snes_checksum
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.file_io,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+ROM_SIZE = 0x80000
+HEADER_BASE = 0xFFC0
+SPRITE_SLOT = 96  # Compressed bytes available at each sprite offset
+OFFSETS = [0x20000, 0x20100, 0x30000]
+
+def make_rom(path) -> bytes:
+    """512KB ROM with a valid header and room for SPRITE_SLOT bytes at each offset"""
+    rom = bytearray(b"\x55" * ROM_SIZE)
+    for offset in OFFSETS:
+        rom[offset:offset + SPRITE_SLOT] = b"\x11" * SPRITE_SLOT
+        rom[offset + SPRITE_SLOT:offset + SPRITE_SLOT + 16] = b"\xff" * 16
+    rom[HEADER_BASE:HEADER_BASE + 21] = b"BATCH TEST".ljust(21)
+    struct.pack_into("<HH", rom, HEADER_BASE + 28, 0xFFFF, 0x0000)
+    checksum = calculate_snes_checksum(rom)
+    struct.pack_into("<HH", rom, HEADER_BASE + 28, checksum ^ 0xFFFF, checksum)
+    path.write_bytes(rom)
+    return bytes(rom)
+
+def make_sprite(path, size: int, seed: int) -> str:
+    pixels = np.random.default_rng(seed).integers(0, 16, (size, size), dtype=np.uint8)
+    image = Image.fromarray(pixels, mode="P")
+    image.putpalette([value for i in range(16) for value in (i * 16, i * 16, i * 16)])
+    image.save(path)
+    return str(path)
+
+class ModeSensitiveHAL(MockHALCompressor):
+    """Mock whose fast mode compresses twice as poorly as standard mode"""
+
+    def compress_to_file(self, input_data: bytes, output_path: str, fast: bool = False) -> int:
+        self._compression_ratio = 0.8 if fast else 0.4
+        return super().compress_to_file(input_data, output_path, fast)
+
+@pytest.fixture
+def injector():
+    with patch("core.rom_injector.HALCompressor", lambda: MockHALCompressor(use_pool=False)):
+        injector = ROMInjector()
+    return injector
+
+@pytest.fixture
+def rom(tmp_path):
+    path = tmp_path / "game.sfc"
+    return path, make_rom(path)
+
+class TestBatchInjection:
+    """Test inject_sprites_to_rom"""
+
+    def test_single_read_backup_and_write(self, injector, rom, tmp_path):
+        rom_path, original = rom
+        sprites = [(make_sprite(tmp_path / f"s{i}.png", 16, i), offset) for i, offset in enumerate(OFFSETS)]
+        output = tmp_path / "out.sfc"
+        progress = []
+
+        with patch("core.rom_injector.ROMBackupManager.create_journaled_backup", return_value="backup") as backup, \
+             patch("core.rom_injector.atomic_write", wraps=atomic_write) as write:
+            success, message, results = injector.inject_sprites_to_rom(
+                sprites, str(rom_path), str(output), progress_callback=lambda p, m: progress.append(p)
+            )
+
+        assert success, message
+        assert backup.call_count == 1
+        assert len(backup.call_args.args[2]) == len(OFFSETS) + 1  # sprites and header checksum
+        assert write.call_count == 1
+        assert injector.hal_compressor._batch_compress_count == 1
+        assert progress[-1] == 100
+
+        data = output.read_bytes()
+        for result in results:
+            assert result.fits
+            assert result.original_size == SPRITE_SLOT
+            assert result.compressed_size == int(128 * 0.4)
+            assert result.compression_ratio == pytest.approx(60.2, abs=0.1)
+            start = result.offset + result.compressed_size
+            assert data[result.offset:start].startswith(b"MOCK_COMP_")
+            assert data[start:result.offset + SPRITE_SLOT] == b"\xff" * (SPRITE_SLOT - result.compressed_size)
+
+        complement, checksum = struct.unpack_from("<HH", data, HEADER_BASE + 28)
+        assert checksum == calculate_snes_checksum(data)
+        assert checksum ^ complement == 0xFFFF
+        assert data[:HEADER_BASE] == original[:HEADER_BASE]
+
+    def test_failed_sprite_aborts_batch(self, injector, rom, tmp_path):
+        rom_path, _ = rom
+        sprites = [
+            (make_sprite(tmp_path / "small.png", 16, 0), OFFSETS[0]),
+            (make_sprite(tmp_path / "large.png", 32, 1), OFFSETS[1]),
+            (make_sprite(tmp_path / "dup.png", 16, 2), OFFSETS[0]),
+        ]
+        output = tmp_path / "out.sfc"
+
+        with patch("core.rom_injector.ROMBackupManager.create_journaled_backup") as backup:
+            success, message, results = injector.inject_sprites_to_rom(sprites, str(rom_path), str(output))
+
+        assert not success
+        assert "2 of 3" in message
+        assert [r.fits for r in results] == [True, False, False]
+        assert "too large" in results[1].error
+        assert "Duplicate offset" in results[2].error
+        assert backup.call_count == 0
+        assert not output.exists()
+
+    def test_overlapping_sprites_rejected(self, injector, rom, tmp_path):
+        rom_path, _ = rom
+        sprites = [
+            (make_sprite(tmp_path / "a.png", 16, 0), OFFSETS[0]),
+            (make_sprite(tmp_path / "b.png", 16, 1), OFFSETS[0] + 0x20),
+        ]
+
+        success, _message, results = injector.inject_sprites_to_rom(
+            sprites, str(rom_path), str(tmp_path / "out.sfc"), create_backup=False
+        )
+
+        assert not success
+        assert results[1].error == f"Overlaps the sprite at 0x{OFFSETS[0]:X}"
+
+class TestBatchInjectionWorker:
+    """Test the batch worker's validation and reporting"""
+
+    def test_run_reports_per_sprite_results(self, rom, tmp_path, qtbot):
+        rom_path, _ = rom
+        sprites = [(make_sprite(tmp_path / f"s{i}.png", 16, i), offset) for i, offset in enumerate(OFFSETS)]
+        with patch("core.rom_injector.HALCompressor", lambda: MockHALCompressor(use_pool=False)):
+            worker = ROMBatchInjectionWorker(sprites, str(rom_path), str(tmp_path / "out.sfc"))
+        info, finished = [], []
+        worker.compression_info.connect(info.append)
+        worker.injection_finished.connect(lambda ok, message: finished.append(ok))
+
+        with patch("core.rom_injector.ROMBackupManager.create_journaled_backup", return_value="backup"):
+            worker.run()
+
+        assert finished == [True]
+        assert [s["offset"] for s in info[0]["sprites"]] == OFFSETS
+        assert all(s["fits"] and s["error"] is None for s in info[0]["sprites"])
+
+class TestCompressionTrials:
+    """Test choosing the smallest fitting encoding"""
+
+    def test_select_smallest_fitting_trial(self):
+        trials = [
+            CompressionTrial("original", False, size=60),
+            CompressionTrial("original", True, size=60),
+            CompressionTrial("reversed", False, size=40, error="failed"),
+            CompressionTrial("reversed", True, size=120),
+        ]
+
+        assert select_compression_trial(trials, 100).fast is False
+        assert select_compression_trial(trials, 100, prefer_fast=True).fast is True
+        assert select_compression_trial(trials, 50) is None
+
+    def test_trials_run_concurrently(self, injector):
+        barrier = threading.Barrier(4, timeout=5)
+        compress = injector.hal_compressor.compress_to_file
+
+        def wait_for_all(data, path, fast=False):
+            barrier.wait()
+            return compress(data, path, fast)
+
+        with patch.object(injector.hal_compressor, "compress_to_file", wait_for_all):
+            trials = injector.run_compression_trials({"original": bytes(128), "reversed": bytes(64)})
+
+        assert [(t.name, t.size) for t in trials] == [
+            ("standard", 51),
+            ("fast", 51),
+            ("standard, reversed tile order", 25),
+            ("fast, reversed tile order", 25),
+        ]
+        assert all(t.error is None and len(t.data) == t.size for t in trials)
+
+    def test_single_injection_picks_fitting_mode(self, rom, tmp_path):
+        rom_path, _ = rom
+        with patch("core.rom_injector.HALCompressor", lambda: ModeSensitiveHAL(use_pool=False)):
+            injector = ROMInjector()
+        output = tmp_path / "out.sfc"
+
+        success, message = injector.inject_sprite_to_rom(
+            make_sprite(tmp_path / "s.png", 16, 0), str(rom_path), str(output), OFFSETS[0],
+            fast_compression=True, create_backup=False,
+        )
+
+        assert success, message
+        assert "Compression mode: standard" in message
+        assert "fast: 102 bytes" in message
+        assert "standard: 51 bytes" in message
+        assert output.read_bytes()[OFFSETS[0] + 51:OFFSETS[0] + SPRITE_SLOT] == b"\xff" * (SPRITE_SLOT - 51)
+
+    def test_batch_injection_picks_fitting_mode(self, rom, tmp_path):
+        rom_path, _ = rom
+        with patch("core.rom_injector.HALCompressor", lambda: ModeSensitiveHAL(use_pool=False)):
+            injector = ROMInjector()
+        sprites = [(make_sprite(tmp_path / f"s{i}.png", 16, i), offset) for i, offset in enumerate(OFFSETS)]
+
+        success, message, results = injector.inject_sprites_to_rom(
+            sprites, str(rom_path), str(tmp_path / "out.sfc"), fast_compression=True, create_backup=False
+        )
+
+        assert success, message
+        assert injector.hal_compressor._batch_compress_count == 1
+        for result in results:
+            assert result.compression_mode == "standard"
+            assert [(t.mode, t.size) for t in result.trials] == [("standard", 51), ("fast", 102)]
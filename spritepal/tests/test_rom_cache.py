@@ -452,6 +452,23 @@ class TestROMCacheCore:
         assert progress["current_offset"] == 0xF0000
         assert len(progress["found_sprites"]) == 3
 
+    def test_cached_scan_sprites_merge_scans(self, rom_cache, test_rom_file) -> None:
+        """Test collecting the sprites found by every cached scan."""
+        rom_cache.save_partial_scan_results(
+            test_rom_file, {"start_offset": 0xC0000, "end_offset": 0xD0000, "alignment": 0x100},
+            [{"offset": 0xC2000, "name": "b"}, {"offset": 0xC1000, "name": "a"}],
+            current_offset=0xD0000, completed=True,
+        )
+        rom_cache.save_partial_scan_results(
+            test_rom_file, {"start_offset": 0xC2000, "end_offset": 0xE0000, "alignment": 0x100},
+            [{"offset": 0xC2000, "name": "b"}, {"offset": 0xD4000, "name": "c"}],
+            current_offset=0xD8000, completed=False,
+        )
+
+        sprites = rom_cache.get_cached_scan_sprites(test_rom_file)
+
+        assert [sprite["offset"] for sprite in sprites] == [0xC1000, 0xC2000, 0xD4000]
+
     def test_scan_id_generation(self, rom_cache) -> None:
         """Test unique scan ID generation from parameters."""
         # Same parameters should produce same ID
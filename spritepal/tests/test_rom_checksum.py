@@ -0,0 +1,83 @@
+"""Tests for vectorized and incremental SNES checksums"""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from core.rom_injector import ROMHeader, ROMInjector
+from utils.rom_checksum import calculate_snes_checksum, checksum_delta, update_snes_checksum
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+def reference_checksum(data: bytes, start: int = 0) -> int:
+    """Word-by-word checksum as the ROM tools compute it"""
+    checksum = 0
+    data = data[start:]
+    for i in range(0, len(data), 2):
+        word = data[i + 1] << 8 | data[i] if i + 1 < len(data) else data[i]
+        checksum = (checksum + word) & 0xFFFF
+    return checksum
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+class TestCalculateChecksum:
+    """Test the NumPy checksum against the word-by-word loop"""
+
+    @pytest.mark.parametrize(("size", "start"), [(0x10000, 0), (0x10001, 0), (0x10200, 512), (0x10201, 512), (0, 0)])
+    def test_matches_reference(self, rng, size, start):
+        data = rng.integers(0, 256, size, dtype=np.uint8).tobytes()
+        assert calculate_snes_checksum(data, start) == reference_checksum(data, start)
+        assert calculate_snes_checksum(bytearray(data), start) == reference_checksum(data, start)
+
+class TestChecksumDelta:
+    """Test O(patch size) checksum updates"""
+
+    @pytest.mark.parametrize(("position", "length"), [(0x100, 64), (0x101, 63), (0x201, 1), (0x3FFE, 2), (0x3FFF, 1)])
+    def test_delta_matches_full_recalculation(self, rng, position, length):
+        data = bytearray(rng.integers(0, 256, 0x4001, dtype=np.uint8).tobytes())
+        before = calculate_snes_checksum(data)
+        old = bytes(data[position:position + length])
+        new = rng.integers(0, 256, length, dtype=np.uint8).tobytes()
+        data[position:position + length] = new
+
+        assert update_snes_checksum(before, position, old, new) == calculate_snes_checksum(data)
+
+    def test_delta_validation(self):
+        assert checksum_delta(3, b"", b"") == 0
+        assert checksum_delta(1, b"\x00", b"\x01") == 0x100
+        with pytest.raises(ValueError):
+            checksum_delta(0, b"\x00", b"")
+
+class TestInjectorChecksum:
+    """Test incremental updates in ROMInjector"""
+
+    @pytest.mark.parametrize("smc_header", [0, 512])
+    def test_incremental_matches_full_update(self, rng, smc_header):
+        rom = bytearray(rng.integers(0, 256, 0x10000 + smc_header, dtype=np.uint8).tobytes())
+        with patch("core.rom_injector.HALCompressor"):
+            injectors = [ROMInjector(), ROMInjector()]
+        roms = [rom, bytearray(rom)]
+        for injector in injectors:
+            injector.header = ROMHeader("TEST", 0x20, 0x08, 0, 0, 0, smc_header)
+        incremental, full = injectors
+        incremental._data_checksum = incremental.calculate_checksum(rom)[0]
+
+        for offset in (smc_header + 0x1001, smc_header + 0x3000, smc_header + 0x1010):
+            new = rng.integers(0, 256, 40, dtype=np.uint8).tobytes()
+            old = bytes(rom[offset:offset + 40])
+            for data in roms:
+                data[offset:offset + 40] = new
+            incremental.update_rom_checksum(roms[0], [(offset, old, new)])
+            full.update_rom_checksum(roms[1])
+
+            assert roms[0] == roms[1]
+            assert incremental.header.checksum == full.header.checksum
+            assert incremental._data_checksum == reference_checksum(roms[0], smc_header)
@@ -0,0 +1,112 @@
+"""Tests for the rasterized ROM map sprite histogram"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from ui.components.visualization.rom_map_widget import (
+    HIGH_QUALITY_RGB,
+    LOW_QUALITY_RGB,
+    MEDIUM_QUALITY_RGB,
+    MIN_MARKER_ALPHA,
+    SPRITE_CLEANUP_TARGET,
+    SPRITE_CLEANUP_THRESHOLD,
+    ROMMapWidget,
+)
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+ROM_SIZE = 0x400000
+WIDTH = 400
+
+@pytest.fixture
+def widget(qtbot):
+    widget = ROMMapWidget()
+    qtbot.addWidget(widget)
+    widget.resize(WIDTH, 70)
+    widget.set_rom_size(ROM_SIZE)
+    widget._ensure_layers(widget.width(), widget.height())
+    return widget
+
+def column(offset: int) -> int:
+    return offset * WIDTH // ROM_SIZE
+
+def pixel(widget: ROMMapWidget, x: int) -> tuple[int, int]:
+    """(alpha, rgb) of marker column x"""
+    value = int(widget._marker_pixels[0, x])
+    assert np.all(widget._marker_pixels[:, x] == value)
+    return value >> 24, value & 0xFFFFFF
+
+class TestHistogram:
+    """Test incremental histogram updates"""
+
+    def test_add_updates_histogram_and_markers(self, widget):
+        offset = 0x100000
+        widget.add_found_sprite(offset, 0.9)
+
+        x = column(offset)
+        assert widget._column_counts[x] == 1
+        assert widget._column_quality[x] == pytest.approx(0.9)
+        assert [pixel(widget, c) for c in range(x - 2, x + 2)] == [(MIN_MARKER_ALPHA, HIGH_QUALITY_RGB)] * 4
+        assert pixel(widget, x - 3) == (0, 0)
+        assert pixel(widget, x + 2) == (0, 0)
+
+    def test_duplicate_upgrades_quality_without_counting(self, widget):
+        widget.add_found_sprite(0x200000, 0.3)
+        widget.add_found_sprite(0x200000, 0.6)
+        widget.add_found_sprite(0x200000, 0.1)
+
+        x = column(0x200000)
+        assert widget.found_sprites == [(0x200000, 0.6)]
+        assert widget._column_counts[x] == 1
+        assert pixel(widget, x)[1] == MEDIUM_QUALITY_RGB
+
+    def test_dense_column_keeps_best_quality(self, widget):
+        offsets = [0x300000 + i * 0x10 for i in range(16)]
+        widget.add_found_sprites_batch([(offset, 0.2) for offset in offsets])
+        widget.add_found_sprites_batch([(offsets[0], 0.9), (0x10000, 0.2)])
+
+        x = column(0x300000)
+        assert widget.get_sprite_count() == 17
+        assert widget._column_counts[x] == 16
+        assert pixel(widget, x) == (255, LOW_QUALITY_RGB)
+        assert pixel(widget, column(0x10000))[1] == LOW_QUALITY_RGB
+
+    def test_out_of_range_offsets_are_not_drawn(self, widget):
+        widget.add_found_sprite(ROM_SIZE + 0x1000, 1.0)
+        assert widget.get_sprite_count() == 1
+        assert widget._column_counts.sum() == 0
+
+class TestLayers:
+    """Test cached image rebuilds"""
+
+    def test_resize_rebuilds_from_sprites(self, widget):
+        widget.add_found_sprites_batch([(0x80000, 0.9), (0x280000, 0.6)])
+
+        widget.resize(800, 70)
+        widget._ensure_layers(widget.width(), widget.height())
+
+        assert widget._marker_image.width() == 800
+        assert np.flatnonzero(widget._column_counts).tolist() == [0x80000 * 800 // ROM_SIZE, 0x280000 * 800 // ROM_SIZE]
+
+    def test_clear_and_cleanup(self, widget):
+        widget.add_found_sprite(0x1000, 0.9)
+        widget.clear_sprites()
+        assert widget._column_counts.sum() == 0
+        assert not widget._marker_pixels.any()
+
+        widget.add_found_sprites_batch([(i * 0x100, i / SPRITE_CLEANUP_THRESHOLD) for i in range(SPRITE_CLEANUP_THRESHOLD + 1)])
+        widget._ensure_layers(widget.width(), widget.height())
+        assert widget._column_counts.sum() == SPRITE_CLEANUP_TARGET
+        widget.add_found_sprite(0x100 * SPRITE_CLEANUP_THRESHOLD, 1.0)
+        assert widget.get_sprite_count() == SPRITE_CLEANUP_TARGET
+
+    def test_paint_renders(self, widget):
+        widget.add_found_sprite(0x100000, 0.9)
+        widget.set_current_offset(0x200000)
+        image = widget.grab().toImage()
+        assert image.width() == WIDTH
+        assert image.pixelColor(column(0x100000), 40).green() > 200
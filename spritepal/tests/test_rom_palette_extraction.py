@@ -3,12 +3,19 @@ Test ROM palette extraction functionality
 """
 from __future__ import annotations
 
+import itertools
 import json
 import os
 import tempfile
 
+import numpy as np
 import pytest
-from core.rom_palette_extractor import ROMPaletteExtractor
+from core.rom_palette_extractor import (
+    ROMPaletteExtractor,
+    bgr555_to_rgb888,
+    score_palette_windows,
+)
+from utils.rom_cache import ROMCache
 
 # Systematic pytest markers applied based on test content analysis
 pytestmark = [
@@ -184,5 +191,94 @@ class TestROMPaletteExtraction:
                 assert len(palettes[idx]) == 16
                 assert all(len(color) == 3 for color in palettes[idx])
 
+def make_ramp_palette(seed: int) -> bytes:
+    """Build a plausible palette: transparent black followed by a color ramp"""
+    words = [0]
+    for i in range(15):
+        level = min(31, i * 2 + seed % 3)
+        words.append((min(31, level + seed) << 10) | (level << 5) | level)
+    return np.array(words, dtype="<u2").tobytes()
+
+def make_scan_rom(palette_offset: int, palette_count: int) -> bytearray:
+    """Random ROM with zero padding and a block of palettes"""
+    rng = np.random.default_rng(1234)
+    rom_data = bytearray(rng.integers(0, 256, 0x40000, dtype=np.uint8).tobytes())
+    rom_data[0x10000:0x18000] = bytes(0x8000)
+    for idx in range(palette_count):
+        start = palette_offset + idx * 32
+        rom_data[start:start + 32] = make_ramp_palette(idx)
+    return rom_data
+
+class TestROMPaletteScan:
+    """Test ROM-wide palette discovery"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.extractor = ROMPaletteExtractor()
+
+    def test_bgr555_to_rgb888_matches_scalar_conversion(self):
+        """Vectorized conversion uses the same scaling as palette extraction"""
+        words = np.array([0x001F, 0x03E0, 0x7C00, 0x7FFF, 0x0000], dtype=np.uint16)
+        assert bgr555_to_rgb888(words).tolist() == [
+            [255, 0, 0],
+            [0, 255, 0],
+            [0, 0, 255],
+            [255, 255, 255],
+            [0, 0, 0],
+        ]
+
+    def test_finds_unaligned_palette_block(self):
+        """All palettes in a block are found at their exact offsets"""
+        rom_data = make_scan_rom(0x20012, 6)
+
+        candidates = self.extractor.find_palette_candidates(bytes(rom_data))
+
+        offsets = sorted(c["offset"] for c in candidates[:6])
+        assert offsets == [0x20012 + idx * 32 for idx in range(6)]
+        assert candidates[0]["colors"][0] == [0, 0, 0]
+        assert len(candidates[0]["colors"]) == 16
+
+    def test_candidates_do_not_overlap(self):
+        """Overlapping windows collapse to a single candidate"""
+        rom_data = make_scan_rom(0x20000, 8)
+
+        offsets = sorted(
+            c["offset"] for c in self.extractor.find_palette_candidates(bytes(rom_data))
+        )
+
+        assert all(b - a >= 32 for a, b in itertools.pairwise(offsets))
+
+    def test_padding_and_high_bit_data_rejected(self):
+        """Zero padding and words with bit 15 set never score"""
+        rom_data = bytes(0x1000) + b"\xff" * 0x1000
+        offsets, scores = score_palette_windows(rom_data)
+        assert len(offsets) == len(scores) == 0
+
+    def test_step_alignment(self):
+        """Candidate windows honour the requested alignment"""
+        rom_data = make_scan_rom(0x20000, 4)
+        offsets, _ = score_palette_windows(bytes(rom_data), step=32)
+        assert np.all(offsets % 32 == 0)
+
+        with pytest.raises(ValueError, match="step"):
+            score_palette_windows(bytes(rom_data), step=3)
+
+    def test_scan_results_cached(self, tmp_path, monkeypatch):
+        """ROM scans are stored in and served from ROMCache"""
+        rom_path = tmp_path / "scan.sfc"
+        rom_path.write_bytes(bytes(make_scan_rom(0x20000, 4)))
+        cache = ROMCache(cache_dir=str(tmp_path / "cache"))
+        monkeypatch.setattr("core.rom_palette_extractor.get_rom_cache", lambda: cache)
+
+        first = self.extractor.scan_rom_for_palettes(str(rom_path))
+        assert cache.get_cache_stats()["palette_scan_caches"] == 1
+
+        monkeypatch.setattr(
+            self.extractor,
+            "find_palette_candidates",
+            lambda *args: pytest.fail("cached scan should not rescan"),
+        )
+        assert self.extractor.scan_rom_for_palettes(str(rom_path)) == first
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
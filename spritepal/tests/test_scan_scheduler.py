@@ -0,0 +1,132 @@
+"""Tests for scheduling scans across many ROMs"""
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from core.scan_scheduler import SCAN_CHUNK_SIZE, ScanScheduler
+from utils.rom_cache import ROMCache
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.file_io,
+    pytest.mark.no_qt,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+MARKER = 0x5A
+
+class FakeWorker:
+    """Stands in for the scan worker: a sprite wherever the ROM holds MARKER"""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, int]] = []
+
+    def scan_chunk(self, rom_path: str, start: int, end: int) -> list[dict]:
+        self.calls.append((Path(rom_path).name, start))
+        data = Path(rom_path).read_bytes()
+        return [{"offset": offset, "tile_count": 16} for offset in range(start, end) if data[offset] == MARKER]
+
+@pytest.fixture
+def worker():
+    fake = FakeWorker()
+    with patch("core.scan_scheduler._init_scan_worker"), \
+         patch("core.scan_scheduler._scan_chunk", fake.scan_chunk):
+        yield fake
+
+def make_rom(path: Path, chunks: int, markers: list[int], prefix: bytes = b"", fill: int = 0x11) -> str:
+    data = bytearray(bytes([fill]) * (chunks * SCAN_CHUNK_SIZE))
+    for offset in markers:
+        data[offset] = MARKER
+    path.write_bytes(prefix + data)
+    return str(path)
+
+def test_identical_roms_are_scanned_once(tmp_path, worker):
+    scheduler = ScanScheduler(jobs=1)
+    first = make_rom(tmp_path / "a.sfc", 2, [0x100])
+    copy = make_rom(tmp_path / "copy.sfc", 2, [0x100])
+
+    scan = scheduler.add_rom(first)
+    assert scheduler.add_rom(copy) is scan
+
+    scans = scheduler.run()
+    assert len(scans) == 1
+    assert scan.rom_paths == [first, copy]
+    assert [sprite["offset"] for sprite in scan.sprites] == [0x100]
+    assert len(worker.calls) == 2
+
+def test_active_rom_goes_first(tmp_path, worker):
+    scheduler = ScanScheduler(jobs=1)
+    for name in ("a", "b", "c"):
+        markers = [chunk * SCAN_CHUNK_SIZE + chunk for chunk in range(4)]  # No two chunks alike
+        scheduler.add_rom(make_rom(tmp_path / f"{name}.sfc", 4, markers, fill=ord(name)))
+    scheduler.set_active_rom(str(tmp_path / "c.sfc"))
+
+    switched = []
+
+    def on_progress(progress):
+        # The user switches to b while c is scanning
+        if not switched:
+            switched.append(True)
+            scheduler.set_active_rom(str(tmp_path / "b.sfc"))
+
+    scheduler.run(on_progress)
+
+    order = [name for name, _start in worker.calls]
+    # Two chunks of c were already submitted when b was raised
+    assert order == ["c.sfc"] * 2 + ["b.sfc"] * 4 + ["c.sfc"] * 2 + ["a.sfc"] * 4
+
+def test_identical_chunks_are_reused_across_roms(tmp_path, worker):
+    scheduler = ScanScheduler(jobs=1)
+    original = scheduler.add_rom(make_rom(tmp_path / "us.sfc", 4, [0x100, 0x50000]))
+    # The same data moved one chunk further into the ROM
+    variant = scheduler.add_rom(make_rom(tmp_path / "eu.sfc", 4, [0x100, 0x50000], prefix=b"\x22" * SCAN_CHUNK_SIZE))
+
+    scheduler.run()
+
+    assert scheduler.chunk_cache_hits == 4
+    assert len(worker.calls) == 5
+    assert [sprite["offset"] for sprite in original.sprites] == [0x100, 0x50000]
+    assert [sprite["offset"] for sprite in variant.sprites] == [0x40100, 0x90000]
+
+def test_results_persist_and_resume(tmp_path, worker):
+    cache = ROMCache(cache_dir=str(tmp_path / "cache"), use_settings=False)
+    rom = make_rom(tmp_path / "game.sfc", 4, [0x100, 0xC0100])
+
+    scheduler = ScanScheduler(jobs=1, cache=cache)
+    scheduler.add_rom(rom)
+    scheduler.run(lambda progress: scheduler.cancel())
+    assert len(worker.calls) == 2
+
+    scheduler = ScanScheduler(jobs=1, cache=cache)
+    scan = scheduler.add_rom(rom)
+    assert scan.resumed_from == 2 * SCAN_CHUNK_SIZE
+    scheduler.run()
+    assert [start for _name, start in worker.calls[2:]] == [0x80000, 0xC0000]
+    assert [sprite["offset"] for sprite in scan.sprites] == [0x100, 0xC0100]
+
+    scheduler = ScanScheduler(jobs=1, cache=cache)
+    scan = scheduler.add_rom(rom)
+    cached = []
+    scheduler.run(cached.append)
+    assert scan.cached
+    assert len(worker.calls) == 4
+    assert [sprite["offset"] for sprite in cached[0].sprites] == [0x100, 0xC0100]
+    assert cache.get_cached_scan_sprites(rom) == scan.sprites
+
+def test_worker_initializer_starts_no_hal_pool(tmp_path, monkeypatch):
+    from core import scan_scheduler
+    from core.hal_compression import HALCompressor
+
+    monkeypatch.chdir(tmp_path)  # SpriteFinder creates its preview directory here
+    monkeypatch.setattr(scan_scheduler, "_worker_finder", None)
+    with patch.object(HALCompressor, "_find_tool", return_value="exhal"), \
+         patch("core.hal_compression.HALProcessPool") as pool:
+        scan_scheduler._init_scan_worker(0x100)
+
+    pool.assert_not_called()
+    finder = scan_scheduler._worker_finder.sprite_finders[0]
+    assert finder.extractor.rom_injector.hal_compressor is finder.extractor.hal_compressor
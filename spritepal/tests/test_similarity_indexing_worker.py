@@ -0,0 +1,100 @@
+"""Tests for the decode/hash pipeline of SimilarityIndexingWorker"""
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from ui.rom_extraction.workers.similarity_indexing_worker import SimilarityIndexingWorker
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.no_manager_setup,
+]
+
+WORKER_MODULE = "ui.rom_extraction.workers.similarity_indexing_worker"
+
+def make_tile_data(offset: int, tile_count: int) -> bytes:
+    """Deterministic 4bpp tile data per offset"""
+    rng = np.random.default_rng(offset)
+    return rng.integers(0, 256, tile_count * 32, dtype=np.uint8).tobytes()
+
+@pytest.fixture
+def rom_file(tmp_path):
+    rom_path = tmp_path / "test.sfc"
+    rom_path.write_bytes(bytes(0x10000))
+    return rom_path
+
+@pytest.fixture
+def worker(rom_file, tmp_path):
+    with patch.object(SimilarityIndexingWorker, "_get_cache_directory", return_value=tmp_path):
+        worker = SimilarityIndexingWorker(str(rom_file))
+    yield worker
+    worker.similarity_engine.sprite_database.clear()
+
+def make_extractor(sizes: dict[int, int]) -> MagicMock:
+    """ROM extractor whose decompression yields ``sizes[offset]`` tiles"""
+    def find_compressed_sprite(rom_data, offset, expected_size=None):
+        if offset not in sizes:
+            raise ValueError("bad sprite")
+        return 0x100, make_tile_data(offset, sizes[offset])
+
+    extractor = MagicMock()
+    extractor.rom_injector.find_compressed_sprite.side_effect = find_compressed_sprite
+    return extractor
+
+def run_worker(worker, extractor):
+    manager = MagicMock()
+    manager.get_rom_extractor.return_value = extractor
+    finished = []
+    indexed = []
+    worker.operation_finished.connect(lambda ok, message: finished.append((ok, message)))
+    worker.sprite_indexed.connect(indexed.append)
+    with patch(f"{WORKER_MODULE}.get_extraction_manager", return_value=manager):
+        worker.run()
+    return finished, indexed
+
+class TestIndexingPipeline:
+    """Test batched indexing of decoded sprites"""
+
+    def test_indexes_all_decodable_sprites(self, worker):
+        sizes = {0x1000 + i * 0x100: (16 if i % 3 else 4) for i in range(150)}
+        for offset, tiles in sizes.items():
+            worker.on_sprite_found({"offset": offset, "decompressed_size": tiles * 32})
+        worker.on_sprite_found({"offset": 0xF000})
+
+        finished, indexed = run_worker(worker, make_extractor(sizes))
+
+        assert finished == [(True, "Indexed 150 sprites")]
+        assert sorted(indexed) == sorted(sizes)
+        assert worker.get_indexed_count() == 150
+        assert not worker.is_sprite_indexed(0xF000)
+
+    def test_batch_hashes_match_single_sprite_hashes(self, worker):
+        sizes = {0x2000: 8, 0x3000: 8}
+        for offset in sizes:
+            worker.on_sprite_found({"offset": offset})
+
+        run_worker(worker, make_extractor(sizes))
+
+        engine = worker.similarity_engine
+        rom_data = bytes(0x10000)
+        for offset in sizes:
+            pixels = worker._decode_sprite(rom_data, offset, {}, make_extractor(sizes))
+            phash, dhash, histogram = engine.compute_batch_hashes(pixels[np.newaxis])
+            stored = engine.sprite_database[offset]
+            np.testing.assert_array_equal(stored.phash, phash[0])
+            np.testing.assert_array_equal(stored.dhash, dhash[0])
+            np.testing.assert_allclose(stored.histogram, histogram[0])
+
+    def test_cancellation_stops_producer(self, worker):
+        sizes = {0x1000 + i * 0x100: 4 for i in range(50)}
+        for offset in sizes:
+            worker.on_sprite_found({"offset": offset})
+        worker.cancel()
+
+        finished, indexed = run_worker(worker, make_extractor(sizes))
+
+        assert finished == [(False, "Indexing cancelled")]
+        assert indexed == []
@@ -0,0 +1,123 @@
+"""Tests for SpriteGalleryModel row indexing, batched updates, filtering and sorting"""
+from __future__ import annotations
+
+import pytest
+from PySide6.QtCore import QPersistentModelIndex
+from PySide6.QtGui import QPixmap
+from ui.models.sprite_gallery_model import SpriteGalleryModel
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+def make_sprites(count: int) -> list[dict]:
+    return [
+        {
+            "offset": 0x10000 + i * 0x100,
+            "decompressed_size": (i * 37) % 1000,
+            "tile_count": (i * 11) % 50,
+            "compressed": i % 2 == 0,
+        }
+        for i in range(count)
+    ]
+
+@pytest.fixture
+def model(qtbot):
+    model = SpriteGalleryModel()
+    model.set_sprites(make_sprites(300))
+    return model
+
+def visible_offsets(model: SpriteGalleryModel) -> list[int]:
+    return [model.index(row, 0).data(SpriteGalleryModel.OffsetRole) for row in range(model.rowCount())]
+
+def changed_ranges(model: SpriteGalleryModel, action) -> list[tuple[int, int]]:
+    ranges = []
+    model.dataChanged.connect(lambda top, bottom, roles: ranges.append((top.row(), bottom.row())))
+    action()
+    return ranges
+
+class TestThumbnailUpdates:
+    """Test coalesced thumbnail notifications"""
+
+    def test_thumbnails_coalesce_into_ranges(self, model):
+        pixmap = QPixmap(8, 8)
+
+        def add_thumbnails():
+            for row in [*range(10, 20), 5, *range(40, 43), 0xFFFF]:
+                model.set_thumbnail(0x10000 + row * 0x100, pixmap)
+            model.flush_thumbnail_updates()
+
+        assert changed_ranges(model, add_thumbnails) == [(5, 5), (10, 19), (40, 42)]
+        assert model.get_sprite_pixmap(0x10000 + 12 * 0x100) is pixmap
+        assert model.index(12, 0).data(SpriteGalleryModel.PixmapRole).cacheKey() == pixmap.cacheKey()
+
+    def test_timer_flushes_pending_rows(self, model, qtbot):
+        with qtbot.waitSignal(model.dataChanged, timeout=1000) as blocker:
+            model.set_thumbnail(0x10000 + 7 * 0x100, QPixmap(8, 8))
+        assert blocker.args[0].row() == 7
+
+    def test_filter_discards_pending_rows(self, model):
+        model.set_thumbnail(0x10000 + 3 * 0x100, QPixmap(8, 8))
+        model.apply_filter(compressed_only=True)
+        assert changed_ranges(model, model.flush_thumbnail_updates) == []
+
+class TestFilterAndSort:
+    """Test column-based filtering and sorting"""
+
+    def test_text_and_compressed_filters(self, model):
+        model.apply_filter("0x0112")
+        assert visible_offsets(model) == [0x11200]
+
+        model.apply_filter("", compressed_only=True)
+        assert visible_offsets(model) == [s["offset"] for s in make_sprites(300) if s["compressed"]]
+        assert model.get_row_for_offset(0x10100) is None
+        assert model.get_row_for_offset(0x10200) == 1
+
+        model.apply_filter("0X0112", compressed_only=True)
+        assert visible_offsets(model) == [0x11200]
+        assert model.get_sprite_count_info() == (1, 300, 0)
+
+    def test_sort_matches_python_sort(self, model):
+        sprites = make_sprites(300)
+        model.sort_sprites("Size")
+        expected = sorted(sprites, key=lambda s: s["decompressed_size"], reverse=True)
+        assert visible_offsets(model) == [s["offset"] for s in expected]
+
+        model.sort_sprites("Tiles")
+        expected = sorted(expected, key=lambda s: s["tile_count"], reverse=True)
+        assert visible_offsets(model) == [s["offset"] for s in expected]
+
+        model.apply_filter("", compressed_only=True)
+        assert visible_offsets(model) == [s["offset"] for s in expected if s["compressed"]]
+
+        model.sort_sprites("Offset")
+        assert visible_offsets(model) == sorted(s["offset"] for s in sprites if s["compressed"])
+
+    def test_row_index_follows_sort(self, model):
+        model.sort_sprites("Size")
+        for row in (0, 57, 299):
+            offset = model.index(row, 0).data(SpriteGalleryModel.OffsetRole)
+            assert model.get_row_for_offset(offset) == row
+            assert model.get_sprite_at_row(row)["offset"] == offset
+
+    def test_sort_keeps_persistent_indexes(self, model):
+        persistent = QPersistentModelIndex(model.index(42, 0))
+        offset = persistent.data(SpriteGalleryModel.OffsetRole)
+
+        model.sort_sprites("Tiles")
+
+        assert persistent.isValid()
+        assert persistent.data(SpriteGalleryModel.OffsetRole) == offset
+        assert persistent.row() == model.get_row_for_offset(offset)
+
+    def test_selection_uses_row_index(self, model):
+        model.apply_filter("", compressed_only=True)
+        ranges = changed_ranges(model, lambda: model.toggle_selection(0x10400))
+        assert ranges == [(2, 2)]
+        assert model.index(2, 0).data(SpriteGalleryModel.SelectedRole)
+
+        model.select_all()
+        assert model.get_sprite_count_info() == (150, 300, 150)
+        assert model.get_visible_range(0, 3) == [0x10000, 0x10200, 0x10400, 0x10600]
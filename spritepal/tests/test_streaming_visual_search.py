@@ -0,0 +1,123 @@
+"""Tests for streaming query-by-image search"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from core.streaming_visual_search import StreamingVisualSearch
+from core.visual_similarity_search import VisualSimilarityEngine
+from PIL import Image
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.no_manager_setup,
+]
+
+def encode_4bpp_tiles(pixels: np.ndarray) -> bytes:
+    """Encode an (h, w) grid of color indices as SNES 4bpp tiles, row-major"""
+    height, width = pixels.shape
+    tiles = pixels.reshape(height // 8, 8, width // 8, 8).transpose(0, 2, 1, 3).reshape(-1, 8, 8)
+    data = np.zeros((len(tiles), 32), dtype=np.uint8)
+    for plane in range(4):
+        packed = np.packbits(((tiles >> plane) & 1).astype(np.uint8), axis=2)[:, :, 0]
+        base = 0 if plane < 2 else 16
+        data[:, base + (plane & 1):base + 16:2] = packed
+    return data.tobytes()
+
+def make_sprite(seed: int) -> np.ndarray:
+    """32x128 grid of blobs, the layout decode_sprite_tiles produces for 64 tiles"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[:32, :128]
+    pixels = np.zeros((32, 128), dtype=np.uint8)
+    for _ in range(6):
+        cy, cx, radius = rng.integers(0, 32), rng.integers(0, 128), rng.integers(4, 14)
+        pixels[np.hypot(yy - cy, xx - cx) < radius] = rng.integers(1, 16)
+    return pixels
+
+def to_image(pixels: np.ndarray) -> Image.Image:
+    gray = (pixels * 17).astype(np.uint8)
+    return Image.fromarray(np.stack([gray] * 3, axis=-1), "RGB")
+
+class FakeROM:
+    """Decompressor over a fixed set of sprites that records its calls"""
+
+    def __init__(self, sprites: dict[int, np.ndarray]):
+        self.data = {offset: encode_4bpp_tiles(pixels) for offset, pixels in sprites.items()}
+        self.calls: list[list[int]] = []
+
+    def __call__(self, offsets: list[int]) -> list[bytes | None]:
+        self.calls.append(list(offsets))
+        return [self.data.get(offset) for offset in offsets]
+
+@pytest.fixture
+def sprites():
+    return {0x1000 * (i + 1): make_sprite(i) for i in range(100)}
+
+class TestStreamingVisualSearch:
+    """Test progressive top-k search with indexing as a side effect"""
+
+    def test_finds_reference_and_persists_index(self, sprites, tmp_path):
+        rom = FakeROM(sprites)
+        engine = VisualSimilarityEngine()
+        index_path = tmp_path / "rom.similarity_index"
+        search = StreamingVisualSearch(engine, rom, max_results=5, similarity_threshold=0.0,
+                                       index_path=index_path, batch_size=16)
+        target = engine.hash_image(to_image(sprites[0x20000]))
+
+        updates = list(search.run(target, [*sprites, 0xDEAD00]))
+
+        assert updates[0].matches == [] and updates[0].changed
+        assert len(updates) == 1 + (len(sprites) + 1 + 15) // 16
+        assert updates[-1].hashed == len(sprites)
+        final = updates[-1].matches
+        assert len(final) == 5
+        assert final[0].offset == 0x20000
+        assert final[0].similarity_score > 0.95
+        assert all(len(call) <= 16 for call in rom.calls)
+
+        reloaded = VisualSimilarityEngine()
+        reloaded.import_index(index_path)
+        assert set(reloaded.sprite_database) == set(sprites)
+
+    def test_indexed_sprites_are_reported_first_and_not_rehashed(self, sprites):
+        engine = VisualSimilarityEngine()
+        indexed = list(sprites)[:60]
+        StreamingVisualSearch(engine, FakeROM(sprites))._hash_offsets(indexed)
+        rom = FakeROM(sprites)
+        search = StreamingVisualSearch(engine, rom, max_results=3, similarity_threshold=0.0)
+        target = engine.hash_image(to_image(sprites[indexed[10]]))
+
+        updates = search.run(target, sprites)
+        first = next(updates)
+        rest = list(updates)
+
+        assert first.matches[0].offset == indexed[10]
+        assert rest[-1].matches[0].offset == indexed[10]
+        assert sorted(o for call in rom.calls for o in call) == list(sprites)[60:]
+
+    def test_matches_full_index_search(self, sprites):
+        engine = VisualSimilarityEngine()
+        search = StreamingVisualSearch(engine, FakeROM(sprites), max_results=10, similarity_threshold=0.5,
+                                       batch_size=7)
+        target = engine.hash_image(to_image(make_sprite(1000)))
+
+        final = list(search.run(target, sprites))[-1].matches
+
+        expected = engine.find_similar(target, max_results=10, similarity_threshold=0.5)
+        assert [(m.offset, m.similarity_score) for m in final] == [
+            (m.offset, m.similarity_score) for m in expected
+        ]
+
+    def test_reference_offset_and_cancellation(self, sprites):
+        engine = VisualSimilarityEngine()
+        rom = FakeROM(sprites)
+        search = StreamingVisualSearch(engine, rom, max_results=5, similarity_threshold=0.0, batch_size=8)
+        target = search.reference_from_offset(0x5000)
+        assert target is not None and target.offset == 0x5000
+        assert search.reference_from_offset(0xDEAD00) is None
+
+        cancelled = []
+        updates = list(search.run(target, sprites, is_cancelled=lambda: len(cancelled) > 20 or cancelled.append(1)))
+
+        assert all(m.offset != 0x5000 for update in updates for m in update.matches)
+        assert len(engine.sprite_database) < len(sprites)
@@ -409,6 +409,21 @@ class TestWorkerControllerThreadSafety:
         # Should handle without errors
         controller.cleanup()
 
+    def test_schedule_after_cleanup_does_not_restart(self, qtbot, tmp_path):
+        """Test a late viewport schedule cannot restart a cleaned-up worker."""
+        rom_path = tmp_path / "test.sfc"
+        rom_path.write_bytes(b"\x00" * 0x8000)
+
+        controller = ThumbnailWorkerController()
+        controller.start_worker(str(rom_path), Mock())
+        controller.cleanup()
+
+        with patch.object(controller, "start_worker") as start_worker:
+            controller.schedule_thumbnails([(0x1000, False)], 128)
+
+        start_worker.assert_not_called()
+        assert not controller._is_running()
+
 class TestRaceConditionPrevention:
     """Test prevention of specific race conditions."""
 
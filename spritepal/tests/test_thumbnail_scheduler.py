@@ -0,0 +1,140 @@
+"""Tests for viewport-driven thumbnail scheduling"""
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+from PySide6.QtGui import QPixmap
+from ui.common.thumbnail_scheduler import ViewportThumbnailScheduler
+from ui.models.sprite_gallery_model import SpriteGalleryModel
+from ui.workers.batch_thumbnail_worker import BatchThumbnailWorker, ThumbnailRequest
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def scheduler(clock):
+    return ViewportThumbnailScheduler(prefetch_rows=2, behind_rows=1, burst_interval=0.3, clock=clock)
+
+def items(plan, preview: bool) -> list[int]:
+    return [item for item, is_preview in plan.entries if is_preview == preview]
+
+class TestViewportThumbnailScheduler:
+    """Test window, direction and burst planning"""
+
+    def test_initial_plan_is_full_resolution(self, scheduler):
+        plan = scheduler.update(40, 51, columns=4, item_count=200)
+
+        assert not plan.burst
+        assert items(plan, True) == []
+        assert items(plan, False) == [*range(40, 52), *range(52, 60), 39, 38, 37, 36]
+        assert scheduler.update(40, 51, columns=4, item_count=200) is None
+
+    def test_prefetch_follows_scroll_direction(self, scheduler, clock):
+        scheduler.update(40, 51, columns=4, item_count=200)
+        clock.now = 1.0
+        plan = scheduler.update(20, 31, columns=4, item_count=200)
+
+        assert plan.direction == -1
+        assert items(plan, False) == [*range(20, 32), *range(19, 11, -1), 32, 33, 34, 35]
+
+    def test_scroll_burst_previews_then_settles(self, scheduler, clock):
+        scheduler.update(0, 11, columns=4, item_count=200)
+        clock.now = 0.1
+        burst = scheduler.update(8, 19, columns=4, item_count=200)
+
+        assert burst.burst
+        assert burst.entries[:20] == [(item, True) for item in range(8, 28)]
+        assert items(burst, False) == list(range(8, 20))
+
+        clock.now = 0.5
+        settled = scheduler.update(8, 19, columns=4, item_count=200)
+        assert not settled.burst
+        assert items(settled, False) == [*range(8, 28), 7, 6, 5, 4]
+        assert scheduler.update(8, 19, columns=4, item_count=200) is None
+
+    def test_window_is_bounded_and_clamped(self, clock):
+        scheduler = ViewportThumbnailScheduler(max_window=50, clock=clock)
+
+        plan = scheduler.update(0, 999, columns=4, item_count=1000)
+        assert [item for item, _ in plan.entries] == list(range(50))
+
+        scheduler.reset()
+        plan = scheduler.update(995, 1200, columns=4, item_count=1000)
+        assert items(plan, False)[:5] == list(range(995, 1000))
+        assert scheduler.update(0, 0, columns=4, item_count=0) is None
+
+class TestPreviewThumbnails:
+    """Test model bookkeeping for preview and full thumbnails"""
+
+    def test_preview_does_not_replace_full(self, qtbot):
+        model = SpriteGalleryModel()
+        model.set_sprites([{"offset": 0x1000}, {"offset": 0x2000}])
+        preview, full = QPixmap(4, 4), QPixmap(16, 16)
+
+        model.set_thumbnail(0x1000, preview, preview=True)
+        assert not model.needs_thumbnail(0x1000, preview=True)
+        assert model.needs_thumbnail(0x1000)
+
+        model.set_thumbnail(0x1000, full)
+        model.set_thumbnail(0x1000, preview, preview=True)
+        assert not model.needs_thumbnail(0x1000)
+        assert model.get_sprite_pixmap(0x1000) is full
+        assert model.get_offsets_for_rows([1, 0]) == [0x2000, 0x1000]
+
+class TestWorkerQueue:
+    """Test queue replacement and preview rendering in the worker"""
+
+    @pytest.fixture
+    def worker(self, tmp_path, qtbot):
+        rom = tmp_path / "test.sfc"
+        rom.write_bytes(bytes(range(256)) * 1024)
+        worker = BatchThumbnailWorker(str(rom), rom_extractor=Mock(spec=[]))
+        yield worker
+        worker.cleanup()
+
+    def test_replace_queue_drops_stale_requests(self, worker):
+        worker.queue_batch([0x100, 0x200, 0x300])
+
+        dropped = worker.replace_queue([ThumbnailRequest(0x400, 64, 1), ThumbnailRequest(0x500, 64, 0, True)])
+
+        assert dropped == 3
+        assert [worker._get_next_request().offset for _ in range(2)] == [0x500, 0x400]
+        assert worker._get_next_request() is None
+
+    def test_preview_is_quarter_size_and_shares_decompression(self, worker):
+        worker._load_rom_data()
+        ready, previews = [], []
+        worker.thumbnail_ready.connect(lambda offset, image: ready.append((offset, image.width())))
+        worker.preview_ready.connect(lambda offset, image: previews.append((offset, image.width())))
+
+        for request in (ThumbnailRequest(0x800, 128, preview=True), ThumbnailRequest(0x800, 128)):
+            worker._emit_thumbnail(request, worker._generate_thumbnail(request))
+
+        assert previews == [(0x800, 32)]
+        assert ready == [(0x800, 128)]
+        assert list(worker._sprite_data_cache) == [0x800]
+
+    def test_duplicate_sprite_reuses_thumbnail(self, worker):
+        worker._load_rom_data()
+        # The test ROM repeats every 256 bytes, so both offsets hold the same tiles
+        first = worker._generate_thumbnail(ThumbnailRequest(0x800, 64))
+        worker._add_to_cache((0x800, 64), first)
+
+        assert worker._generate_thumbnail(ThumbnailRequest(0x900, 64)) is first
+        assert worker.tile_index.duplicate_of(0x900) == 0x800
+        assert worker._generate_thumbnail(ThumbnailRequest(0x910, 64)) is not first
@@ -0,0 +1,167 @@
+"""Tests for the flip-canonical tile deduplication index"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from core.navigation.tile_index import (
+    TileFlip,
+    TileIndex,
+    TileOccurrence,
+    canonical_tile_hashes,
+    solid_tiles,
+)
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+def encode_4bpp_tiles(pixels: np.ndarray) -> bytes:
+    """Encode (n, 8, 8) color indices as SNES 4bpp tiles"""
+    tiles = np.zeros((len(pixels), 32), dtype=np.uint8)
+    for plane in range(4):
+        bits = ((pixels >> plane) & 1).astype(np.uint8)
+        packed = np.packbits(bits, axis=2)[:, :, 0]
+        base = 0 if plane < 2 else 16
+        tiles[:, base + (plane & 1):base + 16:2] = packed
+    return tiles.tobytes()
+
+def flip_pixels(pixels: np.ndarray, flip: TileFlip) -> np.ndarray:
+    if flip & TileFlip.HORIZONTAL:
+        pixels = pixels[..., ::-1]
+    if flip & TileFlip.VERTICAL:
+        pixels = pixels[..., ::-1, :]
+    return np.ascontiguousarray(pixels)
+
+def random_tiles(rng, count: int) -> np.ndarray:
+    return rng.integers(0, 16, (count, 8, 8), dtype=np.uint8)
+
+class TestCanonicalHashes:
+    """Test flip canonicalization of tile hashes"""
+
+    def test_flipped_copies_share_a_key(self):
+        pixels = random_tiles(np.random.default_rng(0), 50)
+        keys, _ = canonical_tile_hashes(np.frombuffer(encode_4bpp_tiles(pixels), np.uint8).reshape(-1, 32))
+        for flip in TileFlip:
+            flipped = encode_4bpp_tiles(flip_pixels(pixels, flip))
+            flipped_keys, _ = canonical_tile_hashes(np.frombuffer(flipped, np.uint8).reshape(-1, 32))
+            np.testing.assert_array_equal(flipped_keys, keys)
+        assert len(np.unique(keys)) == len(keys)
+
+    def test_solid_tiles(self):
+        pixels = np.stack([np.full((8, 8), value, dtype=np.uint8) for value in range(16)])
+        pixels = np.concatenate([pixels, random_tiles(np.random.default_rng(1), 4)])
+        tiles = np.frombuffer(encode_4bpp_tiles(pixels), np.uint8).reshape(-1, 32)
+        assert solid_tiles(tiles).tolist() == [True] * 16 + [False] * 4
+
+class TestTileIndex:
+    """Test posting table queries"""
+
+    @pytest.fixture
+    def shared(self):
+        return random_tiles(np.random.default_rng(3), 10)
+
+    @pytest.fixture
+    def index(self, shared):
+        rng = np.random.default_rng(4)
+        blank = np.zeros((4, 8, 8), dtype=np.uint8)
+        blocks = {
+            0x1000: np.concatenate([shared[:6], blank, random_tiles(rng, 20)]),
+            0x2000: np.concatenate([random_tiles(rng, 8), flip_pixels(shared[:4], TileFlip.HORIZONTAL), blank]),
+            0x3000: np.concatenate([flip_pixels(shared[2:8], TileFlip.BOTH), shared[2:4], random_tiles(rng, 3)]),
+            0x4000: np.concatenate([random_tiles(rng, 12), blank]),
+        }
+        index = TileIndex()
+        for offset, pixels in blocks.items():
+            index.add_block(offset, encode_4bpp_tiles(pixels))
+        return index
+
+    def test_counts(self, index):
+        assert len(index) == 4
+        assert 0x3000 in index
+        assert index.tile_count == 30 - 4 + 12 + 11 + 12
+        assert index.unique_tile_count == 8 + 20 + 8 + 3 + 12
+        assert index.add_block(0x1000, b"") == 0
+
+    def test_find_tile_reports_flips(self, index, shared):
+        occurrences = index.find_tile(encode_4bpp_tiles(shared[2:3]))
+
+        assert occurrences == [
+            TileOccurrence(0x1000, 2, TileFlip.NONE),
+            TileOccurrence(0x2000, 10, TileFlip.HORIZONTAL),
+            TileOccurrence(0x3000, 0, TileFlip.BOTH),
+            TileOccurrence(0x3000, 6, TileFlip.NONE),
+        ]
+        flipped = index.find_tile(encode_4bpp_tiles(flip_pixels(shared[2:3], TileFlip.VERTICAL)))
+        assert [o.flip for o in flipped] == [TileFlip.VERTICAL, TileFlip.BOTH, TileFlip.HORIZONTAL, TileFlip.VERTICAL]
+        assert index.find_tile(bytes(range(32))) == []
+        with pytest.raises(ValueError):
+            index.find_tile(bytes(16))
+
+    def test_where_used(self, index):
+        assert [(o.offset, o.tile_index) for o in index.where_used(0x2000, 8)] == [(0x1000, 0)]
+        assert index.where_used(0x1000, 6) == []  # blank tile is not indexed
+        assert index.where_used(0x4000, 0) == []
+
+    def test_blocks_sharing(self, index):
+        assert index.blocks_sharing(0x1000) == [(0x2000, 4), (0x3000, 4)]
+        assert index.blocks_sharing(0x3000) == [(0x1000, 4), (0x2000, 2)]
+        assert index.blocks_sharing(0x3000, min_shared=3) == [(0x1000, 4)]
+        assert index.blocks_sharing(0x4000) == []
+
+    def test_shared_block_pairs_matches_per_block_queries(self, index):
+        pairs = index.shared_block_pairs()
+
+        assert {(a, b): n for a, b, n in pairs} == {
+            (0x1000, 0x2000): 4, (0x1000, 0x3000): 4, (0x2000, 0x3000): 2
+        }
+        assert index.shared_block_pairs(min_shared=3) == [(0x1000, 0x2000, 4), (0x1000, 0x3000, 4)]
+        # Tiles 2 and 3 appear in all three blocks and are dropped
+        assert index.shared_block_pairs(max_postings=2) == [(0x1000, 0x2000, 2), (0x1000, 0x3000, 2)]
+
+    def test_duplicate_blocks(self, index, shared, tmp_path):
+        index.add_block(0x5000, encode_4bpp_tiles(shared[:6]))
+        index.add_block(0x6000, encode_4bpp_tiles(shared[:6]) + bytes(32))
+        index.add_block(0x7000, encode_4bpp_tiles(shared[:6]))
+        index.add_block(0x8000, encode_4bpp_tiles(flip_pixels(shared[:6], TileFlip.HORIZONTAL)))
+        index.add_block(0x9000, b"")
+
+        assert index.duplicate_of(0x5000) is None
+        assert index.duplicate_of(0x7000) == 0x5000
+        assert index.duplicate_of(0x6000) is None
+        assert index.duplicate_of(0x8000) is None
+        assert index.duplicate_of(0x9000) is None
+
+        index.save(tmp_path / "tiles.npz")
+        assert TileIndex.load(tmp_path / "tiles.npz").duplicate_of(0x7000) == 0x5000
+
+    def test_incremental_add_and_save_load(self, index, shared, tmp_path):
+        assert len(index.find_tile(encode_4bpp_tiles(shared[9:10]))) == 0
+        index.add_block(0x5000, encode_4bpp_tiles(shared[8:10]))
+        index.add_block(0x6000, encode_4bpp_tiles(flip_pixels(shared[9:10], TileFlip.VERTICAL)))
+        assert [o.offset for o in index.find_tile(encode_4bpp_tiles(shared[9:10]))] == [0x5000, 0x6000]
+
+        path = tmp_path / "tiles.npz"
+        index.save(path)
+        loaded = TileIndex.load(path)
+
+        assert len(loaded) == len(index)
+        assert loaded.tile_count == index.tile_count
+        assert loaded.shared_block_pairs() == index.shared_block_pairs()
+        assert loaded.find_tile(encode_4bpp_tiles(shared[3:4])) == index.find_tile(encode_4bpp_tiles(shared[3:4]))
+
+    def test_queries_scale(self):
+        rng = np.random.default_rng(5)
+        library = random_tiles(rng, 2000)
+        index = TileIndex()
+        for block in range(500):
+            picks = library[rng.integers(0, len(library), 64)]
+            index.add_block(block * 0x800, encode_4bpp_tiles(picks))
+
+        assert index.tile_count == 500 * 64
+        sharing = index.blocks_sharing(0x800 * 7, min_shared=2)
+        assert all(count >= 2 for _, count in sharing)
+        pairs = {(a, b): n for a, b, n in index.shared_block_pairs(min_shared=2)}
+        assert all(pairs[tuple(sorted((0x800 * 7, offset)))] == count for offset, count in sharing)
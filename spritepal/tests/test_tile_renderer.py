@@ -0,0 +1,82 @@
+"""Tests for TileRenderer and vectorized 4bpp decoding"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from core.indexed_image import decode_4bpp_tiles
+from core.tile_renderer import TileRenderer
+from PySide6.QtGui import QImage
+
+pytestmark = [
+    pytest.mark.headless,
+    pytest.mark.unit,
+    pytest.mark.ci_safe,
+    pytest.mark.no_manager_setup,
+]
+
+def encode_4bpp_tile(pixels: np.ndarray) -> bytes:
+    """Encode an 8x8 array of color indices as a SNES 4bpp tile"""
+    data = bytearray(32)
+    for row in range(8):
+        for plane in range(4):
+            value = 0
+            for col in range(8):
+                if pixels[row, col] & (1 << plane):
+                    value |= 1 << (7 - col)
+            base = 0 if plane < 2 else 16
+            data[base + row * 2 + (plane & 1)] = value
+    return bytes(data)
+
+class TestDecode4bppTiles:
+    """Test the vectorized tile decoder"""
+
+    def test_round_trip_single_tile(self):
+        pixels = np.arange(64, dtype=np.uint8).reshape(8, 8) % 16
+        decoded = decode_4bpp_tiles(encode_4bpp_tile(pixels), 1, 1)
+        assert np.array_equal(decoded, pixels)
+
+    def test_tile_layout(self):
+        tiles = [np.full((8, 8), i + 1, dtype=np.uint8) for i in range(6)]
+        data = b"".join(encode_4bpp_tile(t) for t in tiles)
+
+        decoded = decode_4bpp_tiles(data, 3, 2)
+
+        assert decoded.shape == (16, 24)
+        assert decoded[0, 0] == 1
+        assert decoded[0, 23] == 3
+        assert decoded[15, 0] == 4
+        assert decoded[15, 23] == 6
+
+    def test_short_data_is_zero_padded(self):
+        data = encode_4bpp_tile(np.full((8, 8), 5, dtype=np.uint8))
+        decoded = decode_4bpp_tiles(data, 2, 1)
+        assert np.all(decoded[:, :8] == 5)
+        assert np.all(decoded[:, 8:] == 0)
+
+class TestTileRenderer:
+    """Test TileRenderer output"""
+
+    @pytest.fixture
+    def renderer(self):
+        return TileRenderer()
+
+    def test_render_tiles_transparency(self, renderer):
+        pixels = np.zeros((8, 8), dtype=np.uint8)
+        pixels[0, 1] = 15
+        image = renderer.render_tiles(encode_4bpp_tile(pixels), 1, 1, None)
+
+        assert image.mode == "RGBA"
+        assert image.getpixel((0, 0)) == (0, 0, 0, 0)
+        assert image.getpixel((1, 0)) == (255, 255, 255, 255)
+
+    def test_indexed_render_palette_swap(self, renderer, qapp):
+        pixels = np.full((8, 8), 15, dtype=np.uint8)
+        image = renderer.render_tiles_indexed(encode_4bpp_tile(pixels), 1, 1, None)
+
+        assert image.format() == QImage.Format.Format_Indexed8
+        assert image.pixel(0, 0) == 0xFFFFFFFF
+
+        renderer.default_palettes[3] = [[0, 0, 0]] * 15 + [[10, 20, 30]]
+        renderer._color_tables.clear()
+        renderer.set_palette(image, 3)
+        assert image.pixel(0, 0) == 0xFF0A141E
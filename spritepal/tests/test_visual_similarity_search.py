@@ -8,6 +8,7 @@ from __future__ import annotations
 
 import logging
 import tempfile
+from collections.abc import MutableMapping
 from pathlib import Path
 
 import numpy as np
@@ -15,9 +16,11 @@ import pytest
 from core.visual_similarity_search import (
     # Systematic pytest markers applied based on test content analysis
     SimilarityMatch,
+    SimilarityTopK,
     SpriteGroupFinder,
     SpriteHash,
     VisualSimilarityEngine,
+    pack_hash_bits,
 )
 from PIL import Image
 
@@ -157,7 +160,8 @@ class TestVisualSimilarityEngine:
         engine = VisualSimilarityEngine()
 
         assert engine.hash_size == 8
-        assert isinstance(engine.sprite_database, dict)
+        assert isinstance(engine.sprite_database, MutableMapping)
+        assert not engine.sprite_database
 
     def test_calculate_phash(self, similarity_engine, test_image_8x8):
         """Test perceptual hash calculation."""
@@ -549,6 +553,344 @@ class TestSpriteGroupFinder:
             for i in range(len(animation) - 1):
                 assert animation[i] < animation[i + 1]
 
+def make_random_hash(rng, offset, base=None, flips=0):
+    """Random SpriteHash, or a copy of base with some hash bits flipped."""
+    if base is None:
+        phash = rng.integers(0, 2, 64, dtype=np.uint8)
+        dhash = rng.integers(0, 2, 64, dtype=np.uint8)
+        histogram = rng.random(48).astype(np.float32)
+        histogram /= histogram.sum()
+    else:
+        phash, dhash, histogram = base.phash.copy(), base.dhash.copy(), base.histogram
+        for bits in (phash, dhash):
+            bits[rng.choice(64, flips, replace=False)] ^= 1
+    return SpriteHash(offset=offset, phash=phash, dhash=dhash, histogram=histogram, metadata={})
+
+def brute_force_similar(engine, target_hash, max_results, threshold):
+    """Reference pairwise search over the whole database."""
+    matches = []
+    for offset, sprite_hash in engine.sprite_database.items():
+        if offset == target_hash.offset:
+            continue
+        score = engine._calculate_similarity(target_hash, sprite_hash)
+        if score >= threshold:
+            matches.append((offset, round(score, 6)))
+    matches.sort(key=lambda m: m[1], reverse=True)
+    return matches[:max_results]
+
+class TestSimilarityIndex:
+    """Test the packed-hash search index behind find_similar."""
+
+    @pytest.fixture
+    def populated_engine(self):
+        """Engine with clusters of near-duplicate hashes."""
+        rng = np.random.default_rng(7)
+        engine = VisualSimilarityEngine()
+        base = None
+        for i in range(3000):
+            if i % 6 == 0:
+                base = make_random_hash(rng, i * 0x20)
+                engine.sprite_database[i * 0x20] = base
+            else:
+                flips = int(rng.integers(0, 6))
+                engine.sprite_database[i * 0x20] = make_random_hash(rng, i * 0x20, base, flips)
+        return engine
+
+    @pytest.mark.parametrize("threshold", [0.8, 0.9, 0.95, 0.98])
+    def test_matches_brute_force(self, populated_engine, threshold):
+        """Indexed search returns exactly the pairwise results."""
+        for offset in (0, 0x20 * 7, 0x20 * 1500, 0x20 * 2999):
+            target = populated_engine.sprite_database[offset]
+            found = [
+                (m.offset, round(m.similarity_score, 6))
+                for m in populated_engine.find_similar(offset, 20, threshold)
+            ]
+            assert found == brute_force_similar(populated_engine, target, 20, threshold)
+
+    def test_default_threshold_prunes_candidates(self, monkeypatch):
+        """At 0.8 a large index verifies only a fraction of its rows."""
+        rng = np.random.default_rng(13)
+        count = 60000
+        bases = rng.integers(0, 2, (count // 6, 128), dtype=np.uint8)
+        bits = np.repeat(bases, 6, axis=0) ^ (rng.random((count, 128)) < 0.03)
+        histograms = rng.random((count, 48)).astype(np.float32)
+        histograms /= histograms.sum(axis=1, keepdims=True)
+        engine = VisualSimilarityEngine()
+        engine.sprite_database = {
+            i * 0x20: SpriteHash(i * 0x20, bits[i, :64], bits[i, 64:], histograms[i], {}) for i in range(count)
+        }
+        engine.build_similarity_index()
+
+        target = engine.sprite_database[0x20 * 600]
+        rows = engine._index.candidates(
+            pack_hash_bits(target.phash)[0], pack_hash_bits(target.dhash)[0], 1.0 - 0.8
+        )
+        assert rows is not None
+        assert len(rows) < count // 2
+
+        found = engine.find_similar(target.offset)
+        monkeypatch.setattr("core.visual_similarity_search.MIH_PROBE_COST", float("inf"))
+        assert found == engine.find_similar(target.offset)
+        assert len(found) == 5
+
+    def test_additions_visible_without_rebuild(self, populated_engine):
+        """Sprites added after the index was built are still found."""
+        populated_engine.build_similarity_index()
+        rng = np.random.default_rng(3)
+        base = populated_engine.sprite_database[0]
+        populated_engine.sprite_database[0xFFFF00] = make_random_hash(rng, 0xFFFF00, base, 0)
+
+        matches = populated_engine.find_similar(0, max_results=50, similarity_threshold=0.95)
+
+        assert 0xFFFF00 in [m.offset for m in matches]
+
+    def test_replaced_and_removed_entries(self, populated_engine):
+        """Overwriting or deleting sprites rebuilds the index."""
+        populated_engine.find_similar(0, similarity_threshold=0.9)
+        rng = np.random.default_rng(5)
+        neighbours = [m.offset for m in populated_engine.find_similar(0, 50, 0.9)]
+        assert neighbours
+
+        populated_engine.sprite_database[neighbours[0]] = make_random_hash(rng, neighbours[0])
+        del populated_engine.sprite_database[neighbours[1]]
+
+        target = populated_engine.sprite_database[0]
+        found = [
+            (m.offset, round(m.similarity_score, 6))
+            for m in populated_engine.find_similar(0, 50, 0.9)
+        ]
+        assert found == brute_force_similar(populated_engine, target, 50, 0.9)
+        assert neighbours[1] not in [offset for offset, _ in found]
+
+    def test_export_import_round_trip(self, populated_engine, tmp_path):
+        """Exported indexes hold a plain dict and search identically on import."""
+        index_path = tmp_path / "index.pkl"
+        populated_engine.export_index(index_path)
+
+        restored = VisualSimilarityEngine()
+        restored.import_index(index_path)
+
+        assert len(restored.sprite_database) == len(populated_engine.sprite_database)
+        assert restored.find_similar(0x20 * 6, 10, 0.9) == populated_engine.find_similar(0x20 * 6, 10, 0.9)
+
+class TestStreamedTopK:
+    """Test scoring of hash batches and the bounded top-k."""
+
+    def test_search_hashes_matches_database_search(self):
+        rng = np.random.default_rng(5)
+        base = make_random_hash(rng, -1)
+        hashes = [make_random_hash(rng, 0x100 * (i + 1), base, int(rng.integers(0, 12))) for i in range(200)]
+        engine = VisualSimilarityEngine()
+        engine.sprite_database.update((h.offset, h) for h in hashes)
+
+        streamed = VisualSimilarityEngine().search_hashes(base, hashes, max_results=20, similarity_threshold=0.7)
+
+        assert [(m.offset, round(m.similarity_score, 6)) for m in streamed] == brute_force_similar(
+            engine, base, 20, 0.7
+        )
+        assert VisualSimilarityEngine().search_hashes(base, []) == []
+
+    def test_top_k_across_batches(self):
+        rng = np.random.default_rng(9)
+        matches = [
+            SimilarityMatch(offset=i, similarity_score=round(float(rng.random()), 2), hash_distance=0, metadata={})
+            for i in range(300)
+        ]
+        top = SimilarityTopK(10)
+
+        changes = [top.add(matches[i:i + 37]) for i in range(0, len(matches), 37)]
+
+        expected = sorted(matches, key=lambda m: (-m.similarity_score, m.offset))[:10]
+        assert top.results() == expected
+        assert changes[0]
+        assert top.threshold == expected[-1].similarity_score
+        assert not top.add([m for m in matches if m.similarity_score < expected[-1].similarity_score])
+        assert not top.add(expected[:3])
+
+class TestBatchedGrouping:
+    """Test the banded pair search and union-find grouping."""
+
+    @pytest.fixture
+    def clustered_engine(self):
+        """Three clusters of near-identical hashes plus unrelated sprites."""
+        rng = np.random.default_rng(11)
+        engine = VisualSimilarityEngine()
+        for cluster, start in enumerate((0x1000, 0x40000, 0x80000)):
+            base = make_random_hash(rng, start)
+            for frame in range(3 + cluster):
+                offset = start + frame * 0x400
+                engine.sprite_database[offset] = make_random_hash(rng, offset, base, 1)
+        for i in range(40):
+            offset = 0x100000 + i * 0x800
+            engine.sprite_database[offset] = make_random_hash(rng, offset)
+        return engine
+
+    @pytest.mark.parametrize("window", [None, 0x800, 0x40000])
+    def test_pairs_match_brute_force(self, clustered_engine, window):
+        """Every qualifying pair within the band is reported exactly once."""
+        firsts, seconds, scores = clustered_engine.similarity_pairs(0.85, window)
+
+        expected = set()
+        database = clustered_engine.sprite_database
+        for a in database:
+            for b in database:
+                if a < b and (window is None or b - a <= window):
+                    if clustered_engine._calculate_similarity(database[a], database[b]) >= 0.85:
+                        expected.add((a, b))
+
+        assert set(zip(firsts.tolist(), seconds.tolist(), strict=True)) == expected
+        assert len(firsts) == len(expected)
+        assert np.all(scores >= 0.85)
+
+    @pytest.mark.parametrize("window", [None, 0x800])
+    def test_indexed_pairs_match_scan(self, clustered_engine, monkeypatch, window):
+        """Pairs found through the substring index equal the block scan."""
+        scanned = clustered_engine.similarity_pairs(0.85, window)
+        monkeypatch.setattr("core.visual_similarity_search.MIH_PROBE_COST", 1e-9)
+        indexed = clustered_engine.similarity_pairs(0.85, window)
+
+        assert len(scanned[0])
+        for a, b in zip(scanned, indexed, strict=True):
+            assert a.tolist() == b.tolist()
+
+    def test_small_blocks_give_same_pairs(self, clustered_engine, monkeypatch):
+        """Block size only affects memory use, not results."""
+        reference = clustered_engine.similarity_pairs(0.85)
+        monkeypatch.setattr("core.visual_similarity_search.PAIR_BLOCK_SIZE", 7)
+        firsts, seconds, _ = clustered_engine.similarity_pairs(0.85)
+        assert firsts.tolist() == reference[0].tolist()
+        assert seconds.tolist() == reference[1].tolist()
+
+    def test_groups_are_connected_components(self, clustered_engine):
+        """Clusters come back whole, largest first and offset-sorted."""
+        groups = SpriteGroupFinder(clustered_engine).find_sprite_groups(0.85)
+
+        assert [len(group) for group in groups] == [5, 4, 3]
+        assert groups[0] == [0x80000 + i * 0x400 for i in range(5)]
+        assert all(group == sorted(group) for group in groups)
+
+    def test_group_min_size(self, clustered_engine):
+        groups = SpriteGroupFinder(clustered_engine).find_sprite_groups(0.85, min_group_size=4)
+        assert [len(group) for group in groups] == [5, 4]
+
+    def test_animations_limited_by_proximity(self, clustered_engine):
+        """Frames further apart than the proximity never join a sequence."""
+        finder = SpriteGroupFinder(clustered_engine)
+
+        animations = finder.find_animations(offset_proximity=0x400, similarity_threshold=0.85)
+        assert animations == [
+            [0x1000 + i * 0x400 for i in range(3)],
+            [0x40000 + i * 0x400 for i in range(4)],
+            [0x80000 + i * 0x400 for i in range(5)],
+        ]
+
+        assert finder.find_animations(offset_proximity=0x3FF, similarity_threshold=0.85) == []
+
+def render_indices(pixels, palette):
+    """Render color indices the way TileRenderer does, with color 0 transparent"""
+    lut = np.zeros((16, 4), dtype=np.uint8)
+    lut[:, :3] = palette
+    lut[1:, 3] = 255
+    lut[0] = 0
+    return Image.fromarray(lut[pixels], "RGBA")
+
+class TestBatchHashing:
+    """Test hashing of decoded tile tensors without PIL"""
+
+    @pytest.fixture
+    def sprite_batch(self):
+        rng = np.random.default_rng(3)
+        yy, xx = np.mgrid[:32, :64]
+        pixels = np.zeros((40, 32, 64), dtype=np.uint8)
+        for sprite in pixels:
+            for _ in range(4):
+                cy, cx, radius = rng.integers(0, 32), rng.integers(0, 64), rng.integers(3, 12)
+                sprite[np.hypot(yy - cy, xx - cx) < radius] = rng.integers(1, 16)
+        palette = rng.integers(0, 256, (16, 3)).astype(np.uint8)
+        return pixels, palette
+
+    def test_histogram_matches_image_path(self, similarity_engine, sprite_batch):
+        pixels, palette = sprite_batch
+        _, _, histograms = similarity_engine.compute_batch_hashes(pixels, palette)
+
+        assert histograms.shape == (len(pixels), 48)
+        for sprite, histogram in zip(pixels, histograms, strict=True):
+            expected = similarity_engine._calculate_color_histogram(render_indices(sprite, palette))
+            np.testing.assert_allclose(histogram, expected, atol=1e-6)
+
+    def test_hashes_match_image_path(self, similarity_engine, sprite_batch):
+        """Tile data and rendered images are downscaled the same way."""
+        pixels, palette = sprite_batch
+        phashes, dhashes, _ = similarity_engine.compute_batch_hashes(pixels, palette)
+
+        assert phashes.shape == dhashes.shape == (len(pixels), 64)
+        for sprite, phash, dhash in zip(pixels, phashes, dhashes, strict=True):
+            image = render_indices(sprite, palette)
+            np.testing.assert_array_equal(similarity_engine._calculate_phash(image), phash)
+            np.testing.assert_array_equal(similarity_engine._calculate_dhash(image), dhash)
+            np.testing.assert_array_equal(similarity_engine.hash_image(image).phash, phash)
+
+    def test_per_sprite_palettes_and_grayscale(self, similarity_engine, sprite_batch):
+        pixels, palette = sprite_batch
+        shared = similarity_engine.compute_batch_hashes(pixels, palette)
+        stacked = similarity_engine.compute_batch_hashes(pixels, np.broadcast_to(palette, (len(pixels), 16, 3)))
+        for a, b in zip(shared, stacked, strict=True):
+            np.testing.assert_array_equal(a, b)
+
+        gray = similarity_engine.compute_batch_hashes(pixels)
+        expected = similarity_engine._calculate_color_histogram(
+            render_indices(pixels[0], np.arange(16)[:, np.newaxis].repeat(3, axis=1) * 17)
+        )
+        np.testing.assert_allclose(gray[2][0], expected, atol=1e-6)
+
+    def test_index_sprite_batch_is_searchable(self, similarity_engine, sprite_batch):
+        pixels, palette = sprite_batch
+        offsets = [0x1000 * (i + 1) for i in range(len(pixels))]
+
+        hashes = similarity_engine.index_sprite_batch(
+            offsets, pixels, palette, metadata=[{"index": i} for i in range(len(pixels))]
+        )
+
+        assert [h.offset for h in hashes] == offsets
+        assert hashes[5].metadata == {"index": 5}
+        assert len(similarity_engine.sprite_database) == len(pixels)
+        matches = similarity_engine.find_similar(offsets[7], max_results=1, similarity_threshold=0.0)
+        assert matches[0].offset != offsets[7]
+
+    def test_hash_image_matches_batch_hashes(self, similarity_engine, sprite_batch):
+        pixels, palette = sprite_batch
+        phashes, dhashes, histograms = similarity_engine.compute_batch_hashes(pixels[:5], palette)
+
+        for i in range(5):
+            image_hash = similarity_engine.hash_image(render_indices(pixels[i], palette))
+            assert image_hash.offset == -1
+            assert (image_hash.phash == phashes[i]).mean() > 0.95
+            assert (image_hash.dhash == dhashes[i]).mean() > 0.95
+            np.testing.assert_allclose(image_hash.histogram, histograms[i], atol=1e-6)
+
+    def test_hash_image_finds_indexed_sprite(self, similarity_engine, sprite_batch):
+        pixels, palette = sprite_batch
+        offsets = [0x1000 * (i + 1) for i in range(len(pixels))]
+        similarity_engine.index_sprite_batch(offsets, pixels, palette)
+
+        reference = render_indices(pixels[11], palette).resize((128, 64), Image.Resampling.NEAREST)
+        matches = similarity_engine.find_similar(
+            similarity_engine.hash_image(reference), max_results=1, similarity_threshold=0.0
+        )
+
+        assert matches[0].offset == offsets[11]
+        assert matches[0].similarity_score > 0.9
+
+    def test_invalid_batches_rejected(self, similarity_engine, sprite_batch):
+        pixels, palette = sprite_batch
+        with pytest.raises(ValueError):
+            similarity_engine.compute_batch_hashes(pixels[0], palette)
+        with pytest.raises(ValueError):
+            similarity_engine.compute_batch_hashes(pixels, palette[:8])
+        with pytest.raises(ValueError):
+            similarity_engine.index_sprite_batch([0], pixels, palette)
+        assert similarity_engine.index_sprite_batch([], pixels[:0]) == []
+
 @pytest.mark.slow
 class TestVisualSimilarityPerformance:
     """Performance tests for visual similarity search."""
@@ -329,14 +329,14 @@ class TestPreviewPanel:
         # Should call update_pixmap (not set_preview)
         panel.preview.update_pixmap.assert_called_once_with(mock_pixmap)
 
-    @patch("ui.zoomable_preview.PreviewPanel._pil_to_pixmap")
+    @patch("ui.zoomable_preview.PreviewPanel._qimage_to_pixmap")
     def test_apply_palette_preserves_view(
-        self, mock_pil_to_pixmap, panel, test_grayscale_image, test_palettes
+        self, mock_qimage_to_pixmap, panel, test_grayscale_image, test_palettes
     ):
         """Test that applying palette preserves view state"""
         # Mock the conversion
         mock_pixmap = Mock()
-        mock_pil_to_pixmap.return_value = mock_pixmap
+        mock_qimage_to_pixmap.return_value = mock_pixmap
 
         # Set up panel
         panel.set_grayscale_image(test_grayscale_image)
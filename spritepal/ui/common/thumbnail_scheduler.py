@@ -0,0 +1,132 @@
+"""
+Viewport-driven thumbnail scheduling for the sprite gallery.
+
+The scheduler turns the range of items on screen into an ordered work list:
+visible items first, then a prefetch window ahead of the scroll direction,
+then a short margin behind. Each new plan replaces the previous one in the
+worker queue, so items that scrolled out of the window are cancelled rather
+than rendered.
+
+While the user scrolls quickly (viewport updates arriving closer together
+than the burst interval) the plan asks for cheap low-resolution previews of
+the whole window before full renders of the visible items. Once scrolling
+settles, a final plan fills in full-resolution thumbnails for the window.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+# Grid rows rendered ahead of the viewport in the scroll direction
+PREFETCH_ROWS = 4
+
+# Grid rows kept behind the viewport
+BEHIND_ROWS = 1
+
+# Viewport updates closer together than this (seconds) are a scroll burst
+BURST_INTERVAL = 0.3
+
+# Upper bound on items in one plan, for views that report everything visible
+MAX_WINDOW_ITEMS = 256
+
+class ThumbnailPlan(NamedTuple):
+    """Ordered thumbnail work for one viewport position"""
+
+    entries: list[tuple[int, bool]]  # (item, preview) in priority order
+    burst: bool
+    direction: int  # 1 scrolling down, -1 scrolling up
+
+class ViewportThumbnailScheduler:
+    """Plans thumbnail requests around the visible items of a grid view."""
+
+    def __init__(
+        self,
+        prefetch_rows: int = PREFETCH_ROWS,
+        behind_rows: int = BEHIND_ROWS,
+        burst_interval: float = BURST_INTERVAL,
+        max_window: int = MAX_WINDOW_ITEMS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            prefetch_rows: Grid rows prefetched ahead of the scroll direction
+            behind_rows: Grid rows kept behind the viewport
+            burst_interval: Maximum seconds between updates of a scroll burst
+            max_window: Maximum items in a plan
+            clock: Time source, replaceable in tests
+        """
+        self.prefetch_rows = prefetch_rows
+        self.behind_rows = behind_rows
+        self.burst_interval = burst_interval
+        self.max_window = max_window
+        self.clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the last viewport so the next update always produces a plan"""
+        self._last_range: tuple[int, int] | None = None
+        self._last_time: float | None = None
+        self._last_burst = False
+        self._direction = 1
+
+    def update(self, first: int, last: int, columns: int, item_count: int) -> ThumbnailPlan | None:
+        """
+        Plan thumbnail work for the items currently on screen.
+
+        Args:
+            first: First visible item
+            last: Last visible item
+            columns: Items per grid row
+            item_count: Total number of items
+
+        Returns:
+            A new plan, or None if the previous plan still applies
+        """
+        if item_count <= 0:
+            self.reset()
+            return None
+
+        first = min(max(0, first), item_count - 1)
+        last = min(max(first, last), item_count - 1, first + self.max_window - 1)
+        now = self.clock()
+
+        moved = (first, last) != self._last_range
+        burst = (
+            moved
+            and self._last_time is not None
+            and now - self._last_time < self.burst_interval
+        )
+        if not moved and not self._last_burst:
+            return None
+
+        if moved and self._last_range is not None and first != self._last_range[0]:
+            self._direction = 1 if first > self._last_range[0] else -1
+        self._last_range = (first, last)
+        self._last_time = now
+        self._last_burst = burst
+
+        visible = list(range(first, last + 1))
+        ahead, behind = self._margins(first, last, max(1, columns), item_count)
+        room = self.max_window - len(visible)
+        ahead = ahead[:room]
+        behind = behind[:max(0, room - len(ahead))]
+
+        if burst:
+            entries = [(item, True) for item in visible + ahead]
+            entries += [(item, False) for item in visible]
+        else:
+            entries = [(item, False) for item in visible + ahead + behind]
+        return ThumbnailPlan(entries, burst, self._direction)
+
+    def _margins(self, first: int, last: int, columns: int, item_count: int) -> tuple[list[int], list[int]]:
+        """Items ahead of and behind the viewport, nearest first"""
+        below_end = min(item_count, last + 1 + self.prefetch_rows * columns)
+        above_start = max(0, first - self.prefetch_rows * columns)
+        if self._direction > 0:
+            ahead = list(range(last + 1, below_end))
+            behind = list(range(first - 1, max(-1, first - 1 - self.behind_rows * columns), -1))
+        else:
+            ahead = list(range(first - 1, above_start - 1, -1))
+            behind = list(range(last + 1, min(item_count, last + 1 + self.behind_rows * columns)))
+        return ahead, behind
@@ -2,6 +2,14 @@
 ROM Map Visualization Widget
 
 Visual representation of ROM with sprite locations for manual offset exploration.
+
+Found sprites are kept as a per-pixel-column histogram (sprite count and best
+quality per column) that is updated incrementally as sprites are added. The
+markers are rasterized from the histogram into a cached image, and only the
+columns touched by a new sprite are rewritten. The background, ROM regions
+and sprite regions are cached in a second image rebuilt on resize or when
+the regions change. paintEvent blits both and draws only the cursor line and
+text labels live.
 """
 
 from __future__ import annotations
@@ -13,8 +21,9 @@ try:
 except ImportError:
     from typing_extensions import override
 
+import numpy as np
 from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QColor, QFont, QMouseEvent, QPainter, QPaintEvent, QPen
+from PySide6.QtGui import QColor, QFont, QImage, QMouseEvent, QPainter, QPaintEvent, QPen, QResizeEvent
 from PySide6.QtWidgets import QSizePolicy, QWidget
 from utils.logging_config import get_logger
 from utils.sprite_regions import SpriteRegion
@@ -26,6 +35,28 @@ MAX_SPRITES_IN_MAP = 10000  # Maximum sprites to keep in memory
 SPRITE_CLEANUP_THRESHOLD = 12000  # Start cleanup when we exceed this
 SPRITE_CLEANUP_TARGET = 8000  # Clean down to this many sprites
 
+# Sprite markers span columns x - 2 .. x + 1 and rows 15 .. height - 15
+MARKER_LEFT = 2
+MARKER_WIDTH = 4
+MARKER_TOP = 15
+
+# Marker colors by best quality in the column (ARGB, alpha set from density)
+HIGH_QUALITY_RGB = 0x00FF00  # quality > 0.8
+MEDIUM_QUALITY_RGB = 0xFFFF00  # quality > 0.5
+LOW_QUALITY_RGB = 0xFF0000
+
+# Marker alpha grows from MIN_MARKER_ALPHA (one sprite) to opaque at this many sprites
+DENSITY_SATURATION = 16
+MIN_MARKER_ALPHA = 200
+
+# Common sprite areas (based on typical SNES ROM layout)
+ROM_AREAS = [
+    (0x000000, 0x100000, "#2b2b2b", "Low ROM"),
+    (0x100000, 0x200000, "#3b3b3b", "Mid ROM"),
+    (0x200000, 0x300000, "#4b4b4b", "High ROM"),
+    (0x300000, 0x400000, "#5b5b5b", "Extended ROM"),
+]
+
 class ROMMapWidget(QWidget):
     """Visual representation of ROM with sprite locations"""
 
@@ -36,6 +67,7 @@ class ROMMapWidget(QWidget):
         self.rom_size: int = 0x400000  # Default 4MB
         self.current_offset: int = 0
         self.found_sprites: list[tuple[int, float]] = []  # List of (offset, quality) tuples
+        self._sprite_positions: dict[int, int] = {}  # offset -> index in found_sprites
         self._needs_update: bool = False  # Track if widget needs visual update
 
         # Smart mode region visualization
@@ -43,6 +75,13 @@ class ROMMapWidget(QWidget):
         self.current_region_index: int = -1
         self.highlight_regions: bool = True
 
+        # Per-column sprite histogram and the cached layers drawn from it
+        self._column_counts = np.zeros(0, dtype=np.int32)
+        self._column_quality = np.zeros(0, dtype=np.float32)  # -1 where a column has no sprite
+        self._marker_image: QImage | None = None
+        self._marker_pixels: np.ndarray | None = None
+        self._base_image: QImage | None = None
+
         self.setMinimumHeight(60)
         self.setMaximumHeight(80)
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
@@ -54,6 +93,7 @@ class ROMMapWidget(QWidget):
     def set_rom_size(self, size: int):
         """Update the ROM size"""
         self.rom_size = size
+        self._invalidate_layers()
         self.update()
 
     def set_current_offset(self, offset: int):
@@ -64,31 +104,35 @@ class ROMMapWidget(QWidget):
     def add_found_sprite(self, offset: int, quality: float = 1.0):
         """Add a found sprite location with memory management"""
         # Check for duplicates (same offset)
-        for i, (existing_offset, existing_quality) in enumerate(self.found_sprites):
-            if existing_offset == offset:
-                # Update quality if new one is better
-                if quality > existing_quality:
-                    self.found_sprites[i] = (offset, quality)
-                    self._schedule_update()
-                return
+        position = self._sprite_positions.get(offset)
+        if position is not None:
+            # Update quality if new one is better
+            if quality > self.found_sprites[position][1]:
+                self.found_sprites[position] = (offset, quality)
+                self._add_to_column(offset, quality, counted=False)
+            return
 
         # Add new sprite
+        self._sprite_positions[offset] = len(self.found_sprites)
         self.found_sprites.append((offset, quality))
 
         # Memory management: cleanup if we have too many sprites
         if len(self.found_sprites) > SPRITE_CLEANUP_THRESHOLD:
             self._cleanup_sprites()
+            self._invalidate_layers()
+            self._schedule_update()
+            return
 
-        self._schedule_update()
+        self._add_to_column(offset, quality)
 
     def add_found_sprites_batch(self, sprites: list[tuple[int, float]]):
         """Add multiple sprites efficiently"""
-        # Create a set of existing offsets for quick lookup
-        existing_offsets = {offset for offset, _ in self.found_sprites}
-
         # Filter out duplicates and add new sprites
-        new_sprites = [(offset, quality) for offset, quality in sprites
-                      if offset not in existing_offsets]
+        new_sprites: list[tuple[int, float]] = []
+        for offset, quality in sprites:
+            if offset not in self._sprite_positions:
+                self._sprite_positions[offset] = len(self.found_sprites) + len(new_sprites)
+                new_sprites.append((offset, quality))
 
         if new_sprites:
             self.found_sprites.extend(new_sprites)
@@ -96,13 +140,22 @@ class ROMMapWidget(QWidget):
             # Memory management after batch add
             if len(self.found_sprites) > SPRITE_CLEANUP_THRESHOLD:
                 self._cleanup_sprites()
+                self._invalidate_layers()
+                self._schedule_update()
+                return
 
-            self._schedule_update()
+            offsets, qualities = zip(*new_sprites, strict=True)
+            self._add_to_histogram(np.array(offsets), np.array(qualities))
 
     def clear_sprites(self):
         """Clear all found sprite markers"""
         if self.found_sprites:  # Only clear if there are sprites
             self.found_sprites = []
+            self._sprite_positions.clear()
+            self._column_counts[:] = 0
+            self._column_quality[:] = -1
+            if self._marker_pixels is not None:
+                self._marker_pixels[:] = 0
             self.update()
 
     def get_sprite_count(self) -> int:
@@ -112,17 +165,20 @@ class ROMMapWidget(QWidget):
     def set_sprite_regions(self, regions: list[SpriteRegion]):
         """Set sprite regions for visualization"""
         self.sprite_regions = regions
+        self._base_image = None
         self.update()
 
     def set_current_region(self, region_index: int):
         """Highlight the current region"""
         if self.current_region_index != region_index:
             self.current_region_index = region_index
+            self._base_image = None
             self.update()
 
     def toggle_region_highlight(self, enabled: bool):
         """Toggle region highlighting on/off"""
         self.highlight_regions = enabled
+        self._base_image = None
         self.update()
 
     def _cleanup_sprites(self):
@@ -136,14 +192,199 @@ class ROMMapWidget(QWidget):
 
         # Re-sort by offset for consistent visualization
         self.found_sprites.sort(key=lambda x: x[0])
+        self._sprite_positions = {offset: i for i, (offset, _) in enumerate(self.found_sprites)}
 
-    def _schedule_update(self):
+    def _schedule_update(self, x_start: int | None = None, x_end: int | None = None):
         """Schedule a widget update, optimizing for performance"""
         if self.isVisible():
-            self.update()
+            if x_start is None or x_end is None:
+                self.update()
+            else:
+                self.update(x_start, 0, x_end - x_start, self.height())
         else:
             self._needs_update = True
 
+    def _invalidate_layers(self):
+        """Drop the cached histogram and images; they are rebuilt on the next paint"""
+        self._marker_image = None
+        self._marker_pixels = None
+        self._base_image = None
+
+    def _sprite_columns(self, offsets: np.ndarray) -> np.ndarray:
+        """Pixel column of each offset, clipped to the widget"""
+        width = max(1, self.width())
+        columns = offsets.astype(np.int64) * width // max(1, self.rom_size)
+        return np.clip(columns, 0, width - 1)
+
+    def _add_to_column(self, offset: int, quality: float, counted: bool = True):
+        """Add one sprite to the column histogram and redraw its marker"""
+        if self._marker_pixels is None:
+            # Layers are rebuilt from found_sprites on the next paint
+            self._schedule_update()
+            return
+        if not 0 <= offset < self.rom_size:
+            return
+
+        width = len(self._column_counts)
+        x = min(offset * width // self.rom_size, width - 1)
+        if counted:
+            self._column_counts[x] += 1
+        self._column_quality[x] = max(self._column_quality[x], quality)
+
+        x_start = max(0, x - MARKER_LEFT)
+        x_end = min(width, x - MARKER_LEFT + MARKER_WIDTH)
+        self._paint_marker_columns(x_start, x_end)
+        self._schedule_update(x_start, x_end)
+
+    def _add_to_histogram(self, offsets: np.ndarray, qualities: np.ndarray):
+        """Add a batch of sprites to the column histogram and redraw the touched columns"""
+        if self._marker_pixels is None:
+            # Layers are rebuilt from found_sprites on the next paint
+            self._schedule_update()
+            return
+
+        in_rom = (offsets >= 0) & (offsets < self.rom_size)
+        if not in_rom.any():
+            return
+        columns = self._sprite_columns(offsets[in_rom])
+        np.add.at(self._column_counts, columns, 1)
+        np.maximum.at(self._column_quality, columns, qualities[in_rom].astype(np.float32))
+
+        # A marker at column x covers pixel columns x - 2 .. x + 1
+        x_start = max(0, int(columns.min()) - MARKER_LEFT)
+        x_end = min(len(self._column_counts), int(columns.max()) - MARKER_LEFT + MARKER_WIDTH)
+        self._paint_marker_columns(x_start, x_end)
+        self._schedule_update(x_start, x_end)
+
+    def _rebuild_histogram(self, width: int):
+        """Recompute the column histogram from found_sprites for a new width"""
+        self._column_counts = np.zeros(width, dtype=np.int32)
+        self._column_quality = np.full(width, -1, dtype=np.float32)
+        if not self.found_sprites:
+            return
+        sprites = np.array(self.found_sprites, dtype=np.float64)
+        offsets = sprites[:, 0].astype(np.int64)
+        in_rom = (offsets >= 0) & (offsets < self.rom_size)
+        columns = self._sprite_columns(offsets[in_rom])
+        self._column_counts += np.bincount(columns, minlength=width).astype(np.int32)
+        np.maximum.at(self._column_quality, columns, sprites[in_rom, 1].astype(np.float32))
+
+    def _marker_colors(self, x_start: int, x_end: int) -> np.ndarray:
+        """ARGB marker color for pixel columns x_start .. x_end - 1 (0 where empty)"""
+        # Pixel column c shows the markers of sprite columns c - 1 .. c + 2
+        behind = MARKER_WIDTH - MARKER_LEFT - 1
+        lo = x_start - behind
+        hi = x_end + MARKER_LEFT
+        clip_lo, clip_hi = max(0, lo), min(len(self._column_counts), hi)
+        counts = np.zeros(hi - lo, dtype=np.int32)
+        quality = np.full(hi - lo, -1, dtype=np.float32)
+        counts[clip_lo - lo:clip_hi - lo] = self._column_counts[clip_lo:clip_hi]
+        quality[clip_lo - lo:clip_hi - lo] = self._column_quality[clip_lo:clip_hi]
+        size = x_end - x_start
+        window_counts = counts[:size].copy()
+        window_quality = quality[:size].copy()
+        for shift in range(1, MARKER_WIDTH):
+            window_counts += counts[shift:shift + size]
+            np.maximum(window_quality, quality[shift:shift + size], out=window_quality)
+
+        rgb = np.where(
+            window_quality > 0.8, HIGH_QUALITY_RGB,
+            np.where(window_quality > 0.5, MEDIUM_QUALITY_RGB, LOW_QUALITY_RGB),
+        ).astype(np.uint32)
+        density = np.minimum(1.0, np.log2(np.maximum(window_counts, 1)) / np.log2(DENSITY_SATURATION))
+        alpha = (MIN_MARKER_ALPHA + (255 - MIN_MARKER_ALPHA) * density).astype(np.uint32)
+        return np.where(window_counts > 0, (alpha << 24) | rgb, 0).astype(np.uint32)
+
+    def _paint_marker_columns(self, x_start: int, x_end: int):
+        """Rewrite a column range of the marker image from the histogram"""
+        if self._marker_pixels is None or x_end <= x_start:
+            return
+        self._marker_pixels[:, x_start:x_end] = self._marker_colors(x_start, x_end)
+
+    def _ensure_layers(self, width: int, height: int):
+        """Rebuild the cached marker and base images if the size changed"""
+        marker_height = max(1, height - 30)
+        if (
+            self._marker_image is None
+            or self._marker_image.width() != width
+            or self._marker_image.height() != marker_height
+        ):
+            self._rebuild_histogram(width)
+            self._marker_image = QImage(width, marker_height, QImage.Format.Format_ARGB32)
+            stride = self._marker_image.bytesPerLine() // 4
+            pixels = np.frombuffer(self._marker_image.bits(), dtype=np.uint32, count=stride * marker_height)
+            self._marker_pixels = pixels.reshape(marker_height, stride)[:, :width]
+            self._marker_pixels[:] = 0
+            self._paint_marker_columns(0, width)
+            self._base_image = None
+
+        if self._base_image is None or self._base_image.height() != height:
+            self._base_image = self._render_base(width, height)
+
+    def _render_base(self, width: int, height: int) -> QImage:
+        """Render background, ROM areas, sprite regions and scale ticks"""
+        image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+        painter = QPainter(image)
+        try:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+            # Draw background
+            painter.fillRect(0, 0, width, height, Qt.GlobalColor.black)
+
+            # Draw ROM regions
+            for start, end, color, _label in ROM_AREAS:
+                if start < self.rom_size:
+                    x_start = int((start / self.rom_size) * width)
+                    x_end = int((min(end, self.rom_size) / self.rom_size) * width)
+                    painter.fillRect(x_start, 20, x_end - x_start, height - 40, QColor(color))
+
+            # Draw sprite regions if in smart mode
+            if self.sprite_regions and self.highlight_regions:
+                for i, (x_start, x_end) in enumerate(self._region_spans(width)):
+                    if x_start is None:
+                        continue
+                    # Different colors for current/other regions
+                    if i == self.current_region_index:
+                        # Highlighted current region
+                        painter.fillRect(x_start, 10, x_end - x_start, height - 20,
+                                       QColor(100, 150, 255, 60))  # Highlighted blue
+                        painter.setPen(QPen(QColor(100, 150, 255), 2))
+                    else:
+                        # Other regions
+                        painter.fillRect(x_start, 10, x_end - x_start, height - 20,
+                                       QColor(80, 80, 80, 40))  # Subtle gray
+                        painter.setPen(QPen(QColor(120, 120, 120), 1))
+
+                    # Draw region boundaries
+                    painter.drawRect(x_start, 10, x_end - x_start, height - 20)
+
+            # Draw scale ticks (labels are drawn live)
+            painter.setPen(Qt.GlobalColor.gray)
+            for i in range(5):  # 0%, 25%, 50%, 75%, 100%
+                x = max(0, min(int((i / 4) * width), width - 1))
+                painter.drawLine(x, height - 10, x, height)
+        finally:
+            painter.end()
+        return image
+
+    def _region_spans(self, width: int) -> list[tuple[int | None, int]]:
+        """Pixel span of each sprite region, or (None, 0) if it is outside the ROM"""
+        spans: list[tuple[int | None, int]] = []
+        for region in self.sprite_regions:
+            if 0 <= region.start_offset < self.rom_size:
+                x_start = int((region.start_offset / self.rom_size) * width)
+                x_end = int((min(region.end_offset, self.rom_size) / self.rom_size) * width)
+                spans.append((x_start, x_end))
+            else:
+                spans.append((None, 0))
+        return spans
+
+    @override
+    def resizeEvent(self, event: QResizeEvent):
+        """Cached layers are rebuilt at the new size on the next paint"""
+        super().resizeEvent(event)
+        self._invalidate_layers()
+
     @override
     def showEvent(self, event: Any):
         """Handle widget becoming visible"""
@@ -157,84 +398,25 @@ class ROMMapWidget(QWidget):
         """Paint the ROM map visualization with error recovery"""
         try:
             painter = QPainter(self)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
             # Get widget dimensions with bounds checking
             width = max(1, self.width())  # Ensure minimum width
             height = max(1, self.height())  # Ensure minimum height
 
-            # Draw background
-            painter.fillRect(0, 0, width, height, Qt.GlobalColor.black)
+            # Blit the cached background and sprite markers
+            self._ensure_layers(width, height)
+            if self._base_image is not None:
+                painter.drawImage(0, 0, self._base_image)
+            if self._marker_image is not None:
+                painter.drawImage(0, MARKER_TOP, self._marker_image)
 
-            # Draw ROM regions
-            # Common sprite areas (based on typical SNES ROM layout)
-            regions = [
-                (0x000000, 0x100000, "#2b2b2b", "Low ROM"),
-                (0x100000, 0x200000, "#3b3b3b", "Mid ROM"),
-                (0x200000, 0x300000, "#4b4b4b", "High ROM"),
-                (0x300000, 0x400000, "#5b5b5b", "Extended ROM"),
-            ]
-
-            for start, end, color, _label in regions:
-                if start < self.rom_size:
-                    x_start = int((start / self.rom_size) * width)
-                    x_end = int((min(end, self.rom_size) / self.rom_size) * width)
-                    painter.fillRect(x_start, 20, x_end - x_start, height - 40, QColor(color))
-
-            # Draw sprite regions if in smart mode
+            # Draw region numbers if space permits
             if self.sprite_regions and self.highlight_regions:
-                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-                for i, region in enumerate(self.sprite_regions):
-                    if 0 <= region.start_offset < self.rom_size:
-                        x_start = int((region.start_offset / self.rom_size) * width)
-                        x_end = int((min(region.end_offset, self.rom_size) / self.rom_size) * width)
-
-                        # Different colors for current/other regions
-                        if i == self.current_region_index:
-                            # Highlighted current region
-                            painter.fillRect(x_start, 10, x_end - x_start, height - 20,
-                                           QColor(100, 150, 255, 60))  # Highlighted blue
-                            painter.setPen(QPen(QColor(100, 150, 255), 2))
-                        else:
-                            # Other regions
-                            painter.fillRect(x_start, 10, x_end - x_start, height - 20,
-                                           QColor(80, 80, 80, 40))  # Subtle gray
-                            painter.setPen(QPen(QColor(120, 120, 120), 1))
-
-                        # Draw region boundaries
-                        painter.drawRect(x_start, 10, x_end - x_start, height - 20)
-
-                        # Draw region number if space permits
-                        if x_end - x_start > 20:
-                            painter.setPen(Qt.GlobalColor.white)
-                            painter.setFont(QFont("Arial", 8))
-                            painter.drawText(x_start + 2, 25, f"R{i+1}")
-
-            # Draw found sprites with bounds checking
-            painter.setPen(Qt.PenStyle.NoPen)
-            for offset, quality in self.found_sprites:
-                if 0 <= offset < self.rom_size:  # Enhanced bounds checking
-                    try:
-                        x = int((offset / max(1, self.rom_size)) * width)  # Prevent division by zero
-                        # Ensure x is within widget bounds
-                        x = max(0, min(x, width - 1))
-
-                        # Color based on quality (green = high, yellow = medium, red = low)
-                        if quality > 0.8:
-                            painter.setBrush(Qt.GlobalColor.green)
-                        elif quality > 0.5:
-                            painter.setBrush(Qt.GlobalColor.yellow)
-                        else:
-                            painter.setBrush(Qt.GlobalColor.red)
-
-                        # Draw sprite marker with bounds checking
-                        rect_height = max(1, height - 30)
-                        painter.drawRect(x - 2, 15, 4, rect_height)
-                    except (ArithmeticError, ValueError) as e:
-                        # Skip this sprite if calculation fails
-                        logger.warning(f"Error drawing sprite at offset 0x{offset:06X}: {e}")
-                        continue
+                painter.setPen(Qt.GlobalColor.white)
+                painter.setFont(QFont("Arial", 8))
+                for i, (x_start, x_end) in enumerate(self._region_spans(width)):
+                    if x_start is not None and x_end - x_start > 20:
+                        painter.drawText(x_start + 2, 25, f"R{i+1}")
 
             # Draw current position indicator with error recovery
             if 0 <= self.current_offset < self.rom_size:
@@ -254,13 +436,12 @@ class ROMMapWidget(QWidget):
                 except (ArithmeticError, ValueError) as e:
                     logger.warning(f"Error drawing current position indicator: {e}")
 
-            # Draw scale markers with error recovery
+            # Draw scale labels with error recovery
             painter.setPen(Qt.GlobalColor.gray)
             try:
                 for i in range(5):  # 0%, 25%, 50%, 75%, 100%
                     x = int((i / 4) * width)
                     x = max(0, min(x, width - 1))  # Bounds check
-                    painter.drawLine(x, height - 10, x, height)
 
                     # Draw MB labels with bounds checking
                     mb_value = int((i / 4) * (self.rom_size / 0x100000)) if self.rom_size > 0 else 0
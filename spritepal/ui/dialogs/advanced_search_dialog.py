@@ -9,14 +9,26 @@ import json
 import logging
 import mmap
 import re
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+from core.hex_pattern_search import (
+    HexPatternMatcher,
+    MultiPatternMatcher,
+    RegexPatternSet,
+    match_all_within_window,
+    parse_hex_pattern,
+)
+from core.managers import get_extraction_manager
 from core.parallel_sprite_finder import ParallelSpriteFinder, SearchResult
+from core.streaming_visual_search import StreamingVisualSearch
 from core.visual_similarity_search import SimilarityMatch, VisualSimilarityEngine
 from core.workers.base import handle_worker_errors
+from PIL import Image
 from PySide6.QtCore import QMutex, Qt, QThread, QWaitCondition, Signal
 from PySide6.QtGui import QKeySequence, QPixmap, QShortcut
 from PySide6.QtWidgets import (
@@ -24,6 +36,7 @@ from PySide6.QtWidgets import (
     QComboBox,
     QDialog,
     QDialogButtonBox,
+    QFileDialog,
     QGridLayout,
     QGroupBox,
     QHBoxLayout,
@@ -46,9 +59,18 @@ from ui.common.worker_manager import WorkerManager
 from ui.dialogs.similarity_results_dialog import show_similarity_results
 from utils.constants import MAX_SPRITE_SIZE, MIN_SPRITE_SIZE
 from utils.preview_generator import PreviewGenerator, PreviewRequest
+from utils.rom_cache import get_rom_cache
 
 logger = logging.getLogger(__name__)
 
+# AND queries require every pattern to match within a window of this many bytes
+AND_WINDOW_SIZE = 256
+
+# Visual search hashes cached offsets first, then scans in small chunks so
+# that the first scanner results arrive quickly
+VISUAL_CACHED_CANDIDATES = 4096
+VISUAL_SCAN_CHUNK_SIZE = 0x10000
+
 @dataclass
 class SearchFilter:
     """Container for search filter settings."""
@@ -80,6 +102,8 @@ class SearchWorker(QThread):
 
     progress = Signal(int, int)  # current, total
     result_found = Signal(SearchResult)
+    results_found = Signal(list)  # batch of SearchResult
+    top_matches_updated = Signal(list)  # current best SearchResults, replacing earlier ones
     search_complete = Signal(list)  # all results
     error = Signal(str)
     operation_finished = Signal(bool, str)  # success, message - for decorator compatibility
@@ -167,70 +191,115 @@ class SearchWorker(QThread):
         self.search_complete.emit(filtered_results)
 
     def _run_visual_search(self):
-        """Run visual similarity search."""
+        """
+        Run a streaming visual similarity search.
+
+        The reference is an image file or a ROM offset. Matches from the
+        saved index are reported first; cached scan offsets and then live
+        scanner results are hashed in batches, and the best matches so far
+        are re-emitted whenever they change. New hashes are saved to the
+        index for later searches.
+        """
         try:
             rom_path = self.params["rom_path"]
-            ref_offset = self.params["reference_offset"]
             similarity_threshold = self.params["similarity_threshold"]
-            self.params["search_scope"]
+            search_scope = self.params.get("search_scope", "Current ROM")
+            max_results = self.params.get("max_results", 50)
 
-            # Initialize similarity engine
             similarity_engine = VisualSimilarityEngine()
-
-            # Check if similarity index exists
             index_path = Path(rom_path).with_suffix(".similarity_index")
-            if not index_path.exists():
-                self.error.emit("No similarity index found for ROM. Please build index first.")
-                return
-
-            # Load similarity index
-            try:
-                similarity_engine.import_index(index_path)
-                logger.info(f"Loaded similarity index with {len(similarity_engine.sprite_database)} sprites")
-            except Exception as e:
-                self.error.emit(f"Failed to load similarity index: {e}")
-                return
-
-            # Search for similar sprites
-            max_results = self.params.get("max_results", 50)
+            if index_path.exists():
+                try:
+                    similarity_engine.import_index(index_path)
+                    logger.info(f"Loaded similarity index with {len(similarity_engine.sprite_database)} sprites")
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable similarity index: {e}")
 
-            if ref_offset not in similarity_engine.sprite_database:
-                self.error.emit(f"Reference sprite at 0x{ref_offset:X} not found in index")
-                return
+            hal_compressor = get_extraction_manager().get_rom_extractor().rom_injector.hal_compressor
 
-            # Perform similarity search
-            self.progress.emit(0, 1)  # Indeterminate progress
+            def decompress(offsets: list[int]) -> list[bytes | None]:
+                results = hal_compressor.decompress_batch([(rom_path, offset) for offset in offsets])
+                return [data if ok and isinstance(data, bytes) else None for ok, data in results]
 
-            matches = similarity_engine.find_similar(
-                ref_offset,
+            search = StreamingVisualSearch(
+                similarity_engine,
+                decompress,
                 max_results=max_results,
-                similarity_threshold=similarity_threshold / 100.0  # Convert percentage to decimal
+                similarity_threshold=similarity_threshold / 100.0,  # Convert percentage to decimal
+                index_path=index_path,
             )
 
-            self.progress.emit(1, 1)
-
-            # Convert matches to SearchResult format for compatibility
-            results = []
-            for match in matches:
-                # Create a simplified SearchResult from SimilarityMatch
-                result = SearchResult(
-                    offset=match.offset,
-                    size=0,  # Not available from similarity search
-                    tile_count=0,  # Not available from similarity search
-                    compressed_size=0,  # Not available from similarity search
-                    confidence=match.similarity_score,
-                    metadata={"similarity_score": match.similarity_score,
-                             "hash_distance": match.hash_distance}
-                )
-                results.append(result)
-                self.result_found.emit(result)
+            reference_image = self.params.get("reference_image")
+            if reference_image:
+                with Image.open(reference_image) as image:
+                    target_hash = similarity_engine.hash_image(image)
+            else:
+                ref_offset = self.params["reference_offset"]
+                target_hash = search.reference_from_offset(ref_offset)
+                if target_hash is None:
+                    self.error.emit(f"Could not decode reference sprite at 0x{ref_offset:X}")
+                    return
 
-            self.search_complete.emit(results)
+            self.progress.emit(0, 0)  # Indeterminate until the scanner reports
+
+            results: list[SearchResult] = []
+            for update in search.run(
+                target_hash,
+                self._visual_search_candidates(rom_path, search_scope),
+                is_cancelled=lambda: self._cancelled,
+            ):
+                if update.changed:
+                    results = [self._similarity_result(match) for match in update.matches]
+                    self.top_matches_updated.emit(results)
+
+            if not self._cancelled:
+                self.search_complete.emit(results)
 
         except Exception as e:
             logger.exception("Visual search error")
             self.error.emit(str(e))
 
+    def _visual_search_candidates(self, rom_path: str, search_scope: str) -> Iterator[int]:
+        """Offsets to hash for a visual search, cheapest first."""
+        start = self.params.get("start_offset", 0)
+        end = self.params.get("end_offset")
+
+        for suggestion in get_rom_cache().get_offset_suggestions(rom_path, limit=VISUAL_CACHED_CANDIDATES):
+            offset = suggestion["offset"]
+            if search_scope != "Selected Region" or (offset >= start and (end is None or offset < end)):
+                yield offset
+
+        if search_scope == "All Indexed Sprites":
+            return
+
+        self.finder = ParallelSpriteFinder(
+            num_workers=self.params.get("num_workers", 4),
+            chunk_size=VISUAL_SCAN_CHUNK_SIZE,
+            step_size=self.params.get("step_size", 0x100)
+        )
+        for completed, total, chunk_results in self.finder.iter_search(
+            rom_path,
+            start if search_scope == "Selected Region" else 0,
+            end if search_scope == "Selected Region" else None,
+            cancellation_token=self  # type: ignore[arg-type]  # Worker has is_set() method
+        ):
+            self.progress.emit(completed, total)
+            for result in sorted(chunk_results, key=lambda result: result.offset):
+                yield result.offset
+
+    @staticmethod
+    def _similarity_result(match: SimilarityMatch) -> SearchResult:
+        """Wrap a SimilarityMatch as a SearchResult for the results list."""
+        return SearchResult(
+            offset=match.offset,
+            size=0,  # Not available from similarity search
+            tile_count=0,  # Not available from similarity search
+            compressed_size=0,  # Not available from similarity search
+            confidence=match.similarity_score,
+            metadata={"similarity_score": match.similarity_score,
+                     "hash_distance": match.hash_distance}
+        )
+
     def _run_pattern_search(self):
         """Run pattern-based search with hex patterns and regex support."""
         try:
@@ -277,76 +346,38 @@ class SearchWorker(QThread):
             self.error.emit(str(e))
 
     def _search_hex_pattern(self, rom_data: mmap.mmap, pattern_str: str, alignment: int, context_bytes: int, max_results: int, rom_size: int):
-        """Search for hex pattern with wildcard support."""
+        """Search for hex pattern with wildcard support, emitting results in batches."""
         try:
             # Parse hex pattern (e.g., "00 01 02 ?? FF")
-            pattern_bytes, mask = self._parse_hex_pattern(pattern_str)
-            if not pattern_bytes:
+            try:
+                pattern = parse_hex_pattern(pattern_str)
+            except ValueError as e:
+                logger.warning(f"Failed to parse hex pattern '{pattern_str}': {e}")
                 self.error.emit("Invalid hex pattern format")
                 return
 
-            pattern_len = len(pattern_bytes)
+            matcher = HexPatternMatcher(pattern)
             results_count = 0
-            chunk_size = 0x10000  # 64KB chunks for progress updates
 
-            # Search through ROM data
-            for start_offset in range(0, rom_size - pattern_len + 1, chunk_size):
+            for scanned_to, offsets in matcher.iter_matches(rom_data, max(alignment, 1)):
                 # Check cancellation
                 if self._cancelled:
                     break
 
-                # Update progress
-                progress = int((start_offset / rom_size) * 100)
-                self.progress.emit(progress, 100)
-
-                # Search within this chunk (with overlap for pattern boundary)
-                chunk_end = min(start_offset + chunk_size + pattern_len - 1, rom_size)
-
-                offset = start_offset
-                while offset <= chunk_end - pattern_len:
-                    # Check alignment
-                    if alignment > 1 and offset % alignment != 0:
-                        offset += 1
-                        continue
-
-                    # Check pattern match
-                    if self._match_hex_pattern_at_offset(rom_data, offset, pattern_bytes, mask):
-                        # Create search result
-                        context_start = max(0, offset - context_bytes)
-                        context_end = min(rom_size, offset + pattern_len + context_bytes)
-                        context_data = bytes(rom_data[context_start:context_end])
-
-                        result = SearchResult(
-                            offset=offset,
-                            size=pattern_len,
-                            tile_count=1,  # Pattern matches are single entities
-                            compressed_size=pattern_len,
-                            confidence=1.0,  # Exact match
-                            metadata={
-                                "pattern": pattern_str,
-                                "pattern_type": "hex",
-                                "context_start": context_start,
-                                "context_data": context_data.hex(),
-                                "match_data": bytes(rom_data[offset:offset + pattern_len]).hex()
-                            }
-                        )
-
-                        self.result_found.emit(result)
-                        results_count += 1
-
-                        # Check if we've reached the maximum results
-                        if results_count >= max_results:
-                            logger.info(f"Reached maximum results limit: {max_results}")
-                            return
-
-                        # Skip past this match
-                        offset += pattern_len
-                    else:
-                        offset += 1
+                batch = [
+                    self._create_pattern_result(rom_data, offset, pattern.length, pattern_str, "hex", context_bytes, rom_size)
+                    for offset in offsets[:max_results - results_count].tolist()
+                ]
+                if batch:
+                    self.results_found.emit(batch)
+                    results_count += len(batch)
+
+                # Check if we've reached the maximum results
+                if results_count >= max_results:
+                    logger.info(f"Reached maximum results limit: {max_results}")
+                    return
 
-                # Early termination check
-                if self._cancelled:
-                    break
+                self.progress.emit(int(scanned_to / max(rom_size, 1) * 100), 100)
 
             self.progress.emit(100, 100)
 
@@ -435,59 +466,6 @@ class SearchWorker(QThread):
             logger.exception("Regex pattern search error")
             self.error.emit(f"Regex pattern search failed: {e}")
 
-    def _parse_hex_pattern(self, pattern_str: str) -> tuple[bytes, bytes]:
-        """
-        Parse hex pattern string with wildcards into bytes and mask.
-
-        Args:
-            pattern_str: Pattern like "00 01 02 ?? ?? FF"
-
-        Returns:
-            Tuple of (pattern_bytes, mask_bytes) where mask has 0xFF for exact match, 0x00 for wildcard
-        """
-        try:
-            # Clean and split pattern
-            pattern_str = pattern_str.strip().upper()
-            hex_tokens = re.split(r"[\s,]+", pattern_str)
-
-            pattern_bytes = bytearray()
-            mask_bytes = bytearray()
-
-            for token in hex_tokens:
-                if not token:
-                    continue
-
-                if token in {"??", "?"}:
-                    # Wildcard - any byte matches
-                    pattern_bytes.append(0x00)
-                    mask_bytes.append(0x00)
-                else:
-                    # Hex byte
-                    if len(token) != 2 or not all(c in "0123456789ABCDEF" for c in token):
-                        raise ValueError(f"Invalid hex token: {token}")
-
-                    byte_value = int(token, 16)
-                    pattern_bytes.append(byte_value)
-                    mask_bytes.append(0xFF)
-
-            return bytes(pattern_bytes), bytes(mask_bytes)
-
-        except (ValueError, IndexError) as e:
-            logger.exception(f"Failed to parse hex pattern '{pattern_str}': {e}")
-            return b"", b""
-
-    def _match_hex_pattern_at_offset(self, rom_data: mmap.mmap, offset: int, pattern_bytes: bytes, mask_bytes: bytes) -> bool:
-        """Check if hex pattern matches at specific offset."""
-        if offset + len(pattern_bytes) > len(rom_data):
-            return False
-
-        for i, (pattern_byte, mask_byte) in enumerate(zip(pattern_bytes, mask_bytes, strict=False)):
-            rom_byte = rom_data[offset + i]
-            if mask_byte == 0xFF and rom_byte != pattern_byte:
-                return False
-
-        return True
-
     def _safe_decode(self, data: bytes) -> str:
         """Safely decode bytes to string for display."""
         try:
@@ -504,99 +482,75 @@ class SearchWorker(QThread):
             return "<decode error>"
 
     def _search_multiple_hex_patterns(self, rom_data: mmap.mmap, patterns: list[str], operation: str, alignment: int, context_bytes: int, max_results: int, rom_size: int):
-        """Search for multiple hex patterns with OR/AND operations."""
+        """Search for multiple hex patterns with OR/AND operations in a single pass."""
         try:
             # Parse all patterns
             parsed_patterns = []
             for pattern_str in patterns:
-                pattern_bytes, mask = self._parse_hex_pattern(pattern_str)
-                if pattern_bytes:
-                    parsed_patterns.append((pattern_str, pattern_bytes, mask))
-                else:
+                try:
+                    parsed_patterns.append((pattern_str, parse_hex_pattern(pattern_str)))
+                except ValueError:
                     logger.warning(f"Skipping invalid hex pattern: {pattern_str}")
 
             if not parsed_patterns:
                 self.error.emit("No valid hex patterns found")
                 return
 
+            matcher = MultiPatternMatcher([pattern for _, pattern in parsed_patterns])
+            alignment = max(alignment, 1)
             results_count = 0
-            chunk_size = 0x10000  # 64KB chunks
-            and_window_size = 256  # For AND operations, look within this window
 
             if operation.startswith("OR"):
                 # OR operation - find matches for any pattern
-                for start_offset in range(0, rom_size, chunk_size):
-                    if self._cancelled or results_count >= max_results:
+                for scanned_to, offsets, pattern_ids in matcher.iter_matches(rom_data, alignment):
+                    if self._cancelled:
                         break
 
-                    progress = int((start_offset / rom_size) * 100)
-                    self.progress.emit(progress, 100)
-
-                    chunk_end = min(start_offset + chunk_size, rom_size)
-
-                    # Check each pattern in this chunk
-                    for pattern_str, pattern_bytes, mask in parsed_patterns:
-                        pattern_len = len(pattern_bytes)
-
-                        offset = start_offset
-                        while offset <= chunk_end - pattern_len and results_count < max_results:
-                            if alignment > 1 and offset % alignment != 0:
-                                offset += 1
-                                continue
+                    batch = []
+                    for offset, pattern_id in zip(offsets.tolist(), pattern_ids.tolist(), strict=True):
+                        if results_count + len(batch) >= max_results:
+                            break
+                        pattern_str, pattern = parsed_patterns[pattern_id]
+                        batch.append(self._create_pattern_result(rom_data, offset, pattern.length, pattern_str, "hex", context_bytes, rom_size))
+                    if batch:
+                        self.results_found.emit(batch)
+                        results_count += len(batch)
+                    if results_count >= max_results:
+                        break
 
-                            if self._match_hex_pattern_at_offset(rom_data, offset, pattern_bytes, mask):
-                                result = self._create_pattern_result(rom_data, offset, pattern_len, pattern_str, "hex", context_bytes, rom_size)
-                                self.result_found.emit(result)
-                                results_count += 1
-                                offset += pattern_len
-                            else:
-                                offset += 1
+                    self.progress.emit(int(scanned_to / max(rom_size, 1) * 90), 100)
 
             elif operation.startswith("AND"):
                 # AND operation - find locations where all patterns exist nearby
-                for start_offset in range(0, rom_size - and_window_size, chunk_size):
-                    if self._cancelled or results_count >= max_results:
-                        break
-
-                    progress = int((start_offset / rom_size) * 100)
-                    self.progress.emit(progress, 100)
-
-                    chunk_end = min(start_offset + chunk_size, rom_size)
-
-                    offset = start_offset
-                    while offset <= chunk_end - and_window_size and results_count < max_results:
-                        if alignment > 1 and offset % alignment != 0:
-                            offset += 1
-                            continue
+                hit_offsets = []
+                for scanned_to, offsets, pattern_ids in matcher.iter_matches(rom_data, overlapping=True):
+                    if self._cancelled:
+                        return
+                    hit_offsets.append((offsets, pattern_ids))
+                    self.progress.emit(int(scanned_to / max(rom_size, 1) * 90), 100)
+
+                offsets = np.concatenate([offsets for offsets, _ in hit_offsets])
+                pattern_ids = np.concatenate([pattern_ids for _, pattern_ids in hit_offsets])
+                per_pattern = [np.sort(offsets[pattern_ids == i]) for i in range(len(parsed_patterns))]
+                windows = match_all_within_window(
+                    per_pattern,
+                    [hits + pattern.length for hits, (_, pattern) in zip(per_pattern, parsed_patterns, strict=True)],
+                    AND_WINDOW_SIZE, rom_size, alignment, max_results,
+                )
 
-                        # Check if all patterns exist within the window
-                        window_end = min(offset + and_window_size, rom_size)
-                        pattern_matches = []
-
-                        for pattern_str, pattern_bytes, mask in parsed_patterns:
-                            pattern_len = len(pattern_bytes)
-                            found = False
-
-                            for window_offset in range(offset, window_end - pattern_len + 1):
-                                if self._match_hex_pattern_at_offset(rom_data, window_offset, pattern_bytes, mask):
-                                    pattern_matches.append((pattern_str, window_offset, pattern_len))
-                                    found = True
-                                    break
-
-                            if not found:
-                                break
-
-                        # If all patterns found, create result
-                        if len(pattern_matches) == len(parsed_patterns):
-                            # Use the first match as the main result
-                            main_pattern, main_offset, main_len = pattern_matches[0]
-                            result = self._create_pattern_result(rom_data, main_offset, main_len, f"AND: {main_pattern} (+{len(pattern_matches)-1} more)", "hex", context_bytes, rom_size)
-                            result.metadata["and_matches"] = pattern_matches
-                            self.result_found.emit(result)
-                            results_count += 1
-                            offset += and_window_size // 2  # Skip ahead to avoid overlaps
-                        else:
-                            offset += 1
+                batch = []
+                for _, chosen in windows:
+                    pattern_matches = [
+                        (pattern_str, int(hits[index]), pattern.length)
+                        for hits, index, (pattern_str, pattern) in zip(per_pattern, chosen, parsed_patterns, strict=True)
+                    ]
+                    # Use the first match as the main result
+                    main_pattern, main_offset, main_len = pattern_matches[0]
+                    result = self._create_pattern_result(rom_data, main_offset, main_len, f"AND: {main_pattern} (+{len(pattern_matches)-1} more)", "hex", context_bytes, rom_size)
+                    result.metadata["and_matches"] = pattern_matches
+                    batch.append(result)
+                if batch:
+                    self.results_found.emit(batch)
 
             self.progress.emit(100, 100)
 
@@ -605,7 +559,7 @@ class SearchWorker(QThread):
             self.error.emit(f"Multiple hex pattern search failed: {e}")
 
     def _search_multiple_regex_patterns(self, rom_data: mmap.mmap, patterns: list[str], operation: str, case_sensitive: bool, alignment: int, context_bytes: int, max_results: int, rom_size: int):
-        """Search for multiple regex patterns with OR/AND operations."""
+        """Search for multiple regex patterns with OR/AND operations in a single pass."""
         try:
             # Compile all patterns
             flags = 0 if case_sensitive else re.IGNORECASE
@@ -622,87 +576,64 @@ class SearchWorker(QThread):
                 self.error.emit("No valid regex patterns found")
                 return
 
+            pattern_set = RegexPatternSet([pattern for _, pattern in compiled_patterns])
+            alignment = max(alignment, 1)
             results_count = 0
-            chunk_size = 0x10000  # 64KB chunks
-            overlap_size = 1024   # Overlap to catch patterns spanning chunks
-            and_window_size = 256  # For AND operations
 
             if operation.startswith("OR"):
                 # OR operation - find matches for any pattern
-                for start_offset in range(0, rom_size, chunk_size - overlap_size):
-                    if self._cancelled or results_count >= max_results:
+                for scanned_to, hits in pattern_set.iter_matches(rom_data):
+                    if self._cancelled:
                         break
 
-                    progress = int((start_offset / rom_size) * 100)
-                    self.progress.emit(progress, 100)
-
-                    chunk_end = min(start_offset + chunk_size, rom_size)
-                    chunk_data = bytes(rom_data[start_offset:chunk_end])
-
-                    # Check each pattern in this chunk
-                    for pattern_str, pattern in compiled_patterns:
-                        for match in pattern.finditer(chunk_data):
-                            if results_count >= max_results:
-                                break
-
-                            match_offset = start_offset + match.start()
-                            match_len = match.end() - match.start()
-
-                            if alignment > 1 and match_offset % alignment != 0:
-                                continue
-
-                            # Avoid duplicates in overlap region
-                            if start_offset > 0 and match.start() < overlap_size:
-                                continue
+                    batch = []
+                    for match_offset, pattern_id, match in hits:
+                        if results_count + len(batch) >= max_results:
+                            break
+                        if match_offset % alignment != 0:
+                            continue
+                        pattern_str = compiled_patterns[pattern_id][0]
+                        result = self._create_pattern_result(rom_data, match_offset, match.end() - match_offset, pattern_str, "regex", context_bytes, rom_size)
+                        result.metadata["match_text"] = self._safe_decode(match.group())
+                        batch.append(result)
+                    if batch:
+                        self.results_found.emit(batch)
+                        results_count += len(batch)
+                    if results_count >= max_results:
+                        break
 
-                            result = self._create_pattern_result(rom_data, match_offset, match_len, pattern_str, "regex", context_bytes, rom_size)
-                            result.metadata["match_text"] = self._safe_decode(match.group())
-                            self.result_found.emit(result)
-                            results_count += 1
+                    self.progress.emit(int(scanned_to / max(rom_size, 1) * 90), 100)
 
             elif operation.startswith("AND"):
                 # AND operation - find locations where all patterns exist nearby
-                for start_offset in range(0, rom_size - and_window_size, chunk_size):
-                    if self._cancelled or results_count >= max_results:
-                        break
-
-                    progress = int((start_offset / rom_size) * 100)
-                    self.progress.emit(progress, 100)
-
-                    chunk_end = min(start_offset + chunk_size, rom_size)
-
-                    offset = start_offset
-                    while offset <= chunk_end - and_window_size and results_count < max_results:
-                        if alignment > 1 and offset % alignment != 0:
-                            offset += 1
-                            continue
+                matches: list[list[re.Match[bytes]]] = [[] for _ in compiled_patterns]
+                for scanned_to, hits in pattern_set.iter_matches(rom_data, overlapping=True):
+                    if self._cancelled:
+                        return
+                    for _, pattern_id, match in hits:
+                        matches[pattern_id].append(match)
+                    self.progress.emit(int(scanned_to / max(rom_size, 1) * 90), 100)
+
+                windows = match_all_within_window(
+                    [np.array([m.start() for m in found], dtype=np.int64) for found in matches],
+                    [np.array([m.end() for m in found], dtype=np.int64) for found in matches],
+                    AND_WINDOW_SIZE, rom_size, alignment, max_results,
+                )
 
-                        # Check if all patterns exist within the window
-                        window_end = min(offset + and_window_size, rom_size)
-                        window_data = bytes(rom_data[offset:window_end])
-                        pattern_matches = []
-
-                        for pattern_str, pattern in compiled_patterns:
-                            match = pattern.search(window_data)
-                            if match:
-                                match_offset = offset + match.start()
-                                match_len = match.end() - match.start()
-                                pattern_matches.append((pattern_str, match_offset, match_len, self._safe_decode(match.group())))
-                            else:
-                                break
-
-                        # If all patterns found, create result
-                        if len(pattern_matches) == len(compiled_patterns):
-                            # Use the first match as the main result
-                            main_pattern, main_offset, main_len, main_text = pattern_matches[0]
-                            result = self._create_pattern_result(rom_data, main_offset, main_len, f"AND: {main_pattern} (+{len(pattern_matches)-1} more)", "regex", context_bytes, rom_size)
-                            result.metadata["match_text"] = main_text
-                            result.metadata["and_matches"] = pattern_matches
-                            self.result_found.emit(result)
-                            results_count += 1
-                            offset += and_window_size // 2
-                        else:
-                            offset += 1
+                batch = []
+                for _, chosen in windows:
+                    pattern_matches = []
+                    for found, index, (pattern_str, _) in zip(matches, chosen, compiled_patterns, strict=True):
+                        match = found[index]
+                        pattern_matches.append((pattern_str, match.start(), match.end() - match.start(), self._safe_decode(match.group())))
+                    # Use the first match as the main result
+                    main_pattern, main_offset, main_len, main_text = pattern_matches[0]
+                    result = self._create_pattern_result(rom_data, main_offset, main_len, f"AND: {main_pattern} (+{len(pattern_matches)-1} more)", "regex", context_bytes, rom_size)
+                    result.metadata["match_text"] = main_text
+                    result.metadata["and_matches"] = pattern_matches
+                    batch.append(result)
+                if batch:
+                    self.results_found.emit(batch)
 
             self.progress.emit(100, 100)
 
@@ -879,6 +810,7 @@ class AdvancedSearchDialog(QDialog):
         self.search_history = []
         self.current_results = []
         self.search_worker = None
+        self.reference_image_path: str | None = None
 
         self._setup_ui()
         self._setup_shortcuts()
@@ -1020,6 +952,11 @@ class AdvancedSearchDialog(QDialog):
         self.ref_browse_button.clicked.connect(self._browse_reference_sprite)
         ref_select_layout.addWidget(self.ref_browse_button)
 
+        self.ref_image_button = QPushButton("Image...")
+        self.ref_image_button.setToolTip("Search for sprites resembling an image file")
+        self.ref_image_button.clicked.connect(self._browse_reference_image)
+        ref_select_layout.addWidget(self.ref_image_button)
+
         ref_layout.addLayout(ref_select_layout)
 
         # Reference preview
@@ -1356,25 +1293,25 @@ class AdvancedSearchDialog(QDialog):
         self.search_worker.start()
 
     def _start_visual_search(self):
-        """Start visual similarity search."""
-        # Check if similarity index exists first
-        if not self._check_similarity_index_exists():
-            self._offer_to_build_similarity_index()
-            return
-
-        # Get reference sprite offset
-        ref_text = self.ref_offset_edit.text().strip()
-        if not ref_text:
-            if self.results_label:
-                self.results_label.setText("Please specify a reference sprite offset")
-            return
+        """Start visual similarity search against a reference sprite or image."""
+        # Get reference image or sprite offset
+        ref_offset = None
+        if self.reference_image_path:
+            query = f"Similar to {Path(self.reference_image_path).name}"
+        else:
+            ref_text = self.ref_offset_edit.text().strip()
+            if not ref_text:
+                if self.results_label:
+                    self.results_label.setText("Please specify a reference sprite offset or image")
+                return
 
-        try:
-            ref_offset = int(ref_text, 16) if ref_text.startswith("0x") else int(ref_text, 16)
-        except ValueError:
-            if self.results_label:
-                self.results_label.setText("Invalid offset format. Use hex format like 0x12345")
-            return
+            try:
+                ref_offset = int(ref_text, 16) if ref_text.startswith("0x") else int(ref_text, 16)
+            except ValueError:
+                if self.results_label:
+                    self.results_label.setText("Invalid offset format. Use hex format like 0x12345")
+                return
+            query = f"Similar to 0x{ref_offset:X}"
 
         # Get similarity threshold
         similarity_threshold = self.similarity_slider.value()  # Get percentage value
@@ -1386,6 +1323,7 @@ class AdvancedSearchDialog(QDialog):
         params = {
             "rom_path": self.rom_path,
             "reference_offset": ref_offset,
+            "reference_image": self.reference_image_path,
             "similarity_threshold": similarity_threshold,
             "search_scope": search_scope,
             "max_results": 50
@@ -1410,7 +1348,7 @@ class AdvancedSearchDialog(QDialog):
         entry = SearchHistoryEntry(
             timestamp=datetime.now(),
             search_type="Visual",
-            query=f"Similar to 0x{ref_offset:X} (threshold: {similarity_threshold}%)",
+            query=f"{query} (threshold: {similarity_threshold}%)",
             filters=SearchFilter(
                 min_size=0, max_size=MAX_SPRITE_SIZE,
                 min_tiles=0, max_tiles=1024,
@@ -1561,6 +1499,8 @@ class AdvancedSearchDialog(QDialog):
         if self.search_worker:
             self.search_worker.progress.connect(self._update_progress)
             self.search_worker.result_found.connect(self._add_result)
+            self.search_worker.results_found.connect(self._add_results)
+            self.search_worker.top_matches_updated.connect(self._replace_results)
             self.search_worker.search_complete.connect(self._search_complete)
             self.search_worker.error.connect(self._search_error)
 
@@ -1576,6 +1516,8 @@ class AdvancedSearchDialog(QDialog):
             with suppress(RuntimeError, TypeError):
                 self.search_worker.progress.disconnect(self._update_progress)
                 self.search_worker.result_found.disconnect(self._add_result)
+                self.search_worker.results_found.disconnect(self._add_results)
+                self.search_worker.top_matches_updated.disconnect(self._replace_results)
                 self.search_worker.search_complete.disconnect(self._search_complete)
                 self.search_worker.error.disconnect(self._search_error)
                 self.search_worker.input_requested.disconnect(self._handle_worker_input_request)
@@ -1639,6 +1581,24 @@ class AdvancedSearchDialog(QDialog):
         if self.results_label:
             self.results_label.setText(f"Found {len(self.current_results)} {result_type}")
 
+    def _add_results(self, results: list[SearchResult]):
+        """Add a batch of results with a single repaint of the results list."""
+        if self.results_list:
+            self.results_list.setUpdatesEnabled(False)
+        try:
+            for result in results:
+                self._add_result(result)
+        finally:
+            if self.results_list:
+                self.results_list.setUpdatesEnabled(True)
+
+    def _replace_results(self, results: list[SearchResult]):
+        """Replace the results list with the current best matches."""
+        self.current_results = []
+        if self.results_list:
+            self.results_list.clear()
+        self._add_results(results)
+
     def _search_complete(self, results: list[Any]):
         """Handle search completion."""
         if self.search_button:
@@ -1783,9 +1743,40 @@ class AdvancedSearchDialog(QDialog):
             if self.results_label:
                 self.results_label.setText(f"Error: {e}")
 
+    def _browse_reference_image(self):
+        """Choose an image file to use as the visual search reference."""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Select Reference Image",
+            str(Path(self.rom_path).parent),
+            "Images (*.png *.bmp *.gif *.jpg *.jpeg);;All Files (*)"
+        )
+        if not file_path:
+            return
+
+        pixmap = QPixmap(file_path)
+        if pixmap.isNull():
+            if self.results_label:
+                self.results_label.setText(f"Could not load image {Path(file_path).name}")
+            return
+
+        # Clearing the offset resets the preview, so do it before showing the image
+        self.ref_offset_edit.clear()
+        self.reference_image_path = file_path
+        if self.ref_preview_label:
+            self.ref_preview_label.setPixmap(pixmap.scaled(
+                128, 128,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.FastTransformation
+            ))
+            self.ref_preview_label.setToolTip(file_path)
+
     def _on_reference_offset_changed(self):
         """Handle changes to reference offset text."""
         offset_text = self.ref_offset_edit.text().strip()
+        if offset_text:
+            # Typing an offset replaces any reference image
+            self.reference_image_path = None
         if not offset_text:
             if self.ref_preview_label:
                 self.ref_preview_label.setText("No reference sprite selected")
@@ -1852,8 +1843,10 @@ class AdvancedSearchDialog(QDialog):
         """Show visual search results in similarity dialog."""
         try:
             # Convert SearchResult objects back to SimilarityMatch for the dialog
-            ref_offset_text = self.ref_offset_edit.text().strip()
-            ref_offset = int(ref_offset_text, 16) if ref_offset_text.startswith("0x") else int(ref_offset_text, 16)
+            ref_offset = None
+            if not self.reference_image_path:
+                ref_offset_text = self.ref_offset_edit.text().strip()
+                ref_offset = int(ref_offset_text, 16) if ref_offset_text.startswith("0x") else int(ref_offset_text, 16)
 
             matches = []
             for result in results:
@@ -1875,68 +1868,6 @@ class AdvancedSearchDialog(QDialog):
             if self.results_label:
                 self.results_label.setText(f"Error displaying results: {e}")
 
-    def _check_similarity_index_exists(self) -> bool:
-        """Check if similarity index exists for the current ROM."""
-        index_path = Path(self.rom_path).with_suffix(".similarity_index")
-        return index_path.exists()
-
-    def _offer_to_build_similarity_index(self):
-        """Offer to build similarity index if it doesn't exist (thread-safe)."""
-        from PySide6.QtCore import QThread
-        from PySide6.QtWidgets import QMessageBox
-
-        # Check if we're in the main thread
-        if QThread.currentThread() != self.thread():
-            logger.warning("_offer_to_build_similarity_index called from worker thread - operation skipped")
-            return
-
-        try:
-            reply = QMessageBox.question(
-                self,
-                "Build Similarity Index",
-                "No similarity index found for this ROM. Visual search requires an index to be built first.\n\n"
-                "Building an index will scan the ROM for sprites and create a searchable database. "
-                "This may take several minutes but only needs to be done once per ROM.\n\n"
-                "Would you like to build the similarity index now?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                QMessageBox.StandardButton.Yes
-            )
-
-            if reply == QMessageBox.StandardButton.Yes:
-                self._build_similarity_index()
-        except Exception as e:
-            logger.exception(f"Error in _offer_to_build_similarity_index: {e}")
-            if self.results_label:
-                self.results_label.setText(f"Error: {e}")
-
-    def _build_similarity_index(self):
-        """Build similarity index for the current ROM (thread-safe)."""
-        # This would be implemented to scan the ROM and build the index
-        # For now, show a placeholder message
-        from PySide6.QtCore import QThread
-        from PySide6.QtWidgets import QMessageBox
-
-        # Check if we're in the main thread
-        if QThread.currentThread() != self.thread():
-            logger.warning("_build_similarity_index called from worker thread - operation skipped")
-            return
-
-        try:
-            QMessageBox.information(
-                self,
-                "Build Index",
-                "Index building is not yet implemented. This feature would:\n\n"
-                "1. Scan the entire ROM for sprite data\n"
-                "2. Extract visual features from each sprite\n"
-                "3. Build a searchable similarity index\n"
-                "4. Save the index for future searches\n\n"
-                "This functionality will be added in a future update."
-            )
-        except Exception as e:
-            logger.exception(f"Error in _build_similarity_index: {e}")
-            if self.results_label:
-                self.results_label.setText(f"Error: {e}")
-
     def _replay_search(self, item: QListWidgetItem):
         """Replay a search from history."""
         # TODO: Implement search replay
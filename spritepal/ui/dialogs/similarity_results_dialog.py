@@ -134,7 +134,7 @@ class SimilarityResultsDialog(BaseDialog):
 
     sprite_selected = Signal(int)  # Emitted when user selects a sprite
 
-    def __init__(self, matches: list[SimilarityMatch], source_offset: int, parent: QWidget | None = None):
+    def __init__(self, matches: list[SimilarityMatch], source_offset: int | None, parent: QWidget | None = None):
         # Declare instance variables before super().__init__()
         self.matches = matches
         self.source_offset = source_offset
@@ -153,7 +153,10 @@ class SimilarityResultsDialog(BaseDialog):
         layout = QVBoxLayout()
 
         # Header
-        header_text = f"Found {len(self.matches)} sprites similar to 0x{self.source_offset:06X}"
+        if self.source_offset is None:
+            header_text = f"Found {len(self.matches)} sprites similar to the reference image"
+        else:
+            header_text = f"Found {len(self.matches)} sprites similar to 0x{self.source_offset:06X}"
         header_label = QLabel(header_text)
         header_label.setStyleSheet("font-size: 14px; font-weight: bold; margin-bottom: 10px;")
         layout.addWidget(header_label)
@@ -214,7 +217,7 @@ class SimilarityResultsDialog(BaseDialog):
 
 def show_similarity_results(
     matches: list[SimilarityMatch],
-    source_offset: int,
+    source_offset: int | None,
     parent: QWidget | None = None
 ) -> SimilarityResultsDialog:
     """
@@ -222,7 +225,7 @@ def show_similarity_results(
 
     Args:
         matches: List of similar sprites found
-        source_offset: Offset of the source sprite
+        source_offset: Offset of the source sprite, or None for an image reference
         parent: Parent widget
 
     Returns:
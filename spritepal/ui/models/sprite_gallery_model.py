@@ -1,17 +1,24 @@
 """
 Sprite gallery model for efficient handling of large sprite collections.
 Implements virtual scrolling through QAbstractListModel.
+
+Offset, size, tile count and compression flags are kept as NumPy columns so
+filtering and sorting are array operations; the visible rows are an index
+array into the sprite list, with an offset-to-row dictionary for O(1)
+thumbnail and selection updates.
 """
 from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
 from PySide6.QtCore import (
     QAbstractListModel,
     QModelIndex,
     QPersistentModelIndex,
     QSize,
     Qt,
+    QTimer,
     Signal,
 )
 from PySide6.QtGui import QPixmap
@@ -20,6 +27,16 @@ from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Thumbnail arrivals are coalesced into ranged dataChanged emissions about once per frame
+THUMBNAIL_FLUSH_INTERVAL_MS = 16
+
+# Sort key -> (column attribute, descending)
+SORT_COLUMNS = {
+    "Offset": ("_offsets", False),
+    "Size": ("_sizes", True),
+    "Tiles": ("_tile_counts", True),
+}
+
 class SpriteGalleryModel(QAbstractListModel):
     """Model for sprite gallery using virtual item view."""
 
@@ -42,10 +59,28 @@ class SpriteGalleryModel(QAbstractListModel):
 
         # Sprite data storage
         self._sprites: list[dict[str, Any]] = []
-        self._filtered_sprites: list[dict[str, Any]] = []
         self._thumbnails: dict[int, QPixmap] = {}  # offset -> pixmap cache
+        self._preview_offsets: set[int] = set()  # thumbnails still at preview resolution
         self._selected_offsets: set[int] = set()
 
+        # Per-sprite columns, parallel to _sprites
+        self._offsets = np.empty(0, dtype=np.int64)
+        self._sizes = np.empty(0, dtype=np.int64)
+        self._tile_counts = np.empty(0, dtype=np.int64)
+        self._compressed = np.empty(0, dtype=bool)
+        self._offset_text = np.empty(0, dtype="U1")
+
+        # Visible rows as indices into _sprites, and offset -> visible row
+        self._rows = np.empty(0, dtype=np.intp)
+        self._row_of: dict[int, int] = {}
+
+        # Rows whose thumbnails arrived since the last flush
+        self._pending_rows: set[int] = set()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(THUMBNAIL_FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush_thumbnail_updates)
+
         # Display settings
         self._thumbnail_size = 256
         self._columns = 4
@@ -62,8 +97,7 @@ class SpriteGalleryModel(QAbstractListModel):
             parent = QModelIndex()
         if parent.isValid():
             return 0
-        sprites = self._filtered_sprites if self._use_filtering else self._sprites
-        return len(sprites)
+        return len(self._rows)
 
     @override
     def columnCount(self, parent: QModelIndex | QPersistentModelIndex | None = None) -> int:
@@ -81,13 +115,12 @@ class SpriteGalleryModel(QAbstractListModel):
             return None
 
         row = index.row()
-        sprites = self._filtered_sprites if self._use_filtering else self._sprites
-
-        if row < 0 or row >= len(sprites):
+        if row < 0 or row >= len(self._rows):
             return None
 
-        sprite = sprites[row]
-        offset = self._get_offset(sprite)
+        sprite_index = self._rows[row]
+        sprite = self._sprites[sprite_index]
+        offset = int(self._offsets[sprite_index])
 
         if role == Qt.ItemDataRole.DisplayRole:
             # Return offset text for display
@@ -134,13 +167,10 @@ class SpriteGalleryModel(QAbstractListModel):
             return False
 
         row = index.row()
-        sprites = self._filtered_sprites if self._use_filtering else self._sprites
-
-        if row < 0 or row >= len(sprites):
+        if row < 0 or row >= len(self._rows):
             return False
 
-        sprite = sprites[row]
-        offset = self._get_offset(sprite)
+        offset = int(self._offsets[self._rows[row]])
 
         if role == self.SelectedRole:
             # Update selection state
@@ -173,34 +203,68 @@ class SpriteGalleryModel(QAbstractListModel):
         self.beginResetModel()
 
         self._sprites = sprites
-        self._filtered_sprites = sprites.copy()
+        self._offsets = np.array([self._get_offset(sprite) for sprite in sprites], dtype=np.int64)
+        self._sizes = np.array(
+            [sprite.get('decompressed_size', sprite.get('size', 0)) for sprite in sprites], dtype=np.int64
+        )
+        self._tile_counts = np.array([sprite.get('tile_count', 0) for sprite in sprites], dtype=np.int64)
+        self._compressed = np.array([bool(sprite.get('compressed', False)) for sprite in sprites], dtype=bool)
+        self._offset_text = np.char.mod("0x%06x", self._offsets) if sprites else np.empty(0, dtype="U1")
         if self._thumbnails:
             self._thumbnails.clear()
+        self._preview_offsets.clear()
         if self._selected_offsets:
             self._selected_offsets.clear()
+        self._filter_text = ""
+        self._filter_compressed_only = False
         self._use_filtering = False
+        self._update_rows()
 
         self.endResetModel()
 
         logger.info(f"Model populated with {len(sprites)} sprites")
 
-    def set_thumbnail(self, offset: int, pixmap: QPixmap):
+    def set_thumbnail(self, offset: int, pixmap: QPixmap, preview: bool = False):
         """
         Set thumbnail for a sprite.
 
+        The view is notified on the next flush, so a burst of thumbnails
+        costs one dataChanged per contiguous run of rows. A late preview
+        never replaces a full-resolution thumbnail.
+
         Args:
             offset: Sprite offset
             pixmap: Thumbnail pixmap
+            preview: True for a low-resolution first pass
         """
+        if preview:
+            if offset in self._thumbnails and offset not in self._preview_offsets:
+                return
+            self._preview_offsets.add(offset)
+        else:
+            self._preview_offsets.discard(offset)
         self._thumbnails[offset] = pixmap
 
-        # Find the sprite row and emit dataChanged
-        sprites = self._filtered_sprites if self._use_filtering else self._sprites
-        for row, sprite in enumerate(sprites):
-            if self._get_offset(sprite) == offset:
-                index = self.index(row, 0)
-                self.dataChanged.emit(index, index, [self.PixmapRole])
-                break
+        row = self._row_of.get(offset)
+        if row is None:
+            return
+        self._pending_rows.add(row)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush_thumbnail_updates(self):
+        """Emit dataChanged for thumbnails that arrived since the last flush."""
+        self._flush_timer.stop()
+        if not self._pending_rows:
+            return
+
+        rows = np.fromiter(sorted(self._pending_rows), dtype=np.intp, count=len(self._pending_rows))
+        self._pending_rows.clear()
+
+        run_starts = np.flatnonzero(np.diff(rows, prepend=rows[0] - 2) != 1)
+        run_ends = np.r_[run_starts[1:], len(rows)] - 1
+        for start, end in zip(rows[run_starts].tolist(), rows[run_ends].tolist(), strict=True):
+            self.dataChanged.emit(self.index(start, 0), self.index(end, 0), [self.PixmapRole])
 
     def apply_filter(self, text: str = "", compressed_only: bool = False):
         """
@@ -212,67 +276,74 @@ class SpriteGalleryModel(QAbstractListModel):
         """
         self._filter_text = text.lower()
         self._filter_compressed_only = compressed_only
+        self._use_filtering = bool(text or compressed_only)
 
         self.beginResetModel()
-
-        if not text and not compressed_only:
-            # No filtering
-            self._filtered_sprites = self._sprites.copy()
-            self._use_filtering = False
-        else:
-            # Apply filters
-            self._filtered_sprites = []
-            for sprite in self._sprites:
-                # Check text filter
-                if text:
-                    offset = self._get_offset(sprite)
-                    offset_str = f"0x{offset:06x}".lower()
-                    if text not in offset_str:
-                        continue
-
-                # Check compression filter
-                if compressed_only and not sprite.get('compressed', False):
-                    continue
-
-                self._filtered_sprites.append(sprite)
-
-            self._use_filtering = True
-
+        self._update_rows()
         self.endResetModel()
 
-        logger.debug(f"Filter applied: {len(self._filtered_sprites)}/{len(self._sprites)} sprites shown")
+        logger.debug(f"Filter applied: {len(self._rows)}/{len(self._sprites)} sprites shown")
 
     def sort_sprites(self, sort_key: str):
         """
         Sort sprites by the given key.
 
+        Ties keep their previous relative order. Views keep their selection
+        and current item because rows are moved with a layout change rather
+        than a model reset.
+
         Args:
             sort_key: Sort key ("Offset", "Size", "Tiles")
         """
-        self.beginResetModel()
-
-        if sort_key == "Offset":
-            self._sprites.sort(key=lambda x: self._get_offset(x))
-        elif sort_key == "Size":
-            self._sprites.sort(key=lambda x: x.get('decompressed_size', x.get('size', 0)), reverse=True)
-        elif sort_key == "Tiles":
-            self._sprites.sort(key=lambda x: x.get('tile_count', 0), reverse=True)
-
-        # Re-apply filter after sorting
-        if self._use_filtering:
-            self.apply_filter(self._filter_text, self._filter_compressed_only)
-        else:
-            self._filtered_sprites = self._sprites.copy()
-
-        self.endResetModel()
+        if sort_key not in SORT_COLUMNS:
+            return
+
+        attribute, descending = SORT_COLUMNS[sort_key]
+        column = getattr(self, attribute)
+        order = np.argsort(-column if descending else column, kind="stable")
+
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_offsets = [int(self._offsets[self._rows[index.row()]]) for index in persistent]
+
+        self._sprites[:] = [self._sprites[i] for i in order.tolist()]
+        for name in ("_offsets", "_sizes", "_tile_counts", "_compressed", "_offset_text"):
+            setattr(self, name, getattr(self, name)[order])
+        self._update_rows()
+
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(self._row_of[offset], index.column()) for offset, index in zip(
+                persistent_offsets, persistent, strict=True
+            )]
+        )
+        self.layoutChanged.emit()
 
     def get_sprite_at_row(self, row: int) -> dict[str, Any | None] | None:
         """Get sprite data at the given row."""
-        sprites = self._filtered_sprites if self._use_filtering else self._sprites
-        if 0 <= row < len(sprites):
-            return sprites[row]
+        if 0 <= row < len(self._rows):
+            return self._sprites[self._rows[row]]
         return None
 
+    def get_row_for_offset(self, offset: int) -> int | None:
+        """Get the visible row of a sprite, or None if it is filtered out."""
+        return self._row_of.get(offset)
+
+    def _update_rows(self):
+        """Recompute the visible rows and the offset -> row index."""
+        mask = np.ones(len(self._sprites), dtype=bool)
+        if self._filter_text:
+            mask &= np.char.find(self._offset_text, self._filter_text) >= 0
+        if self._filter_compressed_only:
+            mask &= self._compressed
+
+        self._rows = np.flatnonzero(mask)
+        # Reverse so the first row wins when offsets repeat
+        visible_offsets = self._offsets[self._rows].tolist()
+        self._row_of = dict(zip(reversed(visible_offsets), range(len(visible_offsets) - 1, -1, -1), strict=True))
+        # Row numbers changed, so queued notifications no longer apply
+        self._pending_rows.clear()
+
     def get_selected_sprites(self) -> list[dict[str, Any]]:
         """Get all selected sprites."""
         selected = []
@@ -283,17 +354,12 @@ class SpriteGalleryModel(QAbstractListModel):
 
     def select_all(self):
         """Select all visible sprites."""
-        sprites = self._filtered_sprites if self._use_filtering else self._sprites
-
-        if self._selected_offsets:
-            self._selected_offsets.clear()
-        for sprite in sprites:
-            self._selected_offsets.add(self._get_offset(sprite))
+        self._selected_offsets = set(self._offsets[self._rows].tolist())
 
         # Emit dataChanged for all items
-        if sprites:
+        if len(self._rows):
             top_left = self.index(0, 0)
-            bottom_right = self.index(len(sprites) - 1, 0)
+            bottom_right = self.index(len(self._rows) - 1, 0)
             self.dataChanged.emit(top_left, bottom_right, [self.SelectedRole])
 
         self.selection_changed.emit(list(self._selected_offsets))
@@ -304,12 +370,10 @@ class SpriteGalleryModel(QAbstractListModel):
         if self._selected_offsets:
             self._selected_offsets.clear()
 
-        if had_selection:
-            sprites = self._filtered_sprites if self._use_filtering else self._sprites
-            if sprites:
-                top_left = self.index(0, 0)
-                bottom_right = self.index(len(sprites) - 1, 0)
-                self.dataChanged.emit(top_left, bottom_right, [self.SelectedRole])
+        if had_selection and len(self._rows):
+            top_left = self.index(0, 0)
+            bottom_right = self.index(len(self._rows) - 1, 0)
+            self.dataChanged.emit(top_left, bottom_right, [self.SelectedRole])
 
         self.selection_changed.emit([])
 
@@ -320,13 +384,11 @@ class SpriteGalleryModel(QAbstractListModel):
         else:
             self._selected_offsets.add(offset)
 
-        # Find and update the sprite
-        sprites = self._filtered_sprites if self._use_filtering else self._sprites
-        for row, sprite in enumerate(sprites):
-            if self._get_offset(sprite) == offset:
-                index = self.index(row, 0)
-                self.dataChanged.emit(index, index, [self.SelectedRole])
-                break
+        # Update the sprite's row if it is visible
+        row = self._row_of.get(offset)
+        if row is not None:
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, [self.SelectedRole])
 
         self.selection_changed.emit(list(self._selected_offsets))
 
@@ -356,23 +418,43 @@ class SpriteGalleryModel(QAbstractListModel):
         Returns:
             List of offsets that need thumbnails
         """
-        offsets = []
-        sprites = self._filtered_sprites if self._use_filtering else self._sprites
+        visible = self._offsets[self._rows[max(0, first_visible):max(0, last_visible + 1)]].tolist()
+
+        # Only request if not already cached
+        return [offset for offset in visible if offset not in self._thumbnails]
+
+    def get_offsets_for_rows(self, rows: list[int]) -> list[int]:
+        """
+        Get sprite offsets for visible rows.
+
+        Args:
+            rows: Row numbers, all within 0..rowCount() - 1
+
+        Returns:
+            Offsets in the same order as ``rows``
+        """
+        return self._offsets[self._rows[np.asarray(rows, dtype=np.intp)]].tolist()
 
-        for row in range(max(0, first_visible), min(len(sprites), last_visible + 1)):
-            sprite = sprites[row]
-            offset = self._get_offset(sprite)
+    def needs_thumbnail(self, offset: int, preview: bool = False) -> bool:
+        """
+        Check whether a sprite still needs a thumbnail of the given kind.
 
-            # Only request if not already cached
-            if offset not in self._thumbnails:
-                offsets.append(offset)
+        Args:
+            offset: Sprite offset
+            preview: True to ask about any thumbnail, False about a full-resolution one
 
-        return offsets
+        Returns:
+            True if a request would change what is displayed
+        """
+        if offset not in self._thumbnails:
+            return True
+        return not preview and offset in self._preview_offsets
 
     def clear_thumbnail_cache(self):
         """Clear the thumbnail cache."""
         if self._thumbnails:
             self._thumbnails.clear()
+        self._preview_offsets.clear()
 
         # Notify view that all pixmaps need refresh
         if self._sprites:
@@ -397,7 +479,7 @@ class SpriteGalleryModel(QAbstractListModel):
         Returns:
             Tuple of (visible_count, total_count, selected_count)
         """
-        visible_count = len(self._filtered_sprites) if self._use_filtering else len(self._sprites)
+        visible_count = len(self._rows)
         total_count = len(self._sprites)
         selected_count = len(self._selected_offsets)
 
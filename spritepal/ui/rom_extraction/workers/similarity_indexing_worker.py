@@ -10,20 +10,31 @@ import contextlib
 import hashlib
 import json
 import pickle
+import queue
 import threading
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from core.managers import ExtractionManager, get_extraction_manager
+import numpy as np
+from core.indexed_image import decode_sprite_tiles
+from core.managers import get_extraction_manager
 from core.visual_similarity_search import VisualSimilarityEngine
 from core.workers.base import BaseWorker, handle_worker_errors
-from PIL import Image
 from PySide6.QtCore import QObject, Signal, Slot
+from utils.constants import SPRITE_WIDTH_TILES
 from utils.logging_config import get_logger
 from utils.settings_manager import get_settings_manager
 
+if TYPE_CHECKING:
+    from core.rom_extractor import ROMExtractor
+
 logger = get_logger(__name__)
 
+# Sprites of the same dimensions hashed together in one batch
+INDEX_BATCH_SIZE = 64
+# Decoded sprites buffered between the decompression and hashing stages
+DECODE_QUEUE_SIZE = 256
+
 class SimilarityIndexingWorker(BaseWorker):
     """
     Background worker that indexes sprites for visual similarity search.
@@ -260,11 +271,14 @@ class SimilarityIndexingWorker(BaseWorker):
 
     @handle_worker_errors("similarity indexing")
     def run(self) -> None:
-        """Background indexing of pending sprites."""
-        try:
-            extraction_manager = get_extraction_manager()
-            indexed_count = 0
+        """
+        Background indexing of pending sprites.
 
+        Decompression runs on a producer thread that feeds decoded tile
+        arrays through a bounded queue; this thread groups them by size and
+        hashes each group as a single batch.
+        """
+        try:
             # Process pending sprites
             sprites_to_process = list(self._pending_sprites.items())
             total_sprites = len(sprites_to_process)
@@ -275,39 +289,60 @@ class SimilarityIndexingWorker(BaseWorker):
                 self.emit_progress(100, "No sprites to index")
                 return
 
+            rom_extractor = get_extraction_manager().get_rom_extractor()
+            rom_data = Path(self.rom_path).read_bytes()
+
             self.emit_progress(0, f"Starting indexing of {total_sprites} sprites")
 
-            for i, (offset, sprite_info) in enumerate(sprites_to_process):
-                # Check for cancellation
-                self.check_cancellation()
-                self.wait_if_paused()
+            decoded: queue.Queue[tuple[int, dict[str, Any], np.ndarray | None] | None] = queue.Queue(
+                maxsize=DECODE_QUEUE_SIZE
+            )
+            stop_event = threading.Event()
+            producer = threading.Thread(
+                target=self._decode_sprites,
+                args=(rom_data, sprites_to_process, rom_extractor, decoded, stop_event),
+                name="SimilarityDecode",
+                daemon=True,
+            )
+            producer.start()
 
-                try:
-                    # Extract sprite image for indexing
-                    sprite_image = self._extract_sprite_image(offset, extraction_manager)
-                    if sprite_image is None:
-                        logger.warning(f"Could not extract image for sprite at 0x{offset:X}")
+            indexed_count = 0
+            processed = 0
+            batches: dict[tuple[int, int], list[tuple[int, dict[str, Any], np.ndarray]]] = {}
+            try:
+                while True:
+                    # Check for cancellation
+                    self.check_cancellation()
+                    self.wait_if_paused()
+
+                    try:
+                        item = decoded.get(timeout=0.1)
+                    except queue.Empty:
                         continue
+                    if item is None:
+                        break
 
-                    # Index the sprite
-                    self.similarity_engine.index_sprite(
-                        offset=offset,
-                        image=sprite_image,
-                        metadata=sprite_info
-                    )
-
-                    indexed_count += 1
-                    self.sprite_indexed.emit(offset)
+                    processed += 1
+                    offset, sprite_info, pixels = item
+                    if pixels is None:
+                        logger.warning(f"Could not extract image for sprite at 0x{offset:X}")
+                        continue
 
-                    # Update progress
-                    progress = int((i + 1) / total_sprites * 100)
-                    self.emit_progress(progress, f"Indexed {indexed_count}/{total_sprites} sprites")
+                    batch = batches.setdefault(pixels.shape, [])
+                    batch.append((offset, sprite_info, pixels))
+                    if len(batch) >= INDEX_BATCH_SIZE:
+                        indexed_count += self._index_batch(batches.pop(pixels.shape))
+                        progress = int(processed / total_sprites * 100)
+                        self.emit_progress(progress, f"Indexed {indexed_count}/{total_sprites} sprites")
 
-                    logger.debug(f"Indexed sprite at 0x{offset:X} ({indexed_count}/{total_sprites})")
+                for batch in batches.values():
+                    self.check_cancellation()
+                    indexed_count += self._index_batch(batch)
+            finally:
+                stop_event.set()
+                producer.join()
 
-                except Exception as e:
-                    logger.exception(f"Failed to index sprite at 0x{offset:X}: {e}")
-                    continue
+            self.emit_progress(100, f"Indexed {indexed_count}/{total_sprites} sprites")
 
             # Clear pending sprites
             with self._index_lock:
@@ -329,36 +364,107 @@ class SimilarityIndexingWorker(BaseWorker):
             logger.exception("Similarity indexing failed")
             self.operation_finished.emit(False, f"Indexing failed: {e}")
 
-    def _extract_sprite_image(self, offset: int, extraction_manager: ExtractionManager) -> Image.Image | None:
+    def _index_batch(self, batch: list[tuple[int, dict[str, Any], np.ndarray]]) -> int:
         """
-        Extract sprite image for indexing.
+        Hash a batch of equally sized sprites and add them to the index.
 
         Args:
-            offset: ROM offset of the sprite
-            extraction_manager: Manager to handle sprite extraction
+            batch: (offset, sprite_info, pixels) entries with identical pixel shapes
 
         Returns:
-            PIL Image of the sprite, or None if extraction failed
+            Number of sprites indexed
         """
+        offsets = [offset for offset, _, _ in batch]
         try:
-            # Use extraction manager to get sprite data
-            # TODO: Implement extract_sprite_at_offset method on ExtractionManager
-            sprite_data = extraction_manager.extract_sprite_at_offset(  # type: ignore[attr-defined]
-                rom_path=self.rom_path,
-                offset=offset,
-                output_format="RGBA"  # Get as PIL Image
+            self.similarity_engine.index_sprite_batch(
+                offsets=offsets,
+                pixels=np.stack([pixels for _, _, pixels in batch]),
+                metadata=[sprite_info for _, sprite_info, _ in batch],
             )
+        except Exception as e:
+            logger.exception(f"Failed to index batch starting at 0x{offsets[0]:X}: {e}")
+            return 0
+
+        for offset in offsets:
+            self.sprite_indexed.emit(offset)
+        logger.debug(f"Indexed batch of {len(offsets)} sprites")
+        return len(offsets)
+
+    def _decode_sprites(
+        self,
+        rom_data: bytes,
+        sprites: list[tuple[int, dict[str, Any]]],
+        rom_extractor: ROMExtractor,
+        decoded: queue.Queue[tuple[int, dict[str, Any], np.ndarray | None] | None],
+        stop_event: threading.Event,
+    ) -> None:
+        """
+        Producer stage: decompress and decode sprites onto the queue.
 
-            if sprite_data and hasattr(sprite_data, "image"):
-                return sprite_data.image
+        Always finishes with a None sentinel, even on failure, unless the
+        consumer has already stopped.
 
-            logger.warning(f"No image data returned for sprite at 0x{offset:X}")
-            return None
+        Args:
+            rom_data: Full ROM contents
+            sprites: (offset, sprite_info) pairs to decode
+            rom_extractor: Extractor providing HAL decompression
+            decoded: Queue receiving (offset, sprite_info, pixels) entries
+            stop_event: Set by the consumer when it stops reading the queue
+        """
+        try:
+            for offset, sprite_info in sprites:
+                if stop_event.is_set():
+                    return
+                pixels = self._decode_sprite(rom_data, offset, sprite_info, rom_extractor)
+                if not self._put_decoded(decoded, (offset, sprite_info, pixels), stop_event):
+                    return
+        finally:
+            self._put_decoded(decoded, None, stop_event)
+
+    @staticmethod
+    def _put_decoded(
+        decoded: queue.Queue[tuple[int, dict[str, Any], np.ndarray | None] | None],
+        item: tuple[int, dict[str, Any], np.ndarray | None] | None,
+        stop_event: threading.Event,
+    ) -> bool:
+        """Put an item on the bounded queue, giving up once the consumer has stopped"""
+        while not stop_event.is_set():
+            try:
+                decoded.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode_sprite(
+        self,
+        rom_data: bytes,
+        offset: int,
+        sprite_info: dict[str, Any],
+        rom_extractor: ROMExtractor,
+    ) -> np.ndarray | None:
+        """
+        Decompress a sprite and decode it to a grid of 4bpp color indices.
 
+        Args:
+            rom_data: Full ROM contents
+            offset: ROM offset of the sprite
+            sprite_info: Scan result for the sprite
+            rom_extractor: Extractor providing HAL decompression
+
+        Returns:
+            uint8 array of color indices, or None if extraction failed
+        """
+        try:
+            _, sprite_data = rom_extractor.rom_injector.find_compressed_sprite(
+                rom_data, offset, expected_size=sprite_info.get("decompressed_size") or None
+            )
         except Exception as e:
-            logger.exception(f"Failed to extract sprite image at 0x{offset:X}: {e}")
+            logger.debug(f"Failed to decompress sprite at 0x{offset:X}: {e}")
             return None
 
+        return decode_sprite_tiles(sprite_data, SPRITE_WIDTH_TILES)
+
     def get_similarity_engine(self) -> VisualSimilarityEngine:
         """Get the similarity engine for external use."""
         return self.similarity_engine
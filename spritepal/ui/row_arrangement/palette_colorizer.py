@@ -3,8 +3,11 @@ Palette colorization for sprite images with caching
 """
 from __future__ import annotations
 
+import numpy as np
 from PIL import Image
 from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QImage
+from utils.image_utils import build_color_table, create_indexed_qimage
 
 
 class PaletteColorizer(QObject):
@@ -23,6 +26,10 @@ class PaletteColorizer(QObject):
             {}
         )  # (row_index, palette_index) -> Image
         self._max_cache_size: int = 100  # Limit cache size to prevent memory issues
+        # Palette-independent per-row data for color table swapping
+        self._index_cache: dict[int, tuple[Image.Image, np.ndarray]] = {}
+        self._indexed_qimages: dict[int, QImage] = {}
+        self._color_tables: dict[int, list[int]] = {}
 
     def set_palettes(
         self, palettes_dict: dict[int, list[tuple[int, int, int]]]
@@ -33,6 +40,7 @@ class PaletteColorizer(QObject):
             palettes_dict: Dictionary mapping palette index to RGB color lists
         """
         self._current_palettes = palettes_dict
+        self._color_tables.clear()
         if self._colorized_cache:
             self._colorized_cache.clear()  # Clear cache when palettes change
 
@@ -114,51 +122,16 @@ class PaletteColorizer(QObject):
             return None
 
         try:
-            # Convert grayscale to RGBA for transparency support
-            rgba_image = grayscale_image.convert("RGBA")
-
-            # Get image data
-            pixels = rgba_image.load()
-            if pixels is None:
-                print("Failed to load image pixels")
-                return None
-            width, height = rgba_image.size
-
-            # Apply palette
-            for y in range(height):
-                for x in range(width):
-                    # Get pixel value
-                    pixel_value = grayscale_image.getpixel((x, y))
-
-                    # Ensure pixel_value is an integer for indexing operations
-                    if not isinstance(pixel_value, int):
-                        # If it's a tuple or other type, convert to int (take first value)
-                        if isinstance(pixel_value, tuple):
-                            first_val = pixel_value[0]
-                            pixel_value = int(first_val)
-                        else:
-                            # For non-tuple, non-int values, convert directly
-                            pixel_value = int(pixel_value) if pixel_value is not None else 0
-
-                    # For palette mode images, pixel value is already the palette index
-                    if grayscale_image.mode == "P":
-                        palette_index = pixel_value
-                    else:
-                        # For grayscale images, map to palette index
-                        palette_index = min(15, pixel_value // 16)
-
-                    # Handle transparency for palette index 0
-                    if palette_index == 0:
-                        # Set transparent pixel
-                        pixels[x, y] = (0, 0, 0, 0)
-                    elif palette_index < len(palette_colors):
-                        # Get RGB color from palette
-                        color_tuple = palette_colors[palette_index]
-                        r, g, b = color_tuple
-                        pixels[x, y] = (r, g, b, 255)
-                    else:
-                        # Use black for out of range indices
-                        pixels[x, y] = (0, 0, 0, 255)
+            indices = self._image_to_indices(grayscale_image)
+
+            # Index 0 is transparent, out of range indices are opaque black
+            rgba_lut = np.zeros((256, 4), dtype=np.uint8)
+            rgba_lut[1:, 3] = 255
+            count = min(len(palette_colors), 256)
+            rgba_lut[:count, :3] = np.asarray(palette_colors[:count], dtype=np.uint8)[:, :3]
+            rgba_lut[0] = (0, 0, 0, 0)
+
+            rgba_image = Image.fromarray(rgba_lut[indices], "RGBA")
 
         except Exception as e:
             print(f"Error applying palette: {e}")
@@ -166,6 +139,34 @@ class PaletteColorizer(QObject):
         else:
             return rgba_image
 
+    def _image_to_indices(self, image: Image.Image) -> np.ndarray:
+        """Convert a grayscale or palette mode image to palette indices
+
+        Args:
+            image: Grayscale ("L"), palette ("P") or multi-band image
+
+        Returns:
+            2D uint8 array of palette indices
+        """
+        if image.mode == "P":
+            # For palette mode images, pixel value is already the palette index
+            return np.asarray(image, dtype=np.uint8)
+
+        # For grayscale images, map to palette index (first band for multi-band)
+        band = image if len(image.getbands()) == 1 else image.getchannel(0)
+        values = np.asarray(band)
+        return np.minimum(values // 16, 15).astype(np.uint8)
+
+    def _get_row_indices(self, row_index: int, grayscale_image: Image.Image) -> np.ndarray:
+        """Get cached palette indices for a row, recomputing if its image changed"""
+        cached = self._index_cache.get(row_index)
+        if cached is not None and cached[0] is grayscale_image:
+            return cached[1]
+        indices = self._image_to_indices(grayscale_image)
+        self._index_cache[row_index] = (grayscale_image, indices)
+        self._indexed_qimages.pop(row_index, None)
+        return indices
+
     def get_display_image(
         self, row_index: int, grayscale_image: Image.Image
     ) -> Image.Image:
@@ -201,6 +202,38 @@ class PaletteColorizer(QObject):
         # Fallback to grayscale if palette application fails
         return grayscale_image
 
+    def get_display_qimage(
+        self, row_index: int, grayscale_image: Image.Image
+    ) -> QImage | None:
+        """Get an Indexed8 QImage of a row colored with the selected palette
+
+        The index data for each row is converted once and kept as an Indexed8
+        QImage. Switching palettes only replaces the image's color table, so
+        cycling palettes does no per-pixel work.
+
+        Args:
+            row_index: Index of the row for caching
+            grayscale_image: The original grayscale image
+
+        Returns:
+            Indexed8 QImage, or None if palette mode is off or the palette is missing
+        """
+        if not self._palette_applied or self._selected_palette_index not in self._current_palettes:
+            return None
+
+        indices = self._get_row_indices(row_index, grayscale_image)
+        qimage = self._indexed_qimages.get(row_index)
+        if qimage is None:
+            qimage = create_indexed_qimage(indices)
+            self._indexed_qimages[row_index] = qimage
+
+        table = self._color_tables.get(self._selected_palette_index)
+        if table is None:
+            table = build_color_table(self._current_palettes[self._selected_palette_index])
+            self._color_tables[self._selected_palette_index] = table
+        qimage.setColorTable(table)
+        return qimage
+
     def is_palette_mode(self) -> bool:
         """Check if palette mode is currently enabled
 
@@ -229,6 +262,8 @@ class PaletteColorizer(QObject):
         """Clear the colorized image cache"""
         if self._colorized_cache:
             self._colorized_cache.clear()
+        self._index_cache.clear()
+        self._indexed_qimages.clear()
 
     def _enforce_cache_limit(self) -> None:
         """Enforce maximum cache size to prevent memory issues"""
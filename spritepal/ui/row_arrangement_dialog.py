@@ -630,7 +630,7 @@ class RowArrangementDialog(SplitterDialog):
                 "Grayscale mode: Original sprite colors | Press C to toggle palette"
             )
 
-    def _get_display_image_for_row(self, row_index: int) -> Image.Image | None:
+    def _get_display_image_for_row(self, row_index: int) -> Image.Image | QImage | None:
         """Get the appropriate display image for a row (grayscale or colorized)"""
         if row_index >= len(self.tile_rows):
             return None
@@ -638,8 +638,10 @@ class RowArrangementDialog(SplitterDialog):
         row_data = self.tile_rows[row_index]
         grayscale_image = row_data["image"]
 
-        # Use colorizer to get display image
-        return self.colorizer.get_display_image(row_index, grayscale_image)
+        # Colorized rows share one Indexed8 QImage per row; cycling palettes
+        # only swaps its color table
+        colorized = self.colorizer.get_display_qimage(row_index, grayscale_image)
+        return colorized if colorized is not None else grayscale_image
 
     def _cycle_palette(self):
         """Cycle through available palettes (8-15)"""
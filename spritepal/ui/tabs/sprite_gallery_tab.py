@@ -65,6 +65,7 @@ class SpriteGalleryTab(QWidget):
         # Workers
         self.thumbnail_controller: ThumbnailWorkerController | None = None
         self.scan_thread: QThread | None = None
+        self._closing: bool = False
 
         # UI Components - these are always initialized in _setup_ui()
         self.gallery_widget: SpriteGalleryWidget  # Always initialized
@@ -90,7 +91,7 @@ class SpriteGalleryTab(QWidget):
         self.gallery_widget.sprite_selected.connect(self._on_sprite_selected)
         self.gallery_widget.sprite_double_clicked.connect(self._on_sprite_double_clicked)
         self.gallery_widget.selection_changed.connect(self._on_selection_changed)
-        self.gallery_widget.thumbnail_request.connect(self._on_thumbnail_request)
+        self.gallery_widget.thumbnail_schedule.connect(self._on_thumbnail_schedule)
         layout.addWidget(self.gallery_widget, 1)  # Give it stretch
 
         # Action bar
@@ -425,7 +426,7 @@ class SpriteGalleryTab(QWidget):
             self.gallery_widget.model.clear_thumbnail_cache()
 
         # Trigger loading of visible thumbnails
-        self.gallery_widget._update_visible_thumbnails()
+        self.gallery_widget.reschedule_thumbnails()
 
         logger.info("Thumbnail refresh triggered - will load on demand as items become visible")
 
@@ -442,15 +443,18 @@ class SpriteGalleryTab(QWidget):
         # Set thumbnail in gallery widget (now uses model)
         self.gallery_widget.set_thumbnail(offset, pixmap)
 
-    def _on_thumbnail_request(self, offset: int, priority: int):
+    def _on_thumbnail_preview_ready(self, offset: int, pixmap: QPixmap):
+        """Show a low-resolution preview until the full thumbnail arrives."""
+        self.gallery_widget.set_thumbnail(offset, pixmap, preview=True)
+
+    def _on_thumbnail_schedule(self, requests: list[tuple[int, bool]]):
         """
-        Handle thumbnail request from gallery widget.
+        Handle the viewport thumbnail schedule from the gallery widget.
 
         Args:
-            offset: Sprite offset
-            priority: Request priority (lower = higher priority)
+            requests: (offset, preview) pairs in priority order; replaces pending work
         """
-        if not self.rom_path:
+        if not self.rom_path or self._closing:
             return
 
         # Create controller if needed
@@ -458,10 +462,10 @@ class SpriteGalleryTab(QWidget):
             logger.info("Creating ThumbnailWorkerController for on-demand requests")
             self.thumbnail_controller = ThumbnailWorkerController(self)
             self.thumbnail_controller.thumbnail_ready.connect(self._on_thumbnail_ready)
+            self.thumbnail_controller.preview_ready.connect(self._on_thumbnail_preview_ready)
             self.thumbnail_controller.start_worker(self.rom_path, self.rom_extractor)
 
-        # Queue thumbnail with priority
-        self.thumbnail_controller.queue_thumbnail(offset, 128, priority)
+        self.thumbnail_controller.schedule_thumbnails(requests, 128)
 
     def _on_sprite_selected(self, offset: int):
         """Handle sprite selection in gallery."""
@@ -657,6 +661,16 @@ class SpriteGalleryTab(QWidget):
 
     def cleanup(self):
         """Clean up resources."""
+        self._closing = True
+
+        # Stop the gallery's viewport timers so no late schedule creates a
+        # new thumbnail worker after cleanup
+        try:
+            self.gallery_widget.thumbnail_schedule.disconnect(self._on_thumbnail_schedule)
+        except (RuntimeError, TypeError) as e:
+            logger.debug(f"Could not disconnect thumbnail_schedule: {e}")
+        self.gallery_widget.cleanup()
+
         # Close detached window if open
         if self.detached_window:
             self.detached_window.close()
@@ -12,9 +12,11 @@ from PySide6.QtGui import (
     QDragMoveEvent,
     QDropEvent,
     QEnterEvent,
+    QImage,
     QPainter,
     QPaintEvent,
     QPen,
+    QPixmap,
 )
 from PySide6.QtWidgets import QListWidget, QWidget
 from typing_extensions import override
@@ -27,7 +29,7 @@ class RowPreviewWidget(QWidget):
     def __init__(
         self,
         row_index: int,
-        row_image: Image.Image,
+        row_image: Image.Image | QImage,
         tiles_per_row: int,
         is_selected: bool = False,
         parent: QWidget | None = None,
@@ -42,8 +44,9 @@ class RowPreviewWidget(QWidget):
         self.setMinimumWidth(350)  # Slightly wider for better layout
         self.setMouseTracking(True)
 
-    def update_image(self, new_image: Image.Image) -> None:
-        """Update the row image for display"""
+    def update_image(self, new_image: Image.Image | QImage) -> None:
+        """Update the row image for display (PIL, or an Indexed8 QImage whose
+        color table already holds the palette)"""
         self.row_image = new_image
         self.update()
 
@@ -87,14 +90,19 @@ class RowPreviewWidget(QWidget):
         # Convert PIL image to QPixmap for display
         image_end_x = 10  # Default position if no image
 
-        if self.row_image:
+        if self.row_image is not None:
             # Scale to fit within both width and height constraints
             target_height = 70  # Maximum height for the image (fits within 72px well)
             max_width = 320  # Maximum width to leave room for labels
 
+            if isinstance(self.row_image, QImage):
+                image_width, image_height = self.row_image.width(), self.row_image.height()
+            else:
+                image_width, image_height = self.row_image.size
+
             # Calculate scale factors for both dimensions
-            height_scale = target_height / self.row_image.height
-            width_scale = max_width / self.row_image.width
+            height_scale = target_height / image_height
+            width_scale = max_width / image_width
 
             # Use the smaller scale factor to maintain aspect ratio
             scale_factor = min(height_scale, width_scale)
@@ -103,23 +111,35 @@ class RowPreviewWidget(QWidget):
             # Use minimum scale of 2 for better visibility in thumbnails
             scale_factor = max(2, int(scale_factor))
 
-            scaled_width = self.row_image.width * scale_factor
-            scaled_height = self.row_image.height * scale_factor
-
-            scaled_image = self.row_image.resize(
-                (scaled_width, scaled_height), Image.Resampling.NEAREST
-            )
-
-            # Handle different image modes
-            if scaled_image.mode == "RGBA":
-                # For RGBA images (colorized), keep as is
-                pass
-            elif scaled_image.mode != "L":
-                # For other modes, convert to grayscale
-                scaled_image = scaled_image.convert("L")
-
-            # Convert to QPixmap using enhanced utility function
-            pixmap = pil_to_qpixmap(scaled_image)
+            scaled_width = image_width * scale_factor
+            scaled_height = image_height * scale_factor
+
+            if isinstance(self.row_image, QImage):
+                # Colorized rows arrive as Indexed8 QImages, drawn straight
+                # from their color table
+                pixmap = QPixmap.fromImage(
+                    self.row_image.scaled(
+                        scaled_width,
+                        scaled_height,
+                        Qt.AspectRatioMode.IgnoreAspectRatio,
+                        Qt.TransformationMode.FastTransformation,
+                    )
+                )
+            else:
+                scaled_image = self.row_image.resize(
+                    (scaled_width, scaled_height), Image.Resampling.NEAREST
+                )
+
+                # Handle different image modes
+                if scaled_image.mode == "RGBA":
+                    # For RGBA images (colorized), keep as is
+                    pass
+                elif scaled_image.mode != "L":
+                    # For other modes, convert to grayscale
+                    scaled_image = scaled_image.convert("L")
+
+                # Convert to QPixmap using enhanced utility function
+                pixmap = pil_to_qpixmap(scaled_image)
 
             if pixmap:
                 # Draw scaled thumbnail centered in the well
@@ -21,6 +21,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 from typing_extensions import override
+from ui.common.thumbnail_scheduler import ViewportThumbnailScheduler
 from ui.delegates.sprite_gallery_delegate import SpriteGalleryDelegate
 from ui.models.sprite_gallery_model import SpriteGalleryModel
 from utils.logging_config import get_logger
@@ -29,8 +30,8 @@ logger = get_logger(__name__)
 
 # Gallery layout constants
 VIEWPORT_MARGIN = 20
-THUMBNAIL_REQUEST_BATCH_SIZE = 50  # Request thumbnails in batches
-VIEWPORT_BUFFER_ROWS = 2  # Load extra rows above/below viewport
+VIEWPORT_UPDATE_INTERVAL_MS = 100  # Viewport is re-planned at most this often while scrolling
+SCROLL_SETTLE_MS = 350  # Quiet time after a scroll burst before full renders of the window
 
 class SpriteGalleryWidget(QWidget):
     """Widget displaying a gallery of sprite thumbnails using virtual scrolling."""
@@ -39,7 +40,7 @@ class SpriteGalleryWidget(QWidget):
     sprite_selected = Signal(int)  # Emits offset when sprite selected
     sprite_double_clicked = Signal(int)  # Emits offset on double-click
     selection_changed = Signal(list)  # Emits list of selected offsets
-    thumbnail_request = Signal(int, int)  # Request thumbnail (offset, priority)
+    thumbnail_schedule = Signal(list)  # (offset, preview) pairs in priority order, replacing earlier ones
 
     def __init__(self, parent: QWidget | None = None):
         """
@@ -63,14 +64,18 @@ class SpriteGalleryWidget(QWidget):
         # Performance - explicit parent ensures cleanup with widget
         self.viewport_timer = QTimer(self)
         self.viewport_timer.timeout.connect(self._update_visible_thumbnails)
-        self.viewport_timer.setInterval(100)
+        self.viewport_timer.setInterval(VIEWPORT_UPDATE_INTERVAL_MS)
         self.viewport_timer.setSingleShot(True)
+        self.settle_timer = QTimer(self)
+        self.settle_timer.timeout.connect(self._update_visible_thumbnails)
+        self.settle_timer.setInterval(SCROLL_SETTLE_MS)
+        self.settle_timer.setSingleShot(True)
 
         # UI components
         self.controls_widget: QWidget | None = None
 
-        # Track last visible range to avoid redundant requests
-        self._last_visible_range = (-1, -1)
+        # Plans thumbnail work around the viewport and skips redundant requests
+        self.scheduler = ViewportThumbnailScheduler()
 
         self._setup_ui()
 
@@ -349,24 +354,41 @@ class SpriteGalleryWidget(QWidget):
         self._update_status()
 
         # Trigger initial thumbnail loading for visible items (use managed timer)
-        self.viewport_timer.start()
+        self.reschedule_thumbnails(delayed=True)
 
         logger.debug(f"Gallery populated with {len(sprites)} sprites using virtual scrolling")
 
-    def set_thumbnail(self, offset: int, pixmap: QPixmap):
+    def set_thumbnail(self, offset: int, pixmap: QPixmap, preview: bool = False):
         """
         Set thumbnail for a sprite.
 
         Args:
             offset: Sprite offset
             pixmap: Thumbnail pixmap
+            preview: True for a low-resolution first pass
         """
         if self.model:
-            self.model.set_thumbnail(offset, pixmap)
+            self.model.set_thumbnail(offset, pixmap, preview)
             logger.debug(f"Thumbnail set for offset 0x{offset:06X}")
 
+    def reschedule_thumbnails(self, delayed: bool = False):
+        """
+        Re-plan thumbnail requests even if the viewport has not moved.
+
+        Used after the items behind the visible rows change (new sprites,
+        filtering, sorting, cleared thumbnails).
+
+        Args:
+            delayed: Wait for the viewport timer instead of planning now
+        """
+        self.scheduler.reset()
+        if delayed:
+            self.viewport_timer.start()
+        else:
+            self._update_visible_thumbnails()
+
     def _update_visible_thumbnails(self):
-        """Request thumbnails for visible items only."""
+        """Schedule thumbnails for the viewport and the prefetch window around it."""
         if not self.list_view or not self.model:
             return
 
@@ -383,34 +405,39 @@ class SpriteGalleryWidget(QWidget):
         if not last_index.isValid():
             last_index = self.model.index(self.model.rowCount() - 1, 0)
 
-        first_row = first_index.row()
-        last_row = last_index.row()
-
-        # Add buffer rows above and below viewport
-        first_row = max(0, first_row - VIEWPORT_BUFFER_ROWS * self.columns)
-        last_row = min(self.model.rowCount() - 1, last_row + VIEWPORT_BUFFER_ROWS * self.columns)
-
-        # Check if range changed
-        if (first_row, last_row) == self._last_visible_range:
+        plan = self.scheduler.update(
+            first_index.row(), last_index.row(), self._grid_columns(), self.model.rowCount()
+        )
+        if plan is None:
             return
-
-        self._last_visible_range = (first_row, last_row)
-
-        # Get offsets that need thumbnails
-        offsets_needed = self.model.get_visible_range(first_row, last_row)
-
-        # Request thumbnails with priority based on position
-        for i, offset in enumerate(offsets_needed[:THUMBNAIL_REQUEST_BATCH_SIZE]):
-            priority = i  # Lower number = higher priority
-            self.thumbnail_request.emit(offset, priority)
-
-        logger.debug(f"Requested {len(offsets_needed)} thumbnails for rows {first_row}-{last_row}")
+        if plan.burst:
+            # Fill in full renders of the prefetch window once scrolling stops
+            self.settle_timer.start()
+
+        rows = [row for row, _ in plan.entries]
+        offsets = self.model.get_offsets_for_rows(rows) if rows else []
+        requests = [
+            (offset, preview)
+            for offset, (_, preview) in zip(offsets, plan.entries, strict=True)
+            if self.model.needs_thumbnail(offset, preview)
+        ]
+        self.thumbnail_schedule.emit(requests)
+
+        logger.debug(f"Scheduled {len(requests)} thumbnails (burst={plan.burst}, direction={plan.direction})")
+
+    def _grid_columns(self) -> int:
+        """Number of items per row in the current grid layout."""
+        if self.list_view and self.model and self.model.rowCount():
+            item_width = self.list_view.visualRect(self.model.index(0, 0)).width()
+            if item_width > 0:
+                return max(1, self.list_view.viewport().width() // (item_width + self.spacing))
+        return max(1, self.columns)
 
     def _on_scroll(self, value: int):
         """Handle scroll events to trigger thumbnail loading."""
-        # Use timer to debounce scroll events
-        self.viewport_timer.stop()
-        self.viewport_timer.start()
+        # Throttle rather than debounce, so the viewport is re-planned while scrolling
+        if not self.viewport_timer.isActive():
+            self.viewport_timer.start()
 
     def _on_item_clicked(self, index: Any) -> None:
         """Handle item click."""
@@ -436,8 +463,9 @@ class SpriteGalleryWidget(QWidget):
         self._update_status()
 
     def _on_thumbnail_needed(self, offset: int, priority: int):
-        """Handle thumbnail request from model."""
-        self.thumbnail_request.emit(offset, priority)
+        """Handle thumbnail request from model by re-planning the viewport."""
+        if not self.viewport_timer.isActive():
+            self.viewport_timer.start()
 
     def _on_size_changed(self, value: int):
         """Handle thumbnail size change."""
@@ -456,7 +484,7 @@ class SpriteGalleryWidget(QWidget):
             self.list_view.reset()
 
         # Trigger thumbnail reload for new size
-        self.viewport_timer.start()
+        self.reschedule_thumbnails(delayed=True)
 
     def _apply_filters(self):
         """Apply current filters to the gallery."""
@@ -470,7 +498,7 @@ class SpriteGalleryWidget(QWidget):
         self._update_status()
 
         # Trigger thumbnail loading for newly visible items
-        self.viewport_timer.start()
+        self.reschedule_thumbnails(delayed=True)
 
     def _apply_sort(self):
         """Apply sorting to the sprite data."""
@@ -481,7 +509,7 @@ class SpriteGalleryWidget(QWidget):
         self.model.sort_sprites(sort_key)
 
         # Trigger thumbnail loading for newly visible items
-        self.viewport_timer.start()
+        self.reschedule_thumbnails(delayed=True)
 
     def _select_all(self):
         """Select all visible thumbnails."""
@@ -549,7 +577,7 @@ class SpriteGalleryWidget(QWidget):
         """Force the gallery to recalculate its layout."""
         if self.list_view:
             self.list_view.reset()
-            self.viewport_timer.start()
+            self.reschedule_thumbnails(delayed=True)
             logger.debug("Forced layout update for list view")
 
     def get_sprite_pixmap(self, offset: int) -> QPixmap | None:
@@ -588,4 +616,6 @@ class SpriteGalleryWidget(QWidget):
         """Clean up resources before deletion to prevent timer callbacks on deleted objects."""
         if self.viewport_timer:
             self.viewport_timer.stop()
+        if self.settle_timer:
+            self.settle_timer.stop()
         logger.debug("SpriteGalleryWidget cleanup complete")
@@ -71,6 +71,7 @@ class DetachedGalleryWindow(QMainWindow):
         self.thumbnail_controller: ThumbnailWorkerController | None = None
         self.scanning: bool = False
         self.scan_timeout_timer: QTimer | None = None
+        self._closing: bool = False
 
         # Core managers
         self.extraction_manager = get_extraction_manager()
@@ -131,6 +132,7 @@ class DetachedGalleryWindow(QMainWindow):
         # Connect signals
         self.gallery_widget.sprite_selected.connect(self.sprite_selected.emit)
         self.gallery_widget.sprite_double_clicked.connect(self._on_sprite_double_clicked)
+        self.gallery_widget.thumbnail_schedule.connect(self._on_thumbnail_schedule)
 
         # Add to layout with stretch factor to fill window
         layout.addWidget(self.gallery_widget, 1)  # Stretch factor 1 to fill space
@@ -1091,6 +1093,7 @@ class DetachedGalleryWindow(QMainWindow):
         # List of signals and their connected slots
         signals_to_disconnect = [
             ('thumbnail_ready', self._on_thumbnail_ready),
+            ('preview_ready', self._on_thumbnail_preview_ready),
             ('progress', self._on_thumbnail_progress),
         ]
 
@@ -1128,7 +1131,16 @@ class DetachedGalleryWindow(QMainWindow):
 
         self.status_bar.showMessage("Generating thumbnails...")
 
-        # Create new thumbnail controller
+        self._start_thumbnail_controller()
+
+        # Thumbnails are requested for the viewport and its prefetch window;
+        # scrolling re-plans the queue
+        self.gallery_widget.reschedule_thumbnails()
+
+    def _start_thumbnail_controller(self):
+        """Create the thumbnail controller and start its worker."""
+        if not self.rom_path or self._closing:
+            return
         logger.info("Creating new ThumbnailWorkerController for thumbnail generation")
         self.thumbnail_controller = ThumbnailWorkerController(self)
 
@@ -1136,23 +1148,23 @@ class DetachedGalleryWindow(QMainWindow):
         # Note: finished and error signals from BaseWorker are not connected here
         # This prevents unnecessary signal connections that could leak
         self.thumbnail_controller.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self.thumbnail_controller.preview_ready.connect(self._on_thumbnail_preview_ready)
         self.thumbnail_controller.progress.connect(self._on_thumbnail_progress)
 
         # Start the worker with proper thread management
         self.thumbnail_controller.start_worker(self.rom_path, self.rom_extractor)
 
-        # Queue all sprites for thumbnail generation
-        logger.info(f"Queueing {len(self.sprites_data)} sprites for thumbnail generation")
-        for sprite_info in self.sprites_data:
-            offset = sprite_info.get('offset', 0)
-            if isinstance(offset, str):
-                offset = int(offset, 16) if offset.startswith('0x') else int(offset)
-            # Queue with size 256 for better visibility
-            self.thumbnail_controller.queue_thumbnail(offset, 256)
-
-        # The controller handles thread management, no need to manually start
+    def _on_thumbnail_schedule(self, requests: list[tuple[int, bool]]):
+        """Replace pending thumbnail work with the gallery's viewport schedule."""
+        if not self.rom_path or self._closing:
+            return
         if not self.thumbnail_controller:
-            logger.error("Failed to create thumbnail controller - cannot generate thumbnails")
+            if not requests:
+                return
+            self._start_thumbnail_controller()
+        if self.thumbnail_controller:
+            # Size 256 for better visibility
+            self.thumbnail_controller.schedule_thumbnails(requests, 256)
 
     def _on_thumbnail_ready(self, offset: int, pixmap: QPixmap):
         """Handle thumbnail ready from worker."""
@@ -1188,6 +1200,11 @@ class DetachedGalleryWindow(QMainWindow):
                 thumbnail.set_sprite_data(pixmap, sprite_info)  # type: ignore[attr-defined]
                 logger.debug(f"Set thumbnail for sprite at 0x{offset:06X} using old API")
 
+    def _on_thumbnail_preview_ready(self, offset: int, pixmap: QPixmap):
+        """Show a low-resolution preview until the full thumbnail arrives."""
+        if self.gallery_widget and hasattr(self.gallery_widget, 'set_thumbnail'):
+            self.gallery_widget.set_thumbnail(offset, pixmap, preview=True)
+
     def _on_thumbnail_progress(self, percent: int, message: str):
         """Handle thumbnail generation progress."""
         self.status_bar.showMessage(f"Generating thumbnails: {percent}% - {message}")
@@ -1415,6 +1432,16 @@ class DetachedGalleryWindow(QMainWindow):
     def closeEvent(self, event: QCloseEvent):
         """Handle window close event."""
         logger.info("DetachedGalleryWindow closing, cleaning up workers")
+        self._closing = True
+
+        # Stop the gallery's viewport timers first so no late schedule
+        # restarts the thumbnail worker after cleanup
+        if self.gallery_widget:
+            try:
+                self.gallery_widget.thumbnail_schedule.disconnect(self._on_thumbnail_schedule)
+            except (RuntimeError, TypeError) as e:
+                logger.debug(f"Could not disconnect thumbnail_schedule: {e}")
+            self.gallery_widget.cleanup()
 
         # Clean up fullscreen viewer
         if self.fullscreen_viewer:
@@ -1,6 +1,20 @@
 """
 Batch thumbnail worker for generating sprite thumbnails asynchronously.
 Handles queue management and priority-based generation.
+
+The queue can be replaced wholesale with the requests for the current
+viewport, dropping work for sprites that scrolled away. Preview requests
+render a quarter-size image and are delivered on a separate signal;
+decompressed sprite data is cached so the full render that follows a
+preview does not decompress again.
+
+Every decompressed sprite is added to a ROM-wide TileIndex. A sprite whose
+tiles duplicate an already rendered sprite reuses that thumbnail instead of
+being decoded and scaled again.
+
+Thumbnails are decoded to palette indices and scaled with nearest-neighbor
+straight into an Indexed8 QImage, so each thumbnail costs one image buffer
+and no RGBA intermediate.
 """
 from __future__ import annotations
 
@@ -13,30 +27,46 @@ from pathlib import Path
 from queue import PriorityQueue
 from typing import Any
 
+from core.indexed_image import decode_sprite_tiles
+from core.navigation.tile_index import TileIndex
 from core.rom_extractor import ROMExtractor
 from core.tile_renderer import TileRenderer
-from PIL import Image
 from PySide6.QtCore import (
     QMutex,
     QMutexLocker,
     QObject,
-    Qt,
     QThread,
     Signal,
     Slot,
 )
 from PySide6.QtGui import QImage, QPixmap
 from typing_extensions import override
+from utils.image_utils import create_scaled_indexed_qimage
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Sprites are laid out on a grid at most this many tiles wide
+THUMBNAIL_WIDTH_TILES = 16
+
+# Preview thumbnails are rendered at 1/PREVIEW_SCALE of the requested size
+PREVIEW_SCALE = 4
+
+# Decompressed sprites kept for the full render that follows a preview
+SPRITE_DATA_CACHE_SIZE = 64
+
 @dataclass
 class ThumbnailRequest:
     """Request for thumbnail generation."""
     offset: int
     size: int
     priority: int = 0
+    preview: bool = False
+
+    @property
+    def render_size(self) -> int:
+        """Pixel size of the generated image."""
+        return max(1, self.size // PREVIEW_SCALE) if self.preview else self.size
 
     def __lt__(self, other: object) -> bool:
         """For priority queue sorting (lower priority value = higher priority)."""
@@ -133,6 +163,7 @@ class BatchThumbnailWorker(QObject):
 
     # Signals - Use QImage instead of QPixmap for thread safety
     thumbnail_ready = Signal(int, QImage)  # offset, qimage (thread-safe)
+    preview_ready = Signal(int, QImage)  # offset, low-resolution qimage
     progress = Signal(int, int)  # current, total
     error = Signal(str)
     started = Signal()
@@ -171,6 +202,9 @@ class BatchThumbnailWorker(QObject):
 
         # LRU Cache for recently generated thumbnails (store QImage, not QPixmap)
         self._cache = LRUCache(maxsize=100)
+        self._sprite_data_cache: OrderedDict[int, bytes] = OrderedDict()
+        # Tiles of every sprite decompressed so far, guarded by _cache_mutex
+        self.tile_index = TileIndex()
 
         # Memory-mapped ROM data
         self._rom_file = None
@@ -218,6 +252,26 @@ class BatchThumbnailWorker(QObject):
         for i, offset in enumerate(offsets):
             self.queue_thumbnail(offset, size, priority_start + i)
 
+    def replace_queue(self, requests: list[ThumbnailRequest]) -> int:
+        """
+        Replace all pending requests, cancelling those not in the new list.
+
+        Requests already being rendered still complete.
+
+        Args:
+            requests: New requests; lower priority values are served first
+
+        Returns:
+            Number of pending requests that were dropped
+        """
+        with QMutexLocker(self._mutex):
+            dropped = self._request_queue.qsize()
+            self._request_queue = PriorityQueue()
+            for request in requests:
+                self._request_queue.put(request)
+            self._pending_count = max(0, self._pending_count - dropped) + len(requests)
+        return dropped
+
     def clear_queue(self) -> None:
         """Clear all pending requests."""
         with QMutexLocker(self._mutex):
@@ -297,10 +351,10 @@ class BatchThumbnailWorker(QObject):
                         request = self._get_next_request()
                         if request:
                             # Check cache first
-                            cache_key = (request.offset, request.size)
+                            cache_key = (request.offset, request.render_size)
                             cached_image = self._get_cached_image(cache_key)
                             if cached_image:
-                                self.thumbnail_ready.emit(request.offset, cached_image)
+                                self._emit_thumbnail(request, cached_image)
                                 self._completed_count += 1
                                 self._emit_progress()
                             else:
@@ -341,11 +395,11 @@ class BatchThumbnailWorker(QObject):
                 logger.debug(f"Processing thumbnail request: offset=0x{request.offset:06X}, size={request.size}")
 
                 # Check cache first (thread-safe)
-                cache_key = (request.offset, request.size)
+                cache_key = (request.offset, request.render_size)
                 cached_image = self._get_cached_image(cache_key)
 
                 if cached_image:
-                    self.thumbnail_ready.emit(request.offset, cached_image)
+                    self._emit_thumbnail(request, cached_image)
                     self._completed_count += 1
                     self._emit_progress()
                     continue
@@ -359,7 +413,7 @@ class BatchThumbnailWorker(QObject):
                     self._add_to_cache(cache_key, qimage)
 
                     # Emit result (QImage is thread-safe)
-                    self.thumbnail_ready.emit(request.offset, qimage)
+                    self._emit_thumbnail(request, qimage)
                     processed_count += 1
                 else:
                     logger.warning(f"Failed to generate thumbnail for 0x{request.offset:06X} - image is null or None")
@@ -531,11 +585,11 @@ class BatchThumbnailWorker(QObject):
                 qimage = future.result(timeout=2.0)  # 2 second timeout per thumbnail
                 if qimage:
                     # Cache the result
-                    cache_key = (request.offset, request.size)
+                    cache_key = (request.offset, request.render_size)
                     self._add_to_cache(cache_key, qimage)
 
                     # Emit result (thread-safe)
-                    self.thumbnail_ready.emit(request.offset, qimage)
+                    self._emit_thumbnail(request, qimage)
                     self._completed_count += 1
                     self._emit_progress()
 
@@ -575,124 +629,99 @@ class BatchThumbnailWorker(QObject):
             return None
 
         try:
-            # Try to decompress sprite at offset
-            decompressed_data = None
-
-            if self.rom_extractor and hasattr(self.rom_extractor, 'rom_injector'):
-                # Try HAL decompression
-                try:
-                    # Read chunk for decompression
-                    chunk = self._read_rom_chunk(request.offset, 0x10000)  # Read up to 64KB
-                    if chunk:
-                        _, decompressed_data = self.rom_extractor.rom_injector.find_compressed_sprite(
-                            chunk,
-                            0,  # Offset within chunk
-                            expected_size=None
-                        )
-                        if decompressed_data:
-                            logger.debug(f"HAL decompressed {len(decompressed_data)} bytes from 0x{request.offset:06X}")
-                except Exception as e:
-                    # Log decompression failures for debugging, but continue with fallback to raw data
-                    logger.debug(f"HAL decompression failed for offset 0x{request.offset:06X}: {e}")
-                    decompressed_data = None
-
-            # If no decompressed data, use raw data
-            if not decompressed_data:
-                # Read raw tile data (up to 256 tiles)
-                max_size = 32 * 256  # 32 bytes per tile, max 256 tiles
-                decompressed_data = self._read_rom_chunk(request.offset, max_size)
-                if decompressed_data:
-                    logger.debug(f"Using raw data: {len(decompressed_data)} bytes from 0x{request.offset:06X}")
-
+            decompressed_data = self._load_sprite_data(request.offset)
             if not decompressed_data:
                 return None
 
-            # Render tiles to image
-            tile_count = len(decompressed_data) // 32
-            if tile_count == 0:
+            # Identical tile content renders identically
+            with QMutexLocker(self._cache_mutex):
+                source = self.tile_index.duplicate_of(request.offset)
+            if source is not None:
+                duplicate = self._cache.get((source, request.render_size))
+                if duplicate is not None:
+                    logger.debug(f"Reusing thumbnail of 0x{source:06X} for 0x{request.offset:06X}")
+                    return duplicate
+
+            # Decode straight to palette indices (grayscale by default)
+            indices = decode_sprite_tiles(decompressed_data, THUMBNAIL_WIDTH_TILES)
+            if indices is None:
                 logger.debug(f"No tiles to render for 0x{request.offset:06X}")
                 return None
 
-            # Calculate dimensions (try to make roughly square)
-            width_tiles = min(16, tile_count)
-            height_tiles = (tile_count + width_tiles - 1) // width_tiles
-            logger.debug(f"Rendering {tile_count} tiles as {width_tiles}x{height_tiles} grid")
-
-            # Render using tile renderer
-            # Use palette_index=None for grayscale (will trigger grayscale fallback)
-            image = self.tile_renderer.render_tiles(
-                decompressed_data,
-                width_tiles,
-                height_tiles,
-                palette_index=None  # Grayscale by default
+            # Nearest-neighbor scale into the Indexed8 image's own buffer
+            return create_scaled_indexed_qimage(
+                indices, request.render_size, self.tile_renderer.get_color_table(None)
             )
 
-            if not image:
-                logger.warning(f"TileRenderer returned None for 0x{request.offset:06X}")
-                return None
-
-            # Convert PIL Image to QImage (thread-safe)
-            qimage = self._pil_to_qimage(image)
-
-            # Scale to requested size
-            if qimage and not qimage.isNull():
-                qimage = qimage.scaled(
-                    request.size,
-                    request.size,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-
-            return qimage
-
         except Exception as e:
             logger.debug(f"Failed to generate thumbnail for offset {request.offset:06X}: {e}")
             return None
 
-    def _pil_to_qimage(self, image: Image.Image) -> QImage:
+    def _load_sprite_data(self, offset: int) -> bytes | None:
         """
-        Convert PIL Image to QImage (thread-safe and optimized).
+        Get sprite data at an offset, HAL-decompressed when possible.
+
+        Results are kept in a small LRU so a preview and the full render that
+        follows it share one decompression.
 
         Args:
-            image: PIL Image
+            offset: ROM offset of sprite
 
         Returns:
-            QImage (thread-safe alternative to QPixmap)
+            Decompressed (or raw) tile data, or None if unreadable
         """
-        width, height = image.size
-
-        # Optimize based on image mode to avoid unnecessary conversions
-        if image.mode == "RGBA":
-            # Already in RGBA - most efficient path
-            bytes_data = image.tobytes("raw", "RGBA")
-            qimage = QImage(bytes_data, width, height, width * 4, QImage.Format.Format_RGBA8888)
-        elif image.mode == "RGB":
-            # RGB - convert directly without alpha
-            bytes_data = image.tobytes("raw", "RGB")
-            qimage = QImage(bytes_data, width, height, width * 3, QImage.Format.Format_RGB888)
-        elif image.mode == "L":
-            # Grayscale - use native grayscale format
-            bytes_data = image.tobytes("raw", "L")
-            qimage = QImage(bytes_data, width, height, width, QImage.Format.Format_Grayscale8)
-        elif image.mode == "P":
-            # Palette mode - convert to RGB (more efficient than RGBA)
-            image = image.convert("RGB")
-            bytes_data = image.tobytes("raw", "RGB")
-            qimage = QImage(bytes_data, width, height, width * 3, QImage.Format.Format_RGB888)
-        else:
-            # Fallback for other modes
-            image = image.convert("RGBA")
-            bytes_data = image.tobytes("raw", "RGBA")
-            qimage = QImage(bytes_data, width, height, width * 4, QImage.Format.Format_RGBA8888)
+        with QMutexLocker(self._cache_mutex):
+            if offset in self._sprite_data_cache:
+                self._sprite_data_cache.move_to_end(offset)
+                return self._sprite_data_cache[offset]
+
+        decompressed_data = None
 
-        # Use copy() only when necessary - if the bytes_data might be garbage collected
-        # Since we're in a worker thread and the data is from tobytes(), we need the copy
-        return qimage.copy()
+        if self.rom_extractor and hasattr(self.rom_extractor, 'rom_injector'):
+            # Try HAL decompression
+            try:
+                # Read chunk for decompression
+                chunk = self._read_rom_chunk(offset, 0x10000)  # Read up to 64KB
+                if chunk:
+                    _, decompressed_data = self.rom_extractor.rom_injector.find_compressed_sprite(
+                        chunk,
+                        0,  # Offset within chunk
+                        expected_size=None
+                    )
+                    if decompressed_data:
+                        logger.debug(f"HAL decompressed {len(decompressed_data)} bytes from 0x{offset:06X}")
+            except Exception as e:
+                # Log decompression failures for debugging, but continue with fallback to raw data
+                logger.debug(f"HAL decompression failed for offset 0x{offset:06X}: {e}")
+                decompressed_data = None
+
+        # If no decompressed data, use raw data
+        if not decompressed_data:
+            # Read raw tile data (up to 256 tiles)
+            max_size = 32 * 256  # 32 bytes per tile, max 256 tiles
+            decompressed_data = self._read_rom_chunk(offset, max_size)
+            if decompressed_data:
+                logger.debug(f"Using raw data: {len(decompressed_data)} bytes from 0x{offset:06X}")
+
+        if decompressed_data:
+            with QMutexLocker(self._cache_mutex):
+                self.tile_index.add_block(offset, decompressed_data)
+                self._sprite_data_cache[offset] = decompressed_data
+                while len(self._sprite_data_cache) > SPRITE_DATA_CACHE_SIZE:
+                    self._sprite_data_cache.popitem(last=False)
+        return decompressed_data
 
     def _add_to_cache(self, key: tuple[int, int], qimage: QImage):
         """Add an image to the cache (thread-safe with LRU eviction)."""
         self._cache.put(key, qimage)
 
+    def _emit_thumbnail(self, request: ThumbnailRequest, qimage: QImage) -> None:
+        """Emit a finished image on the signal matching its request kind."""
+        if request.preview:
+            self.preview_ready.emit(request.offset, qimage)
+        else:
+            self.thumbnail_ready.emit(request.offset, qimage)
+
     def _emit_progress(self) -> None:
         """Emit progress signal."""
         total = self._pending_count + self._completed_count
@@ -714,6 +743,8 @@ class BatchThumbnailWorker(QObject):
             cache_size = self._cache.size()
             if self._cache:
                 self._cache.clear()
+            with QMutexLocker(self._cache_mutex):
+                self._sprite_data_cache.clear()
             if cache_size > 0:
                 logger.debug(f"Cleared thumbnail cache: freed {cache_size} cached images")
                 # Log cache statistics before clearing
@@ -782,6 +813,7 @@ class ThumbnailWorkerController(QObject):
 
     # Forward signals from worker
     thumbnail_ready = Signal(int, QPixmap)  # Convert QImage back to QPixmap in main thread
+    preview_ready = Signal(int, QPixmap)  # Low-resolution first pass
     progress = Signal(int, int)
     error = Signal(str)
 
@@ -789,13 +821,18 @@ class ThumbnailWorkerController(QObject):
         super().__init__(parent)
         self.worker: BatchThumbnailWorker | None = None
         self._thread: QThread | None = None
+        self._rom_path: str | None = None
+        self._rom_extractor: ROMExtractor | None = None
 
     def start_worker(self, rom_path: str, rom_extractor: ROMExtractor | None = None) -> None:
         """Start worker with proper thread management."""
-        if self._thread and self._thread.isRunning():
+        if self._is_running():
             logger.warning("Worker already running, stopping first")
             self.stop_worker()
 
+        self._rom_path = rom_path
+        self._rom_extractor = rom_extractor
+
         # Create worker and thread
         self.worker = BatchThumbnailWorker(rom_path, rom_extractor)
         self._thread = QThread()
@@ -811,6 +848,7 @@ class ThumbnailWorkerController(QObject):
 
         # Forward worker signals, converting QImage to QPixmap
         self.worker.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self.worker.preview_ready.connect(self._on_preview_ready)
         self.worker.progress.connect(self.progress.emit)
         self.worker.error.connect(self.error.emit)
 
@@ -824,6 +862,20 @@ class ThumbnailWorkerController(QObject):
             pixmap = QPixmap.fromImage(qimage)
             self.thumbnail_ready.emit(offset, pixmap)
 
+    @Slot(int, QImage)
+    def _on_preview_ready(self, offset: int, qimage: QImage) -> None:
+        """Convert a preview QImage to QPixmap in main thread and forward signal."""
+        if not qimage.isNull():
+            self.preview_ready.emit(offset, QPixmap.fromImage(qimage))
+
+    def _is_running(self) -> bool:
+        """Check whether the worker thread is alive."""
+        try:
+            return self._thread is not None and self._thread.isRunning()
+        except RuntimeError:
+            # Thread object already deleted after the worker auto-stopped
+            return False
+
     def queue_thumbnail(self, offset: int, size: int = 128, priority: int = 0) -> None:
         """Queue a thumbnail for generation."""
         if self.worker:
@@ -834,17 +886,42 @@ class ThumbnailWorkerController(QObject):
         if self.worker:
             self.worker.queue_batch(offsets, size, priority_start)
 
+    def schedule_thumbnails(self, requests: list[tuple[int, bool]], size: int = 128) -> None:
+        """
+        Replace pending work with the requests for the current viewport.
+
+        Restarts the worker if it stopped itself after idling. Does nothing
+        once the controller has been cleaned up.
+
+        Args:
+            requests: (offset, preview) pairs in priority order
+            size: Full thumbnail size in pixels
+        """
+        if not self._is_running():
+            if not self._rom_path:
+                return
+            self.start_worker(self._rom_path, self._rom_extractor)
+        if self.worker:
+            self.worker.replace_queue([
+                ThumbnailRequest(offset, size, priority, preview)
+                for priority, (offset, preview) in enumerate(requests)
+            ])
+
     def stop_worker(self) -> None:
         """Safely stop worker and thread."""
         if self.worker:
-            self.worker.stop()
-        if self._thread:
+            with suppress(RuntimeError):  # Worker deleted after auto-stop
+                self.worker.stop()
+        if self._thread and self._is_running():
             self._thread.quit()
             if not self._thread.wait(3000):  # Wait up to 3 seconds
                 logger.warning("Thread did not stop within timeout")
 
     def cleanup(self) -> None:
-        """Clean up resources."""
+        """Clean up resources. The worker is not restarted afterwards."""
+        # Forget the ROM first so a late schedule_thumbnails() cannot restart it
+        self._rom_path = None
+        self._rom_extractor = None
         self.stop_worker()
         if self.worker:
             self.worker.cleanup()
@@ -160,3 +160,109 @@ class ROMInjectionWorker(QThread):
         except Exception as e:
             logger.error(f"ROM injection failed: {e}", exc_info=True)
             self.injection_finished.emit(False, f"Injection failed: {e}")
+
+class ROMBatchInjectionWorker(QThread):
+    """Worker thread that injects several sprites into a ROM in one transaction"""
+
+    progress: Signal = Signal(str)  # Status message
+    progress_percent: Signal = Signal(int)  # Progress percentage (0-100)
+    compression_info: Signal = Signal(dict)  # Per-sprite compression statistics
+    injection_finished: Signal = Signal(bool, str)  # Success, message
+
+    def __init__(
+        self,
+        sprites: list[tuple[str, int]],
+        rom_input: str,
+        rom_output: str,
+        fast_compression: bool = False,
+    ):
+        super().__init__()
+        self.sprites: list[tuple[str, int]] = sprites
+        self.rom_input: str = rom_input
+        self.rom_output: str = rom_output
+        self.fast_compression: bool = fast_compression
+        self.injector: ROMInjector = ROMInjector()
+
+    @override
+    def run(self) -> None:
+        """Validate every sprite, then inject them all with a single ROM read and write"""
+        logger.info(f"Starting batch ROM injection worker: {len(self.sprites)} sprites, rom={self.rom_input}")
+        try:
+            if not self.rom_output or not self.rom_output.strip():
+                self.injection_finished.emit(False, "Output ROM path is required. Please specify an output file.")
+                return
+
+            output_path = Path(self.rom_output)
+            if not output_path.parent.exists():
+                self.injection_finished.emit(
+                    False,
+                    f"Output directory does not exist: {output_path.parent}"
+                )
+                return
+
+            # Validate all sprites before touching the ROM
+            self.progress.emit(f"Validating {len(self.sprites)} sprite files...")
+            self.progress_percent.emit(0)
+            errors: list[str] = []
+            for sprite_path, _offset in self.sprites:
+                valid, message = self.injector.validate_sprite(sprite_path)
+                if not valid:
+                    errors.append(f"{Path(sprite_path).name}: {message}")
+                    continue
+                is_valid, sprite_errors, _warnings = SpriteValidator.validate_sprite_comprehensive(sprite_path)
+                if not is_valid:
+                    errors.extend(f"{Path(sprite_path).name}: {error}" for error in sprite_errors)
+            if errors:
+                self.injection_finished.emit(False, "Sprite validation failed:\n" + "\n".join(errors))
+                return
+
+            tools_ok, tools_msg = self.injector.hal_compressor.test_tools()
+            if not tools_ok:
+                self.injection_finished.emit(False, tools_msg)
+                return
+
+            # Offsets are given without the SMC header
+            try:
+                _header_info, header_offset = ROMValidator.validate_rom_header(self.rom_input)
+            except Exception as e:
+                self.injection_finished.emit(False, f"ROM validation failed: {e}")
+                return
+            sprites = [(path, offset + header_offset) for path, offset in self.sprites]
+
+            def on_progress(percent: int, message: str) -> None:
+                self.progress.emit(message)
+                self.progress_percent.emit(percent)
+
+            success, message, results = self.injector.inject_sprites_to_rom(
+                sprites,
+                self.rom_input,
+                self.rom_output,
+                fast_compression=self.fast_compression,
+                create_backup=True,
+                progress_callback=on_progress,
+            )
+
+            self.compression_info.emit({
+                "sprites": [
+                    {
+                        "sprite_path": result.sprite_path,
+                        "offset": result.offset - header_offset,
+                        "original_size": result.original_size,
+                        "compressed_size": result.compressed_size,
+                        "compression_ratio": result.compression_ratio,
+                        "compression_mode": result.compression_mode,
+                        "trials": [
+                            {"mode": trial.name, "size": trial.size, "error": trial.error}
+                            for trial in result.trials
+                        ],
+                        "fits": result.fits,
+                        "error": result.error,
+                    }
+                    for result in results
+                ],
+            })
+            self.injection_finished.emit(success, message)
+
+        except Exception as e:
+            logger.error(f"Batch ROM injection failed: {e}", exc_info=True)
+            self.injection_finished.emit(False, f"Injection failed: {e}")
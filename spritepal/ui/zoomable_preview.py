@@ -11,6 +11,7 @@ from typing_extensions import override
 if TYPE_CHECKING:
     from PySide6.QtGui import (
         QColor,
+        QImage,
         QMouseEvent,
         QPainter,
         QPen,
@@ -21,6 +22,7 @@ if TYPE_CHECKING:
 else:
     from PySide6.QtGui import (
         QColor,
+        QImage,
         QMouseEvent,
         QPainter,
         QPen,
@@ -500,14 +502,14 @@ class PreviewPanel(QWidget):
         if not self._grayscale_image or not self.colorizer.has_palettes():
             return
 
-        # Get colorized image from colorizer
-        self._colorized_image = self.colorizer.get_display_image(
+        # Get colorized image from colorizer (Indexed8, recolored via color table)
+        self._colorized_image = self.colorizer.get_display_qimage(
             0, self._grayscale_image
         )
 
         # Update preview with colorized image
-        if self._colorized_image:
-            pixmap = self._pil_to_pixmap(self._colorized_image)
+        if self._colorized_image is not None:
+            pixmap = self._qimage_to_pixmap(self._colorized_image)
             self.preview.update_pixmap(pixmap)
 
     def _show_grayscale(self) -> None:
@@ -612,6 +614,10 @@ class PreviewPanel(QWidget):
         """Convert PIL image to QPixmap using enhanced utility function"""
         return pil_to_qpixmap(pil_image)
 
+    def _qimage_to_pixmap(self, qimage: QImage) -> QPixmap:
+        """Convert QImage to QPixmap"""
+        return QPixmap.fromImage(qimage)
+
     @override
     def keyPressEvent(self, a0: Any) -> None:
         """Handle keyboard input"""
@@ -31,11 +31,19 @@ EMPTY_REGION_MAX_UNIQUE_BYTES = 4     # Max unique bytes to consider empty
 EMPTY_REGION_SIZE = 4096              # Size of regions to analyze (4KB)
 EMPTY_REGION_TIMEOUT_MS = 1.0         # Max time per region analysis (1ms)
 
+# Free Space Detection Configuration
+FREE_SPACE_FILL_BYTES = (0x00, 0xFF)  # Padding bytes that mark unused ROM space
+FREE_SPACE_MIN_RUN = 64               # Shortest padding run treated as free space
+FREE_SPACE_GUARD = 16                 # Bytes kept unused at the start of each run
+LOROM_BANK_SIZE = 0x8000              # ROM bytes per LoROM bank
+HIROM_BANK_SIZE = 0x10000             # ROM bytes per HiROM bank
+
 # Sprite format
 BYTES_PER_TILE = 32  # 4bpp format
 TILE_WIDTH = 8  # Pixels
 TILE_HEIGHT = 8  # Pixels
 DEFAULT_TILES_PER_ROW = 16  # Default layout
+SPRITE_WIDTH_TILES = 16  # Tile grid width sprites are decoded on for similarity hashing
 
 # Palette information
 COLORS_PER_PALETTE = 16
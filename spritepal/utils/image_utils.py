@@ -2,9 +2,12 @@
 from __future__ import annotations
 
 import io
+from collections.abc import Sequence
+from functools import lru_cache
 
+import numpy as np
 from PIL import Image
-from PySide6.QtGui import QPixmap
+from PySide6.QtGui import QImage, QPixmap
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -64,6 +67,119 @@ def pil_to_qpixmap(pil_image: Image.Image | None) -> QPixmap | None:
         )
         return None
 
+def build_color_table(
+    colors: Sequence[Sequence[int]],
+    transparent_index: int | None = 0,
+    fill_color: tuple[int, int, int, int] = (0, 0, 0, 255),
+) -> list[int]:
+    """
+    Build a 256-entry ARGB color table for an Indexed8 QImage.
+
+    Args:
+        colors: RGB triplets for the palette (usually 16 entries)
+        transparent_index: Palette index rendered fully transparent, or None
+        fill_color: RGBA used for indices beyond the end of the palette
+
+    Returns:
+        List of 256 ARGB32 values suitable for QImage.setColorTable()
+    """
+    r, g, b, a = fill_color
+    fill = (a << 24) | (r << 16) | (g << 8) | b
+    table = [fill] * 256
+    for index, rgb in enumerate(colors[:256]):
+        table[index] = 0xFF000000 | (int(rgb[0]) << 16) | (int(rgb[1]) << 8) | int(rgb[2])
+    if transparent_index is not None and 0 <= transparent_index < 256:
+        table[transparent_index] = table[transparent_index] & 0x00FFFFFF
+    return table
+
+def create_indexed_qimage(indices: np.ndarray, color_table: list[int] | None = None) -> QImage:
+    """
+    Wrap a 2D array of palette indices in a Format_Indexed8 QImage.
+
+    The pixel data is copied once into the image's own buffer. Changing the
+    palette afterwards only needs QImage.setColorTable(), which touches the
+    table entries and not the pixels.
+
+    Args:
+        indices: 2D array (height, width) of palette indices
+        color_table: Optional ARGB color table (see build_color_table)
+
+    Returns:
+        Indexed8 QImage owning its pixel data
+    """
+    height, width = indices.shape
+    image = QImage(width, height, QImage.Format.Format_Indexed8)
+    if width and height:
+        stride = image.bytesPerLine()
+        buffer = np.frombuffer(image.bits(), dtype=np.uint8, count=stride * height)
+        buffer.reshape(height, stride)[:, :width] = np.clip(indices, 0, 255)
+    if color_table is not None:
+        image.setColorTable(color_table)
+    return image
+
+def fit_size(width: int, height: int, size: int) -> tuple[int, int]:
+    """
+    Size of a ``width`` x ``height`` image scaled to fit a ``size`` square.
+
+    Matches QImage.scaled() with Qt.KeepAspectRatio.
+
+    Args:
+        width: Source width
+        height: Source height
+        size: Edge of the bounding square
+
+    Returns:
+        (width, height) of the scaled image, each at least 1
+    """
+    if width >= height:
+        return size, max(1, height * size // width)
+    return max(1, width * size // height), size
+
+@lru_cache(maxsize=64)
+def _nearest_index_map(height: int, width: int, target_height: int, target_width: int) -> np.ndarray:
+    """Flat source index of every target pixel for nearest-neighbor scaling"""
+    rows = np.arange(target_height, dtype=np.intp) * height // target_height
+    cols = np.arange(target_width, dtype=np.intp) * width // target_width
+    index_map = rows[:, np.newaxis] * width + cols
+    index_map.setflags(write=False)
+    return index_map
+
+def create_scaled_indexed_qimage(
+    indices: np.ndarray, size: int, color_table: list[int] | None = None
+) -> QImage:
+    """
+    Scale palette indices with nearest-neighbor into a new Indexed8 QImage.
+
+    The image is scaled to fit a ``size`` square keeping its aspect ratio,
+    as pixel art should be: no filtering, no intermediate RGBA image. Pixels
+    are gathered straight into the QImage's own buffer through a cached index
+    map, so the image is the only per-call allocation.
+
+    Args:
+        indices: 2D array (height, width) of palette indices
+        size: Edge of the bounding square in pixels
+        color_table: Optional ARGB color table (see build_color_table)
+
+    Returns:
+        Indexed8 QImage owning its pixel data, or a null image if ``indices`` is empty
+    """
+    height, width = indices.shape
+    if not width or not height:
+        return QImage()
+    target_width, target_height = fit_size(width, height, size)
+    image = QImage(target_width, target_height, QImage.Format.Format_Indexed8)
+    stride = image.bytesPerLine()
+    buffer = np.frombuffer(image.bits(), dtype=np.uint8, count=stride * target_height)
+    np.take(
+        np.ascontiguousarray(indices, dtype=np.uint8).ravel(),
+        _nearest_index_map(height, width, target_height, target_width),
+        out=buffer.reshape(target_height, stride)[:, :target_width],
+        mode="clip",
+    )
+    if color_table is not None:
+        image.setColorTable(color_table)
+    return image
+
 def create_checkerboard_pattern(
     width: int,
     height: int,
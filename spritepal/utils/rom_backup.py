@@ -1,24 +1,79 @@
 """
 ROM backup utilities for SpritePal
+
+Two kinds of backup are kept side by side in a spritepal_backups directory:
+
+- Full copies of the ROM (``<rom>_backup_<timestamp><ext>``).
+- Journaled patches (``<rom>_patch_<timestamp>.sppatch``). A patch records
+  only the byte ranges an injection overwrites, with both the original and
+  the new bytes, plus SHA-256 hashes of the ROM before and after. Patches
+  chain by hash, so restoring undoes them newest first until the requested
+  state is reached.
+
+Journaled backups also take a full copy every ANCHOR_INTERVAL patches, or
+when no full copy exists yet. Every injection still writes its patch, so the
+chain never breaks at an anchor; the patch written alongside a full copy
+names it, and restoring that patch copies the anchor back directly.
 """
 from __future__ import annotations
 
+import hashlib
+import json
 import shutil
+import struct
+from collections.abc import Iterable
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+from utils.file_validator import atomic_write
 from utils.logging_config import get_logger
 from utils.rom_exceptions import ROMBackupError
 
 logger = get_logger(__name__)
 
+PATCH_MAGIC = b"SPPATCH1"
+PATCH_EXTENSION = ".sppatch"
+PATCH_RECORD = struct.Struct("<II")  # offset, length
+
+def _sha256(data: bytes | bytearray) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _read_patch(patch_path: Path, with_records: bool = True) -> tuple[dict[str, Any], list[tuple[int, bytes, bytes]]]:
+    """Read a patch file's header and, optionally, its (offset, old, new) records"""
+    data = patch_path.read_bytes()
+    if not data.startswith(PATCH_MAGIC):
+        raise ROMBackupError(f"Not a SpritePal patch backup: {patch_path}")
+    position = len(PATCH_MAGIC)
+    (header_length,) = struct.unpack_from("<I", data, position)
+    position += 4
+    header = json.loads(data[position : position + header_length])
+    position += header_length
+
+    records: list[tuple[int, bytes, bytes]] = []
+    while with_records and position < len(data):
+        offset, length = PATCH_RECORD.unpack_from(data, position)
+        position += PATCH_RECORD.size
+        old = data[position : position + length]
+        new = data[position + length : position + 2 * length]
+        if len(new) != length:
+            raise ROMBackupError(f"Truncated patch backup: {patch_path}")
+        position += 2 * length
+        records.append((offset, old, new))
+    return header, records
+
 class ROMBackupManager:
     """Manages ROM backups before modifications"""
 
     # Maximum number of backups to keep per ROM
     MAX_BACKUPS_PER_ROM = 10
 
+    # Maximum number of patch backups to keep per ROM
+    MAX_PATCHES_PER_ROM = 200
+
+    # Journaled backups take a full copy after this many patches
+    ANCHOR_INTERVAL = 10
+
     @classmethod
     def create_backup(cls, rom_path: str, backup_dir: str | None = None) -> str:
         """
@@ -49,7 +104,7 @@ class ROMBackupManager:
         rom_path_obj = Path(rom_path)
         rom_base = rom_path_obj.stem
         rom_ext = rom_path_obj.suffix
-        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S_%f")
         backup_name = f"{rom_base}_backup_{timestamp}{rom_ext}"
         backup_path = backup_subdir / backup_name
 
@@ -66,6 +121,117 @@ class ROMBackupManager:
         else:
             return str(backup_path)
 
+    @classmethod
+    def create_journaled_backup(
+        cls,
+        rom_path: str,
+        patched_data: bytes | bytearray,
+        patches: Iterable[tuple[int, bytes | bytearray, bytes | bytearray]],
+        backup_dir: str | None = None,
+    ) -> str:
+        """
+        Back up a ROM before writing an injection, as a patch where possible.
+
+        Call this after applying the patches in memory and before writing the
+        ROM. A full copy of the unmodified ROM on disk is taken as well when no
+        full copy exists yet or ANCHOR_INTERVAL patches have been written since
+        the last one.
+
+        Args:
+            rom_path: Path to the unmodified ROM file
+            patched_data: ROM data with the patches applied
+            patches: (offset, old bytes, new bytes) for each overwritten range
+            backup_dir: Directory for backups (default: same as ROM)
+
+        Returns:
+            Path to the patch backup
+
+        Raises:
+            ROMBackupError: If backup creation fails
+        """
+        if not Path(rom_path).exists():
+            raise ROMBackupError(f"ROM file not found: {rom_path}")
+
+        backups = cls.list_backups(rom_path, backup_dir)
+        patches_since_anchor = 0
+        for backup in backups:
+            if backup["kind"] == "full":
+                break
+            patches_since_anchor += 1
+        else:
+            patches_since_anchor = cls.ANCHOR_INTERVAL
+
+        anchor = None
+        if patches_since_anchor >= cls.ANCHOR_INTERVAL:
+            anchor = Path(cls.create_backup(rom_path, backup_dir)).name
+        return cls.create_patch_backup(rom_path, patched_data, patches, backup_dir, anchor=anchor)
+
+    @classmethod
+    def create_patch_backup(
+        cls,
+        rom_path: str,
+        patched_data: bytes | bytearray,
+        patches: Iterable[tuple[int, bytes | bytearray, bytes | bytearray]],
+        backup_dir: str | None = None,
+        anchor: str | None = None,
+    ) -> str:
+        """
+        Record the ranges an injection overwrites as a reversible patch.
+
+        Args:
+            rom_path: Path to the ROM being patched (names the backup)
+            patched_data: ROM data with the patches applied
+            patches: (offset, old bytes, new bytes) for each overwritten range
+            backup_dir: Directory for backups (default: same as ROM)
+            anchor: File name of a full copy of the unpatched ROM in the same
+                directory, taken for this injection
+
+        Returns:
+            Path to patch file
+
+        Raises:
+            ROMBackupError: If backup creation fails
+        """
+        if backup_dir is None:
+            backup_dir = str(Path(rom_path).parent)
+        backup_subdir = Path(backup_dir) / "spritepal_backups"
+
+        rom_path_obj = Path(rom_path)
+        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S_%f")
+        patch_path = backup_subdir / f"{rom_path_obj.stem}_patch_{timestamp}{PATCH_EXTENSION}"
+
+        try:
+            backup_subdir.mkdir(exist_ok=True)
+            records = [(offset, bytes(old), bytes(new)) for offset, old, new in patches]
+
+            # Rebuild the base ROM by undoing the patches, newest first
+            base = bytearray(patched_data)
+            for offset, old, new in reversed(records):
+                if len(old) != len(new):
+                    raise ValueError(f"Patch at 0x{offset:X} changes length")
+                base[offset : offset + len(old)] = old
+
+            header = json.dumps({
+                "rom": rom_path_obj.name,
+                "rom_size": len(patched_data),
+                "base_sha256": _sha256(base),
+                "result_sha256": _sha256(patched_data),
+                "created": timestamp,
+                "anchor": anchor,
+            }).encode()
+            chunks = [PATCH_MAGIC, struct.pack("<I", len(header)), header]
+            for offset, old, new in records:
+                chunks += [PATCH_RECORD.pack(offset, len(old)), old, new]
+            atomic_write(patch_path, b"".join(chunks))
+            logger.info(f"Created patch backup: {patch_path.name} ({len(records)} ranges)")
+
+            cls._cleanup_old_backups(backup_subdir, rom_path_obj.stem, rom_path_obj.suffix)
+
+        except Exception as e:
+            raise ROMBackupError(f"Failed to create patch backup: {e}") from e
+        else:
+            return str(patch_path)
+
     @classmethod
     def _cleanup_old_backups(cls, backup_dir: Path, rom_base: str, rom_ext: str) -> None:
         """Remove old backups keeping only the most recent ones"""
@@ -86,6 +252,12 @@ class ROMBackupManager:
                 backup_path.unlink()
                 logger.info(f"Removed old backup: {backup_path.name}")
 
+            # Patch names sort by creation time
+            patches = sorted(backup_dir.glob(f"{rom_base}_patch_*{PATCH_EXTENSION}"), reverse=True)
+            for patch_path in patches[cls.MAX_PATCHES_PER_ROM :]:
+                patch_path.unlink()
+                logger.info(f"Removed old patch backup: {patch_path.name}")
+
         except Exception as e:
             logger.warning(f"Failed to cleanup old backups: {e}")
 
@@ -130,6 +302,11 @@ class ROMBackupManager:
         """
         Restore a backup to target location.
 
+        A full backup is copied over the target. For a patch backup the target
+        is returned to the ROM as it was before that patch by undoing the
+        chain of patches that leads from the target's current contents back
+        to it, newest first.
+
         Args:
             backup_path: Path to backup file
             target_path: Path to restore to
@@ -140,12 +317,63 @@ class ROMBackupManager:
         if not Path(backup_path).exists():
             raise ROMBackupError(f"Backup file not found: {backup_path}")
 
+        if backup_path.endswith(PATCH_EXTENSION):
+            cls._restore_patch_backup(Path(backup_path), Path(target_path))
+            return
+
         try:
             _ = shutil.copy2(backup_path, target_path)
             logger.info(f"Restored backup to: {target_path}")
         except Exception as e:
             raise ROMBackupError(f"Failed to restore backup: {e}") from e
 
+    @classmethod
+    def _restore_patch_backup(cls, patch_path: Path, target_path: Path) -> None:
+        """Undo patches on the target until it matches the base of patch_path"""
+        try:
+            header = _read_patch(patch_path, with_records=False)[0]
+            goal = header["base_sha256"]
+
+            # A full copy taken with the patch holds its base state as is
+            anchor_path = patch_path.parent / header["anchor"] if header.get("anchor") else None
+            if anchor_path is not None and anchor_path.exists():
+                anchor_data = anchor_path.read_bytes()
+                if _sha256(anchor_data) == goal:
+                    atomic_write(target_path, anchor_data)
+                    logger.info(f"Restored {target_path} from anchor {anchor_path.name}")
+                    return
+
+            data = bytearray(target_path.read_bytes())
+            current = _sha256(data)
+
+            # Candidate patches, newest first; each is undone at most once
+            candidates = sorted(patch_path.parent.glob(f"*_patch_*{PATCH_EXTENSION}"), reverse=True)
+            headers = {path: _read_patch(path, with_records=False)[0] for path in candidates}
+            undone = 0
+            while current != goal:
+                step = next(
+                    (path for path in candidates if headers[path]["result_sha256"] == current),
+                    None,
+                )
+                if step is None:
+                    raise ROMBackupError(
+                        f"No patch chain leads from {target_path.name} back to {patch_path.name}"
+                    )
+                candidates.remove(step)
+                for offset, old, _new in reversed(_read_patch(step)[1]):
+                    data[offset : offset + len(old)] = old
+                current = _sha256(data)
+                if current != headers[step]["base_sha256"]:
+                    raise ROMBackupError(f"Patch backup {step.name} does not match its base ROM")
+                undone += 1
+
+            atomic_write(target_path, bytes(data))
+            logger.info(f"Restored {target_path} by undoing {undone} patch(es)")
+        except ROMBackupError:
+            raise
+        except Exception as e:
+            raise ROMBackupError(f"Failed to restore patch backup: {e}") from e
+
     @classmethod
     def list_backups(
         cls, rom_path: str, backup_dir: str | None = None
@@ -154,7 +382,11 @@ class ROMBackupManager:
         List all backups for a ROM.
 
         Returns:
-            List of backup info dicts with keys: path, size, timestamp
+            List of backup info dicts, newest first, with keys: path, filename,
+            size, mtime, timestamp_str, date and kind ("full" or "patch").
+            Patch entries also have base_sha256, result_sha256 and ranges; a
+            patch's base_sha256 equals the result_sha256 of the one before it
+            in the chain.
         """
         rom_path_obj = Path(rom_path)
 
@@ -188,12 +420,33 @@ class ROMBackupManager:
                             "date": datetime.fromtimestamp(stat.st_mtime, UTC).strftime(
                                 "%Y-%m-%d %H:%M:%S"
                             ),
+                            "kind": "full",
                         }
                     )
+
+            for file_path in backup_subdir.glob(f"{rom_base}_patch_*{PATCH_EXTENSION}"):
+                stat = file_path.stat()
+                header, records = _read_patch(file_path)
+                backups.append(
+                    {
+                        "path": str(file_path),
+                        "filename": file_path.name,
+                        "size": stat.st_size,
+                        "mtime": stat.st_mtime,
+                        "timestamp_str": header["created"],
+                        "date": datetime.fromtimestamp(stat.st_mtime, UTC).strftime(
+                            "%Y-%m-%d %H:%M:%S"
+                        ),
+                        "kind": "patch",
+                        "base_sha256": header["base_sha256"],
+                        "result_sha256": header["result_sha256"],
+                        "ranges": [(offset, len(old)) for offset, old, _new in records],
+                    }
+                )
         except Exception as e:
             logger.warning(f"Failed to list backups: {e}")
 
-        # Sort by modification time (newest first)
-        backups.sort(key=lambda x: x["mtime"], reverse=True)
+        # Sort by creation time (newest first); copy2 keeps the ROM's mtime on full copies
+        backups.sort(key=lambda x: x["timestamp_str"], reverse=True)
 
         return backups
@@ -49,11 +49,13 @@ class ROMCache:
     CACHE_VERSION = "1.0"
     CACHE_DIR_NAME = ".spritepal_rom_cache"
 
-    def __init__(self, cache_dir: str | None = None) -> None:
+    def __init__(self, cache_dir: str | None = None, use_settings: bool = True) -> None:
         """Initialize ROM cache with robust error handling.
 
         Args:
             cache_dir: Optional custom cache directory. If None, uses settings or default
+            use_settings: Read cache settings from the settings manager; headless
+                callers pass False to avoid loading the (Qt) manager stack
 
         """
         # Initialize hash cache for performance optimization
@@ -61,8 +63,10 @@ class ROMCache:
         self._hash_cache_lock = threading.Lock()
 
         # Get settings manager (might be None if managers not initialized yet)
+        self.settings_manager = None
         try:
-            self.settings_manager = get_settings_manager()
+            if use_settings:
+                self.settings_manager = get_settings_manager()
         except (ImportError, AttributeError, RuntimeError, Exception) as e:
             # Catch all exceptions including ManagerError from uninitialized managers
             logger.warning(f"Could not get settings manager during ROM cache initialization: {e}")
@@ -122,6 +126,10 @@ class ROMCache:
 
         return True
 
+    def get_rom_fingerprint(self, rom_path: str) -> str:
+        """Get the content hash identifying a ROM, shared by identical copies."""
+        return self._get_rom_hash(rom_path)
+
     def _get_rom_hash(self, rom_path: str) -> str:
         """Generate SHA-256 hash of ROM file for cache key with caching optimization.
 
@@ -370,6 +378,36 @@ class ROMCache:
             logger.warning(f"Failed to load scan progress: {e}")
             return None
 
+    def get_cached_scan_sprites(self, rom_path: str) -> list[dict[str, Any]]:
+        """Get the sprites found by every cached scan of a ROM, one per offset.
+
+        Args:
+            rom_path: Path to ROM file
+
+        Returns:
+            Sprite dictionaries sorted by offset
+        """
+        if not self._cache_enabled:
+            return []
+
+        sprites: dict[int, dict[str, Any]] = {}
+        try:
+            rom_hash = self._get_rom_hash(rom_path)
+            for cache_file in self.cache_dir.glob(f"{rom_hash}_scan_progress_*.json"):
+                if not self._is_cache_valid(cache_file, rom_path):
+                    continue
+                cache_data = self._load_cache_data(cache_file)
+                if not cache_data or cache_data.get("version") != self.CACHE_VERSION:
+                    continue
+                for sprite in cache_data.get("scan_progress", {}).get("found_sprites", []):
+                    offset = sprite.get("offset")
+                    if isinstance(offset, int):
+                        sprites.setdefault(offset, sprite)
+        except Exception as e:
+            logger.warning(f"Failed to load cached scan results: {e}")
+
+        return [sprites[offset] for offset in sorted(sprites)]
+
     def _get_scan_id(self, scan_params: dict[str, int]) -> str:
         """Generate unique scan ID from parameters."""
         # Create consistent hash from scan parameters
@@ -399,6 +437,7 @@ class ROMCache:
             scan_progress_files = [f for f in cache_files if "_scan_progress_" in f.name]
             preview_files = [f for f in cache_files if "_preview_" in f.name]
             preview_batch_files = [f for f in cache_files if "_preview_batch.json" in f.name]
+            palette_scan_files = [f for f in cache_files if "_palette_scan_" in f.name]
 
             return {
                 "cache_dir": str(self.cache_dir),
@@ -410,6 +449,7 @@ class ROMCache:
                 "scan_progress_caches": len(scan_progress_files),
                 "preview_caches": len(preview_files),
                 "preview_batch_caches": len(preview_batch_files),
+                "palette_scan_caches": len(palette_scan_files),
                 "cache_dir_exists": self.cache_dir.exists(),
             }
 
@@ -636,6 +676,80 @@ class ROMCache:
             logger.warning(f"Failed to save ROM info to cache: {e}")
             return False
 
+    def get_palette_candidates(self, rom_path: str,
+                               scan_params: dict[str, Any]) -> list[dict[str, Any]] | None:
+        """Get cached palette discovery results for ROM.
+
+        Args:
+            rom_path: Path to ROM file
+            scan_params: Parameters the palette scan was run with
+
+        Returns:
+            List of palette candidates or None if not cached
+
+        """
+        if not self._cache_enabled:
+            return None
+
+        try:
+            rom_hash = self._get_rom_hash(rom_path)
+            scan_id = self._get_scan_id(scan_params)
+            cache_file = self._get_cache_file_path(rom_hash, f"palette_scan_{scan_id}")
+
+            if not self._is_cache_valid(cache_file, rom_path):
+                return None
+
+            cache_data = self._load_cache_data(cache_file)
+            if not cache_data:
+                return None
+
+            # Validate cache format
+            if (cache_data.get("version") != self.CACHE_VERSION or
+                "palette_candidates" not in cache_data):
+                return None
+
+            return cache_data["palette_candidates"]
+
+        except Exception as e:
+            logger.warning(f"Failed to load palette candidates from cache: {e}")
+            return None
+
+    def save_palette_candidates(self, rom_path: str, scan_params: dict[str, Any],
+                                candidates: list[dict[str, Any]]) -> bool:
+        """Save palette discovery results to cache.
+
+        Args:
+            rom_path: Path to ROM file
+            scan_params: Parameters the palette scan was run with
+            candidates: Ranked palette candidates to cache
+
+        Returns:
+            True if saved successfully, False otherwise
+
+        """
+        if not self._cache_enabled:
+            return False
+
+        try:
+            rom_hash = self._get_rom_hash(rom_path)
+            scan_id = self._get_scan_id(scan_params)
+            cache_file = self._get_cache_file_path(rom_hash, f"palette_scan_{scan_id}")
+
+            cache_data = {
+                "version": self.CACHE_VERSION,
+                "rom_path": str(Path(rom_path).resolve()),
+                "rom_hash": rom_hash,
+                "scan_params": scan_params,
+                "cached_at": time.time(),
+                "palette_candidates": candidates,
+            }
+
+            return self._save_cache_data(cache_file, cache_data)
+
+        except Exception as e:
+            logger.warning(f"Failed to save palette candidates to cache: {e}")
+            return False
+
     def clear_scan_progress_cache(self, rom_path: str | None = None,
                                  scan_params: dict[str, int] | None = None) -> int:
         """Clear scan progress caches."""
@@ -0,0 +1,72 @@
+"""
+SNES ROM checksum utilities for SpritePal
+
+The SNES checksum is the sum of the ROM as little-endian 16-bit words,
+modulo 0x10000 (a trailing odd byte counts as a low byte). Because it is a
+plain sum, a patch changes it by the difference of the patched bytes alone:
+bytes at even positions contribute their value and bytes at odd positions
+256 times their value. checksum_delta uses this to keep a checksum current
+in O(patch size) instead of re-reading the whole ROM.
+"""
+from __future__ import annotations
+
+import numpy as np
+from utils.constants import ROM_CHECKSUM_COMPLEMENT_MASK
+
+
+def calculate_snes_checksum(data: bytes | bytearray | memoryview, start: int = 0) -> int:
+    """
+    Calculate the SNES checksum of a ROM.
+
+    Args:
+        data: ROM data
+        start: Offset where the ROM starts (SMC header size, if present)
+
+    Returns:
+        16-bit checksum
+    """
+    rom = np.frombuffer(data, dtype=np.uint8)[start:]
+    even_length = len(rom) & ~1
+    total = int(rom[:even_length].view("<u2").sum(dtype=np.uint64))
+    if even_length < len(rom):
+        total += int(rom[-1])
+    return total & ROM_CHECKSUM_COMPLEMENT_MASK
+
+def checksum_delta(position: int, old: bytes | bytearray, new: bytes | bytearray) -> int:
+    """
+    Change in the checksum sum when old bytes are replaced by new ones.
+
+    Args:
+        position: Position of the patch relative to the ROM start
+        old: Bytes before the patch
+        new: Bytes after the patch (same length as old)
+
+    Returns:
+        Unreduced change in the word sum; add it to a checksum and mask
+    """
+    if len(old) != len(new):
+        raise ValueError(f"Patch lengths differ: {len(old)} old bytes, {len(new)} new bytes")
+    if not old:
+        return 0
+
+    diff = np.frombuffer(new, dtype=np.uint8).astype(np.int64) - np.frombuffer(old, dtype=np.uint8)
+    # The first patched byte is a low byte if its position is even
+    low, high = (diff[0::2], diff[1::2]) if position % 2 == 0 else (diff[1::2], diff[0::2])
+    return int(low.sum()) + (int(high.sum()) << 8)
+
+def update_snes_checksum(
+    checksum: int, position: int, old: bytes | bytearray, new: bytes | bytearray
+) -> int:
+    """
+    Update a checksum for a patch without re-reading the ROM.
+
+    Args:
+        checksum: Checksum before the patch
+        position: Position of the patch relative to the ROM start
+        old: Bytes before the patch
+        new: Bytes after the patch
+
+    Returns:
+        16-bit checksum after the patch
+    """
+    return (checksum + checksum_delta(position, old, new)) & ROM_CHECKSUM_COMPLEMENT_MASK